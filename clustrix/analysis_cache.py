@@ -0,0 +1,222 @@
+"""Per-code-object cache for static analyses of decorated functions.
+
+Every call through ``@cluster`` may look at the function's source several
+times: complexity scoring, flattening, loop detection, loop splitting and
+GPU operation scanning each used to call ``inspect.getsource`` and
+``ast.parse`` on their own, on every call. None of these depend on the
+call's arguments, so they are computed once per code object and reused.
+
+Entries are keyed by ``func.__code__`` and validated against the
+modification time of the file defining it; when the file changes, the
+source is re-read and the cached analyses are dropped if its hash differs.
+Analyses that depend on argument values (such as evaluating ``range``
+bounds) still run per call, on the cached syntax tree.
+
+Cached values are shared: callers must not mutate the trees or results
+they get back.
+"""
+
+import ast
+import hashlib
+import inspect
+import linecache
+import logging
+import os
+import textwrap
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class AnalysisCacheStats:
+    """Hit/miss counters of the analysis cache."""
+
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+    entries: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+@dataclass
+class _Entry:
+    filename: str
+    mtime: Optional[int]
+    source: Optional[str] = None
+    source_hash: Optional[str] = None
+    analyses: Dict[str, Any] = field(default_factory=dict)
+
+
+def _file_mtime(filename: str) -> Optional[int]:
+    try:
+        return os.stat(filename).st_mtime_ns
+    except (OSError, ValueError):
+        # Interactive and generated code has no file to watch
+        return None
+
+
+def _code_of(func: Callable) -> Any:
+    return getattr(inspect.unwrap(func), "__code__", None)
+
+
+class AnalysisCache:
+    """Analyses of functions, cached per code object."""
+
+    def __init__(self):
+        self._entries: Dict[Any, _Entry] = {}
+        self._lock = threading.Lock()
+        self._stats = AnalysisCacheStats()
+
+    def _entry(self, func: Callable) -> Optional[_Entry]:
+        """Return the valid entry for ``func``, creating it if needed."""
+        code = _code_of(func)
+        if code is None:
+            return None
+        mtime = _file_mtime(code.co_filename)
+        with self._lock:
+            entry = self._entries.get(code)
+            if entry is None:
+                entry = self._entries[code] = _Entry(code.co_filename, mtime)
+                return entry
+            if entry.mtime == mtime:
+                return entry
+
+        # The file changed: keep the analyses only if this function didn't
+        linecache.checkcache(entry.filename)
+        try:
+            changed = entry.source_hash != self._hash(inspect.getsource(func))
+        except (OSError, TypeError):
+            changed = True
+        with self._lock:
+            if changed:
+                logger.debug(f"♻️ Source of {code.co_name} changed, re-analysing")
+                entry = self._entries[code] = _Entry(code.co_filename, mtime)
+                self._stats.invalidations += 1
+            else:
+                entry.mtime = mtime
+        return entry
+
+    @staticmethod
+    def _hash(source: str) -> str:
+        return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+    def source(self, func: Callable) -> str:
+        """
+        Return the source of ``func``, like ``inspect.getsource``.
+
+        Raises:
+            OSError, TypeError: If the source is unavailable (not cached)
+        """
+        entry = self._entry(func)
+        if entry is not None and entry.source is not None:
+            with self._lock:
+                self._stats.hits += 1
+            return entry.source
+        source = inspect.getsource(func)
+        if entry is not None:
+            with self._lock:
+                entry.source, entry.source_hash = source, self._hash(source)
+                self._stats.misses += 1
+        return source
+
+    def tree(self, func: Callable) -> ast.Module:
+        """
+        Return the parsed, dedented source of ``func``.
+
+        Line numbers are relative to the start of the definition. The tree
+        is shared and must not be modified; deep-copy it first.
+        """
+        return self.get(
+            func, "tree", lambda: ast.parse(textwrap.dedent(self.source(func)))
+        )
+
+    def get(self, func: Callable, name: str, compute: Callable[[], T]) -> T:
+        """
+        Return the analysis ``name`` of ``func``, computing it on a miss.
+
+        Exceptions raised by ``compute`` propagate and nothing is cached, so
+        a failed analysis is retried on the next call. Functions without a
+        code object are analysed every time.
+        """
+        entry = self._entry(func)
+        if entry is None:
+            return compute()
+        with self._lock:
+            if name in entry.analyses:
+                self._stats.hits += 1
+                return entry.analyses[name]
+        value = compute()
+        with self._lock:
+            entry.analyses.setdefault(name, value)
+            self._stats.misses += 1
+            return entry.analyses[name]
+
+    def invalidate(self, func: Optional[Callable] = None) -> None:
+        """Forget the analyses of ``func``, or of every function."""
+        with self._lock:
+            if func is None:
+                self._stats.invalidations += len(self._entries)
+                self._entries.clear()
+            elif self._entries.pop(_code_of(func), None) is not None:
+                self._stats.invalidations += 1
+
+    def discard(self, name: str) -> None:
+        """Forget one kind of analysis for every function."""
+        with self._lock:
+            for entry in self._entries.values():
+                entry.analyses.pop(name, None)
+
+    def stats(self) -> AnalysisCacheStats:
+        with self._lock:
+            return AnalysisCacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                invalidations=self._stats.invalidations,
+                entries=len(self._entries),
+            )
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = AnalysisCacheStats()
+
+
+_cache = AnalysisCache()
+
+
+def get_analysis_cache() -> AnalysisCache:
+    """Return the process-wide analysis cache."""
+    return _cache
+
+
+def function_source(func: Callable) -> str:
+    """Cached ``inspect.getsource(func)``."""
+    return _cache.source(func)
+
+
+def function_tree(func: Callable) -> ast.Module:
+    """Cached parse of ``func``'s dedented source (shared; do not modify)."""
+    return _cache.tree(func)
+
+
+def cached_analysis(func: Callable, name: str, compute: Callable[[], T]) -> T:
+    """Return analysis ``name`` of ``func``, computed once per code object."""
+    return _cache.get(func, name, compute)
+
+
+def analysis_cache_stats() -> AnalysisCacheStats:
+    """Return hit/miss statistics of the analysis cache."""
+    return _cache.stats()
+
+
+def clear_analysis_cache(func: Optional[Callable] = None) -> None:
+    """Forget cached analyses of ``func``, or of all functions."""
+    _cache.invalidate(func)
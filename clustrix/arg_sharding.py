@@ -0,0 +1,134 @@
+"""Send each parallel chunk only its slice of the arguments it iterates.
+
+Chunks of a split loop used to carry the call's full arguments, so a large
+array the loop walks over was serialized and uploaded once per chunk. When
+the loop analysis finds that an argument is only read inside the loop
+(:attr:`LoopSplit.shards`), each chunk gets just its part of it:
+
+- ``for row in data``: the chunk gets ``data[start:stop]`` and iterates all
+  of it
+- ``for i in range(len(x))`` reading ``x[i]`` or ``x.iloc[i]``: the chunk
+  gets ``x[start:stop]`` (``x.iloc[start:stop]``) and its chunk variant
+  reads ``x[i - start]``
+
+NumPy arrays and pandas objects are sliced as views, so sharding copies
+nothing locally; each chunk's payload then holds only its own rows.
+Arguments that are not sharded can be shared between chunks through the
+blob store (:mod:`clustrix.blob_store`).
+"""
+
+import inspect
+import logging
+from typing import Any, Callable, Dict, List, Tuple
+
+from .loop_splitting import _SHARD_OFFSET, SHARD_ILOC, SHARD_ITER, LoopSplitPlan
+
+logger = logging.getLogger(__name__)
+
+_SLICEABLE = (list, tuple, range, str, bytes)
+
+
+def _is_pandas(value: Any) -> bool:
+    return type(value).__module__.split(".")[0] == "pandas"
+
+
+def shard_value(value: Any, start: int, stop: int, access: str) -> Tuple[bool, Any]:
+    """
+    Slice positions ``start:stop`` of ``value``, as a view where possible.
+
+    Returns:
+        ``(True, shard)``, or ``(False, None)`` if ``value`` cannot be
+        sliced the way the function reads it
+    """
+    if access == SHARD_ILOC:
+        iloc = getattr(value, "iloc", None)
+        if iloc is None:
+            return False, None
+        return True, iloc[start:stop]
+    if _is_pandas(value):
+        # ``series[i]`` looks labels up, so positions cannot be shifted
+        return False, None
+    if isinstance(value, _SLICEABLE) or (
+        type(value).__name__ == "ndarray" and getattr(value, "ndim", 0) >= 1
+    ):
+        return True, value[start:stop]
+    return False, None
+
+
+def shard_chunk_arguments(
+    func: Callable,
+    args: tuple,
+    kwargs: dict,
+    split_plan: LoopSplitPlan,
+    chunks: List[Dict[str, Any]],
+) -> List[str]:
+    """
+    Replace sharded arguments in each chunk by the chunk's slice of them.
+
+    Args:
+        func: The (undecorated) function being run
+        args: Positional arguments of the call
+        kwargs: Keyword arguments of the call
+        split_plan: The call's loop split
+        chunks: Work chunks, updated in place
+
+    Returns:
+        Names of the arguments that were sharded
+    """
+    if split_plan.positional:
+        wanted = [(n, a) for n, a in split_plan.split.shards if a == SHARD_ITER]
+    else:
+        iterations = split_plan.iterations
+        if iterations.step != 1 or iterations.start < 0:
+            return []
+        wanted = [(n, a) for n, a in split_plan.split.shards if a != SHARD_ITER]
+    if not wanted or not chunks:
+        return []
+
+    try:
+        signature = inspect.signature(func)
+        bound = signature.bind(*args, **kwargs)
+    except (TypeError, ValueError):
+        return []
+    positional = [
+        name
+        for name, parameter in signature.parameters.items()
+        if parameter.kind
+        in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD)
+    ][: len(args)]
+    located = []
+    for name, access in wanted:
+        if (
+            name in bound.arguments
+            and shard_value(bound.arguments[name], 0, 0, access)[0]
+        ):
+            index = positional.index(name) if name in positional else None
+            located.append((name, access, bound.arguments[name], index))
+        elif access != SHARD_ITER:
+            # Indexed shards share one offset, so they are all or nothing
+            return []
+    if not located:
+        return []
+
+    range_kwarg = f"_chunk_range_{split_plan.split.variable}"
+    for chunk in chunks:
+        positions_of_chunk = chunk["range"]
+        if len(positions_of_chunk) == 0:
+            continue
+        start, stop = positions_of_chunk[0], positions_of_chunk[-1] + 1
+        chunk_args = list(chunk["args"])
+        for name, access, value, index in located:
+            _, shard = shard_value(value, start, stop, access)
+            if index is not None:
+                chunk_args[index] = shard
+            else:
+                chunk["kwargs"][name] = shard
+        chunk["args"] = tuple(chunk_args)
+        if split_plan.positional:
+            chunk["kwargs"][range_kwarg] = None  # Iterate the whole shard
+        else:
+            chunk["kwargs"][_SHARD_OFFSET] = start
+
+    names = [name for name, _, _, _ in located]
+    logger.info(f"✂️ Sending each chunk only its slice of {', '.join(names)}")
+    return names
@@ -0,0 +1,171 @@
+"""Content-addressed store for arguments shared by many cluster jobs.
+
+Every chunk of a parallel run is its own job with its own pickled
+arguments, so an argument all chunks need (a lookup table, model weights)
+used to be uploaded once per chunk. :class:`BlobStore` uploads such an
+argument once, as ``<remote_work_dir>/blobs/<sha256>.pkl``, and puts a
+:class:`BlobRef` in its place. Identical values are stored once across
+runs and clients: an upload is skipped when the blob already exists.
+
+A BlobRef needs nothing but the standard library on the cluster. It
+pickles as ``pickle.load(open("../blobs/<sha256>.pkl", "rb"))``, so the
+job's usual ``pickle.loads(data['args'])`` reads the shared value from
+the job directory's sibling ``blobs`` directory.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import shlex
+import tempfile
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+from .filesystem import invalidate_metadata
+from .placement import payload_bytes
+from .result_cache import REMOTE_TIER_CLUSTER_TYPES
+
+logger = logging.getLogger(__name__)
+
+BLOB_DIR = "blobs"
+DEFAULT_MIN_BYTES = 1024 * 1024
+
+
+class _BlobFile:
+    """Pickles as an open file, relative to the unpickling job's directory."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __reduce__(self):
+        return open, (self.path, "rb")
+
+
+class BlobRef:
+    """Stand-in for a value stored in the blob store."""
+
+    def __init__(self, digest: str, size: int):
+        self.digest = digest
+        self.size = size
+
+    @property
+    def job_relative_path(self) -> str:
+        """Path of the blob as seen from a job directory."""
+        return f"../{BLOB_DIR}/{self.digest}.pkl"
+
+    def __reduce__(self):
+        return pickle.load, (_BlobFile(self.job_relative_path),)
+
+    def __repr__(self) -> str:
+        return f"BlobRef({self.digest[:12]}, {self.size} bytes)"
+
+
+def blob_store_available(config, job_config: Dict[str, Any]) -> bool:
+    """Whether jobs run in ``remote_work_dir`` on a shared filesystem."""
+    return config.cluster_type in REMOTE_TIER_CLUSTER_TYPES and not job_config.get(
+        "provider"
+    )
+
+
+def blob_dir(config) -> str:
+    return f"{config.remote_work_dir}/{BLOB_DIR}"
+
+
+class BlobStore:
+    """
+    Uploads large arguments once and hands out references to them.
+
+    Args:
+        executor: Connected ClusterExecutor
+        config: Cluster configuration
+        min_bytes: Values smaller than this are left inline (default:
+            ``config.blob_store_min_bytes``)
+    """
+
+    def __init__(self, executor, config, min_bytes: Optional[int] = None):
+        self.executor = executor
+        self.config = config
+        if min_bytes is None:
+            min_bytes = getattr(config, "blob_store_min_bytes", DEFAULT_MIN_BYTES)
+        self.min_bytes = min_bytes
+        # id(value) -> (value, ref); the value is kept so its id stays unique
+        self._shared: Dict[int, Tuple[Any, Optional[BlobRef]]] = {}
+        self._dir_ready = False
+        self.uploaded_bytes = 0
+        self.reused = 0
+
+    def share(self, value: Any) -> Any:
+        """Return a BlobRef to ``value`` if it is large, else ``value``."""
+        if payload_bytes(value) < self.min_bytes:
+            return value
+        key = id(value)
+        if key not in self._shared:
+            self._shared[key] = (value, self._store(value))
+        ref = self._shared[key][1]
+        return value if ref is None else ref
+
+    def share_arguments(self, args: tuple, kwargs: dict) -> Tuple[tuple, dict]:
+        """Replace large positional and keyword arguments by references."""
+        return (
+            tuple(self.share(arg) for arg in args),
+            {name: self.share(value) for name, value in kwargs.items()},
+        )
+
+    def _store(self, value: Any) -> Optional[BlobRef]:
+        try:
+            data = pickle.dumps(value, protocol=4)
+        except Exception as e:
+            logger.debug(f"Not sharing unpicklable argument: {e}")
+            return None
+        if len(data) < self.min_bytes:
+            return None
+        digest = hashlib.sha256(data).hexdigest()
+        try:
+            self._upload(digest, data)
+        except Exception as e:
+            logger.warning(f"Could not upload shared argument, sending it inline: {e}")
+            return None
+        return BlobRef(digest, len(data))
+
+    def _run(self, command: str) -> str:
+        stdout, _ = self.executor.connection_manager.execute_remote_command(command)
+        return stdout
+
+    def _upload(self, digest: str, data: bytes) -> None:
+        directory = blob_dir(self.config)
+        path = f"{directory}/{digest}.pkl"
+        prepare = "" if self._dir_ready else f"mkdir -p {shlex.quote(directory)} && "
+        if "present" in self._run(
+            f"{prepare}test -f {shlex.quote(path)} && echo present"
+        ):
+            self._dir_ready = True
+            self.reused += 1
+            logger.info(f"📦 Argument {digest[:12]} is already on the cluster")
+            return
+        self._dir_ready = True
+
+        with tempfile.NamedTemporaryFile(mode="wb", delete=False) as f:
+            f.write(data)
+            local_path = f.name
+        partial = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            self.executor.connection_manager.upload_file(local_path, partial)
+        finally:
+            os.unlink(local_path)
+        # Readers only ever see complete blobs
+        self._run(f"mv -f {shlex.quote(partial)} {shlex.quote(path)}")
+        invalidate_metadata(path, self.config)
+        self.uploaded_bytes += len(data)
+        logger.info(
+            f"📦 Uploaded shared argument {digest[:12]} ({len(data)} bytes) once "
+            f"for all chunks"
+        )
+
+
+def clear_blob_store(executor, config=None) -> None:
+    """Delete every blob on the cluster."""
+    config = config or executor.config
+    executor.connection_manager.execute_remote_command(
+        f"rm -rf {shlex.quote(blob_dir(config))}"
+    )
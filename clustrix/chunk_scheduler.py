@@ -0,0 +1,212 @@
+"""Dynamic chunk scheduling for local loop parallelism.
+
+Splitting an iteration space into equal static chunks leaves cores idle when
+iteration cost is uneven: every worker waits for whichever chunk happened to
+get the expensive iterations. The schedulers here hand out chunks on demand
+from a shared counter instead:
+
+- ``static``: equal chunks of ``total / num_workers`` (the previous behaviour)
+- ``guided``: chunks proportional to the remaining work, shrinking towards the
+  end so late chunks fill the gaps left by slow ones (as OpenMP ``guided``)
+- ``adaptive``: guided sizes capped by an online estimate of per-iteration
+  cost, so each chunk takes roughly ``target_chunk_seconds``
+
+Results are always returned in iteration order.
+"""
+
+import logging
+import math
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEDULES = ("static", "guided", "adaptive")
+
+
+def guided_chunk_sizes(total: int, num_workers: int, min_chunk: int = 1) -> List[int]:
+    """
+    Precompute guided chunk sizes for ``total`` iterations.
+
+    Each chunk covers ``remaining / (2 * num_workers)`` iterations (at least
+    ``min_chunk``), so chunk sizes decrease geometrically. Submitted in order
+    to a pool, the large chunks start first and the small ones balance the
+    tail.
+    """
+    sizes = []
+    remaining = total
+    divisor = 2 * max(1, num_workers)
+    while remaining > 0:
+        size = min(remaining, max(min_chunk, math.ceil(remaining / divisor)))
+        sizes.append(size)
+        remaining -= size
+    return sizes
+
+
+class ChunkScheduler:
+    """
+    Hand out ``[start, stop)`` index ranges from a shared iteration counter.
+
+    Thread-safe; :meth:`record` feeds measured chunk durations back into the
+    adaptive schedule.
+    """
+
+    def __init__(
+        self,
+        total: int,
+        num_workers: int,
+        schedule: str = "guided",
+        min_chunk: int = 1,
+        target_chunk_seconds: float = 0.05,
+        chunk_size: Optional[int] = None,
+    ):
+        if schedule not in SCHEDULES:
+            raise ValueError(
+                f"Unknown schedule '{schedule}', expected one of {SCHEDULES}"
+            )
+        self.total = total
+        self.num_workers = max(1, num_workers)
+        self.schedule = schedule
+        self.min_chunk = max(1, min_chunk)
+        self.target_chunk_seconds = target_chunk_seconds
+        self.chunk_size = chunk_size
+        self.chunks_issued = 0
+        self._next = 0
+        self._cost_per_item: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def cost_per_item(self) -> Optional[float]:
+        """Smoothed seconds per iteration measured so far (adaptive only)."""
+        return self._cost_per_item
+
+    def _guided_size(self, remaining: int) -> int:
+        return max(self.min_chunk, math.ceil(remaining / (2 * self.num_workers)))
+
+    def _chunk_size(self, remaining: int) -> int:
+        if self.chunk_size:
+            return self.chunk_size
+        if self.schedule == "static":
+            return max(self.min_chunk, math.ceil(self.total / self.num_workers))
+
+        guided = self._guided_size(remaining)
+        if self.schedule == "guided":
+            return guided
+
+        if self._cost_per_item is None:
+            # Probe with small chunks until the first timings arrive
+            probe = math.ceil(self.total / (self.num_workers * 16))
+            return max(self.min_chunk, min(guided, probe))
+        if self._cost_per_item <= 0:
+            return guided
+        target = int(self.target_chunk_seconds / self._cost_per_item)
+        return max(self.min_chunk, min(guided, target))
+
+    def next_chunk(self) -> Optional[Tuple[int, int]]:
+        """Return the next ``(start, stop)`` range, or None when exhausted."""
+        with self._lock:
+            remaining = self.total - self._next
+            if remaining <= 0:
+                return None
+            size = min(remaining, self._chunk_size(remaining))
+            start = self._next
+            self._next += size
+            self.chunks_issued += 1
+            return start, start + size
+
+    def record(self, size: int, seconds: float) -> None:
+        """Record that a chunk of ``size`` iterations took ``seconds``."""
+        if size <= 0:
+            return
+        observed = seconds / size
+        with self._lock:
+            if self._cost_per_item is None:
+                self._cost_per_item = observed
+            else:
+                # Exponential moving average favouring recent chunks
+                self._cost_per_item = 0.7 * self._cost_per_item + 0.3 * observed
+
+
+class StreamChunkSizer:
+    """
+    Chunk sizes for iterables of unknown length.
+
+    Starts with single-item chunks and grows them so each chunk takes about
+    ``target_chunk_seconds``, based on a moving average of per-item cost.
+    """
+
+    def __init__(self, target_chunk_seconds: float = 0.05, max_chunk: int = 10_000):
+        self.target_chunk_seconds = target_chunk_seconds
+        self.max_chunk = max_chunk
+        self._cost_per_item: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def next_size(self) -> int:
+        with self._lock:
+            if self._cost_per_item is None:
+                return 1
+            if self._cost_per_item <= 0:
+                return self.max_chunk
+            target = int(self.target_chunk_seconds / self._cost_per_item)
+            return max(1, min(self.max_chunk, target))
+
+    def record(self, size: int, seconds: float) -> None:
+        if size <= 0:
+            return
+        observed = seconds / size
+        with self._lock:
+            if self._cost_per_item is None:
+                self._cost_per_item = observed
+            else:
+                self._cost_per_item = 0.7 * self._cost_per_item + 0.3 * observed
+
+
+def run_scheduled_chunks(
+    submit: Callable[[int, int], Future],
+    scheduler: ChunkScheduler,
+    max_in_flight: Optional[int] = None,
+) -> List[Any]:
+    """
+    Dispatch chunks from ``scheduler`` as workers become free.
+
+    Args:
+        submit: Submits the chunk ``[start, stop)`` and returns a future whose
+            result is ``(value, elapsed_seconds)``
+        scheduler: Source of chunk ranges
+        max_in_flight: Chunks outstanding at once (defaults to two per worker)
+
+    Returns:
+        Chunk values in iteration order
+    """
+    max_in_flight = max_in_flight or 2 * scheduler.num_workers
+    in_flight: Dict[Future, Tuple[int, int]] = {}
+    values: Dict[int, Any] = {}
+
+    def fill() -> None:
+        while len(in_flight) < max_in_flight:
+            chunk = scheduler.next_chunk()
+            if chunk is None:
+                return
+            in_flight[submit(*chunk)] = chunk
+
+    try:
+        fill()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                start, stop = in_flight.pop(future)
+                value, elapsed = future.result()
+                scheduler.record(stop - start, elapsed)
+                values[start] = value
+            fill()
+    except BaseException:
+        for future in in_flight:
+            future.cancel()
+        raise
+
+    logger.debug(
+        f"Scheduled {scheduler.total} iterations in {scheduler.chunks_issued} "
+        f"{scheduler.schedule} chunks"
+    )
+    return [values[start] for start in sorted(values)]
@@ -0,0 +1,391 @@
+"""Slot-aware placement of cloud jobs onto shared instances.
+
+By default every cloud job gets its own instance. When job packing is enabled,
+this module tracks the GPU, CPU and memory capacity of each running instance
+(taken from the provider catalogs in :mod:`clustrix.cost_providers`) and
+bin-packs concurrent jobs onto instances that still have free slots. Each job
+is isolated with its own ``CUDA_VISIBLE_DEVICES`` and CPU affinity set, and a
+new instance is only requested when no existing instance can fit the job.
+"""
+
+import re
+import logging
+import threading
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class InstanceCapacity:
+    """Schedulable resources of a single cloud instance type."""
+
+    gpus: int = 0
+    cpus: Optional[int] = None  # None means unknown / not constrained
+    memory_gb: Optional[float] = None  # None means unknown / not constrained
+
+    @property
+    def is_known(self) -> bool:
+        """Whether enough is known about the instance to pack jobs onto it."""
+        return self.gpus > 0 or self.cpus is not None
+
+
+@dataclass
+class SlotRequest:
+    """Resources requested by a single job."""
+
+    gpus: int = 0
+    cpus: int = 1
+    memory_gb: float = 0.0
+
+
+@dataclass
+class SlotAllocation:
+    """Resources assigned to a job on a specific instance."""
+
+    allocation_id: str
+    instance_key: str
+    gpu_ids: List[int] = field(default_factory=list)
+    cpu_ids: List[int] = field(default_factory=list)
+    memory_gb: float = 0.0
+
+    def get_environment(self) -> Dict[str, str]:
+        """Environment variables isolating this job on the shared instance."""
+        env = {"CUDA_VISIBLE_DEVICES": ",".join(str(g) for g in self.gpu_ids)}
+        if self.cpu_ids:
+            env["CLUSTRIX_CPU_AFFINITY"] = ",".join(str(c) for c in self.cpu_ids)
+        return env
+
+    def wrap_command(self, command: str) -> str:
+        """Prefix a single remote command with the isolation environment.
+
+        CPU pinning itself is applied by the execution script, which reads
+        ``CLUSTRIX_CPU_AFFINITY`` and calls ``os.sched_setaffinity``.
+        """
+        env_prefix = " ".join(f"{k}={v}" for k, v in self.get_environment().items())
+        return f"{env_prefix} {command}"
+
+
+class PackedInstance:
+    """Occupancy bookkeeping for one cloud instance shared by several jobs."""
+
+    def __init__(
+        self,
+        instance_key: str,
+        provider: str,
+        instance_type: str,
+        region: str,
+        capacity: InstanceCapacity,
+    ):
+        self.instance_key = instance_key
+        self.provider = provider
+        self.instance_type = instance_type
+        self.region = region
+        self.capacity = capacity
+
+        self.instance_id: Optional[str] = None
+        self.ssh_config: Optional[Dict[str, Any]] = None
+        self.cloud_provider: Any = None
+        self.error: Optional[str] = None
+        self.ready = threading.Event()
+
+        self.free_gpus: Set[int] = set(range(capacity.gpus))
+        self.free_cpus: Optional[Set[int]] = (
+            set(range(capacity.cpus)) if capacity.cpus is not None else None
+        )
+        self.free_memory_gb: Optional[float] = capacity.memory_gb
+        self.allocations: Dict[str, SlotAllocation] = {}
+
+    def matches(self, provider: str, instance_type: str, region: str) -> bool:
+        """Whether this instance can serve jobs for the given placement key."""
+        return (
+            self.error is None
+            and self.provider == provider
+            and self.instance_type == instance_type
+            and self.region == region
+        )
+
+    def fits(self, request: SlotRequest) -> bool:
+        """Whether the requested resources are currently free."""
+        if request.gpus > len(self.free_gpus):
+            return False
+        if self.free_cpus is not None and request.cpus > len(self.free_cpus):
+            return False
+        if self.free_memory_gb is not None and request.memory_gb > self.free_memory_gb:
+            return False
+        return True
+
+    def allocate(self, request: SlotRequest) -> SlotAllocation:
+        """Reserve slots for a job. Caller must check :meth:`fits` first."""
+        gpu_ids = sorted(self.free_gpus)[: request.gpus]
+        self.free_gpus.difference_update(gpu_ids)
+
+        cpu_ids: List[int] = []
+        if self.free_cpus is not None:
+            cpu_ids = sorted(self.free_cpus)[: request.cpus]
+            self.free_cpus.difference_update(cpu_ids)
+
+        if self.free_memory_gb is not None:
+            self.free_memory_gb -= request.memory_gb
+
+        allocation = SlotAllocation(
+            allocation_id=uuid.uuid4().hex[:8],
+            instance_key=self.instance_key,
+            gpu_ids=gpu_ids,
+            cpu_ids=cpu_ids,
+            memory_gb=request.memory_gb,
+        )
+        self.allocations[allocation.allocation_id] = allocation
+        return allocation
+
+    def free(self, allocation: SlotAllocation):
+        """Return a job's slots to the instance."""
+        if self.allocations.pop(allocation.allocation_id, None) is None:
+            return
+        self.free_gpus.update(allocation.gpu_ids)
+        if self.free_cpus is not None:
+            self.free_cpus.update(allocation.cpu_ids)
+        if self.free_memory_gb is not None:
+            self.free_memory_gb += allocation.memory_gb
+
+    @property
+    def is_idle(self) -> bool:
+        """Whether no jobs are currently placed on this instance."""
+        return not self.allocations
+
+    def get_occupancy(self) -> Dict[str, Any]:
+        """Summarize slot usage for monitoring."""
+        return {
+            "instance_id": self.instance_id,
+            "instance_type": self.instance_type,
+            "jobs": len(self.allocations),
+            "gpus_used": self.capacity.gpus - len(self.free_gpus),
+            "gpus_total": self.capacity.gpus,
+            "cpus_used": (
+                self.capacity.cpus - len(self.free_cpus)
+                if self.free_cpus is not None and self.capacity.cpus is not None
+                else None
+            ),
+            "cpus_total": self.capacity.cpus,
+            "ready": self.ready.is_set(),
+        }
+
+
+class SlotScheduler:
+    """Thread-safe first-fit bin packing of jobs onto shared cloud instances."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._instances: Dict[str, PackedInstance] = {}
+
+    def acquire(
+        self,
+        provider: str,
+        instance_type: str,
+        region: str,
+        request: SlotRequest,
+        capacity: InstanceCapacity,
+    ) -> tuple:
+        """
+        Reserve slots for a job, registering a new instance if none fits.
+
+        Args:
+            provider: Cloud provider name
+            instance_type: Provider-specific instance type
+            region: Region the instance lives in
+            request: Resources needed by the job
+            capacity: Capacity of ``instance_type``
+
+        Returns:
+            Tuple of (PackedInstance, SlotAllocation, is_new). When ``is_new`` is
+            True the caller is responsible for provisioning the instance and
+            calling :meth:`mark_ready` or :meth:`mark_failed`.
+        """
+        with self._lock:
+            for instance in self._instances.values():
+                if instance.matches(provider, instance_type, region) and instance.fits(
+                    request
+                ):
+                    return instance, instance.allocate(request), False
+
+            instance = PackedInstance(
+                instance_key=f"{provider}_{uuid.uuid4().hex[:8]}",
+                provider=provider,
+                instance_type=instance_type,
+                region=region,
+                capacity=capacity,
+            )
+            if not instance.fits(request):
+                raise ValueError(
+                    f"Job requesting {request.gpus} GPUs / {request.cpus} CPUs / "
+                    f"{request.memory_gb}GB does not fit on {instance_type}"
+                )
+            self._instances[instance.instance_key] = instance
+            return instance, instance.allocate(request), True
+
+    def mark_ready(
+        self,
+        instance: PackedInstance,
+        instance_id: str,
+        ssh_config: Dict[str, Any],
+        cloud_provider: Any = None,
+    ):
+        """Record a provisioned instance and wake jobs waiting on it."""
+        instance.instance_id = instance_id
+        instance.ssh_config = ssh_config
+        instance.cloud_provider = cloud_provider
+        instance.ready.set()
+
+    def mark_failed(self, instance: PackedInstance, error: str):
+        """Record that provisioning failed and stop placing jobs on the instance."""
+        with self._lock:
+            instance.error = error
+        instance.ready.set()
+
+    def release(self, allocation: SlotAllocation) -> Optional[PackedInstance]:
+        """
+        Free a job's slots.
+
+        Returns:
+            The instance if it became idle and was removed from the pool (so the
+            caller can terminate it), otherwise None.
+        """
+        with self._lock:
+            instance = self._instances.get(allocation.instance_key)
+            if instance is None:
+                return None
+            instance.free(allocation)
+            if instance.is_idle:
+                del self._instances[instance.instance_key]
+                return instance
+            return None
+
+    def get_occupancy(self) -> List[Dict[str, Any]]:
+        """Per-instance slot occupancy."""
+        with self._lock:
+            return [inst.get_occupancy() for inst in self._instances.values()]
+
+
+def _parse_memory_gb(value: Any) -> Optional[float]:
+    """Parse memory strings such as ``"8GB"``, ``"512MB"`` or ``"1.5T"``."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    match = re.match(r"^\s*([\d.]+)\s*([KMGT]?)i?B?\s*$", str(value), re.IGNORECASE)
+    if not match:
+        return None
+    number = float(match.group(1))
+    unit = match.group(2).upper()
+    scale = {"K": 1 / (1024 * 1024), "M": 1 / 1024, "G": 1, "T": 1024, "": 1}
+    return number * scale[unit]
+
+
+def _get_catalog_metadata(provider: str) -> Dict[str, Dict[str, Any]]:
+    """Load the instance metadata catalog of a provider's cost monitor."""
+    try:
+        if provider == "lambda":
+            from .cost_providers.lambda_cloud import LambdaCostMonitor
+
+            return LambdaCostMonitor(use_pricing_api=False).instance_metadata
+        elif provider == "aws":
+            from .cost_providers.aws import AWSCostMonitor
+
+            return AWSCostMonitor(use_pricing_api=False).instance_metadata
+        elif provider == "azure":
+            from .cost_providers.azure import AzureCostMonitor
+
+            return AzureCostMonitor(use_pricing_api=False).instance_metadata
+        elif provider == "gcp":
+            from .cost_providers.gcp import GCPCostMonitor
+
+            return GCPCostMonitor(use_pricing_api=False).instance_metadata
+    except Exception as e:
+        logger.debug(f"Could not load instance catalog for {provider}: {e}")
+    return {}
+
+
+# Lambda API instance type names and their keys in the Lambda cost catalog
+_LAMBDA_CATALOG_KEYS = {
+    "gpu_1x_a10": "a10",
+    "gpu_1x_a6000": "a6000",
+    "gpu_1x_h100": "h100",
+    "gpu_1x_h100_pcie": "h100",
+    "gpu_1x_a100": "a100_40gb",
+    "gpu_1x_a100_sxm4": "a100_40gb",
+    "gpu_2x_a100": "2xa100_40gb",
+    "gpu_4x_a100": "4xa100_40gb",
+    "gpu_8x_a100": "8xa100_40gb",
+}
+
+
+def _catalog_key(provider: str, instance_type: str) -> str:
+    """Key of ``instance_type`` in the provider's cost catalog."""
+    if provider == "lambda":
+        return _LAMBDA_CATALOG_KEYS.get(instance_type.lower(), instance_type.lower())
+    return instance_type
+
+
+def get_instance_capacity(
+    provider: str,
+    instance_type: str,
+    override: Optional[Dict[str, Any]] = None,
+) -> InstanceCapacity:
+    """
+    Look up the GPU, CPU and memory capacity of an instance type.
+
+    Args:
+        provider: Cloud provider name ('lambda', 'aws', 'azure', 'gcp')
+        instance_type: Provider-specific instance type name
+        override: Optional dict with ``gpus``, ``cpu_cores`` and ``ram`` keys,
+            used for instance types missing from the catalogs
+
+    Returns:
+        InstanceCapacity
+
+    Raises:
+        ValueError: If the instance type is in no catalog and no override
+            is given
+    """
+    metadata = override
+    if metadata is None:
+        catalog = _get_catalog_metadata(provider)
+        metadata = catalog.get(_catalog_key(provider, instance_type))
+
+    if metadata is None:
+        raise ValueError(
+            f"Unknown {provider} instance type '{instance_type}': pass its "
+            f"'instance_capacity' (gpus, cpu_cores, ram) to pack jobs onto it"
+        )
+
+    return InstanceCapacity(
+        gpus=int(metadata.get("gpus", 0)),
+        cpus=(
+            int(metadata["cpu_cores"])
+            if metadata.get("cpu_cores") is not None
+            else None
+        ),
+        memory_gb=_parse_memory_gb(metadata.get("ram")),
+    )
+
+
+def build_slot_request(
+    job_config: Dict[str, Any], capacity: InstanceCapacity
+) -> SlotRequest:
+    """
+    Derive a job's slot request from its job configuration.
+
+    Jobs on GPU instances default to one GPU each; ``cores`` and ``memory``
+    follow the usual job_config conventions (e.g. ``4`` and ``"8GB"``).
+    """
+    default_gpus = 1 if capacity.gpus > 0 else 0
+    gpus = job_config.get("gpus")
+    memory_gb = _parse_memory_gb(job_config.get("memory")) or 0.0
+    return SlotRequest(
+        gpus=int(gpus) if gpus is not None else default_gpus,
+        cpus=max(1, int(job_config.get("cores") or 1)),
+        memory_gb=memory_gb,
+    )
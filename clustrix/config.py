@@ -138,6 +138,65 @@ class ClusterConfig:
     use_two_venv: bool = True  # Use two-venv setup for cross-version compatibility
     venv_setup_timeout: int = 300  # Timeout for venv setup in seconds (5 minutes)
 
+    # Local worker pool
+    local_pool_reuse: bool = True  # Keep local workers warm across @cluster calls
+    local_pool_preload_modules: Optional[list] = None  # Imported in each worker
+    local_pool_max_tasks: Optional[int] = None  # Recycle pool after N tasks in all
+    local_pool_max_worker_memory_mb: Optional[float] = None  # Recycle on RSS growth
+    local_chunk_schedule: str = "guided"  # static or guided local loop chunks
+    local_calibration: bool = True  # Measure functions to pick serial/threads/processes
+    local_task_timeout: Optional[float] = None  # Kill and replace stuck local tasks
+    local_task_retries: int = 0  # Retries for timed-out or crashed local tasks
+    local_cpu_affinity: bool = False  # Pin local workers to NUMA-local cores
+    limit_worker_threads: bool = (
+        True  # Set OMP/MKL/OPENBLAS threads to each worker's cores
+    )
+
+    # Result memoization (opt-in)
+    result_cache: bool = False  # Reuse results of identical @cluster calls
+    result_cache_max_bytes: Optional[int] = 2 * 1024**3  # Local tier LRU budget
+    result_cache_remote: bool = True  # Share results via remote_work_dir/result_cache
+    result_cache_remote_max_age_days: Optional[int] = 30  # Prune unused remote entries
+
+    # Parallel result collection
+    result_download_workers: int = 4  # Chunk results downloaded concurrently
+
+    # Parallel job payloads
+    shard_arguments: bool = True  # Send chunks only their slice of iterated args
+    blob_store_min_bytes: int = 1024 * 1024  # Share larger args via remote blobs
+
+    # Remote result handles (opt-in)
+    lazy_results: bool = False  # Calls return RemoteResults, downloaded on access
+
+    # Filesystem metadata cache (opt-in)
+    filesystem_cache: bool = False  # Cache remote stat/exists/ls results in memory
+    filesystem_cache_ttl: float = 30.0  # Seconds a cached lookup is trusted
+    filesystem_cache_max_entries: int = 100_000  # LRU bound, counting listed names
+
+    # Checkpointed parallel runs (opt-in)
+    checkpoint_parallel: bool = False  # Resume failed/interrupted runs chunk by chunk
+
+    # Straggler mitigation for parallel runs (opt-in)
+    speculative_execution: bool = False  # Duplicate slow chunks; first copy wins
+    speculative_min_done: float = 0.75  # Fraction of chunks done before speculating
+    speculative_percentile: float = 90.0  # Finished-chunk runtime percentile...
+    speculative_slack: float = 1.5  # ...times this marks a chunk as a straggler
+    speculative_max_duplicates: float = 0.1  # Duplicate cap, as a fraction of chunks
+    speculative_exclude_node: bool = True  # Keep duplicates off the slow node (SLURM)
+
+    # Local vs. remote placement
+    # cluster (remote whenever configured), auto (cost model), local_serial,
+    # local_parallel, remote_single or remote_array
+    placement: str = "cluster"
+    placement_queue_probe: bool = True  # Ask squeue/sprio for the current queue wait
+    placement_queue_ttl: float = 60.0  # Seconds a queue probe is reused
+    placement_remote_speedup: float = 1.0  # Per-core speed of cluster nodes vs. here
+    placement_max_local_seconds: float = 60.0  # Longer calls always run remotely
+
+    # Cloud job placement
+    cloud_job_packing: bool = False  # Pack concurrent cloud jobs onto shared instances
+    cloud_max_concurrent_jobs: int = 16  # Worker pool size for cloud job workflows
+
     # Monitoring settings
     cost_monitoring: bool = False  # Enable cost monitoring for cloud providers
 
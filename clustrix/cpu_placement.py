@@ -0,0 +1,263 @@
+"""CPU placement and BLAS thread limits for worker processes.
+
+A pool of ``N`` worker processes that each run multithreaded NumPy/BLAS code
+starts ``N x cores`` compute threads, which thrash each other's caches and
+spend their time context switching. Giving each worker a core budget avoids
+this:
+
+- ``OMP_NUM_THREADS``, ``MKL_NUM_THREADS``, ``OPENBLAS_NUM_THREADS`` (and
+  friends) are set to the budget before worker code imports NumPy, and are
+  re-applied through ``threadpoolctl`` when BLAS was already loaded (e.g. in
+  forked workers)
+- optionally, each worker is pinned with ``os.sched_setaffinity`` to its
+  own set of cores, taken from a single NUMA node so its memory stays local
+
+Variables the user has already set are never overridden.
+"""
+
+import glob
+import logging
+import multiprocessing
+import multiprocessing.util
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+try:
+    from threadpoolctl import threadpool_limits
+
+    THREADPOOLCTL_AVAILABLE = True
+except ImportError:
+    THREADPOOLCTL_AVAILABLE = False
+
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+
+
+def thread_env(threads: int) -> Dict[str, str]:
+    """Environment variables limiting native thread pools to ``threads``."""
+    return {var: str(max(1, threads)) for var in THREAD_ENV_VARS}
+
+
+def parse_cpulist(cpulist: str) -> List[int]:
+    """Parse a Linux cpulist such as ``"0-3,8-11"`` into CPU ids."""
+    cpus: List[int] = []
+    for part in cpulist.strip().split(","):
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-")
+            cpus.extend(range(int(first), int(last) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def available_cpus() -> List[int]:
+    """CPUs this process may run on (respects cgroup/taskset limits)."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def numa_nodes(sysfs_root: str = "/sys/devices/system/node") -> List[List[int]]:
+    """
+    CPUs of each NUMA node, restricted to CPUs available to this process.
+
+    Returns a single node with every available CPU when the topology cannot
+    be read (non-Linux systems, containers without sysfs).
+    """
+    allowed = set(available_cpus())
+    nodes = []
+    paths = glob.glob(os.path.join(sysfs_root, "node[0-9]*", "cpulist"))
+    for path in sorted(paths, key=lambda p: int(re.findall(r"node(\d+)", p)[-1])):
+        try:
+            with open(path) as f:
+                cpus = [cpu for cpu in parse_cpulist(f.read()) if cpu in allowed]
+        except (OSError, ValueError):
+            continue
+        if cpus:
+            nodes.append(cpus)
+    return nodes or [sorted(allowed)]
+
+
+def _split(cpus: List[int], parts: int) -> List[List[int]]:
+    """Split ``cpus`` into ``parts`` contiguous groups (sharing if too few)."""
+    if parts <= len(cpus):
+        base, extra = divmod(len(cpus), parts)
+        groups, start = [], 0
+        for i in range(parts):
+            size = base + (1 if i < extra else 0)
+            groups.append(cpus[start : start + size])
+            start += size
+        return groups
+    return [[cpus[i % len(cpus)]] for i in range(parts)]
+
+
+def plan_worker_cpus(
+    num_workers: int,
+    cpus: Optional[Sequence[int]] = None,
+    nodes: Optional[Sequence[Sequence[int]]] = None,
+) -> List[List[int]]:
+    """
+    Assign each worker a set of cores that lies within one NUMA node.
+
+    Workers are spread across nodes in proportion to node size and the
+    resulting slots are interleaved (node 0, node 1, node 0, ...) so that
+    the first workers to start land on different sockets.
+
+    Args:
+        num_workers: Number of worker processes
+        cpus: Usable CPUs (defaults to this process's affinity)
+        nodes: CPUs per NUMA node (defaults to the detected topology)
+
+    Returns:
+        One CPU list per worker slot
+    """
+    num_workers = max(1, num_workers)
+    usable = sorted(cpus if cpus is not None else available_cpus())
+    node_cpus = [
+        sorted(set(node) & set(usable))
+        for node in (nodes if nodes is not None else numa_nodes())
+    ]
+    node_cpus = [node for node in node_cpus if node] or [usable]
+
+    # Workers per node by largest remainder
+    total = sum(len(node) for node in node_cpus)
+    shares = [num_workers * len(node) / total for node in node_cpus]
+    counts = [int(share) for share in shares]
+    by_remainder = sorted(
+        range(len(node_cpus)), key=lambda i: shares[i] - counts[i], reverse=True
+    )
+    for i in by_remainder[: num_workers - sum(counts)]:
+        counts[i] += 1
+
+    per_node = [_split(node, count) for node, count in zip(node_cpus, counts) if count]
+    slots = []
+    for i in range(max(len(groups) for groups in per_node)):
+        for groups in per_node:
+            if i < len(groups):
+                slots.append(groups[i])
+    return slots
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+@dataclass
+class WorkerPlacement:
+    """
+    Per-worker thread budget and optional core pinning.
+
+    Passed to worker processes as initializer arguments. Each worker claims
+    a free slot when it starts and releases it when it exits; slots held by
+    workers that were killed are reclaimed, so a replacement worker takes
+    over the cores of the one it replaces.
+    """
+
+    threads_per_worker: Optional[int] = None
+    cpu_sets: Optional[List[List[int]]] = None
+    slot_owners: Any = None  # Shared array of worker PIDs, 0 when free
+
+    def claim_slot(self, pid: int) -> int:
+        """Assign ``pid`` the first slot that is free or whose owner died."""
+        with self.slot_owners.get_lock():
+            owners = list(self.slot_owners)
+            for slot, owner in enumerate(owners):
+                if owner == 0 or owner == pid or not _pid_alive(owner):
+                    self.slot_owners[slot] = pid
+                    return slot
+        # More live workers than slots: share the first slot
+        logger.debug(f"No free CPU slot for worker {pid}, sharing slot 0")
+        return 0
+
+    def release_slot(self, pid: int) -> None:
+        """Free the slot held by ``pid``, if any."""
+        with self.slot_owners.get_lock():
+            for slot, owner in enumerate(list(self.slot_owners)):
+                if owner == pid:
+                    self.slot_owners[slot] = 0
+
+    def apply(self) -> None:
+        """Configure the calling worker process."""
+        threads = self.threads_per_worker
+        if self.cpu_sets:
+            pid = os.getpid()
+            cpus = self.cpu_sets[self.claim_slot(pid)]
+            multiprocessing.util.Finalize(
+                None, self.release_slot, args=(pid,), exitpriority=0
+            )
+            try:
+                os.sched_setaffinity(0, cpus)
+                threads = len(cpus)
+            except (AttributeError, OSError) as e:
+                logger.debug(f"Could not pin worker {os.getpid()} to {cpus}: {e}")
+
+        if not threads:
+            return
+        user_set = [var for var in THREAD_ENV_VARS if var in os.environ]
+        for var, value in thread_env(threads).items():
+            os.environ.setdefault(var, value)
+        if THREADPOOLCTL_AVAILABLE and not user_set:
+            # BLAS loaded before the fork ignores the environment
+            threadpool_limits(limits=threads)
+
+
+def plan_worker_placement(
+    num_workers: int,
+    limit_threads: bool = True,
+    cpu_affinity: bool = False,
+    context: Any = None,
+) -> Optional[WorkerPlacement]:
+    """
+    Build the placement for a pool of ``num_workers`` worker processes.
+
+    Args:
+        num_workers: Number of worker processes
+        limit_threads: Cap native thread pools at each worker's core budget
+        cpu_affinity: Pin each worker to NUMA-local cores
+        context: Multiprocessing context used by the pool
+
+    Returns:
+        A WorkerPlacement, or None when neither option is enabled
+    """
+    if not (limit_threads or cpu_affinity):
+        return None
+
+    cpus = available_cpus()
+    placement = WorkerPlacement()
+    if limit_threads:
+        placement.threads_per_worker = max(1, len(cpus) // max(1, num_workers))
+    if cpu_affinity and hasattr(os, "sched_setaffinity"):
+        placement.cpu_sets = plan_worker_cpus(num_workers, cpus)
+        context = context or multiprocessing.get_context()
+        placement.slot_owners = context.Array("i", len(placement.cpu_sets))
+    return placement
+
+
+def initialize_worker(
+    placement: Optional[WorkerPlacement], preload_modules: Sequence[str] = ()
+) -> None:
+    """Worker initializer: apply placement, then import preloaded modules."""
+    if placement is not None:
+        placement.apply()
+    if preload_modules:
+        # Imported here so the thread limits are in place first
+        from .worker_pool import _preload_modules
+
+        _preload_modules(tuple(preload_modules))
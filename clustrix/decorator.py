@@ -1,12 +1,71 @@
 import functools
-from typing import Any, Callable, Optional, Dict, List
+import logging
+import math
+import pickle
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import (
+    Any,
+    Callable,
+    Optional,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Sequence,
+    Tuple,
+)
 
 from .config import get_config
 from .executor import ClusterExecutor
 from .async_executor_simple import AsyncClusterExecutor
-from .local_executor import create_local_executor
+from .arg_sharding import shard_chunk_arguments
+from .blob_store import BlobStore, blob_store_available
+from .calibration import ExecutionPlan, get_execution_plan
+from .chunk_scheduler import guided_chunk_sizes
+from .local_executor import calibrated_imap, create_local_executor
 from .loop_analysis import find_parallelizable_loops
-from .utils import detect_loops, serialize_function
+from .loop_splitting import (
+    LoopSplitPlan,
+    get_chunk_variant,
+    plan_loop_split,
+    remote_tree_reduce,
+)
+from .map_session import (
+    COMPLETED,
+    SUBMITTED,
+    ChunkFailuresError,
+    MapSession,
+    open_map_session,
+)
+from .remote_result import (
+    RemoteResult,
+    can_chain,
+    chain_dependencies,
+    remote_results_in,
+    resolve_remote_results,
+)
+from .result_collection import collect_as_completed, download_workers, poll_interval
+from .speculation import Speculator, StragglerPolicy
+from .placement import (
+    LOCAL_SERIAL,
+    REMOTE_SINGLE,
+    PlacementDecision,
+    decide_placement,
+    get_placement_history,
+)
+from .result_cache import (
+    CacheKey,
+    environment_fingerprint,
+    get_result_cache,
+    invalidate_results,
+    remote_cache_path,
+    remote_tier_available,
+    result_cache_key,
+)
+from .task_supervisor import TaskTimeoutError
+from .utils import serialize_function
+from .worker_pool import has_warm_worker_pool
 from .gpu_utils import (
     detect_gpu_parallelizable_operations,
 )
@@ -16,6 +75,8 @@ from .function_flattening import (
     create_simple_subprocess_fallback,
 )
 
+logger = logging.getLogger(__name__)
+
 
 def cluster(
     _func: Optional[Callable] = None,
@@ -29,6 +90,10 @@ def cluster(
     auto_gpu_parallel: Optional[bool] = None,
     environment: Optional[str] = None,
     async_submit: Optional[bool] = None,
+    cache_results: Optional[bool] = None,
+    placement: Optional[str] = None,
+    checkpoint: Optional[bool] = None,
+    lazy: Optional[bool] = None,
     provider: Optional[str] = None,
     instance_type: Optional[str] = None,
     region: Optional[str] = None,
@@ -55,6 +120,20 @@ def cluster(
         auto_gpu_parallel: Whether to automatically parallelize across GPUs
         environment: Conda environment name
         async_submit: Whether to submit jobs asynchronously (non-blocking)
+        cache_results: Whether to reuse results of identical calls
+            (default: ``config.result_cache``)
+        placement: Where calls run: 'cluster' to run remotely whenever a
+            cluster is configured, 'auto' to choose from estimated local
+            runtime, transfer time and queue wait, or one of 'local_serial',
+            'local_parallel', 'remote_single', 'remote_array'
+            (default: ``config.placement``)
+        checkpoint: Whether parallel runs keep a local manifest and result
+            store, so re-calling after a failure or crash resubmits only
+            failed or missing chunks (default: ``config.checkpoint_parallel``)
+        lazy: Whether remote calls return a RemoteResult as soon as the job
+            is submitted, downloading the value only when asked; passed to
+            another call, it is read on the cluster without a round trip
+            (default: ``config.lazy_results``)
         provider: Cloud provider to use ('lambda', 'aws', 'azure', 'gcp', 'huggingface')
         instance_type: Cloud instance type (e.g., 'gpu_1x_a100' for Lambda Cloud)
         region: Cloud region (e.g., 'us-east-1')
@@ -73,14 +152,17 @@ def cluster(
     Returns:
         Decorated function that executes on cluster
         If async_submit=True, returns AsyncJobResult for non-blocking execution
+        If lazy=True, remote calls return a RemoteResult
+        The decorated function's ``map(iterable, ordered=True, ...)`` streams
+        the function over an iterable on local workers with bounded memory
+        The decorated function's ``as_completed(*args, **kwargs)`` runs a
+        parallel call on the cluster and yields ``(chunk index, partial
+        result)`` pairs as chunks finish
     """
 
     def decorator(func: Callable) -> Callable:
 
-        @functools.wraps(func)
-        def wrapper(*args, **func_kwargs):
-            config = get_config()
-
+        def build_job_config(config) -> Dict[str, Any]:
             # Use provided parameters or fall back to config defaults
             job_config = {
                 "cores": cores or config.default_cores,
@@ -149,20 +231,58 @@ def cluster(
                 "key_file",
                 "terminate_on_completion",
                 "instance_startup_timeout",
+                "pack_jobs",
+                "gpus",
+                "instance_capacity",
             ]
 
             for param in cloud_params:
                 if param in kwargs:
                     job_config[param] = kwargs[param]
 
-            # Determine execution mode
-            execution_mode = _choose_execution_mode(config, func, args, func_kwargs)
+            return job_config
+
+        @functools.wraps(func)
+        def wrapper(*args, **func_kwargs):
+            config = get_config()
+            job_config = build_job_config(config)
 
             # Check if function contains loops that can be parallelized
             should_parallelize = (
                 parallel if parallel is not None else config.auto_parallel
             )
 
+            # Decide where the call runs; probing the queue opens the
+            # connection that remote execution then reuses
+            executors: List[ClusterExecutor] = []
+
+            def connect() -> ClusterExecutor:
+                if not executors:
+                    executors.append(ClusterExecutor(config))
+                return executors[0]
+
+            # Results left on the cluster by earlier calls are read there
+            # by a single job, which reuses their connection
+            upstream = remote_results_in(args, func_kwargs)
+            chained = can_chain(upstream, config, job_config)
+            if chained:
+                should_parallelize = False
+                if upstream[0].executor.config is config:
+                    executors.append(upstream[0].executor)
+
+            decision = _place_call(
+                config,
+                func,
+                args,
+                func_kwargs,
+                job_config,
+                allow_parallel=should_parallelize,
+                placement=REMOTE_SINGLE if chained and not placement else placement,
+                connect=connect,
+            )
+            execution_mode = decision.execution_mode
+            should_parallelize = decision.parallel
+
             # Check if GPU parallelization should be attempted
             should_gpu_parallelize = (
                 auto_gpu_parallel
@@ -170,13 +290,46 @@ def cluster(
                 else config.auto_gpu_parallel
             )
 
-            if execution_mode == "local":
-                use_async = (
-                    async_submit
-                    if async_submit is not None
-                    else getattr(config, "async_submit", False)
+            use_async = (
+                async_submit
+                if async_submit is not None
+                else getattr(config, "async_submit", False)
+            )
+            use_lazy = (
+                lazy
+                if lazy is not None
+                else getattr(config, "lazy_results", False) is True
+            )
+
+            if upstream and (not chained or execution_mode == "local" or use_async):
+                args, func_kwargs = resolve_remote_results(args, func_kwargs)
+                upstream, chained = [], False
+            if chained:
+                should_gpu_parallelize = False
+                job_config["dependency"] = chain_dependencies(upstream, config)
+                job_config["dependency_results"] = [
+                    ref.job_relative_path for ref in upstream
+                ]
+
+            # Identical calls are answered from the result cache
+            use_cache = (
+                cache_results if cache_results is not None else config.result_cache
+            )
+            cache_key = None
+            if use_cache and not use_async and not chained:
+                cache_key = result_cache_key(
+                    func,
+                    args,
+                    func_kwargs,
+                    environment_fingerprint(config, execution_mode, job_config),
                 )
+            if cache_key is not None:
+                hit, cached = get_result_cache(config).get(cache_key)
+                if hit:
+                    logger.info(f"♻️ Reusing cached result of {func.__name__}")
+                    return cached
 
+            if execution_mode == "local":
                 if use_async:
                     # Async local execution
                     async_executor = AsyncClusterExecutor(config)
@@ -184,17 +337,19 @@ def cluster(
                         func, args, func_kwargs, job_config
                     )
                 elif should_parallelize:
-                    return _execute_local_parallel(func, args, func_kwargs, job_config)
+                    result = _execute_local_parallel(
+                        func, args, func_kwargs, job_config
+                    )
                 else:
                     # Execute locally without parallelization
-                    return func(*args, **func_kwargs)
+                    start = perf_counter()
+                    result = func(*args, **func_kwargs)
+                    _record_runtime(config, func, decision, perf_counter() - start)
+                if cache_key is not None:
+                    _remember_result(config, cache_key, result)
+                return result
             else:
                 # Remote execution
-                use_async = (
-                    async_submit
-                    if async_submit is not None
-                    else getattr(config, "async_submit", False)
-                )
                 if use_async:
                     # Async execution
                     async_executor = AsyncClusterExecutor(config)
@@ -219,7 +374,7 @@ def cluster(
                     )
                 else:
                     # Synchronous execution (original behavior)
-                    executor = ClusterExecutor(config)
+                    executor = connect()
 
                     # NEW: Ensure Kubernetes cluster is ready if auto-provisioning
                     if config.cluster_type == "kubernetes" and getattr(
@@ -231,31 +386,72 @@ def cluster(
                                 "Auto-provisioned Kubernetes cluster failed to become ready"
                             )
 
+                    # Another client may have computed this call already
+                    remote_path = None
+                    if cache_key is not None and remote_tier_available(
+                        config, job_config
+                    ):
+                        remote_path = remote_cache_path(config, cache_key)
+                        hit, cached = _fetch_remote_result(executor, remote_path)
+                        if hit:
+                            logger.info(
+                                f"♻️ Reusing result of {func.__name__} cached on the cluster"
+                            )
+                            _remember_result(config, cache_key, cached)
+                            return cached
+
+                    result = None
+                    computed = False
                     # Check for GPU parallelization first (higher priority)
                     if should_gpu_parallelize:
-                        gpu_parallel_result = _attempt_client_side_gpu_parallelization(
+                        result = _attempt_client_side_gpu_parallelization(
                             executor, func, args, func_kwargs, job_config
                         )
-                        if gpu_parallel_result is not None:
-                            return gpu_parallel_result
-
-                    # Fall back to CPU parallelization
-                    if should_parallelize:
-                        loop_info = detect_loops(func, args, func_kwargs)
-                        if loop_info:
-                            return _execute_parallel(
+                        computed = result is not None
+
+                    # Fall back to CPU parallelization. Only loops that can
+                    # be split are; any other call runs as a single job
+                    if not computed and should_parallelize:
+                        split_plan = plan_loop_split(func, args, func_kwargs)
+                        if split_plan is not None:
+                            result = _execute_parallel(
                                 executor,
                                 func,
                                 args,
                                 func_kwargs,
                                 job_config,
-                                loop_info,
+                                split_plan.loop_info(),
+                                checkpoint=checkpoint,
+                            )
+                            computed = True
+
+                    if computed:
+                        if cache_key is not None:
+                            _remember_result(
+                                config, cache_key, result, executor, remote_path
                             )
+                        return result
 
-                    # Execute normally on cluster
-                    return _execute_single(
-                        executor, func, args, func_kwargs, job_config
+                    if use_lazy and blob_store_available(config, job_config):
+                        return _submit_lazy(
+                            executor, func, args, func_kwargs, job_config
+                        )
+
+                    # Execute normally on cluster; the job copies its result
+                    # into the cluster-side cache itself
+                    start = perf_counter()
+                    result = _execute_single(
+                        executor,
+                        func,
+                        args,
+                        func_kwargs,
+                        job_config,
+                        result_cache_path=remote_path,
                     )
+                    _record_runtime(config, func, decision, perf_counter() - start)
+                    if cache_key is not None:
+                        _remember_result(config, cache_key, result)
+                    return result
 
         # Store cluster config for access outside execution
         cluster_config = {
@@ -272,6 +468,78 @@ def cluster(
         cluster_config.update(kwargs)
         setattr(wrapper, "_cluster_config", cluster_config)
 
+        def map_items(
+            iterable: Iterable[Any],
+            ordered: bool = True,
+            chunk_size: Optional[int] = None,
+            max_in_flight: Optional[int] = None,
+            **func_kwargs,
+        ) -> Iterator[Any]:
+            """
+            Stream the undecorated function over ``iterable`` on local workers.
+
+            Memory stays bounded however long the iterable is; results are
+            yielded in input order, or as they complete if ``ordered=False``.
+            Lists, tuples and ranges are calibrated first so cheap functions
+            run serially and CPU-bound ones go to processes.
+            """
+            return _execute_local_map(
+                func,
+                iterable,
+                max_workers=cores or get_config().default_cores,
+                ordered=ordered,
+                chunk_size=chunk_size,
+                max_in_flight=max_in_flight,
+                func_kwargs=func_kwargs,
+            )
+
+        setattr(wrapper, "map", map_items)
+
+        def as_completed(*args, **func_kwargs) -> Iterator[Tuple[int, Any]]:
+            """
+            Run a parallel call on the cluster, yielding chunk results early.
+
+            Yields ``(chunk index, partial result)`` as each chunk's job
+            finishes, so work can start on early chunks while later ones
+            run; a partial result is the chunk's share of the call's return
+            value (its part of a sum, or its slice of a list). Calling the
+            function itself combines the same partial results in chunk order.
+            """
+            config = get_config()
+            job_config = build_job_config(config)
+            split_plan = plan_loop_split(func, args, func_kwargs)
+            if split_plan is None:
+                raise ValueError(
+                    f"{func.__name__} has no loop that can be split into chunks"
+                )
+            executor = ClusterExecutor(config)
+            try:
+                run = _start_parallel(
+                    executor,
+                    func,
+                    args,
+                    func_kwargs,
+                    job_config,
+                    split_plan.loop_info(),
+                    checkpoint=checkpoint,
+                )
+                yield from _iter_parallel_results(executor, run)
+            finally:
+                executor.disconnect()
+
+        setattr(wrapper, "as_completed", as_completed)
+
+        def invalidate_cache(executor: Optional[ClusterExecutor] = None) -> int:
+            """
+            Drop cached results of this function.
+
+            Pass a connected ClusterExecutor to clear the cluster-side copies
+            as well. Returns the number of local entries removed.
+            """
+            return invalidate_results(func, executor=executor)
+
+        setattr(wrapper, "invalidate_cache", invalidate_cache)
+
         return wrapper
 
     # Handle both @cluster and @cluster() usage
@@ -289,8 +557,30 @@ def _execute_single(
     args: tuple,
     kwargs: dict,
     job_config: dict,
+    result_cache_path: Optional[str] = None,
 ) -> Any:
-    """Execute function once on cluster."""
+    """Execute function once on cluster.
+
+    With ``result_cache_path``, the result is also copied there on the
+    cluster for other clients to reuse.
+    """
+    job_id = _submit_single(executor, func, args, kwargs, job_config, result_cache_path)
+
+    # Wait for completion and get result
+    result = executor.wait_for_result(job_id)
+
+    return result
+
+
+def _submit_single(
+    executor: ClusterExecutor,
+    func: Callable,
+    args: tuple,
+    kwargs: dict,
+    job_config: dict,
+    result_cache_path: Optional[str] = None,
+) -> str:
+    """Submit one job running the function; return its job ID."""
     import logging
 
     logger = logging.getLogger(__name__)
@@ -326,11 +616,73 @@ def _execute_single(
 
     # Submit job
     job_id = executor.submit_job(func_data, job_config)
+    if result_cache_path:
+        executor.cache_result_on_cluster(job_id, result_cache_path)
+    return job_id
 
-    # Wait for completion and get result
-    result = executor.wait_for_result(job_id)
 
-    return result
+def _submit_lazy(
+    executor: ClusterExecutor,
+    func: Callable,
+    args: tuple,
+    kwargs: dict,
+    job_config: dict,
+) -> Any:
+    """Submit one job and return a RemoteResult without waiting for it."""
+    job_id = _submit_single(executor, func, args, kwargs, job_config)
+    handle = executor.job_handle(job_id)
+    if not handle:
+        return executor.wait_for_result(job_id)
+    logger.info(
+        f"🔗 Leaving the result of {func.__name__} (job {job_id}) on the cluster"
+    )
+    return RemoteResult(executor, job_id, f"{handle['remote_dir']}/result.pkl")
+
+
+def _fetch_remote_result(
+    executor: ClusterExecutor, remote_path: str
+) -> Tuple[bool, Any]:
+    """Look up the cluster-side result cache; failures count as misses."""
+    try:
+        return executor.fetch_cached_result(remote_path)
+    except Exception as e:
+        logger.warning(f"Could not read cluster-side result cache: {e}")
+        return False, None
+
+
+def _remember_result(
+    config,
+    cache_key: CacheKey,
+    result: Any,
+    executor: Optional[ClusterExecutor] = None,
+    remote_path: Optional[str] = None,
+) -> None:
+    """Store a result locally and, given ``remote_path``, on the cluster."""
+    try:
+        data = pickle.dumps(result, protocol=4)
+    except Exception as e:
+        logger.debug(f"Not caching unpicklable result: {e}")
+        return
+    get_result_cache(config).put_bytes(cache_key, data)
+    if executor is not None and remote_path:
+        try:
+            executor.store_cached_result(
+                remote_path, data, config.result_cache_remote_max_age_days
+            )
+        except Exception as e:
+            logger.warning(f"Could not store result in cluster-side cache: {e}")
+
+
+@dataclass
+class _ParallelRun:
+    """Chunk jobs of one parallel call, submitted or restored."""
+
+    split_plan: LoopSplitPlan
+    loop_info: Dict[str, Any]
+    session: Optional[MapSession]
+    submit: Callable[..., str]
+    jobs: List[Tuple[str, Dict[str, Any]]] = field(default_factory=list)
+    restored: List[Tuple[int, Any]] = field(default_factory=list)
 
 
 def _execute_parallel(
@@ -340,31 +692,236 @@ def _execute_parallel(
     kwargs: dict,
     job_config: dict,
     loop_info: Dict[str, Any],
+    checkpoint: Optional[bool] = None,
 ) -> Any:
     """Execute function with parallelized loops."""
 
     config = get_config()
+    run = _start_parallel(
+        executor, func, args, kwargs, job_config, loop_info, checkpoint
+    )
+    split_plan = run.split_plan
+
+    # Reductions are combined next to the partial results on the cluster,
+    # so only the reduced value is downloaded. Checkpointed and speculative
+    # runs collect each chunk's result themselves instead.
+    if run.session is None and not _speculate(config) and split_plan.split.is_reduction:
+        reduced, value = _reduce_on_cluster(
+            executor, [job_id for job_id, _ in run.jobs], split_plan, job_config
+        )
+        if reduced:
+            return value
+
+    # Results arrive as chunks finish; restore input order to combine them
+    results = list(_iter_parallel_results(executor, run))
+    results.sort(key=lambda x: x[0])
+    return split_plan.combine([result for _, result in results])
+
+
+def _speculate(config) -> bool:
+    return getattr(config, "speculative_execution", False) is True
+
+
+def _start_parallel(
+    executor: ClusterExecutor,
+    func: Callable,
+    args: tuple,
+    kwargs: dict,
+    job_config: dict,
+    loop_info: Dict[str, Any],
+    checkpoint: Optional[bool] = None,
+) -> _ParallelRun:
+    """
+    Split a call into chunks and submit (or restore) a job per chunk.
+
+    Raises:
+        ValueError: If the function has no loop that can be split; the
+            original function would run its whole loop in every chunk
+    """
+    config = get_config()
+
+    # Jobs run a variant of the function whose loop covers only their chunk
+    split_plan = plan_loop_split(func, args, kwargs)
+    if split_plan is None:
+        raise ValueError(f"{func.__name__} has no loop that can be split into chunks")
+    loop_info = split_plan.loop_info()
+    chunk_func = get_chunk_variant(func)
 
     # Split work based on loop information
     work_chunks = _create_work_chunks(
         func, args, kwargs, loop_info, config.max_parallel_jobs
     )
 
+    # A checkpointed run records every chunk, so a re-call resumes it
+    use_checkpoint = (
+        checkpoint
+        if checkpoint is not None
+        else getattr(config, "checkpoint_parallel", False) is True
+    )
+    session = None
+    if use_checkpoint:
+        session = open_map_session(
+            config,
+            func,
+            args,
+            kwargs,
+            job_config,
+            len(work_chunks),
+            layout=[chunk["range"] for chunk in work_chunks],
+        )
+
+    # Chunks carry only their slice of the arguments the loop walks over;
+    # other large arguments are uploaded once and shared
+    if getattr(config, "shard_arguments", True) is True:
+        shard_chunk_arguments(func, args, kwargs, split_plan, work_chunks)
+    blobs = None
+    if blob_store_available(config, job_config):
+        blobs = BlobStore(executor, config)
+
+    def submit(chunk: Dict[str, Any], exclude_node: Optional[str] = None) -> str:
+        chunk_config = job_config
+        if exclude_node:
+            chunk_config = dict(job_config, exclude=exclude_node)
+        chunk_args, chunk_kwargs = chunk["args"], chunk["kwargs"]
+        if blobs is not None:
+            chunk_args, chunk_kwargs = blobs.share_arguments(chunk_args, chunk_kwargs)
+        func_data = serialize_function(chunk_func, chunk_args, chunk_kwargs)
+        job_id = executor.submit_job(func_data, chunk_config)
+        if session is not None:
+            session.submitted(chunk["index"], job_id, executor.job_handle(job_id))
+        return job_id
+
     # Submit parallel jobs
-    job_ids = []
+    run = _ParallelRun(split_plan, loop_info, session, submit)
     for chunk in work_chunks:
-        func_data = serialize_function(func, chunk["args"], chunk["kwargs"])
-        job_id = executor.submit_job(func_data, job_config)
-        job_ids.append((job_id, chunk))
+        if session is not None:
+            restored = _resume_chunk(executor, session, chunk["index"])
+            if restored is not None:
+                kind, value = restored
+                if kind == COMPLETED:
+                    run.restored.append((chunk["index"], value))
+                else:
+                    run.jobs.append((value, chunk))
+                continue
+        run.jobs.append((submit(chunk), chunk))
+    return run
 
-    # Collect results
-    results = []
-    for job_id, chunk in job_ids:
-        result = executor.wait_for_result(job_id)
-        results.append((chunk["index"], result))
 
-    # Combine results
-    return _combine_results(results, loop_info)
+def _iter_parallel_results(
+    executor: ClusterExecutor, run: _ParallelRun
+) -> Iterator[Tuple[int, Any]]:
+    """
+    Yield ``(chunk index, result)`` as the chunks of a parallel run finish.
+
+    Results restored from a checkpointed session come first. Failures of a
+    checkpointed run are recorded while collection continues, then raised
+    together as a ChunkFailuresError.
+    """
+    config = get_config()
+    session = run.session
+    for index, result in run.restored:
+        yield index, result
+
+    speculator = None
+    if _speculate(config):
+        speculator = Speculator(
+            executor, run.submit, StragglerPolicy.from_config(config)
+        )
+    collected = collect_as_completed(
+        executor,
+        run.jobs,
+        max_downloads=download_workers(config),
+        interval=poll_interval(config),
+        speculator=speculator,
+    )
+
+    failures: Dict[int, str] = {}
+    first_error: Optional[BaseException] = None
+    for chunk, result, error in collected:
+        if error is not None:
+            if session is None:
+                raise error
+            # Keep collecting so every completed chunk is saved
+            session.failed(chunk["index"], error)
+            failures[chunk["index"]] = f"{type(error).__name__}: {error}"
+            first_error = first_error or error
+            continue
+        if session is not None:
+            session.completed(chunk["index"], result)
+        yield chunk["index"], result
+
+    if session is not None:
+        if failures:
+            raise ChunkFailuresError(session.session_id, failures) from first_error
+        session.discard()
+
+
+def _resume_chunk(
+    executor: ClusterExecutor, session: MapSession, index: int
+) -> Optional[Tuple[str, Any]]:
+    """
+    Restore a chunk from an earlier run of a checkpointed session.
+
+    Returns:
+        ``("completed", result)`` for a saved result, ``("submitted", job_id)``
+        for a job that is still queued or running, or None if the chunk has
+        to be (re)submitted
+    """
+    state = session.chunks[index]
+    if state.status == COMPLETED:
+        try:
+            return COMPLETED, session.load_result(index)
+        except Exception as e:
+            logger.warning(f"Could not load saved result of chunk {index}: {e}")
+            return None
+    if state.status == SUBMITTED and state.handle:
+        try:
+            job_id = executor.reattach_job(state.handle)
+            status = executor.get_job_status(job_id)
+        except Exception as e:
+            logger.warning(f"Could not reattach to job {state.job_id}: {e}")
+            return None
+        if status in ("queued", "pending", "running", "completed"):
+            return SUBMITTED, job_id
+        logger.info(f"Resubmitting chunk {index}: job {job_id} is {status}")
+    return None
+
+
+def _reduce_on_cluster(
+    executor: ClusterExecutor,
+    job_ids: List[str],
+    split_plan: LoopSplitPlan,
+    job_config: dict,
+) -> Tuple[bool, Any]:
+    """
+    Tree-reduce chunk results with a final single-core job on the cluster.
+
+    Returns:
+        ``(True, value)`` on success; ``(False, None)`` when the results are
+        not on the cluster filesystem or the reduction job failed, in which
+        case the partial results are still available for download
+    """
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+    paths = [executor.wait_for_remote_result(job_id) for job_id in job_ids]
+    if not all(paths):
+        return False, None
+
+    func_data = serialize_function(
+        remote_tree_reduce(), (paths, split_plan.split.combine), {"from_files": True}
+    )
+    try:
+        reduce_job = executor.submit_job(func_data, dict(job_config, cores=1))
+        value = executor.wait_for_result(reduce_job)
+    except Exception as e:
+        logger.warning(f"Remote reduction failed, combining locally: {e}")
+        return False, None
+
+    for job_id in job_ids:
+        executor.discard_remote_result(job_id)
+    return True, value
 
 
 def _create_work_chunks(
@@ -379,6 +936,7 @@ def _create_work_chunks(
     chunks = []
     loop_var = loop_info.get("variable")
     loop_range = loop_info.get("range", range(10))  # Default range
+    positional = loop_info.get("positional", False)
 
     chunk_size = max(1, len(loop_range) // max_jobs)
 
@@ -387,7 +945,9 @@ def _create_work_chunks(
 
         # Create modified kwargs for this chunk
         chunk_kwargs = kwargs.copy()
-        chunk_kwargs[f"_chunk_range_{loop_var}"] = chunk_range
+        chunk_kwargs[f"_chunk_range_{loop_var}"] = (
+            slice(i, i + chunk_size) if positional else chunk_range
+        )
         chunk_kwargs["_chunk_index"] = i // chunk_size
 
         chunks.append(
@@ -641,22 +1201,51 @@ def _choose_execution_mode(config, func: Callable, args: tuple, kwargs: dict) ->
     Returns:
         'local' or 'remote'
     """
-    # Check for Kubernetes auto-provisioning
-    if config.cluster_type == "kubernetes" and getattr(
-        config, "auto_provision_k8s", False
-    ):
-        return "remote"
+    return _place_call(config, func, args, kwargs).execution_mode
 
-    # If no cluster is configured, use local execution
-    if not config.cluster_host:
-        return "local"
 
-    # Check if there's a preference for local parallel execution
-    if hasattr(config, "prefer_local_parallel") and config.prefer_local_parallel:
-        return "local"
+def _place_call(
+    config,
+    func: Callable,
+    args: tuple,
+    kwargs: dict,
+    job_config: Optional[dict] = None,
+    allow_parallel: bool = True,
+    placement: Optional[str] = None,
+    connect: Optional[Callable[[], ClusterExecutor]] = None,
+) -> PlacementDecision:
+    """
+    Choose local serial, local parallel, remote single or remote array.
+
+    See :mod:`clustrix.placement` for the cost model; the decision is
+    logged with its reasoning whenever a cluster is configured.
+    """
+    decision = decide_placement(
+        func,
+        args,
+        kwargs,
+        config,
+        job_config=job_config,
+        allow_parallel=allow_parallel,
+        placement=placement,
+        connect=connect,
+    )
+    if config.cluster_host:
+        logger.info(f"🧭 Placing {func.__name__} as {decision.mode}: {decision.reason}")
+    return decision
+
 
-    # Default to remote execution when cluster is available
-    return "remote"
+def _record_runtime(
+    config, func: Callable, decision: PlacementDecision, seconds: float
+) -> None:
+    """Feed the runtime of a serial local run or single job back to placement."""
+    if not config.cluster_host:
+        return
+    history = get_placement_history(config)
+    if decision.mode == LOCAL_SERIAL:
+        history.record_local(func, seconds, decision.estimate.iterations)
+    elif decision.mode == REMOTE_SINGLE:
+        history.record_remote(func, seconds, decision)
 
 
 def _execute_local_parallel(
@@ -674,37 +1263,90 @@ def _execute_local_parallel(
     Returns:
         Function result
     """
-    # Find parallelizable loops
-    parallelizable_loops = find_parallelizable_loops(func, args, kwargs)
+    # Prefer a loop that chunks can split between them; each chunk then
+    # runs a variant of the function that iterates only its own values
+    split_plan = plan_loop_split(func, args, kwargs)
+    if split_plan is not None:
+        loop_info = split_plan.loop_info()
+        chunk_func: Callable = split_plan.chunk_function
+    else:
+        # Find parallelizable loops
+        parallelizable_loops = find_parallelizable_loops(func, args, kwargs)
 
-    if not parallelizable_loops:
-        # No parallelizable loops found, execute normally
-        return func(*args, **kwargs)
+        if not parallelizable_loops:
+            # No parallelizable loops found, execute normally
+            return func(*args, **kwargs)
 
-    # Use the first parallelizable loop
-    loop_info = parallelizable_loops[0]
+        # Use the first parallelizable loop
+        loop_info = parallelizable_loops[0]
+        chunk_func = func
 
-    # Create local executor
+    config = get_config()
     max_workers = job_config.get("cores", 4)
-    local_executor = create_local_executor(
-        max_workers=max_workers, func=func, args=args, kwargs=kwargs
-    )
+    use_threads: Optional[bool] = None
+    chunk_size: Optional[int] = None
+    calibrated: List[Any] = []
 
     try:
+        # A split loop is calibrated like a map over its iterations: the
+        # measured plan picks the executor and chunk size, so the arguments
+        # need no separate pickling probe
+        if split_plan is not None and config.local_calibration:
+            plan, calibrated = _calibrate_split_loop(
+                split_plan, args, kwargs, max_workers, config.local_pool_reuse
+            )
+            if plan.mode == "serial":
+                work_chunks = _create_local_work_chunks(
+                    func,
+                    args,
+                    kwargs,
+                    loop_info,
+                    chunk_size=max(1, len(split_plan.iterations)),
+                    first=len(calibrated),
+                )
+                results = [chunk_func(*c["args"], **c["kwargs"]) for c in work_chunks]
+                return split_plan.combine(calibrated + results)
+            max_workers, chunk_size = plan.workers, plan.chunk_size
+            use_threads = plan.use_threads
+
+        # Create local executor on the shared, warm worker pool
+        local_executor = create_local_executor(
+            max_workers=max_workers,
+            use_threads=use_threads,
+            func=chunk_func,
+            args=args,
+            kwargs=kwargs,
+            reuse_pool=config.local_pool_reuse,
+            pool_options=_local_pool_options(config),
+            task_timeout=config.local_task_timeout,
+            task_retries=config.local_task_retries,
+        )
         with local_executor:
             # Create work chunks for the loop
-            work_chunks = _create_local_work_chunks(func, args, kwargs, loop_info)
+            work_chunks = _create_local_work_chunks(
+                func,
+                args,
+                kwargs,
+                loop_info,
+                chunk_size=chunk_size,
+                first=len(calibrated),
+            )
 
-            if not work_chunks:
+            if not work_chunks and not calibrated:
                 # Fallback to normal execution
                 return func(*args, **kwargs)
 
             # Execute in parallel
-            results = local_executor.execute_parallel(func, work_chunks)
+            results = local_executor.execute_parallel(chunk_func, work_chunks)
 
             # Combine results
+            if split_plan is not None:
+                return split_plan.combine(calibrated + results)
             return _combine_local_results(results, loop_info)
 
+    except TaskTimeoutError:
+        # Re-running sequentially would hang on the same iteration
+        raise
     except Exception as e:
         # Fallback to normal execution on error
         import logging
@@ -716,8 +1358,124 @@ def _execute_local_parallel(
         return func(*args, **kwargs)
 
 
+def _calibrate_split_loop(
+    split_plan: LoopSplitPlan,
+    args: tuple,
+    kwargs: dict,
+    max_workers: int,
+    reuse_pool: bool,
+) -> Tuple[ExecutionPlan, List[Any]]:
+    """
+    Plan local execution of a split loop from measured iterations.
+
+    Returns:
+        The plan, and the partial results of the iterations run while
+        calibrating (one per iteration, a prefix of the loop in order)
+    """
+    chunk_func = split_plan.chunk_function
+    variable = f"_parallel_{split_plan.split.variable}"
+    iterations = split_plan.iterations
+
+    def run_iteration(position: int) -> Any:
+        if split_plan.positional:
+            chunk: Any = slice(position, position + 1)
+        else:
+            chunk = [iterations[position]]
+        return chunk_func(*args, **dict(kwargs, **{variable: chunk}))
+
+    plan, done = get_execution_plan(
+        chunk_func,
+        range(len(iterations)),
+        run_iteration,
+        max_workers,
+        func_args=args,
+        func_kwargs=kwargs,
+        warm_process_pool=reuse_pool and has_warm_worker_pool(False, max_workers),
+    )
+    logger.debug(f"Calibrated loop of {chunk_func.func.__name__}: {plan.reason}")
+    return plan, [done[position] for position in range(len(done))]
+
+
+def _local_pool_options(config) -> Dict[str, Any]:
+    """Local worker pool options from the configuration."""
+    return {
+        "preload_modules": config.local_pool_preload_modules,
+        "max_pool_tasks": config.local_pool_max_tasks,
+        "max_worker_memory_mb": config.local_pool_max_worker_memory_mb,
+        "limit_worker_threads": config.limit_worker_threads,
+        "cpu_affinity": config.local_cpu_affinity,
+    }
+
+
+def _execute_local_map(
+    func: Callable,
+    iterable: Iterable[Any],
+    max_workers: int,
+    ordered: bool = True,
+    chunk_size: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+    func_kwargs: Optional[Dict[str, Any]] = None,
+) -> Iterator[Any]:
+    """
+    Stream ``func`` over ``iterable`` on local workers.
+
+    Args:
+        func: Function applied to each item
+        iterable: Items to process; consumed lazily
+        max_workers: Number of local workers
+        ordered: Yield results in input order or as they complete
+        chunk_size: Items per task (calibrated or adaptive if None)
+        max_in_flight: Maximum outstanding chunks
+        func_kwargs: Keyword arguments passed to every call
+
+    Yields:
+        Results for each item
+    """
+    config = get_config()
+
+    # Sized inputs can be calibrated up front; streams adapt as they go
+    if (
+        config.local_calibration
+        and chunk_size is None
+        and isinstance(iterable, Sequence)
+    ):
+        yield from calibrated_imap(
+            func,
+            iterable,
+            func_kwargs=func_kwargs,
+            max_workers=max_workers,
+            reuse_pool=config.local_pool_reuse,
+            pool_options=_local_pool_options(config),
+            ordered=ordered,
+            max_in_flight=max_in_flight,
+        )
+        return
+
+    local_executor = create_local_executor(
+        max_workers=max_workers,
+        func=func,
+        reuse_pool=config.local_pool_reuse,
+        pool_options=_local_pool_options(config),
+    )
+
+    with local_executor:
+        yield from local_executor.imap(
+            func,
+            iterable,
+            func_kwargs=func_kwargs,
+            chunk_size=chunk_size,
+            max_in_flight=max_in_flight,
+            ordered=ordered,
+        )
+
+
 def _create_local_work_chunks(
-    func: Callable, args: tuple, kwargs: dict, loop_info
+    func: Callable,
+    args: tuple,
+    kwargs: dict,
+    loop_info,
+    chunk_size: Optional[int] = None,
+    first: int = 0,
 ) -> List[Dict]:
     """
     Create work chunks for local parallel execution.
@@ -727,11 +1485,15 @@ def _create_local_work_chunks(
         args: Function arguments
         kwargs: Function keyword arguments
         loop_info: Information about the loop to parallelize
+        chunk_size: Iterations per chunk (default: from the CPU count and
+            ``local_chunk_schedule``)
+        first: Position of the first iteration to include
 
     Returns:
         List of work chunks
     """
     chunks = []
+    positional = False
 
     # Get range information
     if hasattr(loop_info, "range_info") and loop_info.range_info:
@@ -759,23 +1521,37 @@ def _create_local_work_chunks(
         # Legacy format
         loop_range = loop_info.get("range", range(10))
         variable = loop_info.get("variable", "i")
+        positional = loop_info.get("positional", False)
 
-    if not variable or len(loop_range) == 0:
+    remaining = len(loop_range) - first
+    if not variable or remaining <= 0:
         return []
 
-    # Determine chunk size (aim for reasonable number of chunks)
+    # Determine chunk sizes. Guided chunks shrink towards the end of the
+    # range so the pool's queue balances uneven iteration costs.
     import os
 
-    max_chunks = (os.cpu_count() or 1) * 2  # Allow some oversubscription
-    chunk_size = max(1, len(loop_range) // max_chunks)
+    num_workers = os.cpu_count() or 1
+    if chunk_size is not None:
+        chunk_sizes = [chunk_size] * math.ceil(remaining / chunk_size)
+    elif get_config().local_chunk_schedule == "static":
+        max_chunks = num_workers * 2  # Allow some oversubscription
+        chunk_size = max(1, remaining // max_chunks)
+        chunk_sizes = [chunk_size] * math.ceil(remaining / chunk_size)
+    else:
+        chunk_sizes = guided_chunk_sizes(remaining, num_workers)
 
     # Create chunks
-    for i in range(0, len(loop_range), chunk_size):
+    i = first
+    for chunk_size in chunk_sizes:
         chunk_range = list(loop_range[i : i + chunk_size])
 
         # Create modified kwargs for this chunk
         chunk_kwargs = kwargs.copy()
-        chunk_kwargs[f"_parallel_{variable}"] = chunk_range
+        chunk_kwargs[f"_parallel_{variable}"] = (
+            slice(i, i + chunk_size) if positional else chunk_range
+        )
+        i += chunk_size
 
         chunks.append({"args": args, "kwargs": chunk_kwargs})
 
@@ -13,6 +13,8 @@ from typing import Any, Dict, List, Optional, Callable, Set, Tuple
 from dataclasses import dataclass
 import logging
 
+from .project_index import get_environment_index, get_project_index
+
 logger = logging.getLogger(__name__)
 
 
@@ -151,73 +153,39 @@ class FunctionDependencyAnalyzer:
             "asyncio",
         }
 
-        # Add any packages found in site-packages
+        # Add any packages found in site-packages (cached across runs)
         try:
-            import site
-
-            for site_dir in site.getsitepackages():
-                if os.path.exists(site_dir):
-                    for item in os.listdir(site_dir):
-                        if os.path.isdir(
-                            os.path.join(site_dir, item)
-                        ) and not item.startswith("."):
-                            # Remove version info (e.g., 'numpy-1.21.0.dist-info' -> 'numpy')
-                            clean_name = item.split("-")[0].replace("_", "").lower()
-                            known_external.add(clean_name)
+            known_external.update(get_environment_index().site_names)
         except Exception:
             pass  # If we can't determine site packages, use defaults
 
         return known_external
 
     def _load_local_modules(self):
-        """Find and parse all local Python modules."""
+        """Load function tables of all local modules from the project index."""
         logger.info(f"Loading local modules from {self.root_dir}")
 
-        # Find all Python files in the project
-        python_files = []
-        for root, dirs, files in os.walk(self.root_dir):
-            # Skip common non-source directories
-            dirs[:] = [
-                d
-                for d in dirs
-                if not d.startswith(".")
-                and d
-                not in [
-                    "__pycache__",
-                    "build",
-                    "dist",
-                    "egg-info",
-                    ".git",
-                    ".venv",
-                    "venv",
-                ]
-            ]
-
-            for file in files:
-                if file.endswith(".py") and not file.startswith("."):
-                    file_path = os.path.join(root, file)
-                    python_files.append(file_path)
-
-        # Parse each module
-        for file_path in python_files:
-            try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    source = f.read()
-
-                module_ast = ast.parse(source, filename=file_path)
-                rel_path = os.path.relpath(file_path, self.root_dir)
-                self.local_modules[rel_path] = {
-                    "ast": module_ast,
-                    "source": source,
-                    "path": file_path,
-                }
-
-                # Extract function definitions
-                self._extract_functions_from_module(module_ast, rel_path)
-
-            except (SyntaxError, UnicodeDecodeError) as e:
-                logger.warning(f"Could not parse {file_path}: {e}")
+        # Only files changed since the last run are parsed
+        index = get_project_index(self.root_dir)
+        for rel_path, module in index.modules.items():
+            if module.error:
                 continue
+            self.local_modules[rel_path] = {
+                "path": os.path.join(index.root_dir, rel_path),
+                "imports": module.imports,
+                "from_imports": module.from_imports,
+            }
+            for function in module.functions:
+                # Syntax trees are parsed from the source on first use
+                self.dependency_graph[f"{rel_path}::{function.name}"] = FunctionNode(
+                    name=function.name,
+                    source_code=function.source_code,
+                    module_path=rel_path,
+                    is_nested=function.is_nested,
+                    is_local=True,
+                    dependencies=[],
+                    closure_vars=[],
+                )
 
     def _extract_functions_from_module(self, module_ast: ast.Module, module_path: str):
         """Extract all function definitions from a module."""
@@ -417,6 +385,13 @@ class FunctionDependencyAnalyzer:
         """Find function definition in local modules."""
         for qualified_name, func_node in self.dependency_graph.items():
             if func_node.name == func_name:
+                if func_node.ast_node is None and func_node.source_code:
+                    try:
+                        parsed = ast.parse(func_node.source_code).body[0]
+                        if isinstance(parsed, ast.FunctionDef):
+                            func_node.ast_node = parsed
+                    except SyntaxError:
+                        pass
                 return func_node
         return None
 
@@ -11,6 +11,7 @@ import tempfile
 import logging
 import threading
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, Any, Optional, TYPE_CHECKING
 from datetime import datetime, timezone
 
@@ -18,11 +19,28 @@ import paramiko
 import cloudpickle
 import pickle
 
+from .cloud_placement import (
+    SlotScheduler,
+    SlotAllocation,
+    build_slot_request,
+    get_instance_capacity,
+)
+
 if TYPE_CHECKING:
     from .cloud_providers.base import CloudProvider
 
 logger = logging.getLogger(__name__)
 
+# Workflow states that map onto timed phases
+_PHASES = {
+    "provisioning": "provision",
+    "waiting_for_ready": "boot",
+    "uploading": "upload",
+    "executing": "run",
+    "downloading": "download",
+}
+_TERMINAL_STATES = {"completed", "failed", "cancelled"}
+
 
 class CloudJobManager:
     """Manages cloud-based job execution workflows."""
@@ -35,6 +53,69 @@ class CloudJobManager:
         """
         self.config = config
         self.active_jobs: Dict[str, Any] = {}
+        self.slot_scheduler = SlotScheduler()
+        self._worker_pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_worker_pool(self) -> ThreadPoolExecutor:
+        """Lazily create the bounded pool that runs cloud job workflows."""
+        with self._lock:
+            if self._worker_pool is None:
+                self._worker_pool = ThreadPoolExecutor(
+                    max_workers=getattr(self.config, "cloud_max_concurrent_jobs", 16),
+                    thread_name_prefix="clustrix-cloud",
+                )
+            return self._worker_pool
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker pool, cancelling jobs that have not started yet."""
+        for job_info in self.active_jobs.values():
+            future = job_info.get("future")
+            if future is not None and future.cancel():
+                self._set_status(job_info, "cancelled")
+        with self._lock:
+            if self._worker_pool is not None:
+                self._worker_pool.shutdown(wait=wait)
+                self._worker_pool = None
+
+    def _set_status(self, job_info: Dict[str, Any], status: str):
+        """Transition a job to a new state and record per-phase timings.
+
+        Terminal states are final: a late transition from a worker after the
+        job was cancelled is ignored.
+        """
+        with self._lock:
+            if job_info.get("status") in _TERMINAL_STATES:
+                return
+
+            now = time.monotonic()
+            timings = job_info.setdefault("timings", {})
+            current_phase = _PHASES.get(job_info.get("status", ""))
+            started = job_info.get("phase_started_at")
+            if current_phase and started is not None:
+                timings[current_phase] = timings.get(current_phase, 0.0) + (
+                    now - started
+                )
+
+            job_info["status"] = status
+            job_info["phase_started_at"] = now if status in _PHASES else None
+
+    def _run_cloud_job(self, job_id: str) -> Any:
+        """Worker-pool entry point; resolves the job's future."""
+        job_info = self.active_jobs[job_id]
+        try:
+            self._execute_cloud_job_workflow(job_id)
+        except Exception as e:
+            logger.error(f"Cloud job {job_id} failed: {e}")
+            job_info["error"] = str(e)
+            self._set_status(job_info, "failed")
+
+        if job_info.get("status") == "failed":
+            error = job_info.get("error", "Unknown error")
+            raise RuntimeError(f"Cloud job {job_id} failed: {error}")
+        if job_info.get("status") == "cancelled":
+            raise RuntimeError(f"Cloud job {job_id} was cancelled")
+        return job_info.get("result")
 
     def submit_cloud_job(
         self, func_data: Dict[str, Any], job_config: Dict[str, Any], provider: str
@@ -68,18 +149,9 @@ class CloudJobManager:
             "ssh_config": None,
         }
 
-        # Start cloud job execution in background thread
-        def execute_cloud_job():
-            try:
-                self._execute_cloud_job_workflow(job_id)
-            except Exception as e:
-                logger.error(f"Cloud job {job_id} failed: {e}")
-                self.active_jobs[job_id]["status"] = "failed"
-                self.active_jobs[job_id]["error"] = str(e)
-
-        thread = threading.Thread(target=execute_cloud_job)
-        thread.daemon = True
-        thread.start()
+        # Run the workflow on the bounded worker pool; callers wait on the future
+        future = self._get_worker_pool().submit(self._run_cloud_job, job_id)
+        self.active_jobs[job_id]["future"] = future
 
         return job_id
 
@@ -175,36 +247,53 @@ class CloudJobManager:
         job_config = job_info["job_config"]
         func_data = job_info["func_data"]
 
+        if job_config.get(
+            "pack_jobs", getattr(self.config, "cloud_job_packing", False)
+        ):
+            capacity = get_instance_capacity(
+                job_info["provider"],
+                job_config.get("instance_type", "gpu_1x_a10"),
+                job_config.get("instance_capacity"),
+            )
+            if capacity.is_known:
+                self._execute_packed_cloud_job(job_id, capacity)
+                return
+            logger.info(
+                f"Unknown capacity for {job_config.get('instance_type')}, "
+                f"running job {job_id} on a dedicated instance"
+            )
+
         try:
             # Step 1: Create/provision cloud instance
-            job_info["status"] = "provisioning"
+            self._set_status(job_info, "provisioning")
             instance_config = self._create_cloud_instance(
                 cloud_provider, job_config, job_id
             )
             job_info["instance_id"] = instance_config["instance_id"]
 
             # Step 2: Wait for instance to be ready
-            job_info["status"] = "waiting_for_ready"
+            self._set_status(job_info, "waiting_for_ready")
             ssh_config = self._wait_for_instance_ready(
                 cloud_provider, instance_config, job_config
             )
             job_info["ssh_config"] = ssh_config
 
-            # Step 3: Execute job via SSH
-            job_info["status"] = "executing"
+            # Step 3: Execute job via SSH (upload, run, download)
             result = self._execute_job_on_cloud_instance(
                 ssh_config, func_data, job_config, job_id
             )
             job_info["result"] = result
-            job_info["status"] = "completed"
+            self._set_status(job_info, "completed")
 
         except Exception as e:
-            job_info["status"] = "failed"
             job_info["error"] = str(e)
+            self._set_status(job_info, "failed")
             logger.error(f"Cloud job workflow failed for {job_id}: {e}")
         finally:
             # Step 4: Optional cleanup - terminate instance if configured
-            if job_config.get("terminate_on_completion", True):
+            if job_info.get("instance_id") is None:
+                logger.debug(f"No cloud instance was created for job {job_id}")
+            elif job_config.get("terminate_on_completion", True):
                 try:
                     self._cleanup_cloud_instance(cloud_provider, job_info)
                 except Exception as e:
@@ -212,6 +301,90 @@ class CloudJobManager:
                         f"Failed to cleanup cloud instance for job {job_id}: {e}"
                     )
 
+    def _execute_packed_cloud_job(self, job_id: str, capacity):
+        """Execute a cloud job on a shared instance with free GPU/CPU slots."""
+        job_info = self.active_jobs[job_id]
+        job_config = job_info["job_config"]
+        instance_type = job_config.get("instance_type", "gpu_1x_a10")
+        region = job_config.get("region", "us-east-1")
+
+        request = build_slot_request(job_config, capacity)
+        instance, allocation, is_new = self.slot_scheduler.acquire(
+            job_info["provider"], instance_type, region, request, capacity
+        )
+        job_info["allocation"] = allocation
+
+        try:
+            if is_new:
+                # This job provisions the instance; others wait on instance.ready
+                cloud_provider = job_info["cloud_provider_instance"]
+                try:
+                    self._set_status(job_info, "provisioning")
+                    instance_config = self._create_cloud_instance(
+                        cloud_provider, job_config, instance.instance_key
+                    )
+                    job_info["instance_id"] = instance_config["instance_id"]
+                    self._set_status(job_info, "waiting_for_ready")
+                    ssh_config = self._wait_for_instance_ready(
+                        cloud_provider, instance_config, job_config
+                    )
+                except Exception as e:
+                    self.slot_scheduler.mark_failed(instance, str(e))
+                    # Record the instance so the cleanup below can terminate it
+                    instance.instance_id = job_info.get("instance_id")
+                    instance.cloud_provider = cloud_provider
+                    raise
+                self.slot_scheduler.mark_ready(
+                    instance, instance_config["instance_id"], ssh_config, cloud_provider
+                )
+            else:
+                self._set_status(job_info, "waiting_for_ready")
+                startup_timeout = job_config.get("instance_startup_timeout", 300)
+                if not instance.ready.wait(timeout=startup_timeout):
+                    raise RuntimeError(
+                        f"Shared instance not ready within {startup_timeout} seconds"
+                    )
+                if instance.error:
+                    raise RuntimeError(
+                        f"Shared instance failed to start: {instance.error}"
+                    )
+
+            job_info["instance_id"] = instance.instance_id
+            job_info["ssh_config"] = instance.ssh_config
+
+            result = self._execute_job_on_cloud_instance(
+                instance.ssh_config,
+                job_info["func_data"],
+                job_config,
+                job_id,
+                allocation=allocation,
+            )
+            job_info["result"] = result
+            self._set_status(job_info, "completed")
+
+        except Exception as e:
+            job_info["error"] = str(e)
+            self._set_status(job_info, "failed")
+            logger.error(f"Packed cloud job workflow failed for {job_id}: {e}")
+        finally:
+            idle_instance = self.slot_scheduler.release(allocation)
+            # Skip instances whose provisioning failed before one was created
+            if (
+                idle_instance is not None
+                and idle_instance.instance_id is not None
+                and job_config.get("terminate_on_completion", True)
+            ):
+                try:
+                    self._cleanup_cloud_instance(
+                        idle_instance.cloud_provider,
+                        {"instance_id": idle_instance.instance_id},
+                    )
+                except Exception as e:
+                    logger.warning(
+                        f"Failed to cleanup shared cloud instance "
+                        f"{idle_instance.instance_id}: {e}"
+                    )
+
     def _create_cloud_instance(
         self, cloud_provider, job_config: Dict[str, Any], job_id: str
     ) -> Dict[str, Any]:
@@ -287,9 +460,15 @@ class CloudJobManager:
         func_data: Dict[str, Any],
         job_config: Dict[str, Any],
         job_id: str,
+        allocation: Optional[SlotAllocation] = None,
     ) -> Any:
-        """Execute job on cloud instance via SSH."""
+        """Execute job on cloud instance via SSH.
+
+        When ``allocation`` is given the job runs on a shared instance and is
+        restricted to its assigned GPUs and CPUs.
+        """
         # Create temporary SSH client for cloud instance
+        job_info = self.active_jobs.get(job_id, {})
         ssh_client = paramiko.SSHClient()
         ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
 
@@ -306,6 +485,8 @@ class CloudJobManager:
             # Create SFTP client
             sftp_client = ssh_client.open_sftp()
 
+            self._set_status(job_info, "uploading")
+
             # Create remote work directory
             remote_work_dir = f"/tmp/clustrix_cloud_{job_id}"
             sftp_client.mkdir(remote_work_dir)
@@ -336,8 +517,12 @@ class CloudJobManager:
                 os.unlink(temp_script_path)
 
             # Execute job
+            self._set_status(job_info, "executing")
+            run_command = "python execute_job.py"
+            if allocation is not None:
+                run_command = allocation.wrap_command(run_command)
             stdin, stdout, stderr = ssh_client.exec_command(
-                f"cd {remote_work_dir} && python execute_job.py"
+                f"cd {remote_work_dir} && {run_command}"
             )
 
             # Wait for completion
@@ -348,6 +533,7 @@ class CloudJobManager:
                 raise RuntimeError(f"Job execution failed: {stderr_data}")
 
             # Download result
+            self._set_status(job_info, "downloading")
             result_path = f"{remote_work_dir}/result.pkl"
             with tempfile.NamedTemporaryFile(delete=False) as f:
                 temp_result_path = f.name
@@ -381,6 +567,11 @@ import cloudpickle
 import traceback
 
 def main():
+    # Pin to the CPU slots assigned on a shared instance
+    cpu_affinity = os.environ.get('CLUSTRIX_CPU_AFFINITY')
+    if cpu_affinity and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, {{int(c) for c in cpu_affinity.split(',')}})
+
     try:
         # Load function data
         with open('{remote_work_dir}/func_data.pkl', 'rb') as f:
@@ -427,22 +618,37 @@ if __name__ == "__main__":
 
         return self.active_jobs[job_id].get("status", "unknown")
 
-    def wait_for_cloud_result(self, job_id: str) -> Any:
-        """Wait for cloud job result."""
+    def get_cloud_job_future(self, job_id: str) -> Future:
+        """Get the future resolving to a cloud job's result.
+
+        Use ``asyncio.wrap_future`` to await it from asyncio code.
+        """
         job_info = self.active_jobs.get(job_id)
         if not job_info:
             raise ValueError(f"Unknown cloud job ID: {job_id}")
+        return job_info["future"]
 
-        poll_interval = getattr(self.config, "job_poll_interval", 10)
-
-        while job_info.get("status") not in ["completed", "failed"]:
-            time.sleep(poll_interval)
+    def get_cloud_job_timings(self, job_id: str) -> Dict[str, float]:
+        """Get seconds spent so far in each phase (provision, boot, upload, run, download)."""
+        job_info = self.active_jobs.get(job_id)
+        if not job_info:
+            raise ValueError(f"Unknown cloud job ID: {job_id}")
 
-        if job_info.get("status") == "failed":
-            error = job_info.get("error", "Unknown error")
-            raise RuntimeError(f"Cloud job {job_id} failed: {error}")
+        with self._lock:
+            timings = dict(job_info.get("timings", {}))
+            current_phase = _PHASES.get(job_info.get("status", ""))
+            started = job_info.get("phase_started_at")
+            if current_phase and started is not None:
+                timings[current_phase] = timings.get(current_phase, 0.0) + (
+                    time.monotonic() - started
+                )
+        return timings
 
-        return job_info.get("result")
+    def wait_for_cloud_result(
+        self, job_id: str, timeout: Optional[float] = None
+    ) -> Any:
+        """Wait for cloud job result, returning as soon as the job finishes."""
+        return self.get_cloud_job_future(job_id).result(timeout=timeout)
 
     def cancel_cloud_job(self, job_id: str):
         """Cancel a running cloud job."""
@@ -450,6 +656,12 @@ if __name__ == "__main__":
             return
 
         job_info = self.active_jobs[job_id]
+        future = job_info.get("future")
+        if future is not None and future.cancel():
+            # Never started, so there is no instance to terminate
+            self._set_status(job_info, "cancelled")
+            return
+
         cloud_provider = job_info.get("cloud_provider_instance")
         instance_id = job_info.get("instance_id")
 
@@ -467,4 +679,4 @@ if __name__ == "__main__":
                 )
 
         # Mark job as cancelled
-        job_info["status"] = "cancelled"
+        self._set_status(job_info, "cancelled")
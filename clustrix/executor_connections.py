@@ -12,6 +12,8 @@ from typing import Dict, Any
 import yaml
 import paramiko
 
+from .filesystem import invalidate_metadata
+
 logger = logging.getLogger(__name__)
 
 
@@ -234,6 +236,7 @@ class ConnectionManager:
         sftp = self.ssh_client.open_sftp()
         sftp.put(local_path, remote_path)
         sftp.close()
+        invalidate_metadata(remote_path, self.config)
 
     def download_file(self, remote_path: str, local_path: str):
         """Download file from remote cluster."""
@@ -255,6 +258,7 @@ class ConnectionManager:
         with sftp.open(remote_path, "w") as f:
             f.write(content)
         sftp.close()
+        invalidate_metadata(remote_path, self.config)
 
     def remote_file_exists(self, remote_path: str) -> bool:
         """Check if file exists on remote cluster."""
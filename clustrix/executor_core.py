@@ -4,21 +4,46 @@ This module provides the main ClusterExecutor class that acts as a coordinator
 for different job execution backends (schedulers, Kubernetes, cloud providers).
 """
 
+import os
+import posixpath
+import shlex
 import time
 import tempfile
 import pickle
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import cloudpickle
 
 from .executor_connections import ConnectionManager
+from .filesystem import invalidate_metadata
 from .executor_schedulers import SchedulerManager
+from .executor_scheduler_status import DEPENDENCY_NEVER_SATISFIED
 from .executor_kubernetes import KubernetesJobManager
 from .executor_cloud import CloudJobManager
 
 logger = logging.getLogger(__name__)
 
+# squeue states, as reported by get_job_status
+SLURM_STATUSES = {
+    "PENDING": "queued",
+    "RESIZING": "queued",
+    "REQUEUED": "queued",
+    "CONFIGURING": "running",
+    "RUNNING": "running",
+    "COMPLETING": "running",
+    "COMPLETED": "completed",
+    "FAILED": "failed",
+    "CANCELLED": "failed",
+    "TIMEOUT": "failed",
+    "NODE_FAIL": "failed",
+    "PREEMPTED": "failed",
+    "OUT_OF_MEMORY": "failed",
+}
+
+# Job IDs per squeue call
+STATUS_BATCH_SIZE = 200
+
 
 class ClusterExecutor:
     """Handles execution of jobs on various cluster types."""
@@ -40,6 +65,9 @@ class ClusterExecutor:
         # Combined active jobs tracking
         self.active_jobs: Dict[str, Any] = {}
 
+        # Jobs whose result is also copied into the cluster-side result cache
+        self._result_cache_paths: Dict[str, str] = {}
+
         # Connection will be established on-demand
 
     def submit_job(self, func_data: Dict[str, Any], job_config: Dict[str, Any]) -> str:
@@ -146,6 +174,43 @@ class ClusterExecutor:
 
     def _wait_for_scheduler_result(self, job_id: str) -> Any:
         """Wait for scheduler job result (SLURM/PBS/SGE/SSH)."""
+        remote_dir = self._wait_for_scheduler_completion(job_id)
+
+        # SSH-based job result collection
+        result_path = f"{remote_dir}/result.pkl"
+
+        with tempfile.NamedTemporaryFile(mode="wb", delete=False) as f:
+            local_result_path = f.name
+
+        try:
+            self.connection_manager.download_file(result_path, local_result_path)
+
+            with open(local_result_path, "rb") as f:
+                result = pickle.load(f)
+
+            cache_path = self._result_cache_paths.pop(job_id, None)
+            if cache_path:
+                cache_dir = shlex.quote(posixpath.dirname(cache_path))
+                self.connection_manager.execute_remote_command(
+                    f"mkdir -p {cache_dir} && "
+                    f"cp {shlex.quote(result_path)} {shlex.quote(cache_path)}"
+                )
+                invalidate_metadata(cache_path, self.config)
+
+            # Cleanup
+            if self.config.cleanup_on_success:
+                self.connection_manager.execute_remote_command(f"rm -rf {remote_dir}")
+                invalidate_metadata(remote_dir, self.config)
+
+            del self.scheduler_manager.active_jobs[job_id]
+            return result
+
+        finally:
+            if os.path.exists(local_result_path):
+                os.unlink(local_result_path)
+
+    def _wait_for_scheduler_completion(self, job_id: str) -> str:
+        """Poll a scheduler job until it completes; return its remote directory."""
         job_info = self.scheduler_manager.active_jobs.get(job_id)
         if not job_info:
             raise ValueError(f"Unknown job ID: {job_id}")
@@ -157,34 +222,7 @@ class ClusterExecutor:
             status = self.scheduler_manager.check_job_status(job_id)
 
             if status == "completed":
-                # SSH-based job result collection
-                result_path = f"{remote_dir}/result.pkl"
-
-                with tempfile.NamedTemporaryFile(mode="wb", delete=False) as f:
-                    local_result_path = f.name
-
-                try:
-                    self.connection_manager.download_file(
-                        result_path, local_result_path
-                    )
-
-                    with open(local_result_path, "rb") as f:
-                        result = pickle.load(f)
-
-                    # Cleanup
-                    if self.config.cleanup_on_success:
-                        self.connection_manager.execute_remote_command(
-                            f"rm -rf {remote_dir}"
-                        )
-
-                    del self.scheduler_manager.active_jobs[job_id]
-                    return result
-
-                finally:
-                    import os
-
-                    if os.path.exists(local_result_path):
-                        os.unlink(local_result_path)
+                return remote_dir
 
             elif status == "failed":
                 # SSH-based error handling
@@ -203,6 +241,162 @@ class ClusterExecutor:
             # Wait before next poll
             time.sleep(self.config.job_poll_interval)
 
+    def wait_for_remote_result(self, job_id: str) -> Optional[str]:
+        """
+        Wait for a job to finish, leaving its result on the cluster.
+
+        Lets a follow-up job read the result directly (e.g. to combine
+        partial results) instead of downloading it.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            Remote path of the pickled result, or None (without waiting) for
+            jobs whose results do not live on the cluster filesystem; use
+            :meth:`wait_for_result` for those
+        """
+        manager_type = self.active_jobs.get(job_id, {}).get("manager")
+        if manager_type != "scheduler":
+            return None
+        remote_dir = self._wait_for_scheduler_completion(job_id)
+        return f"{remote_dir}/result.pkl"
+
+    def discard_remote_result(self, job_id: str) -> None:
+        """Forget a job collected with :meth:`wait_for_remote_result`."""
+        job_info = self.scheduler_manager.active_jobs.pop(job_id, None)
+        self.active_jobs.pop(job_id, None)
+        if job_info and self.config.cleanup_on_success:
+            self.connection_manager.execute_remote_command(
+                f"rm -rf {job_info['remote_dir']}"
+            )
+            invalidate_metadata(job_info["remote_dir"], self.config)
+
+    def cache_result_on_cluster(self, job_id: str, remote_path: str) -> bool:
+        """
+        Copy a job's result to ``remote_path`` on the cluster when it completes.
+
+        The copy is made cluster-side before the job directory is cleaned
+        up, so caching the result costs no transfer.
+
+        Returns:
+            False for jobs whose results do not live on the cluster filesystem
+        """
+        if self.active_jobs.get(job_id, {}).get("manager") != "scheduler":
+            return False
+        self._result_cache_paths[job_id] = remote_path
+        return True
+
+    def fetch_cached_result(self, remote_path: str) -> Tuple[bool, Any]:
+        """
+        Download a result from the cluster-side result cache.
+
+        Returns:
+            ``(True, value)`` if ``remote_path`` exists, else ``(False, None)``
+        """
+        self.connect()
+        if not self.connection_manager.remote_file_exists(remote_path):
+            return False, None
+
+        with tempfile.NamedTemporaryFile(mode="wb", delete=False) as f:
+            local_path = f.name
+        try:
+            self.connection_manager.download_file(remote_path, local_path)
+            with open(local_path, "rb") as f:
+                value = pickle.load(f)
+        finally:
+            os.unlink(local_path)
+        # Recency for age-based pruning
+        self.connection_manager.execute_remote_command(
+            f"touch {shlex.quote(remote_path)}"
+        )
+        return True, value
+
+    def store_cached_result(
+        self, remote_path: str, data: bytes, max_age_days: Optional[int] = None
+    ) -> None:
+        """
+        Upload a pickled result into the cluster-side result cache.
+
+        Args:
+            remote_path: Destination path
+            data: Pickled result
+            max_age_days: Also remove cache entries unused for this many days
+        """
+        self.connect()
+        cache_dir = shlex.quote(posixpath.dirname(remote_path))
+        self.connection_manager.execute_remote_command(f"mkdir -p {cache_dir}")
+        with tempfile.NamedTemporaryFile(mode="wb", delete=False) as f:
+            f.write(data)
+            local_path = f.name
+        try:
+            self.connection_manager.upload_file(local_path, remote_path)
+        finally:
+            os.unlink(local_path)
+        if max_age_days:
+            self.connection_manager.execute_remote_command(
+                f"find {cache_dir} -name '*.pkl' -mtime +{int(max_age_days)} -delete"
+            )
+
+    def remove_remote_files(self, pattern: str) -> None:
+        """Remove files matching a glob in a single remote directory."""
+        self.connect()
+        directory, name = posixpath.split(pattern)
+        self.connection_manager.execute_remote_command(
+            f"rm -f {shlex.quote(directory)}/{name}"
+        )
+        invalidate_metadata(directory, self.config)
+
+    def job_handle(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Describe a submitted job so another executor can reattach to it.
+
+        Returns:
+            A JSON-serializable dict for scheduler jobs, or None for jobs
+            that cannot be reattached (Kubernetes and cloud jobs)
+        """
+        if self.active_jobs.get(job_id, {}).get("manager") != "scheduler":
+            return None
+        job_info = self.scheduler_manager.active_jobs.get(job_id)
+        if not job_info:
+            return None
+        return {
+            "manager": "scheduler",
+            "job_id": job_id,
+            "remote_dir": job_info["remote_dir"],
+            "submit_time": job_info.get("submit_time"),
+        }
+
+    def reattach_job(self, handle: Dict[str, Any]) -> str:
+        """
+        Track a job submitted by an earlier executor, from :meth:`job_handle`.
+
+        Returns:
+            The job ID, ready for :meth:`get_job_status` and :meth:`wait_for_result`
+        """
+        if handle.get("manager") != "scheduler":
+            raise ValueError(f"Cannot reattach to {handle.get('manager')} jobs")
+        self.connect()
+        job_id = handle["job_id"]
+        self.scheduler_manager.active_jobs[job_id] = {
+            "remote_dir": handle["remote_dir"],
+            "status": "submitted",
+            "submit_time": handle.get("submit_time"),
+        }
+        self.active_jobs[job_id] = {"manager": "scheduler", "job_id": job_id}
+        return job_id
+
+    def job_node(self, job_id: str) -> Optional[str]:
+        """Return the node(s) a SLURM job runs on, or None if not running."""
+        if self.config.cluster_type != "slurm":
+            return None
+        if self.active_jobs.get(job_id, {}).get("manager") != "scheduler":
+            return None
+        stdout, _ = self.connection_manager.execute_remote_command(
+            f"squeue -j {shlex.quote(job_id)} -h -o %N"
+        )
+        return stdout.strip() or None
+
     def get_job_status(self, job_id: str) -> str:
         """Get job status (alias for _check_job_status)."""
         # Check if this is a tracked job and delegate to appropriate manager
@@ -230,6 +424,71 @@ class ClusterExecutor:
         else:
             return self.scheduler_manager.check_job_status(job_id)
 
+    def get_job_statuses(self, job_ids: Sequence[str]) -> Dict[str, str]:
+        """
+        Get the status of many jobs at once.
+
+        SLURM jobs are looked up with one ``squeue`` call per
+        ``STATUS_BATCH_SIZE`` jobs, and jobs that have left the queue with
+        one check for their result files. Only jobs that left the queue
+        without a result, and jobs of other cluster types, are checked one
+        by one with :meth:`get_job_status`.
+
+        Args:
+            job_ids: Job identifiers
+
+        Returns:
+            Status of each job, as from :meth:`get_job_status`
+        """
+        statuses: Dict[str, str] = {}
+        if self.config.cluster_type == "slurm":
+            slurm_jobs = [
+                job_id
+                for job_id in job_ids
+                if self.active_jobs.get(job_id, {}).get("manager") == "scheduler"
+                and job_id in self.scheduler_manager.active_jobs
+            ]
+            for i in range(0, len(slurm_jobs), STATUS_BATCH_SIZE):
+                statuses.update(
+                    self._slurm_job_statuses(slurm_jobs[i : i + STATUS_BATCH_SIZE])
+                )
+        for job_id in job_ids:
+            if job_id not in statuses:
+                statuses[job_id] = self.get_job_status(job_id)
+        return statuses
+
+    def _slurm_job_statuses(self, job_ids: List[str]) -> Dict[str, str]:
+        """Statuses of SLURM jobs that are queued, running, or have a result."""
+        statuses: Dict[str, str] = {}
+        stdout, _ = self.connection_manager.execute_remote_command(
+            f"squeue -h -j {','.join(shlex.quote(j) for j in job_ids)} -o '%i %T %r'"
+        )
+        for line in stdout.splitlines():
+            parts = line.split()
+            if len(parts) >= 2 and parts[0] in job_ids:
+                statuses[parts[0]] = SLURM_STATUSES.get(parts[1], "unknown")
+                if parts[2:3] == [DEPENDENCY_NEVER_SATISFIED]:
+                    # Would wait forever for a failed upstream job
+                    statuses[parts[0]] = "failed"
+
+        # Jobs no longer in the queue have finished; those with a result
+        # file completed
+        left_queue = {
+            self.scheduler_manager.active_jobs[job_id]["remote_dir"]: job_id
+            for job_id in job_ids
+            if job_id not in statuses
+        }
+        if left_queue:
+            dirs = " ".join(shlex.quote(d) for d in left_queue)
+            stdout, _ = self.connection_manager.execute_remote_command(
+                f'for d in {dirs}; do [ -f "$d/result.pkl" ] && echo "$d"; done'
+            )
+            for remote_dir in stdout.splitlines():
+                job_id = left_queue.get(remote_dir.strip())
+                if job_id is not None:
+                    statuses[job_id] = "completed"
+        return statuses
+
     def get_result(self, job_id: str) -> Any:
         """Get result (alias for wait_for_result)."""
         return self.wait_for_result(job_id)
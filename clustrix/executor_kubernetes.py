@@ -13,6 +13,8 @@ import ast
 
 import cloudpickle
 
+from .cpu_placement import thread_env
+
 logger = logging.getLogger(__name__)
 
 
@@ -135,6 +137,18 @@ class KubernetesJobManager:
         func_data_serialized = cloudpickle.dumps(func_data)
         func_data_b64 = base64.b64encode(func_data_serialized).decode("utf-8")
 
+        # Match OpenMP/BLAS threads to the container's CPU request
+        thread_env_vars = []
+        if getattr(self.config, "limit_worker_threads", True):
+            try:
+                cores = max(1, int(float(job_config.get("cores", 1))))
+            except (TypeError, ValueError):
+                cores = 1  # e.g. millicore strings such as "500m"
+            thread_env_vars = [
+                {"name": name, "value": value}
+                for name, value in thread_env(cores).items()
+            ]
+
         # Create Kubernetes Job manifest
         job_manifest = {
             "apiVersion": "batch/v1",
@@ -242,6 +256,7 @@ except Exception as e:
 "
 """
                                 ],
+                                "env": thread_env_vars,
                                 "resources": {
                                     "requests": {
                                         "cpu": f"{job_config.get('cores', 1)}",
@@ -13,6 +13,9 @@ from typing import Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
 
+# squeue reason of a pending job whose afterok dependency failed
+DEPENDENCY_NEVER_SATISFIED = "DependencyNeverSatisfied"
+
 
 class SchedulerStatusManager:
     """Manages job status monitoring and error handling for HPC schedulers."""
@@ -238,6 +241,9 @@ class SchedulerStatusManager:
                     return "failed"
                 elif slurm_status in ["RUNNING", "CONFIGURING"]:
                     return "running"
+                elif reason == DEPENDENCY_NEVER_SATISFIED:
+                    # Held on a failed upstream job, so it would never start
+                    return "failed"
                 elif slurm_status in ["PENDING", "RESIZING", "REQUEUED"]:
                     return "queued"
                 else:
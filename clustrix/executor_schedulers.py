@@ -10,6 +10,7 @@ import tempfile
 import pickle
 import logging
 import threading
+import uuid
 from typing import Dict, Any, Optional
 
 from .utils import create_job_script, setup_remote_environment
@@ -33,12 +34,16 @@ class SchedulerManager:
         self.active_jobs: Dict[str, Any] = {}
         self.status_manager = SchedulerStatusManager(config, connection_manager)
 
+    def _new_job_dir(self) -> str:
+        """A job directory no other job uses, even one submitted the same second."""
+        return f"{self.config.remote_work_dir}/job_{int(time.time())}_{uuid.uuid4().hex[:8]}"
+
     def submit_slurm_job(
         self, func_data: Dict[str, Any], job_config: Dict[str, Any]
     ) -> str:
         """Submit job via SLURM."""
         # Create remote working directory
-        remote_job_dir = f"{self.config.remote_work_dir}/job_{int(time.time())}"
+        remote_job_dir = self._new_job_dir()
         self.connection_manager.execute_remote_command(f"mkdir -p {remote_job_dir}")
 
         # Upload function data
@@ -159,7 +164,7 @@ class SchedulerManager:
     ) -> str:
         """Submit job via PBS."""
         # Similar to SLURM but with PBS commands
-        remote_job_dir = f"{self.config.remote_work_dir}/job_{int(time.time())}"
+        remote_job_dir = self._new_job_dir()
         self.connection_manager.execute_remote_command(f"mkdir -p {remote_job_dir}")
 
         # Upload function data
@@ -202,7 +207,7 @@ class SchedulerManager:
     ) -> str:
         """Submit job via SGE."""
         # Create remote working directory
-        remote_job_dir = f"{self.config.remote_work_dir}/job_{int(time.time())}"
+        remote_job_dir = self._new_job_dir()
         self.connection_manager.execute_remote_command(f"mkdir -p {remote_job_dir}")
 
         # Upload function data
@@ -255,7 +260,7 @@ class SchedulerManager:
         self, func_data: Dict[str, Any], job_config: Dict[str, Any]
     ) -> str:
         """Submit job via direct SSH using two-venv approach."""
-        remote_job_dir = f"{self.config.remote_work_dir}/job_{int(time.time())}"
+        remote_job_dir = self._new_job_dir()
         self.connection_manager.execute_remote_command(f"mkdir -p {remote_job_dir}")
 
         # Upload function data
@@ -18,6 +18,7 @@ from pathlib import Path
 from typing import Dict, Set, Optional, Any, Callable, List
 from .dependency_analysis import DependencyGraph, analyze_function_dependencies
 from .config import ClusterConfig
+from .project_index import get_environment_index
 
 
 class PackageInfo:
@@ -509,13 +510,9 @@ def setup_filesystem_functions(cluster_config):
     def _get_installed_packages(self) -> Dict[str, str]:
         """Get information about installed packages."""
         try:
-            import pkg_resources  # type: ignore[import-untyped]
-
-            installed = {}
-            for dist in pkg_resources.working_set:
-                installed[dist.project_name] = dist.version
-            return installed
-        except ImportError:
+            # Rebuilt only when the environment changes
+            return dict(get_environment_index().distributions)
+        except Exception:
             return {}
 
     def _detect_external_dependencies(self, dependencies: DependencyGraph) -> List[str]:
@@ -633,7 +630,13 @@ def setup_filesystem_functions(cluster_config):
             "tf": "tensorflow",
         }
 
-        return module_to_package.get(module_name, module_name)
+        if module_name in module_to_package:
+            return module_to_package[module_name]
+        try:
+            distributions = get_environment_index().module_distributions
+        except Exception:
+            return module_name
+        return distributions.get(module_name, [module_name])[0]
 
     def _find_package_root(self, module_path: Path) -> Optional[Path]:
         """Find the root directory of a Python package."""
@@ -3,9 +3,21 @@ Unified filesystem operations for local and remote clusters.
 
 This module provides a consistent interface for filesystem operations that work
 both locally and on remote clusters based on the ClusterConfig object.
+
+Remote metadata operations (ls, stat, exists, isdir, isfile) are single SFTP
+requests on one persistent session; only operations SFTP has no request for
+(find, glob, du, count_files) run shell commands.
+
+With ``config.filesystem_cache`` enabled, remote metadata lookups are
+answered from an in-memory TTL cache (see :mod:`clustrix.metadata_cache`);
+the convenience functions then share one filesystem, and its connection,
+per configuration. Pass ``use_cache=False`` to bypass the cache for a call.
 """
 
 import os
+import stat
+import threading
+import weakref
 import glob as glob_module
 from pathlib import Path
 from typing import List, Optional, Dict, Any
@@ -13,6 +25,12 @@ from typing import List, Optional, Dict, Any
 import paramiko
 
 from .config import ClusterConfig
+from .metadata_cache import (
+    MetadataCache,
+    MetadataCacheStats,
+    create_metadata_cache,
+    metadata_cache_enabled,
+)
 
 
 class FileInfo:
@@ -97,8 +115,15 @@ class DiskUsage:
 class ClusterFilesystem:
     """Unified filesystem operations for local and remote clusters."""
 
-    def __init__(self, config: ClusterConfig):
-        """Initialize filesystem with cluster configuration."""
+    def __init__(self, config: ClusterConfig, cache_metadata: Optional[bool] = None):
+        """
+        Initialize filesystem with cluster configuration.
+
+        Args:
+            config: Cluster configuration
+            cache_metadata: Whether to cache remote metadata lookups
+                (default: ``config.filesystem_cache``)
+        """
         self.config = config
         self._ssh_client: Optional[paramiko.SSHClient] = None
         self._sftp_client: Optional[paramiko.SFTPClient] = None
@@ -106,6 +131,13 @@ class ClusterFilesystem:
         # Auto-detect if we're running on the target cluster (for shared filesystems)
         self._auto_detect_cluster_location()
 
+        if cache_metadata is None:
+            cache_metadata = metadata_cache_enabled(config)
+        self.metadata_cache: Optional[MetadataCache] = None
+        if cache_metadata and self.config.cluster_type != "local":
+            self.metadata_cache = create_metadata_cache(config)
+            _caching_filesystems.add(self)
+
     def _auto_detect_cluster_location(self):
         """
         Auto-detect if we're already running on the target cluster.
@@ -280,12 +312,12 @@ class ClusterFilesystem:
 
     # ===== Core Operations =====
 
-    def ls(self, path: str = ".") -> List[str]:
+    def ls(self, path: str = ".", use_cache: bool = True) -> List[str]:
         """List directory contents."""
         if self.config.cluster_type == "local":
             return self._local_ls(path)
         else:
-            return self._remote_ls(path)
+            return self._remote_ls(path, use_cache)
 
     def find(self, pattern: str, path: str = ".") -> List[str]:
         """Find files matching pattern."""
@@ -294,33 +326,33 @@ class ClusterFilesystem:
         else:
             return self._remote_find(pattern, path)
 
-    def stat(self, path: str) -> FileInfo:
+    def stat(self, path: str, use_cache: bool = True) -> FileInfo:
         """Get file/directory information."""
         if self.config.cluster_type == "local":
             return self._local_stat(path)
         else:
-            return self._remote_stat(path)
+            return self._remote_stat(path, use_cache)
 
-    def exists(self, path: str) -> bool:
+    def exists(self, path: str, use_cache: bool = True) -> bool:
         """Check if file/directory exists."""
         if self.config.cluster_type == "local":
             return self._local_exists(path)
         else:
-            return self._remote_exists(path)
+            return self._remote_exists(path, use_cache)
 
-    def isdir(self, path: str) -> bool:
+    def isdir(self, path: str, use_cache: bool = True) -> bool:
         """Check if path is a directory."""
         if self.config.cluster_type == "local":
             return self._local_isdir(path)
         else:
-            return self._remote_isdir(path)
+            return self._remote_isdir(path, use_cache)
 
-    def isfile(self, path: str) -> bool:
+    def isfile(self, path: str, use_cache: bool = True) -> bool:
         """Check if path is a file."""
         if self.config.cluster_type == "local":
             return self._local_isfile(path)
         else:
-            return self._remote_isfile(path)
+            return self._remote_isfile(path, use_cache)
 
     def glob(self, pattern: str, path: str = ".") -> List[str]:
         """Pattern matching for files."""
@@ -336,6 +368,19 @@ class ClusterFilesystem:
         else:
             return self._remote_du(path)
 
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Forget cached metadata of ``path`` (and below it), or all of it."""
+        if self.metadata_cache is not None:
+            self.metadata_cache.invalidate(
+                None if path is None else self._get_full_path(path)
+            )
+
+    def cache_stats(self) -> Optional[MetadataCacheStats]:
+        """Hit/miss statistics of the metadata cache, or None if disabled."""
+        if self.metadata_cache is None:
+            return None
+        return self.metadata_cache.stats()
+
     def count_files(self, path: str = ".", pattern: str = "*") -> int:
         """Count files in directory matching pattern."""
         if self.config.cluster_type == "local":
@@ -450,19 +495,36 @@ class ClusterFilesystem:
 
     # ===== Remote Implementations =====
 
-    def _remote_ls(self, path: str) -> List[str]:
-        """Remote directory listing via SSH."""
-        ssh_client = self._get_ssh_client()
-        full_path = self._get_full_path(path)
+    def _remote_ls(self, path: str, use_cache: bool = True) -> List[str]:
+        """Remote directory listing via SFTP."""
+        return sorted(self._remote_listing(path, use_cache) or {})
 
-        # Use ls -1 for one file per line
-        cmd = f"ls -1 {full_path} 2>/dev/null || true"
-        stdin, stdout, stderr = ssh_client.exec_command(cmd)
-        output = stdout.read().decode().strip()
+    def _remote_ls_info(self, path: str, use_cache: bool = True) -> List[FileInfo]:
+        """Remote directory entries with their attributes, in one SFTP request."""
+        listing = self._remote_listing(path, use_cache) or {}
+        return [_file_info(attrs, name) for name, attrs in sorted(listing.items())]
 
-        if output:
-            return sorted(output.split("\n"))
-        return []
+    def _remote_listing(
+        self, path: str, use_cache: bool = True
+    ) -> Optional[Dict[str, paramiko.SFTPAttributes]]:
+        """Attributes of the entries of a remote directory, or None."""
+        full_path = self._get_full_path(path)
+        cache = self.metadata_cache
+        if cache is not None and use_cache:
+            hit, listing = cache.get_listing(full_path)
+            if hit:
+                return listing
+
+        sftp_client = self._get_sftp_client()
+        try:
+            listing = {
+                attrs.filename: attrs for attrs in sftp_client.listdir_attr(full_path)
+            }
+        except IOError:
+            listing = None
+        if cache is not None:
+            cache.put_listing(full_path, listing)
+        return listing
 
     def _remote_find(self, pattern: str, path: str) -> List[str]:
         """Remote file finding via SSH."""
@@ -478,71 +540,46 @@ class ClusterFilesystem:
             return output.split("\n")
         return []
 
-    def _remote_stat(self, path: str) -> FileInfo:
-        """Remote file stat via SSH."""
-        ssh_client = self._get_ssh_client()
+    def _remote_attributes(
+        self, path: str, use_cache: bool = True
+    ) -> Optional[paramiko.SFTPAttributes]:
+        """SFTP attributes of a remote path (following symlinks), or None."""
         full_path = self._get_full_path(path)
+        cache = self.metadata_cache
+        if cache is not None and use_cache:
+            hit, attrs = cache.get_attributes(full_path)
+            if hit:
+                return attrs
 
-        # Use stat command with portable format
-        # %s = size, %Y = modification time, %f = file type/mode in hex
-        cmd = f"stat -c '%s %Y %f' {full_path} 2>/dev/null"
-        stdin, stdout, stderr = ssh_client.exec_command(cmd)
-        output = stdout.read().decode().strip()
-
-        if not output:
+        sftp_client = self._get_sftp_client()
+        try:
+            attrs = sftp_client.stat(full_path)
+        except IOError:
+            attrs = None
+        if cache is not None:
+            cache.put_attributes(full_path, attrs)
+        return attrs
+
+    def _remote_stat(self, path: str, use_cache: bool = True) -> FileInfo:
+        """Remote file stat via SFTP."""
+        attrs = self._remote_attributes(path, use_cache)
+        if attrs is None:
             raise FileNotFoundError(f"File not found: {path}")
+        return _file_info(attrs, os.path.basename(path))
 
-        parts = output.split()
-        size = int(parts[0])
-        mtime = int(parts[1])
-        mode_hex = int(parts[2], 16)
-
-        # Check if directory (S_IFDIR = 0x4000)
-        is_dir = bool(mode_hex & 0x4000)
-
-        # Extract permissions (last 3 octal digits)
-        permissions = oct(mode_hex & 0o777)[-3:]
-
-        return FileInfo(
-            size=size,
-            modified=mtime,
-            is_dir=is_dir,
-            permissions=permissions,
-            name=os.path.basename(path),
-        )
-
-    def _remote_exists(self, path: str) -> bool:
+    def _remote_exists(self, path: str, use_cache: bool = True) -> bool:
         """Check if remote path exists."""
-        ssh_client = self._get_ssh_client()
-        full_path = self._get_full_path(path)
-
-        cmd = f"test -e {full_path} && echo 'EXISTS' || echo 'NOT_EXISTS'"
-        stdin, stdout, stderr = ssh_client.exec_command(cmd)
-        output = stdout.read().decode().strip()
+        return self._remote_attributes(path, use_cache) is not None
 
-        return output == "EXISTS"
-
-    def _remote_isdir(self, path: str) -> bool:
+    def _remote_isdir(self, path: str, use_cache: bool = True) -> bool:
         """Check if remote path is directory."""
-        ssh_client = self._get_ssh_client()
-        full_path = self._get_full_path(path)
-
-        cmd = f"test -d {full_path} && echo 'DIR' || echo 'NOT_DIR'"
-        stdin, stdout, stderr = ssh_client.exec_command(cmd)
-        output = stdout.read().decode().strip()
+        attrs = self._remote_attributes(path, use_cache)
+        return attrs is not None and stat.S_ISDIR(attrs.st_mode or 0)
 
-        return output == "DIR"
-
-    def _remote_isfile(self, path: str) -> bool:
+    def _remote_isfile(self, path: str, use_cache: bool = True) -> bool:
         """Check if remote path is file."""
-        ssh_client = self._get_ssh_client()
-        full_path = self._get_full_path(path)
-
-        cmd = f"test -f {full_path} && echo 'FILE' || echo 'NOT_FILE'"
-        stdin, stdout, stderr = ssh_client.exec_command(cmd)
-        output = stdout.read().decode().strip()
-
-        return output == "FILE"
+        attrs = self._remote_attributes(path, use_cache)
+        return attrs is not None and stat.S_ISREG(attrs.st_mode or 0)
 
     def _remote_glob(self, pattern: str, path: str) -> List[str]:
         """Remote glob pattern matching via SSH."""
@@ -597,17 +634,66 @@ class ClusterFilesystem:
         return int(output) if output else 0
 
 
+def _file_info(attrs: paramiko.SFTPAttributes, name: str) -> FileInfo:
+    """FileInfo from SFTP attributes."""
+    mode = attrs.st_mode or 0
+    return FileInfo(
+        size=attrs.st_size or 0,
+        modified=attrs.st_mtime or 0,
+        is_dir=stat.S_ISDIR(mode),
+        permissions=oct(mode & 0o777)[-3:],
+        name=name,
+    )
+
+
+# Filesystems with a metadata cache, for invalidation after writes
+_caching_filesystems: "weakref.WeakSet[ClusterFilesystem]" = weakref.WeakSet()
+
+# Filesystems shared by the convenience functions, per configuration
+_shared_filesystems: Dict[int, ClusterFilesystem] = {}
+_shared_lock = threading.Lock()
+
+
+def _filesystem_for(config: ClusterConfig) -> ClusterFilesystem:
+    """A new filesystem, or the shared one for ``config`` if it caches metadata."""
+    if not metadata_cache_enabled(config):
+        return ClusterFilesystem(config)
+    with _shared_lock:
+        fs = _shared_filesystems.get(id(config))
+        if fs is None or fs.config is not config:
+            fs = _shared_filesystems[id(config)] = ClusterFilesystem(config)
+        return fs
+
+
+def invalidate_metadata(
+    path: Optional[str] = None, config: Optional[ClusterConfig] = None
+) -> None:
+    """
+    Drop cached metadata of a remote ``path`` that clustrix wrote to.
+
+    Args:
+        path: Absolute remote path (everything below it is dropped too), or
+            None to drop all cached metadata
+        config: Only invalidate filesystems using this configuration
+    """
+    for fs in list(_caching_filesystems):
+        if config is None or fs.config is config:
+            fs.invalidate(path)
+
+
 # ===== Convenience Functions =====
 
 
-def cluster_ls(path: str = ".", config: Optional[ClusterConfig] = None) -> List[str]:
+def cluster_ls(
+    path: str = ".", config: Optional[ClusterConfig] = None, use_cache: bool = True
+) -> List[str]:
     """List directory contents locally or remotely based on config."""
     if config is None:
         from .config import get_config
 
         config = get_config()
-    fs = ClusterFilesystem(config)
-    return fs.ls(path)
+    fs = _filesystem_for(config)
+    return fs.ls(path, use_cache=use_cache)
 
 
 def cluster_find(
@@ -618,48 +704,56 @@ def cluster_find(
         from .config import get_config
 
         config = get_config()
-    fs = ClusterFilesystem(config)
+    fs = _filesystem_for(config)
     return fs.find(pattern, path)
 
 
-def cluster_stat(path: str, config: Optional[ClusterConfig] = None) -> FileInfo:
+def cluster_stat(
+    path: str, config: Optional[ClusterConfig] = None, use_cache: bool = True
+) -> FileInfo:
     """Get file information locally or remotely based on config."""
     if config is None:
         from .config import get_config
 
         config = get_config()
-    fs = ClusterFilesystem(config)
-    return fs.stat(path)
+    fs = _filesystem_for(config)
+    return fs.stat(path, use_cache=use_cache)
 
 
-def cluster_exists(path: str, config: Optional[ClusterConfig] = None) -> bool:
+def cluster_exists(
+    path: str, config: Optional[ClusterConfig] = None, use_cache: bool = True
+) -> bool:
     """Check if file/directory exists locally or remotely based on config."""
     if config is None:
         from .config import get_config
 
         config = get_config()
-    fs = ClusterFilesystem(config)
-    return fs.exists(path)
+    fs = _filesystem_for(config)
+    return fs.exists(path, use_cache=use_cache)
 
 
-def cluster_isdir(path: str, config: Optional[ClusterConfig] = None) -> bool:
+def cluster_isdir(
+    path: str, config: Optional[ClusterConfig] = None, use_cache: bool = True
+) -> bool:
     """Check if path is directory locally or remotely based on config."""
     if config is None:
         from .config import get_config
 
         config = get_config()
-    fs = ClusterFilesystem(config)
-    return fs.isdir(path)
+    fs = _filesystem_for(config)
+    return fs.isdir(path, use_cache=use_cache)
 
 
-def cluster_isfile(path: str, config: Optional[ClusterConfig] = None) -> bool:
+def cluster_isfile(
+    path: str, config: Optional[ClusterConfig] = None, use_cache: bool = True
+) -> bool:
     """Check if path is file locally or remotely based on config."""
     if config is None:
         from .config import get_config
 
         config = get_config()
-    fs = ClusterFilesystem(config)
-    return fs.isfile(path)
+    fs = _filesystem_for(config)
+    return fs.isfile(path, use_cache=use_cache)
 
 
 def cluster_glob(
@@ -670,7 +764,7 @@ def cluster_glob(
         from .config import get_config
 
         config = get_config()
-    fs = ClusterFilesystem(config)
+    fs = _filesystem_for(config)
     return fs.glob(pattern, path)
 
 
@@ -680,7 +774,7 @@ def cluster_du(path: str = ".", config: Optional[ClusterConfig] = None) -> DiskU
         from .config import get_config
 
         config = get_config()
-    fs = ClusterFilesystem(config)
+    fs = _filesystem_for(config)
     return fs.du(path)
 
 
@@ -692,5 +786,5 @@ def cluster_count_files(
         from .config import get_config
 
         config = get_config()
-    fs = ClusterFilesystem(config)
+    fs = _filesystem_for(config)
     return fs.count_files(path, pattern)
@@ -7,11 +7,11 @@ environments that have strict function complexity limits.
 """
 
 import ast
-import inspect
-import textwrap
 from typing import Callable, Dict, List, Any, Optional, Tuple
 import logging
 
+from .analysis_cache import cached_analysis, function_tree
+
 logger = logging.getLogger(__name__)
 
 
@@ -137,41 +137,11 @@ def analyze_function_complexity(func: Callable) -> Dict[str, Any]:
         Dictionary with complexity metrics
     """
     try:
-        source = inspect.getsource(func)
-        source = textwrap.dedent(source)
-        tree = ast.parse(source)
-
-        analyzer = ComplexityAnalyzer()
-        analyzer.visit(tree)
-
-        # Calculate overall complexity assessment
-        is_complex = (
-            analyzer.complexity_score > 20
-            or analyzer.line_count > 30
-            or analyzer.max_nested_depth > 3
-            or analyzer.subprocess_calls > 2
-            or analyzer.function_calls > 15
-            or analyzer.nested_functions > 0  # ANY nested function requires flattening
+        # Copy, so callers can annotate the result without touching the cache
+        return dict(
+            cached_analysis(func, "complexity", lambda: _complexity_metrics(func))
         )
 
-        return {
-            "complexity_score": analyzer.complexity_score,
-            "line_count": analyzer.line_count,
-            "max_nested_depth": analyzer.max_nested_depth,
-            "function_calls": analyzer.function_calls,
-            "import_statements": analyzer.import_statements,
-            "loop_count": analyzer.loop_count,
-            "conditional_count": analyzer.conditional_count,
-            "subprocess_calls": analyzer.subprocess_calls,
-            "nested_functions": analyzer.nested_functions,
-            "is_complex": is_complex,
-            "estimated_risk": (
-                "high"
-                if is_complex
-                else "medium" if analyzer.complexity_score > 10 else "low"
-            ),
-        }
-
     except Exception as e:
         logger.warning(f"Complexity analysis failed: {e}")
         return {
@@ -182,6 +152,39 @@ def analyze_function_complexity(func: Callable) -> Dict[str, Any]:
         }
 
 
+def _complexity_metrics(func: Callable) -> Dict[str, Any]:
+    analyzer = ComplexityAnalyzer()
+    analyzer.visit(function_tree(func))
+
+    # Calculate overall complexity assessment
+    is_complex = (
+        analyzer.complexity_score > 20
+        or analyzer.line_count > 30
+        or analyzer.max_nested_depth > 3
+        or analyzer.subprocess_calls > 2
+        or analyzer.function_calls > 15
+        or analyzer.nested_functions > 0  # ANY nested function requires flattening
+    )
+
+    return {
+        "complexity_score": analyzer.complexity_score,
+        "line_count": analyzer.line_count,
+        "max_nested_depth": analyzer.max_nested_depth,
+        "function_calls": analyzer.function_calls,
+        "import_statements": analyzer.import_statements,
+        "loop_count": analyzer.loop_count,
+        "conditional_count": analyzer.conditional_count,
+        "subprocess_calls": analyzer.subprocess_calls,
+        "nested_functions": analyzer.nested_functions,
+        "is_complex": is_complex,
+        "estimated_risk": (
+            "high"
+            if is_complex
+            else "medium" if analyzer.complexity_score > 10 else "low"
+        ),
+    }
+
+
 class FunctionFlattener:
     """Flattens complex functions into simpler components."""
 
@@ -203,9 +206,7 @@ class FunctionFlattener:
             Dictionary with flattened function components
         """
         try:
-            source = inspect.getsource(func)
-            source = textwrap.dedent(source)
-            tree = ast.parse(source)
+            tree = function_tree(func)
 
             # Extract the function definition
             func_def = None
@@ -800,6 +801,15 @@ def auto_flatten_if_needed(func: Callable) -> Tuple[Callable, Optional[Dict[str,
         # Function is simple enough, return as-is
         return func, None
 
+    if "analysis_error" in complexity_info:
+        # Don't cache an outcome caused by missing source
+        return _flatten(func, complexity_info)
+    return cached_analysis(func, "flattening", lambda: _flatten(func, complexity_info))
+
+
+def _flatten(
+    func: Callable, complexity_info: Dict[str, Any]
+) -> Tuple[Callable, Optional[Dict[str, Any]]]:
     logger.info(
         f"Function {func.__name__} is complex (score: {complexity_info['complexity_score']}), attempting to flatten"
     )
@@ -6,11 +6,13 @@ for seamless multi-GPU usage without requiring manual GPU configuration.
 """
 
 import ast
-import inspect
+import copy
 import subprocess
 from typing import Any, Dict, List, Optional, Callable
 import logging
 
+from .analysis_cache import cached_analysis, function_tree
+
 logger = logging.getLogger(__name__)
 
 
@@ -96,6 +98,138 @@ if torch.cuda.is_available():
     return gpu_info
 
 
+class _GPUOpVisitor(ast.NodeVisitor):
+    """Find loops and comprehensions containing GPU-compatible calls."""
+
+    def __init__(self):
+        self.operations = []
+        self.current_loop = None
+
+    def visit_For(self, node):
+        """Detect for loops that might benefit from GPU parallelization."""
+        if isinstance(node.target, ast.Name):
+            loop_var = node.target.id
+
+            # Analyze loop body for GPU operations
+            gpu_ops_in_loop = []
+            for stmt in ast.walk(node):
+                if isinstance(stmt, ast.Call):
+                    call_info = self._analyze_call(stmt)
+                    if call_info and call_info.get("gpu_compatible"):
+                        gpu_ops_in_loop.append(call_info)
+
+            if gpu_ops_in_loop:
+                loop_info = {
+                    "type": "for_loop",
+                    "variable": loop_var,
+                    "iterable": self._get_iterable_info(node.iter),
+                    "gpu_operations": gpu_ops_in_loop,
+                    "parallelizable": True,
+                    "estimated_benefit": self._estimate_gpu_benefit(gpu_ops_in_loop),
+                }
+                self.operations.append(loop_info)
+
+        self.generic_visit(node)
+
+    def visit_ListComp(self, node):
+        """Detect list comprehensions that might benefit from GPU parallelization."""
+        # Analyze comprehension for GPU operations
+        gpu_ops = []
+        for stmt in ast.walk(node.elt):
+            if isinstance(stmt, ast.Call):
+                call_info = self._analyze_call(stmt)
+                if call_info and call_info.get("gpu_compatible"):
+                    gpu_ops.append(call_info)
+
+        if gpu_ops and node.generators:
+            gen = node.generators[0]  # Focus on first generator
+            if isinstance(gen.target, ast.Name):
+                comp_info = {
+                    "type": "list_comprehension",
+                    "variable": gen.target.id,
+                    "iterable": self._get_iterable_info(gen.iter),
+                    "gpu_operations": gpu_ops,
+                    "parallelizable": True,
+                    "estimated_benefit": self._estimate_gpu_benefit(gpu_ops),
+                }
+                self.operations.append(comp_info)
+
+        self.generic_visit(node)
+
+    def _analyze_call(self, call_node: ast.Call) -> Optional[Dict[str, Any]]:
+        """Analyze a function call to determine if it's GPU-compatible."""
+        if isinstance(call_node.func, ast.Attribute):
+            # Method calls like tensor.cuda(), torch.mm(), etc.
+            if hasattr(call_node.func, "attr"):
+                method_name = call_node.func.attr
+                if method_name in [
+                    "cuda",
+                    "to",
+                    "mm",
+                    "matmul",
+                    "add",
+                    "mul",
+                    "conv2d",
+                ]:
+                    return {
+                        "type": "method_call",
+                        "method": method_name,
+                        "gpu_compatible": True,
+                        "operation_type": "tensor_operation",
+                    }
+        elif isinstance(call_node.func, ast.Name):
+            # Function calls
+            func_name = call_node.func.id
+            if func_name in ["torch", "F"]:  # Common PyTorch functions
+                return {
+                    "type": "function_call",
+                    "function": func_name,
+                    "gpu_compatible": True,
+                    "operation_type": "torch_function",
+                }
+
+        return None
+
+    def _get_iterable_info(self, iter_node: ast.AST) -> Dict[str, Any]:
+        """Extract information about loop iterable."""
+        if isinstance(iter_node, ast.Call) and isinstance(iter_node.func, ast.Name):
+            if iter_node.func.id == "range":
+                # Extract range parameters
+                args = iter_node.args
+                if len(args) == 1:
+                    return {
+                        "type": "range",
+                        "start": 0,
+                        "stop": "dynamic",
+                        "step": 1,
+                    }
+                elif len(args) == 2:
+                    return {
+                        "type": "range",
+                        "start": "dynamic",
+                        "stop": "dynamic",
+                        "step": 1,
+                    }
+                elif len(args) == 3:
+                    return {
+                        "type": "range",
+                        "start": "dynamic",
+                        "stop": "dynamic",
+                        "step": "dynamic",
+                    }
+
+        return {"type": "unknown", "analyzable": False}
+
+    def _estimate_gpu_benefit(self, gpu_ops: List[Dict[str, Any]]) -> str:
+        """Estimate potential benefit from GPU parallelization."""
+        if len(gpu_ops) >= 3:
+            return "high"
+        elif len(gpu_ops) >= 1:
+            return "medium"
+        else:
+            return "low"
+
+
 def detect_gpu_parallelizable_operations(
     func: Callable, args: tuple, kwargs: dict
 ) -> List[Dict[str, Any]]:
@@ -113,149 +247,10 @@ def detect_gpu_parallelizable_operations(
     parallelizable_ops = []
 
     try:
-        source = inspect.getsource(func)
-        # Remove leading whitespace to avoid indentation issues
-        import textwrap
-
-        source = textwrap.dedent(source)
-        tree = ast.parse(source)
-
-        class GPUOpVisitor(ast.NodeVisitor):
-            def __init__(self):
-                self.operations = []
-                self.current_loop = None
-
-            def visit_For(self, node):
-                """Detect for loops that might benefit from GPU parallelization."""
-                if isinstance(node.target, ast.Name):
-                    loop_var = node.target.id
-
-                    # Analyze loop body for GPU operations
-                    gpu_ops_in_loop = []
-                    for stmt in ast.walk(node):
-                        if isinstance(stmt, ast.Call):
-                            call_info = self._analyze_call(stmt)
-                            if call_info and call_info.get("gpu_compatible"):
-                                gpu_ops_in_loop.append(call_info)
-
-                    if gpu_ops_in_loop:
-                        loop_info = {
-                            "type": "for_loop",
-                            "variable": loop_var,
-                            "iterable": self._get_iterable_info(node.iter),
-                            "gpu_operations": gpu_ops_in_loop,
-                            "parallelizable": True,
-                            "estimated_benefit": self._estimate_gpu_benefit(
-                                gpu_ops_in_loop
-                            ),
-                        }
-                        self.operations.append(loop_info)
-
-                self.generic_visit(node)
-
-            def visit_ListComp(self, node):
-                """Detect list comprehensions that might benefit from GPU parallelization."""
-                # Analyze comprehension for GPU operations
-                gpu_ops = []
-                for stmt in ast.walk(node.elt):
-                    if isinstance(stmt, ast.Call):
-                        call_info = self._analyze_call(stmt)
-                        if call_info and call_info.get("gpu_compatible"):
-                            gpu_ops.append(call_info)
-
-                if gpu_ops and node.generators:
-                    gen = node.generators[0]  # Focus on first generator
-                    if isinstance(gen.target, ast.Name):
-                        comp_info = {
-                            "type": "list_comprehension",
-                            "variable": gen.target.id,
-                            "iterable": self._get_iterable_info(gen.iter),
-                            "gpu_operations": gpu_ops,
-                            "parallelizable": True,
-                            "estimated_benefit": self._estimate_gpu_benefit(gpu_ops),
-                        }
-                        self.operations.append(comp_info)
-
-                self.generic_visit(node)
-
-            def _analyze_call(self, call_node: ast.Call) -> Optional[Dict[str, Any]]:
-                """Analyze a function call to determine if it's GPU-compatible."""
-                if isinstance(call_node.func, ast.Attribute):
-                    # Method calls like tensor.cuda(), torch.mm(), etc.
-                    if hasattr(call_node.func, "attr"):
-                        method_name = call_node.func.attr
-                        if method_name in [
-                            "cuda",
-                            "to",
-                            "mm",
-                            "matmul",
-                            "add",
-                            "mul",
-                            "conv2d",
-                        ]:
-                            return {
-                                "type": "method_call",
-                                "method": method_name,
-                                "gpu_compatible": True,
-                                "operation_type": "tensor_operation",
-                            }
-                elif isinstance(call_node.func, ast.Name):
-                    # Function calls
-                    func_name = call_node.func.id
-                    if func_name in ["torch", "F"]:  # Common PyTorch functions
-                        return {
-                            "type": "function_call",
-                            "function": func_name,
-                            "gpu_compatible": True,
-                            "operation_type": "torch_function",
-                        }
-
-                return None
-
-            def _get_iterable_info(self, iter_node: ast.AST) -> Dict[str, Any]:
-                """Extract information about loop iterable."""
-                if isinstance(iter_node, ast.Call) and isinstance(
-                    iter_node.func, ast.Name
-                ):
-                    if iter_node.func.id == "range":
-                        # Extract range parameters
-                        args = iter_node.args
-                        if len(args) == 1:
-                            return {
-                                "type": "range",
-                                "start": 0,
-                                "stop": "dynamic",
-                                "step": 1,
-                            }
-                        elif len(args) == 2:
-                            return {
-                                "type": "range",
-                                "start": "dynamic",
-                                "stop": "dynamic",
-                                "step": 1,
-                            }
-                        elif len(args) == 3:
-                            return {
-                                "type": "range",
-                                "start": "dynamic",
-                                "stop": "dynamic",
-                                "step": "dynamic",
-                            }
-
-                return {"type": "unknown", "analyzable": False}
-
-            def _estimate_gpu_benefit(self, gpu_ops: List[Dict[str, Any]]) -> str:
-                """Estimate potential benefit from GPU parallelization."""
-                if len(gpu_ops) >= 3:
-                    return "high"
-                elif len(gpu_ops) >= 1:
-                    return "medium"
-                else:
-                    return "low"
-
-        visitor = GPUOpVisitor()
-        visitor.visit(tree)
-        parallelizable_ops = visitor.operations
+        # Shared cached list; copy so callers can annotate their own
+        parallelizable_ops = copy.deepcopy(
+            cached_analysis(func, "gpu_operations", lambda: _gpu_operations(func))
+        )
 
     except Exception as e:
         logger.warning(f"GPU operation analysis failed: {e}")
@@ -263,6 +258,12 @@ def detect_gpu_parallelizable_operations(
     return parallelizable_ops
 
 
+def _gpu_operations(func: Callable) -> List[Dict[str, Any]]:
+    visitor = _GPUOpVisitor()
+    visitor.visit(function_tree(func))
+    return visitor.operations
+
+
 def create_gpu_parallel_execution_plan(
     func: Callable,
     args: tuple,
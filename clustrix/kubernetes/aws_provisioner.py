@@ -7,7 +7,6 @@ including VPC, IAM roles, security groups, and node groups.
 
 import json
 import logging
-import time
 from typing import Dict, Any, List
 import subprocess
 import tempfile
@@ -24,6 +23,7 @@ except ImportError:
     NoCredentialsError = Exception
 
 from .cluster_provisioner import BaseKubernetesProvisioner, ClusterSpec
+from .provisioning_engine import ProvisioningGraph, WaiterFailure, wait_with_backoff
 
 logger = logging.getLogger(__name__)
 
@@ -115,45 +115,101 @@ class AWSEKSFromScratchProvisioner(BaseKubernetesProvisioner):
         """
         Create complete EKS cluster infrastructure from scratch.
 
-        Steps:
-        1. Create VPC with public/private subnets
-        2. Create Internet Gateway and NAT Gateways
-        3. Set up routing tables
-        4. Create security groups
-        5. Create IAM roles and policies
-        6. Create EKS control plane
-        7. Create and configure node groups
-        8. Configure kubectl access
-        9. Set up Clustrix namespace and RBAC
-        10. Verify cluster is ready for jobs
+        Independent resources are created concurrently. The dependency graph is:
+
+        - vpc_network (VPC, subnets, Internet Gateway)
+        - cluster_role, node_role (IAM, independent of networking)
+        - security_groups (after vpc_network)
+        - nat_gateways, then routing (after vpc_network)
+        - control_plane (after vpc_network, security_groups, cluster_role)
+        - node_groups (after control_plane, routing, node_role)
+        - kubectl access, Clustrix environment and verification
         """
         logger.info(f"🚀 Starting EKS cluster provisioning: {spec.cluster_name}")
 
-        try:
-            # Step 1: Create VPC infrastructure
-            vpc_config = self._create_vpc_infrastructure(spec)
-
-            # Step 2: Create IAM infrastructure
-            iam_config = self._create_iam_infrastructure(spec)
-
-            # Step 3: Create EKS control plane
-            cluster_info = self._create_eks_control_plane(spec, vpc_config, iam_config)
-
-            # Step 4: Create node groups
-            self._create_node_groups(spec, cluster_info, vpc_config, iam_config)
-
-            # Step 5: Configure kubectl access
-            kubectl_config = self._configure_kubectl_access(cluster_info)
+        graph = ProvisioningGraph(max_workers=4)
+        graph.add_step("vpc_network", lambda r: self._create_vpc_network(spec))
+        graph.add_step(
+            "cluster_role",
+            lambda r: self._create_eks_cluster_role(
+                f"clustrix-eks-cluster-role-{spec.cluster_name}"
+            ),
+        )
+        graph.add_step(
+            "node_role",
+            lambda r: self._create_eks_node_role(
+                f"clustrix-eks-node-role-{spec.cluster_name}"
+            ),
+        )
+        graph.add_step(
+            "security_groups",
+            lambda r: self._create_security_groups(r["vpc_network"]["vpc_id"], spec),
+            depends_on=["vpc_network"],
+        )
+        graph.add_step(
+            "nat_gateways",
+            lambda r: self._create_nat_gateways(r["vpc_network"]["public_subnet_ids"]),
+            depends_on=["vpc_network"],
+        )
+        graph.add_step(
+            "routing",
+            lambda r: self._create_routing_tables(
+                r["vpc_network"]["vpc_id"],
+                {
+                    "public": r["vpc_network"]["public_subnet_ids"],
+                    "private": r["vpc_network"]["private_subnet_ids"],
+                },
+                r["vpc_network"]["internet_gateway_id"],
+                r["nat_gateways"],
+            ),
+            depends_on=["vpc_network", "nat_gateways"],
+        )
+        graph.add_step(
+            "control_plane",
+            lambda r: self._create_eks_control_plane(
+                spec,
+                {**r["vpc_network"], "security_group_ids": r["security_groups"]},
+                {"cluster_role_arn": r["cluster_role"]},
+            ),
+            depends_on=["vpc_network", "security_groups", "cluster_role"],
+        )
+        graph.add_step(
+            "node_groups",
+            lambda r: self._create_node_groups(
+                spec,
+                r["control_plane"],
+                r["vpc_network"],
+                {"node_role_arn": r["node_role"]},
+            ),
+            depends_on=["control_plane", "routing", "node_role"],
+        )
+        graph.add_step(
+            "kubectl_access",
+            lambda r: self._configure_kubectl_access(r["control_plane"]),
+            depends_on=["control_plane"],
+        )
+        graph.add_step(
+            "clustrix_environment",
+            lambda r: self._setup_clustrix_environment(
+                r["control_plane"], r["kubectl_access"]
+            ),
+            depends_on=["node_groups", "kubectl_access"],
+        )
+        graph.add_step(
+            "verify",
+            lambda r: self._verify_cluster_operational(spec.cluster_name),
+            depends_on=["clustrix_environment"],
+        )
 
-            # Step 6: Set up Clustrix environment
-            self._setup_clustrix_environment(cluster_info, kubectl_config)
+        try:
+            results = graph.run()
 
-            # Step 7: Verify cluster ready
-            self._verify_cluster_operational(cluster_info["cluster_name"])
+            cluster_info = results["control_plane"]
+            vpc_config = results["vpc_network"]
 
             result = {
-                "cluster_id": cluster_info["cluster_name"],
-                "cluster_name": cluster_info["cluster_name"],
+                "cluster_id": cluster_info["name"],
+                "cluster_name": cluster_info["name"],
                 "provider": "aws",
                 "region": self.region,
                 "endpoint": cluster_info["endpoint"],
@@ -163,10 +219,11 @@ class AWSEKSFromScratchProvisioner(BaseKubernetesProvisioner):
                 "instance_type": spec.aws_instance_type,
                 "vpc_id": vpc_config["vpc_id"],
                 "subnet_ids": vpc_config["subnet_ids"],
-                "security_group_ids": vpc_config["security_group_ids"],
-                "kubectl_config": kubectl_config,
+                "security_group_ids": results["security_groups"],
+                "kubectl_config": results["kubectl_access"],
                 "ready_for_jobs": True,
                 "created_resources": self.created_resources.copy(),
+                "provisioning_timings": graph.timings,
             }
 
             logger.info(f"✅ EKS cluster provisioning completed: {spec.cluster_name}")
@@ -179,7 +236,28 @@ class AWSEKSFromScratchProvisioner(BaseKubernetesProvisioner):
             raise
 
     def _create_vpc_infrastructure(self, spec: ClusterSpec) -> Dict[str, Any]:
-        """Create VPC with all networking components."""
+        """Create VPC with all networking components (sequentially)."""
+        vpc_config = self._create_vpc_network(spec)
+        nat_gateways = self._create_nat_gateways(vpc_config["public_subnet_ids"])
+        self._create_routing_tables(
+            vpc_config["vpc_id"],
+            {
+                "public": vpc_config["public_subnet_ids"],
+                "private": vpc_config["private_subnet_ids"],
+            },
+            vpc_config["internet_gateway_id"],
+            nat_gateways,
+        )
+        security_group_ids = self._create_security_groups(vpc_config["vpc_id"], spec)
+
+        return {
+            **vpc_config,
+            "security_group_ids": security_group_ids,
+            "nat_gateway_ids": nat_gateways,
+        }
+
+    def _create_vpc_network(self, spec: ClusterSpec) -> Dict[str, Any]:
+        """Create the VPC, its subnets and the Internet Gateway."""
         logger.info("🏗️ Creating VPC infrastructure...")
 
         # Create VPC
@@ -253,9 +331,18 @@ class AWSEKSFromScratchProvisioner(BaseKubernetesProvisioner):
         # Attach Internet Gateway to VPC
         self.ec2.attach_internet_gateway(InternetGatewayId=igw_id, VpcId=vpc_id)
 
-        # Create NAT Gateways for private subnets
+        return {
+            "vpc_id": vpc_id,
+            "subnet_ids": subnets["private"] + subnets["public"],
+            "private_subnet_ids": subnets["private"],
+            "public_subnet_ids": subnets["public"],
+            "internet_gateway_id": igw_id,
+        }
+
+    def _create_nat_gateways(self, public_subnet_ids: List[str]) -> List[str]:
+        """Create one NAT Gateway per public subnet and wait for all of them."""
         nat_gateways = []
-        for i, public_subnet_id in enumerate(subnets["public"]):
+        for public_subnet_id in public_subnet_ids:
             # Allocate Elastic IP
             eip_response = self.ec2.allocate_address(Domain="vpc")
             allocation_id = eip_response["AllocationId"]
@@ -268,24 +355,11 @@ class AWSEKSFromScratchProvisioner(BaseKubernetesProvisioner):
             self.created_resources["nat_gateways"].append(nat_id)
             nat_gateways.append(nat_id)
 
-            # Wait for NAT Gateway to be available
+        # NAT Gateways come up in parallel, so wait only after creating all
+        for nat_id in nat_gateways:
             self._wait_for_nat_gateway(nat_id)
 
-        # Create route tables and routes
-        self._create_routing_tables(vpc_id, subnets, igw_id, nat_gateways)
-
-        # Create security groups
-        security_group_ids = self._create_security_groups(vpc_id, spec)
-
-        return {
-            "vpc_id": vpc_id,
-            "subnet_ids": subnets["private"] + subnets["public"],
-            "private_subnet_ids": subnets["private"],
-            "public_subnet_ids": subnets["public"],
-            "security_group_ids": security_group_ids,
-            "internet_gateway_id": igw_id,
-            "nat_gateway_ids": nat_gateways,
-        }
+        return nat_gateways
 
     def _create_security_groups(self, vpc_id: str, spec: ClusterSpec) -> List[str]:
         """Create security groups for EKS cluster."""
@@ -444,14 +518,24 @@ class AWSEKSFromScratchProvisioner(BaseKubernetesProvisioner):
         self.created_resources["eks_clusters"].append(spec.cluster_name)
 
         # Wait for cluster to be active
-        logger.info("⏳ Waiting for EKS cluster to be active...")
-        waiter = self.eks.get_waiter("cluster_active")
-        waiter.wait(
-            name=spec.cluster_name, WaiterConfig={"Delay": 30, "MaxAttempts": 40}
-        )
+        described: Dict[str, Any] = {}
 
-        # Get updated cluster info
-        cluster_info = self.eks.describe_cluster(name=spec.cluster_name)["cluster"]
+        def cluster_active() -> bool:
+            described.update(
+                self.eks.describe_cluster(name=spec.cluster_name)["cluster"]
+            )
+            if described["status"] == "FAILED":
+                raise WaiterFailure(f"EKS cluster {spec.cluster_name} failed")
+            return described["status"] == "ACTIVE"
+
+        wait_with_backoff(
+            cluster_active,
+            "EKS control plane",
+            timeout=1200,
+            initial_delay=15,
+            max_delay=60,
+        )
+        cluster_info = described
 
         logger.info(f"✅ EKS control plane active: {cluster_info['endpoint']}")
         return cluster_info
@@ -489,12 +573,20 @@ class AWSEKSFromScratchProvisioner(BaseKubernetesProvisioner):
         self.created_resources["eks_node_groups"].append(node_group_name)
 
         # Wait for node group to be active
-        logger.info("⏳ Waiting for node group to be active...")
-        waiter = self.eks.get_waiter("nodegroup_active")
-        waiter.wait(
-            clusterName=spec.cluster_name,
-            nodegroupName=node_group_name,
-            WaiterConfig={"Delay": 30, "MaxAttempts": 40},
+        def nodegroup_active() -> bool:
+            status = self.eks.describe_nodegroup(
+                clusterName=spec.cluster_name, nodegroupName=node_group_name
+            )["nodegroup"]["status"]
+            if status in ["CREATE_FAILED", "DEGRADED"]:
+                raise WaiterFailure(f"Node group {node_group_name} is {status}")
+            return status == "ACTIVE"
+
+        wait_with_backoff(
+            nodegroup_active,
+            f"node group {node_group_name}",
+            timeout=1200,
+            initial_delay=15,
+            max_delay=60,
         )
 
         logger.info(f"✅ Node group active: {node_group_name}")
@@ -745,30 +837,17 @@ class AWSEKSFromScratchProvisioner(BaseKubernetesProvisioner):
 
     def _wait_for_nat_gateway(self, nat_id: str) -> None:
         """Wait for NAT Gateway to be available."""
-        max_attempts = 20
-        for attempt in range(max_attempts):
-            try:
-                response = self.ec2.describe_nat_gateways(NatGatewayIds=[nat_id])
-                state = response["NatGateways"][0]["State"]
-
-                if state == "available":
-                    return
-                elif state in ["failed", "deleting", "deleted"]:
-                    raise RuntimeError(f"NAT Gateway failed: {state}")
 
-                logger.info(
-                    f"⏳ Waiting for NAT Gateway {nat_id} to be available... "
-                    f"({attempt + 1}/{max_attempts})"
-                )
-                time.sleep(30)
+        def nat_available() -> bool:
+            response = self.ec2.describe_nat_gateways(NatGatewayIds=[nat_id])
+            state = response["NatGateways"][0]["State"]
+            if state in ["failed", "deleting", "deleted"]:
+                raise WaiterFailure(f"NAT Gateway failed: {state}")
+            return state == "available"
 
-            except Exception as e:
-                if attempt == max_attempts - 1:
-                    raise RuntimeError(
-                        f"NAT Gateway {nat_id} not available after "
-                        f"{max_attempts * 30} seconds: {e}"
-                    )
-                time.sleep(30)
+        wait_with_backoff(
+            nat_available, f"NAT Gateway {nat_id}", timeout=600, max_delay=30
+        )
 
     def destroy_cluster_infrastructure(self, cluster_id: str) -> bool:
         """Destroy cluster and all associated infrastructure."""
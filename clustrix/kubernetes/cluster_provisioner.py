@@ -6,13 +6,13 @@ with complete infrastructure setup and Clustrix integration.
 """
 
 import logging
-import time
 from typing import Dict, Any, Optional, List
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 
 from ..config import ClusterConfig
 from ..credential_manager import get_credential_manager
+from .provisioning_engine import wait_with_backoff
 
 logger = logging.getLogger(__name__)
 
@@ -287,27 +287,19 @@ class KubernetesClusterProvisioner:
         self, provisioner: BaseKubernetesProvisioner, cluster_id: str
     ) -> bool:
         """Verify cluster is ready for Clustrix job execution."""
-        max_attempts = 30
-        wait_time = 30  # seconds
 
-        for attempt in range(max_attempts):
-            try:
-                status = provisioner.get_cluster_status(cluster_id)
-                if status.get("ready_for_jobs", False):
-                    return True
-
-                logger.info(
-                    f"⏳ Cluster not ready yet, waiting... ({attempt + 1}/{max_attempts})"
-                )
-                time.sleep(wait_time)
-
-            except Exception as e:
-                logger.debug(f"Error checking cluster status: {e}")
-                time.sleep(wait_time)
+        def ready_for_jobs() -> bool:
+            status = provisioner.get_cluster_status(cluster_id)
+            return bool(status.get("ready_for_jobs", False))
 
-        raise RuntimeError(
-            f"Cluster {cluster_id} not ready after {max_attempts * wait_time} seconds"
+        wait_with_backoff(
+            ready_for_jobs,
+            f"cluster {cluster_id}",
+            timeout=900,
+            initial_delay=5,
+            max_delay=30,
         )
+        return True
 
     def _list_provider_clusters(
         self, provisioner: BaseKubernetesProvisioner, provider: str
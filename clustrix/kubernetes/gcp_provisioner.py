@@ -7,7 +7,6 @@ including VPC, service accounts, firewall rules, and node pools.
 
 import json
 import logging
-import time
 from typing import Dict, Any, List
 import subprocess
 import tempfile
@@ -29,6 +28,7 @@ except ImportError:
     gcp_exceptions = None
 
 from .cluster_provisioner import BaseKubernetesProvisioner, ClusterSpec
+from .provisioning_engine import ProvisioningGraph, WaiterFailure, wait_with_backoff
 
 logger = logging.getLogger(__name__)
 
@@ -148,39 +148,53 @@ class GCPGKEFromScratchProvisioner(BaseKubernetesProvisioner):
         """
         Create complete GKE cluster infrastructure from scratch.
 
-        Steps:
-        1. Create VPC network and subnets
-        2. Create firewall rules
-        3. Create service accounts and IAM roles
-        4. Create GKE control plane
-        5. Create and configure node pools
-        6. Configure kubectl access
-        7. Set up Clustrix namespace and RBAC
-        8. Verify cluster is ready for jobs
+        VPC networking and IAM are created concurrently; the control plane
+        waits for both, and kubectl access is configured while node pools
+        are still being created.
         """
         logger.info(f"🚀 Starting GKE cluster provisioning: {spec.cluster_name}")
 
-        try:
-            # Step 1: Create VPC infrastructure
-            vpc_config = self._create_vpc_infrastructure(spec)
-
-            # Step 2: Create IAM infrastructure
-            iam_config = self._create_iam_infrastructure(spec)
-
-            # Step 3: Create GKE control plane
-            cluster_info = self._create_gke_control_plane(spec, vpc_config, iam_config)
-
-            # Step 4: Create node pools
-            self._create_node_pools(spec, cluster_info, vpc_config, iam_config)
-
-            # Step 5: Configure kubectl access
-            kubectl_config = self._configure_kubectl_access(cluster_info)
+        graph = ProvisioningGraph(max_workers=4)
+        graph.add_step("vpc", lambda r: self._create_vpc_infrastructure(spec))
+        graph.add_step("iam", lambda r: self._create_iam_infrastructure(spec))
+        graph.add_step(
+            "control_plane",
+            lambda r: self._create_gke_control_plane(spec, r["vpc"], r["iam"]),
+            depends_on=["vpc", "iam"],
+        )
+        graph.add_step(
+            "node_pools",
+            lambda r: self._create_node_pools(
+                spec, r["control_plane"], r["vpc"], r["iam"]
+            ),
+            depends_on=["control_plane"],
+        )
+        graph.add_step(
+            "kubectl_access",
+            lambda r: self._configure_kubectl_access(r["control_plane"]),
+            depends_on=["control_plane"],
+        )
+        graph.add_step(
+            "clustrix_environment",
+            lambda r: self._setup_clustrix_environment(
+                r["control_plane"], r["kubectl_access"]
+            ),
+            depends_on=["node_pools", "kubectl_access"],
+        )
+        graph.add_step(
+            "verify",
+            lambda r: self._verify_cluster_operational(
+                r["control_plane"]["cluster_name"]
+            ),
+            depends_on=["clustrix_environment"],
+        )
 
-            # Step 6: Set up Clustrix environment
-            self._setup_clustrix_environment(cluster_info, kubectl_config)
+        try:
+            results = graph.run()
 
-            # Step 7: Verify cluster ready
-            self._verify_cluster_operational(cluster_info["cluster_name"])
+            cluster_info = results["control_plane"]
+            vpc_config = results["vpc"]
+            kubectl_config = results["kubectl_access"]
 
             result = {
                 "cluster_id": cluster_info["cluster_name"],
@@ -197,6 +211,7 @@ class GCPGKEFromScratchProvisioner(BaseKubernetesProvisioner):
                 "kubectl_config": kubectl_config,
                 "ready_for_jobs": True,
                 "created_resources": self.created_resources.copy(),
+                "provisioning_timings": graph.timings,
             }
 
             logger.info(f"✅ GKE cluster provisioning completed: {spec.cluster_name}")
@@ -715,55 +730,46 @@ class GCPGKEFromScratchProvisioner(BaseKubernetesProvisioner):
 
     def _wait_for_operation(self, operation, operation_type: str) -> None:
         """Wait for compute operation to complete."""
-        logger.info(f"⏳ Waiting for {operation_type}...")
-
-        max_attempts = 60  # 10 minutes max
-        for attempt in range(max_attempts):
-            try:
-                if hasattr(operation, "status") and operation.status == "DONE":
-                    return
-                elif hasattr(operation, "done") and operation.done:
-                    return
 
-                time.sleep(10)
-
-            except Exception as e:
-                if attempt == max_attempts - 1:
-                    raise RuntimeError(f"{operation_type} timeout: {e}")
-                time.sleep(10)
+        def operation_done() -> bool:
+            done = getattr(operation, "done", None)
+            if callable(done):
+                # Extended operations refresh their state when polled
+                if not done():
+                    return False
+                if getattr(operation, "error_code", None):
+                    raise WaiterFailure(
+                        f"{operation_type} failed: "
+                        f"{getattr(operation, 'error_message', operation.error_code)}"
+                    )
+                return True
+            if hasattr(operation, "status"):
+                return operation.status == "DONE"
+            return bool(done)
 
-        raise RuntimeError(
-            f"{operation_type} timeout after {max_attempts * 10} seconds"
-        )
+        wait_with_backoff(operation_done, operation_type, timeout=600)
 
     def _wait_for_cluster_operation(self, operation) -> None:
         """Wait for GKE cluster operation to complete."""
-        logger.info("⏳ Waiting for GKE operation...")
-
-        max_attempts = 120  # 20 minutes max for cluster operations
-        for attempt in range(max_attempts):
-            try:
-                operation_status = self.container_client.get_operation(
-                    name=operation.name
-                )
 
-                if operation_status.status.name == "DONE":
-                    if operation_status.error:
-                        raise RuntimeError(
-                            f"Operation failed: {operation_status.error}"
-                        )
-                    return
-                elif operation_status.status.name in ["CANCELLED", "ABORTING"]:
-                    raise RuntimeError(f"Operation failed: {operation_status.status}")
-
-                time.sleep(10)
-
-            except Exception as e:
-                if attempt == max_attempts - 1:
-                    raise RuntimeError(f"GKE operation timeout: {e}")
-                time.sleep(10)
+        def cluster_operation_done() -> bool:
+            operation_status = self.container_client.get_operation(name=operation.name)
+            status = operation_status.status.name
+            if status == "DONE":
+                if operation_status.error:
+                    raise WaiterFailure(f"Operation failed: {operation_status.error}")
+                return True
+            if status in ["CANCELLED", "ABORTING"]:
+                raise WaiterFailure(f"Operation failed: {operation_status.status}")
+            return False
 
-        raise RuntimeError(f"GKE operation timeout after {max_attempts * 10} seconds")
+        wait_with_backoff(
+            cluster_operation_done,
+            "GKE operation",
+            timeout=1200,
+            initial_delay=5,
+            max_delay=60,
+        )
 
     def _cleanup_failed_provisioning(self, cluster_name: str) -> None:
         """Clean up resources if provisioning fails."""
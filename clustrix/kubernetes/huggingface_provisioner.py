@@ -7,7 +7,6 @@ HuggingFace Spaces work with the Clustrix Kubernetes interface.
 """
 
 import logging
-import time
 from typing import Dict, Any, List
 
 try:
@@ -22,6 +21,7 @@ except ImportError:
     HfHubHTTPError = Exception
 
 from .cluster_provisioner import BaseKubernetesProvisioner, ClusterSpec
+from .provisioning_engine import WaiterFailure, wait_with_backoff
 
 logger = logging.getLogger(__name__)
 
@@ -339,32 +339,15 @@ if __name__ == '__main__':
         """Wait for HuggingFace Space to be ready."""
         logger.info("⏳ Waiting for Space to be ready...")
 
-        max_attempts = 60  # 10 minutes
-        for attempt in range(max_attempts):
-            try:
-                space_info = self.api.space_info(space_name)
-                if space_info.runtime and space_info.runtime.stage == "RUNNING":
-                    logger.info("✅ Space is running and ready")
-                    return
-                elif space_info.runtime and space_info.runtime.stage in [
-                    "STOPPED",
-                    "FAILED",
-                ]:
-                    raise RuntimeError(
-                        f"Space failed to start: {space_info.runtime.stage}"
-                    )
-
-                logger.info(f"⏳ Space not ready yet... ({attempt + 1}/{max_attempts})")
-                time.sleep(10)
-
-            except Exception as e:
-                if attempt == max_attempts - 1:
-                    raise RuntimeError(
-                        f"Space not ready after {max_attempts * 10} seconds: {e}"
-                    )
-                time.sleep(10)
+        def space_running() -> bool:
+            space_info = self.api.space_info(space_name)
+            stage = space_info.runtime.stage if space_info.runtime else None
+            if stage in ["STOPPED", "FAILED"]:
+                raise WaiterFailure(f"Space failed to start: {stage}")
+            return stage == "RUNNING"
 
-        raise RuntimeError(f"Space not ready after {max_attempts * 10} seconds")
+        wait_with_backoff(space_running, f"Space {space_name}", timeout=600)
+        logger.info("✅ Space is running and ready")
 
     def _create_kubectl_interface(self, space_info: Dict[str, Any]) -> Dict[str, Any]:
         """Create kubectl-compatible configuration for HF Space."""
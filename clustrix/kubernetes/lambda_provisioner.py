@@ -8,6 +8,7 @@ Lambda Cloud instances work with the Clustrix Kubernetes interface.
 
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List
 import requests
 
@@ -20,6 +21,7 @@ except ImportError:
     paramiko = None  # type: ignore
 
 from .cluster_provisioner import BaseKubernetesProvisioner, ClusterSpec
+from .provisioning_engine import WaiterFailure, wait_with_backoff
 
 logger = logging.getLogger(__name__)
 
@@ -294,26 +296,30 @@ class LambdaCloudKubernetesProvisioner(BaseKubernetesProvisioner):
 
     def _wait_for_instances_ready(self, instances: List[Dict[str, Any]]) -> None:
         """Wait for Lambda Cloud instances to be ready."""
-        logger.info("⏳ Waiting for instances to be ready...")
+        instance_ids = {instance["id"] for instance in instances}
 
-        max_attempts = 60  # 10 minutes
-        for attempt in range(max_attempts):
-            all_ready = True
-
-            for instance in instances:
-                status = self._get_instance_status(instance["id"])
-                if status != "active":
-                    all_ready = False
-                    break
-
-            if all_ready:
-                logger.info("✅ All instances are ready")
-                return
-
-            logger.info(f"⏳ Waiting for instances... ({attempt + 1}/{max_attempts})")
-            time.sleep(10)
+        def all_active() -> bool:
+            # One listing per poll covers every instance
+            response = requests.get(
+                f"{self.base_url}/instances", headers=self.headers, timeout=30
+            )
+            response.raise_for_status()
+            statuses = {
+                data["id"]: data["status"]
+                for data in response.json().get("data", [])
+                if data["id"] in instance_ids
+            }
+            terminated = [i for i, status in statuses.items() if status == "terminated"]
+            if terminated:
+                raise WaiterFailure(f"Instances terminated while booting: {terminated}")
+            return len(statuses) == len(instance_ids) and all(
+                status == "active" for status in statuses.values()
+            )
 
-        raise RuntimeError(f"Instances not ready after {max_attempts * 10} seconds")
+        wait_with_backoff(
+            all_active, "Lambda Cloud instances", timeout=600, initial_delay=5
+        )
+        logger.info("✅ All instances are ready")
 
     def _get_instance_status(self, instance_id: str) -> str:
         """Get Lambda Cloud instance status."""
@@ -365,7 +371,7 @@ class LambdaCloudKubernetesProvisioner(BaseKubernetesProvisioner):
         instances = instances_info["instances"]
         ssh_key_info = instances_info["ssh_key"]
 
-        for instance in instances:
+        def setup_instance(instance: Dict[str, Any]) -> None:
             try:
                 # Connect via SSH
                 ssh_client = self._connect_ssh(
@@ -383,6 +389,11 @@ class LambdaCloudKubernetesProvisioner(BaseKubernetesProvisioner):
             except Exception as e:
                 logger.warning(f"Failed to set up instance {instance['id']}: {e}")
 
+        # Instances are independent, so set them up concurrently
+        if instances:
+            with ThreadPoolExecutor(max_workers=min(len(instances), 8)) as pool:
+                list(pool.map(setup_instance, instances))
+
         logger.info("✅ Instances ready for job execution")
 
     def _connect_ssh(
@@ -395,23 +406,20 @@ class LambdaCloudKubernetesProvisioner(BaseKubernetesProvisioner):
         # Load private key
         private_key = paramiko.RSAKey.from_private_key_file(private_key_file)
 
-        # Connect with retries
-        max_attempts = 30
-        for attempt in range(max_attempts):
-            try:
-                ssh_client.connect(
-                    hostname=instance["ip"],
-                    username="ubuntu",  # Default Lambda Cloud user
-                    pkey=private_key,
-                    timeout=30,
-                )
-                return ssh_client
-            except Exception:
-                if attempt == max_attempts - 1:
-                    raise
-                time.sleep(10)
+        # Connect with retries; sshd comes up shortly after the instance
+        def connected() -> bool:
+            ssh_client.connect(
+                hostname=instance["ip"],
+                username="ubuntu",  # Default Lambda Cloud user
+                pkey=private_key,
+                timeout=30,
+            )
+            return True
 
-        raise RuntimeError(f"Could not connect to instance {instance['id']}")
+        wait_with_backoff(
+            connected, f"SSH on instance {instance['id']}", timeout=300, max_delay=15
+        )
+        return ssh_client
 
     def _install_k8s_tools(
         self, ssh_client: paramiko.SSHClient, instance: Dict[str, Any]
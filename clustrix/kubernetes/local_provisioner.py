@@ -15,6 +15,7 @@ import os
 from typing import Dict, Any
 
 from .cluster_provisioner import BaseKubernetesProvisioner, ClusterSpec
+from .provisioning_engine import wait_with_backoff
 
 logger = logging.getLogger(__name__)
 
@@ -228,34 +229,29 @@ class LocalDockerKubernetesProvisioner(BaseKubernetesProvisioner):
         """Wait for cluster to be fully ready."""
         logger.info("⏳ Waiting for cluster to be ready...")
 
-        start_time = time.time()
-
-        while time.time() - start_time < timeout:
-            try:
-                # Check if all nodes are ready
-                result = subprocess.run(
-                    ["kubectl", "get", "nodes", "--context", f"kind-{cluster_name}"],
-                    capture_output=True,
-                    text=True,
-                    timeout=10,
-                )
-
-                if result.returncode == 0:
-                    # Check if all nodes show as Ready
-                    lines = result.stdout.strip().split("\n")[1:]  # Skip header
-                    if lines and all("Ready" in line for line in lines):
-                        logger.info("✅ All nodes are ready")
-                        return True
-
-                logger.info("Still waiting for nodes to be ready...")
-                time.sleep(10)
+        def nodes_ready() -> bool:
+            # Check if all nodes are ready
+            result = subprocess.run(
+                ["kubectl", "get", "nodes", "--context", f"kind-{cluster_name}"],
+                capture_output=True,
+                text=True,
+                timeout=10,
+            )
+            if result.returncode != 0:
+                return False
+            lines = result.stdout.strip().split("\n")[1:]  # Skip header
+            return bool(lines) and all(" Ready" in line for line in lines)
 
-            except Exception as e:
-                logger.debug(f"Error checking node status: {e}")
-                time.sleep(5)
+        try:
+            wait_with_backoff(
+                nodes_ready, "cluster nodes", timeout=timeout, initial_delay=1
+            )
+        except RuntimeError:
+            logger.error("❌ Timeout waiting for cluster to be ready")
+            return False
 
-        logger.error("❌ Timeout waiting for cluster to be ready")
-        return False
+        logger.info("✅ All nodes are ready")
+        return True
 
     def _get_cluster_info(
         self, cluster_spec: ClusterSpec, kubeconfig: Dict[str, Any]
@@ -0,0 +1,193 @@
+"""
+Dependency-graph provisioning engine and backoff waiters.
+
+Provisioners describe infrastructure creation as named steps with explicit
+dependencies. Independent steps (e.g. IAM roles and VPC networking) run
+concurrently, and the time spent in each step is recorded so slow phases of
+cluster creation are visible.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WaiterFailure(RuntimeError):
+    """Raised by a waiter check when the resource reached a terminal failure state.
+
+    Unlike other exceptions raised by a check, this is not retried.
+    """
+
+
+def wait_with_backoff(
+    check: Callable[[], bool],
+    description: str,
+    timeout: float = 600,
+    initial_delay: float = 2.0,
+    max_delay: float = 30.0,
+    factor: float = 2.0,
+    sleep: Callable[[float], None] = time.sleep,
+) -> None:
+    """
+    Poll ``check`` with capped exponential backoff until it returns True.
+
+    Args:
+        check: Callable returning True once the resource is ready. Raise
+            :class:`WaiterFailure` for terminal failures; any other exception
+            is treated as transient and retried.
+        description: Human-readable name used in log and error messages
+        timeout: Maximum total seconds to wait
+        initial_delay: First delay between polls
+        max_delay: Upper bound on the delay between polls
+        factor: Multiplier applied to the delay after each poll
+        sleep: Sleep function (injectable for tests)
+
+    Raises:
+        WaiterFailure: If the check reports a terminal failure
+        RuntimeError: If the resource is not ready within ``timeout``
+    """
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    attempt = 0
+    last_error: Optional[Exception] = None
+
+    while True:
+        attempt += 1
+        try:
+            if check():
+                logger.debug(f"{description} ready after {attempt} checks")
+                return
+            last_error = None
+        except WaiterFailure:
+            raise
+        except Exception as e:
+            last_error = e
+            logger.debug(f"Transient error while waiting for {description}: {e}")
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            message = f"{description} not ready after {timeout} seconds"
+            if last_error is not None:
+                message += f": {last_error}"
+            raise RuntimeError(message)
+
+        logger.info(f"⏳ Waiting for {description}... (next check in {delay:.0f}s)")
+        sleep(min(delay, remaining))
+        delay = min(delay * factor, max_delay)
+
+
+@dataclass
+class ProvisioningStep:
+    """A unit of infrastructure creation within a provisioning graph."""
+
+    name: str
+    func: Callable[[Dict[str, Any]], Any]
+    depends_on: List[str] = field(default_factory=list)
+    status: str = "pending"  # pending, running, completed, failed, skipped
+    result: Any = None
+    duration: Optional[float] = None
+
+
+class ProvisioningGraph:
+    """
+    Run provisioning steps concurrently in dependency order.
+
+    Each step function receives a dict mapping the names of completed steps
+    to their results. If a step fails, no new steps are started, running
+    steps are allowed to finish, and the first error is re-raised.
+
+    Example:
+        >>> graph = ProvisioningGraph()
+        >>> graph.add_step("vpc", lambda r: create_vpc())
+        >>> graph.add_step("iam", lambda r: create_roles())
+        >>> graph.add_step("cluster", lambda r: create(r["vpc"], r["iam"]),
+        ...                depends_on=["vpc", "iam"])
+        >>> results = graph.run()
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self.steps: Dict[str, ProvisioningStep] = {}
+        self._lock = threading.Lock()
+
+    def add_step(
+        self,
+        name: str,
+        func: Callable[[Dict[str, Any]], Any],
+        depends_on: Iterable[str] = (),
+    ) -> None:
+        """Register a step. Dependencies must already be registered."""
+        if name in self.steps:
+            raise ValueError(f"Duplicate provisioning step: {name}")
+        depends_on = list(depends_on)
+        for dependency in depends_on:
+            if dependency not in self.steps:
+                raise ValueError(f"Step {name} depends on unknown step {dependency}")
+        self.steps[name] = ProvisioningStep(name, func, depends_on)
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        """Seconds spent in each finished step."""
+        return {
+            name: step.duration
+            for name, step in self.steps.items()
+            if step.duration is not None
+        }
+
+    def _run_step(self, step: ProvisioningStep, results: Dict[str, Any]) -> Any:
+        start = time.monotonic()
+        try:
+            return step.func(results)
+        finally:
+            step.duration = time.monotonic() - start
+            logger.info(f"⏱️ Provisioning step '{step.name}' took {step.duration:.1f}s")
+
+    def run(self) -> Dict[str, Any]:
+        """Execute all steps and return their results keyed by step name."""
+        results: Dict[str, Any] = {}
+        running: Dict[Future, ProvisioningStep] = {}
+        first_error: Optional[BaseException] = None
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="clustrix-provision"
+        ) as pool:
+            while True:
+                if first_error is None:
+                    for step in self.steps.values():
+                        if step.status == "pending" and all(
+                            self.steps[d].status == "completed" for d in step.depends_on
+                        ):
+                            step.status = "running"
+                            # Each step sees a snapshot of results so far
+                            future = pool.submit(self._run_step, step, dict(results))
+                            running[future] = step
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    try:
+                        step.result = future.result()
+                        step.status = "completed"
+                        results[step.name] = step.result
+                    except BaseException as e:
+                        step.status = "failed"
+                        logger.error(f"❌ Provisioning step '{step.name}' failed: {e}")
+                        if first_error is None:
+                            first_error = e
+
+        for step in self.steps.values():
+            if step.status == "pending":
+                step.status = "skipped"
+
+        if first_error is not None:
+            raise first_error
+
+        return results
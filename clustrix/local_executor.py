@@ -2,13 +2,53 @@
 
 import os
 from concurrent.futures import (
+    FIRST_COMPLETED,
     ProcessPoolExecutor,
     ThreadPoolExecutor,
     as_completed,
+    wait,
 )
-from typing import Any, List, Callable, Dict, Optional, Union
+from typing import (
+    Any,
+    List,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+import importlib
+import itertools
 import logging
 import pickle
+import time
+
+from .analysis_cache import function_source
+from .calibration import (
+    GIL_PROBE_MIN_ITEM_SECONDS,
+    get_cached_calibration,
+    get_execution_plan,
+)
+from .chunk_scheduler import ChunkScheduler, StreamChunkSizer, run_scheduled_chunks
+from .cpu_placement import plan_worker_placement
+from .shared_args import (
+    DEFAULT_SHARED_MEMORY_THRESHOLD,
+    SharedArgumentStore,
+    call_with_shared_arguments,
+    ensure_resource_tracker,
+    has_shareable_arguments,
+    restore_shared_arguments,
+)
+from .task_supervisor import ChunkOutcome, SupervisedResults, TaskSupervisor
+from .worker_pool import (
+    create_process_pool,
+    get_worker_pool,
+    has_warm_worker_pool,
+    terminate_executor,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -16,17 +56,45 @@ logger = logging.getLogger(__name__)
 class LocalExecutor:
     """Execute functions locally using multiprocessing or threading."""
 
-    def __init__(self, max_workers: Optional[int] = None, use_threads: bool = False):
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        use_threads: bool = False,
+        reuse_pool: bool = False,
+        pool_options: Optional[Dict[str, Any]] = None,
+        shared_memory_threshold: Optional[int] = DEFAULT_SHARED_MEMORY_THRESHOLD,
+        task_timeout: Optional[float] = None,
+        task_retries: int = 0,
+    ):
         """
         Initialize local executor.
 
         Args:
             max_workers: Maximum number of worker processes/threads
             use_threads: If True, use ThreadPoolExecutor, else ProcessPoolExecutor
+            reuse_pool: If True, run on the process-global worker pool for this
+                executor kind and worker count instead of a private one
+            pool_options: Worker options (preload_modules,
+                limit_worker_threads, cpu_affinity; with ``reuse_pool`` also
+                max_pool_tasks, max_worker_memory_mb)
+            shared_memory_threshold: Arguments at least this many bytes are
+                passed to worker processes through shared memory (None disables)
+            task_timeout: Per-task deadline in seconds. Tasks are then run
+                under a TaskSupervisor, which kills and replaces workers stuck
+                past the deadline (see :meth:`execute_supervised`)
+            task_retries: Extra attempts on a fresh worker for tasks that time
+                out or whose worker dies
         """
         self.max_workers = max_workers or os.cpu_count() or 4
         self.use_threads = use_threads
-        self._executor = None
+        self.reuse_pool = reuse_pool
+        self.pool_options = pool_options or {}
+        self.shared_memory_threshold = shared_memory_threshold
+        self.task_timeout = task_timeout
+        self.task_retries = task_retries
+        self._executor: Any = None
+        self._supervisor: Optional[TaskSupervisor] = None
+        self._terminate_on_cleanup = False
 
     def __enter__(self):
         """Context manager entry."""
@@ -39,16 +107,41 @@ class LocalExecutor:
 
     def _create_executor(self):
         """Create the appropriate executor."""
-        if self.use_threads:
+        if self.reuse_pool:
+            self._executor = get_worker_pool(
+                use_threads=self.use_threads,
+                max_workers=self.max_workers,
+                **self.pool_options,
+            ).acquire()
+        elif self.use_threads:
             self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
         else:
-            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            ensure_resource_tracker()
+            options = self.pool_options
+            self._executor = create_process_pool(
+                self.max_workers,
+                preload_modules=options.get("preload_modules") or (),
+                limit_worker_threads=options.get("limit_worker_threads", True),
+                cpu_affinity=options.get("cpu_affinity", False),
+            )
 
     def _cleanup_executor(self):
         """Clean up the executor."""
+        if self._supervisor is not None:
+            self._supervisor.shutdown()
+            self._supervisor = None
         if self._executor:
-            self._executor.shutdown(wait=True)
+            if self._terminate_on_cleanup:
+                # Tasks overran a timeout; waiting on them would hang
+                if self.reuse_pool:
+                    self._executor.terminate()
+                else:
+                    terminate_executor(self._executor)
+            elif not self.reuse_pool:
+                # Shared pools stay warm for the next call
+                self._executor.shutdown(wait=True)
             self._executor = None
+            self._terminate_on_cleanup = False
 
     def execute_single(self, func: Callable, args: tuple, kwargs: dict) -> Any:
         """
@@ -88,6 +181,11 @@ class LocalExecutor:
         if not work_chunks:
             return []
 
+        if self.task_timeout is not None:
+            supervised = self.execute_supervised(func, work_chunks, timeout=timeout)
+            supervised.raise_for_status()
+            return supervised.results
+
         if len(work_chunks) == 1:
             # Single chunk, execute directly
             chunk = work_chunks[0]
@@ -103,11 +201,126 @@ class LocalExecutor:
             self._create_executor()
 
         try:
+            if not self.use_threads and has_shareable_arguments(
+                work_chunks, self.shared_memory_threshold
+            ):
+                return self._execute_with_shared_memory(func, work_chunks, timeout)
             return self._execute_parallel_chunks(func, work_chunks, timeout)
         finally:
             if cleanup_needed:
                 self._cleanup_executor()
 
+    def execute_supervised(
+        self,
+        func: Callable,
+        work_chunks: List[Dict[str, Any]],
+        task_timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> SupervisedResults:
+        """
+        Execute chunks with per-task deadlines, returning partial results.
+
+        Unlike :meth:`execute_parallel`, a failed, hung or crashed chunk does
+        not discard the others: every chunk gets a status (``completed``,
+        ``failed``, ``timeout`` or ``cancelled``) in the returned
+        SupervisedResults.
+
+        Args:
+            func: Function to execute
+            work_chunks: List of work chunks, each containing args and kwargs
+            task_timeout: Per-task deadline (defaults to the executor's)
+            retries: Extra attempts on a fresh worker for timed out or
+                crashed tasks (defaults to the executor's ``task_retries``)
+            timeout: Overall deadline for all chunks
+
+        Returns:
+            SupervisedResults with one outcome per chunk
+
+        Example:
+            >>> with LocalExecutor(max_workers=4) as executor:
+            ...     run = executor.execute_supervised(simulate, chunks, task_timeout=60)
+            >>> completed = [o.result for o in run.outcomes if o.ok]
+        """
+        if not self.use_threads and has_shareable_arguments(
+            work_chunks, self.shared_memory_threshold
+        ):
+            with SharedArgumentStore(self.shared_memory_threshold) as store:
+                shared_chunks = []
+                for chunk in work_chunks:
+                    args, kwargs = store.share_arguments(
+                        chunk.get("args", ()), chunk.get("kwargs", {})
+                    )
+                    shared_chunks.append({"args": (func, args, kwargs)})
+                return self._supervise(
+                    call_with_shared_arguments,
+                    shared_chunks,
+                    task_timeout,
+                    retries,
+                    timeout,
+                )
+        return self._supervise(func, work_chunks, task_timeout, retries, timeout)
+
+    def _supervise(
+        self,
+        func: Callable,
+        work_chunks: Iterable[Dict[str, Any]],
+        task_timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        timeout: Optional[float] = None,
+        on_complete: Optional[Callable[[ChunkOutcome], None]] = None,
+    ) -> SupervisedResults:
+        """Run chunks on this executor's TaskSupervisor (see TaskSupervisor.run)."""
+        if task_timeout is None:
+            task_timeout = self.task_timeout
+        if retries is None:
+            retries = self.task_retries
+
+        cleanup_needed = self._supervisor is None and self._executor is None
+        if self._supervisor is None:
+            placement = None
+            if not self.use_threads:
+                placement = plan_worker_placement(
+                    self.max_workers,
+                    limit_threads=self.pool_options.get("limit_worker_threads", True),
+                    cpu_affinity=self.pool_options.get("cpu_affinity", False),
+                )
+            self._supervisor = TaskSupervisor(
+                self.max_workers, self.use_threads, placement=placement
+            )
+
+        try:
+            return self._supervisor.run(
+                func, work_chunks, task_timeout, retries, timeout, on_complete
+            )
+        finally:
+            if cleanup_needed:
+                self._supervisor.shutdown()
+                self._supervisor = None
+
+    def _execute_with_shared_memory(
+        self,
+        func: Callable,
+        work_chunks: List[Dict[str, Any]],
+        timeout: Optional[float],
+    ) -> List[Any]:
+        """Execute chunks with large arguments passed through shared memory."""
+        with SharedArgumentStore(self.shared_memory_threshold) as store:
+            shared_chunks = []
+            for chunk in work_chunks:
+                args, kwargs = store.share_arguments(
+                    chunk.get("args", ()), chunk.get("kwargs", {})
+                )
+                shared_chunks.append({"args": (func, args, kwargs), "kwargs": {}})
+
+            logger.debug(
+                f"Sharing {store.bytes_shared} bytes of arguments "
+                f"across {len(work_chunks)} chunks"
+            )
+            return self._execute_parallel_chunks(
+                call_with_shared_arguments, shared_chunks, timeout
+            )
+
     def _execute_parallel_chunks(
         self,
         func: Callable,
@@ -146,9 +359,11 @@ class LocalExecutor:
                     )
 
                     if not_done:
-                        # Some tasks didn't complete within timeout
+                        # Some tasks didn't complete within timeout; running
+                        # ones cannot be cancelled, so don't wait for them
                         for future in not_done:
                             future.cancel()
+                        self._terminate_on_cleanup = True
                         raise TimeoutError(
                             f"Execution exceeded timeout of {timeout} seconds"
                         )
@@ -188,6 +403,7 @@ class LocalExecutor:
         func_args: tuple = (),
         func_kwargs: Optional[Dict[Any, Any]] = None,
         chunk_size: Optional[int] = None,
+        schedule: Optional[str] = None,
     ) -> List[Any]:
         """
         Execute a function in parallel over an iterable using intelligent chunking.
@@ -199,8 +415,10 @@ class LocalExecutor:
 
         **Algorithm:**
 
-        1. **Chunking**: Splits the iterable into approximately equal chunks based on
-           worker count and optional chunk_size parameter.
+        1. **Chunking**: Hands out chunks of the iterable on demand as workers
+           become free (see :mod:`clustrix.chunk_scheduler`). ``guided`` chunks
+           shrink as work runs out, ``adaptive`` chunks are sized from measured
+           per-iteration cost, and ``static`` uses equal chunks.
 
         2. **Chunk Processing**: Creates a wrapper function that processes each chunk
            by iterating over individual items and calling the original function.
@@ -227,8 +445,10 @@ class LocalExecutor:
             func_args: Additional positional arguments passed to func for each call.
             func_kwargs: Additional keyword arguments passed to func for each call.
                         Note: loop_var will be added/overridden in these kwargs.
-            chunk_size: Optional size of each work chunk. If None, automatically
-                       calculated as len(items) // max_workers.
+            chunk_size: Optional fixed size of each work chunk. If given and no
+                       schedule is set, the static schedule is used.
+            schedule: 'static', 'guided' or 'adaptive'. Defaults to 'guided'
+                      unless chunk_size is given.
 
         Returns:
             List[Any]: Results from function execution in the same order as the
@@ -275,36 +495,19 @@ class LocalExecutor:
         if not items:
             return []
 
-        # Determine chunk size
-        if chunk_size is None:
-            chunk_size = max(1, len(items) // self.max_workers)
-
-        # Create a wrapper function that processes chunks
-        def chunk_processor(*args, **kwargs):
-            # Extract the chunk of items from kwargs
-            chunk_items = kwargs.pop(loop_var)
-            chunk_results = []
-
-            # Process each item in the chunk individually
-            for item in chunk_items:
-                item_kwargs = kwargs.copy()
-                item_kwargs[loop_var] = item
-                result = func(*args, **item_kwargs)
-                chunk_results.append(result)
-
-            return chunk_results
-
-        # Create work chunks
-        work_chunks = []
-        for i in range(0, len(items), chunk_size):
-            chunk_items = items[i : i + chunk_size]
-            chunk_kwargs = func_kwargs.copy()
-            chunk_kwargs[loop_var] = chunk_items
-
-            work_chunks.append({"args": func_args, "kwargs": chunk_kwargs})
+        if schedule is None:
+            schedule = "static" if chunk_size else "guided"
+        scheduler = ChunkScheduler(
+            len(items), self.max_workers, schedule=schedule, chunk_size=chunk_size
+        )
 
-        # Execute in parallel using the chunk processor
-        chunk_results = self.execute_parallel(chunk_processor, work_chunks)
+        if len(items) == 1:
+            runner = _LoopChunkRunner(func, loop_var, func_args, func_kwargs)
+            chunk_results = [runner(items)[0]]
+        else:
+            chunk_results = self._execute_scheduled_chunks(
+                func, loop_var, items, func_args, func_kwargs, scheduler
+            )
 
         # Flatten results if needed
         results = []
@@ -316,9 +519,256 @@ class LocalExecutor:
 
         return results
 
+    def _execute_scheduled_chunks(
+        self,
+        func: Callable,
+        loop_var: str,
+        items: List[Any],
+        func_args: tuple,
+        func_kwargs: Dict[Any, Any],
+        scheduler: ChunkScheduler,
+    ) -> List[Any]:
+        """
+        Run loop chunks from ``scheduler`` the way :meth:`execute_parallel`
+        runs work chunks: large arguments travel through shared memory, and
+        with a ``task_timeout`` chunks run under the TaskSupervisor.
+        """
+        with SharedArgumentStore(self.shared_memory_threshold) as store:
+            shared = not self.use_threads and has_shareable_arguments(
+                [{"args": func_args, "kwargs": func_kwargs}],
+                self.shared_memory_threshold,
+            )
+            if shared:
+                # Shared once for every chunk rather than pickled with each
+                func_args, func_kwargs = store.share_arguments(func_args, func_kwargs)
+            runner = _LoopChunkRunner(
+                func, loop_var, func_args, func_kwargs, shared_arguments=shared
+            )
+
+            if self.task_timeout is not None:
+                bounds: List[Tuple[int, int]] = []
+
+                def chunks() -> Iterator[Dict[str, Any]]:
+                    while True:
+                        chunk = scheduler.next_chunk()
+                        if chunk is None:
+                            return
+                        bounds.append(chunk)
+                        yield {"args": (items[chunk[0] : chunk[1]],)}
+
+                def record(outcome: ChunkOutcome) -> None:
+                    start, stop = bounds[outcome.index]
+                    scheduler.record(stop - start, outcome.result[1])
+
+                supervised = self._supervise(runner, chunks(), on_complete=record)
+                supervised.raise_for_status()
+                return [value for value, _ in supervised.results]
+
+            # Create executor if not in context manager
+            cleanup_needed = self._executor is None
+            if cleanup_needed:
+                self._create_executor()
+            try:
+                return run_scheduled_chunks(
+                    lambda start, stop: self._executor.submit(
+                        runner, items[start:stop]
+                    ),
+                    scheduler,
+                )
+            finally:
+                if cleanup_needed:
+                    self._cleanup_executor()
+
+    def imap(
+        self,
+        func: Callable,
+        iterable: Iterable[Any],
+        loop_var: Optional[str] = None,
+        func_args: tuple = (),
+        func_kwargs: Optional[Dict[Any, Any]] = None,
+        chunk_size: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        ordered: bool = True,
+    ) -> Iterator[Any]:
+        """
+        Lazily map a function over an iterable with bounded memory.
+
+        Items are pulled from ``iterable`` only as capacity frees up, so
+        generators of any length (including unbounded ones) can be processed.
+        At most ``max_in_flight`` chunks are outstanding at once, counting
+        chunks that have finished but are waiting to be yielded in order.
+
+        Args:
+            func: Function applied to each item
+            iterable: Items to process; consumed lazily
+            loop_var: Keyword argument receiving each item. If None, the item
+                      is passed positionally after ``func_args``.
+            func_args: Additional positional arguments for each call
+            func_kwargs: Additional keyword arguments for each call
+            chunk_size: Items per task. If None, chunks start at one item and
+                        grow so each takes about 50ms.
+            max_in_flight: Maximum outstanding chunks (default: 2 per worker)
+            ordered: Yield results in input order (True) or as chunks complete
+
+        Yields:
+            Results of ``func`` for each item
+
+        Example:
+            >>> with LocalExecutor(max_workers=4) as executor:
+            ...     for row in executor.imap(parse, open("huge.csv")):
+            ...         handle(row)
+
+        Note:
+            Closing the generator early cancels chunks that have not started.
+        """
+        runner = _LoopChunkRunner(func, loop_var, func_args, func_kwargs or {})
+        sizer = StreamChunkSizer()
+        max_in_flight = max_in_flight or 2 * self.max_workers
+        items = iter(iterable)
+
+        cleanup_needed = self._executor is None
+        if cleanup_needed:
+            self._create_executor()
+
+        in_flight: Dict[Any, Tuple[int, int]] = {}
+        completed: Dict[int, List[Any]] = {}
+        next_index = 0
+        next_to_yield = 0
+        exhausted = False
+
+        try:
+            while True:
+                # Top up with new chunks while under the in-flight cap
+                while not exhausted and len(in_flight) + len(completed) < max_in_flight:
+                    size = chunk_size or sizer.next_size()
+                    chunk = list(itertools.islice(items, size))
+                    if not chunk:
+                        exhausted = True
+                        break
+                    future = self._executor.submit(runner, chunk)
+                    in_flight[future] = (next_index, len(chunk))
+                    next_index += 1
+
+                if not in_flight and not completed:
+                    return
+
+                if in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        index, size = in_flight.pop(future)
+                        chunk_results, elapsed = future.result()
+                        sizer.record(size, elapsed)
+                        if ordered:
+                            completed[index] = chunk_results
+                        else:
+                            yield from chunk_results
+
+                while next_to_yield in completed:
+                    yield from completed.pop(next_to_yield)
+                    next_to_yield += 1
+        finally:
+            for future in in_flight:
+                future.cancel()
+            if cleanup_needed:
+                self._cleanup_executor()
+
+
+class _LoopChunkRunner:
+    """Picklable callable applying ``func`` to each item of a chunk."""
+
+    def __init__(
+        self,
+        func: Callable,
+        loop_var: Optional[str],
+        func_args: tuple,
+        func_kwargs: Dict[Any, Any],
+        shared_arguments: bool = False,
+    ):
+        self.func = _by_reference(func)
+        self.loop_var = loop_var
+        self.func_args = func_args
+        self.func_kwargs = func_kwargs
+        self.shared_arguments = shared_arguments
+
+    def __call__(self, chunk_items: List[Any]) -> Tuple[List[Any], float]:
+        start = time.perf_counter()
+        func_args, func_kwargs = self.func_args, self.func_kwargs
+        if self.shared_arguments:
+            func_args, func_kwargs = restore_shared_arguments(func_args, func_kwargs)
+        chunk_results = []
+        for item in chunk_items:
+            if self.loop_var is None:
+                # Items are passed positionally after func_args
+                result = self.func(*func_args, item, **func_kwargs)
+            else:
+                item_kwargs = func_kwargs.copy()
+                item_kwargs[self.loop_var] = item
+                result = self.func(*func_args, **item_kwargs)
+            chunk_results.append(result)
+        return chunk_results, time.perf_counter() - start
+
+
+def _resolve(module: str, qualname: str) -> Any:
+    target: Any = importlib.import_module(module)
+    for part in qualname.split("."):
+        target = getattr(target, part)
+    return target
+
+
+class _WrappedFunction:
+    """
+    Picklable stand-in for a function decorated with :func:`clustrix.cluster`.
+
+    Pickle looks functions up by module and qualified name, which for a
+    decorated function finds the wrapper rather than the function itself.
+    This pickles the wrapper's name and unwraps it on load, as
+    :class:`clustrix.loop_splitting.ChunkFunction` does.
+    """
+
+    def __init__(self, func: Callable):
+        self.func = func
+        self.__wrapped__ = func
+        self.__name__ = func.__name__
+        # Calibrations are cached per code object
+        self.__code__ = func.__code__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def __reduce__(self):
+        return _load_wrapped_function, (self.func.__module__, self.func.__qualname__)
+
+
+def _load_wrapped_function(module: str, qualname: str) -> _WrappedFunction:
+    return _WrappedFunction(_resolve(module, qualname).__wrapped__)
+
+
+def _by_reference(func: Callable) -> Callable:
+    """``func``, or a :class:`_WrappedFunction` if its name finds a wrapper."""
+    if isinstance(func, _WrappedFunction) or not hasattr(func, "__code__"):
+        return func
+    try:
+        target = _resolve(func.__module__, func.__qualname__)
+    except (ImportError, AttributeError, TypeError):
+        return func
+    if target is not func and getattr(target, "__wrapped__", None) is func:
+        return _WrappedFunction(func)
+    return func
+
+
+_ALWAYS_PICKLABLE = (type(None), bool, int, float, complex, str, bytes, range)
+
 
 def _safe_pickle_test(obj) -> bool:
     """Test if an object can be safely pickled."""
+    # Skip serialising values whose type guarantees picklability; large
+    # arrays would otherwise be copied just to answer this question
+    if isinstance(obj, _ALWAYS_PICKLABLE):
+        return True
+    dtype = getattr(obj, "dtype", None)
+    if type(obj).__name__ == "ndarray" and getattr(dtype, "hasobject", True) is False:
+        return True
+
     try:
         pickle.dumps(obj)
         return True
@@ -339,10 +789,14 @@ def choose_executor_type(func: Callable, args: tuple, kwargs: dict) -> bool:
     1. **Pickling Check (Highest Priority)**: Functions and arguments must be picklable for
        multiprocessing. If any component fails pickling, threads are used.
 
-    2. **I/O Detection**: Source code analysis looks for common I/O patterns that benefit
+    2. **Calibration**: If the function has been calibrated (see
+       :func:`execute_calibrated`), threads are chosen when its measured 2-thread
+       speedup shows it releases the GIL, or when items are too cheap for processes.
+
+    3. **I/O Detection**: Source code analysis looks for common I/O patterns that benefit
        from threads due to GIL release during I/O operations.
 
-    3. **Default**: CPU-bound tasks default to processes for true parallelism.
+    4. **Default**: CPU-bound tasks default to processes for true parallelism.
 
     **Key Insight**: `inspect.getsource(lambda x: x)` succeeds but `pickle.dumps(lambda x: x)`
     fails, so pickling must be checked before source analysis.
@@ -392,11 +846,18 @@ def choose_executor_type(func: Callable, args: tuple, kwargs: dict) -> bool:
         if not _safe_pickle_test(value):
             return True
 
-    # Check for common I/O bound indicators
-    import inspect
+    # Prefer measured behaviour from an earlier calibrated run
+    calibration = get_cached_calibration(func)
+    if calibration is not None:
+        if not calibration.picklable:
+            return True
+        if calibration.per_item_seconds < GIL_PROBE_MIN_ITEM_SECONDS:
+            return True  # Too little work to repay process overhead
+        return (calibration.thread_speedup or 1.0) >= 1.5
 
+    # Otherwise fall back to looking for common I/O bound indicators
     try:
-        source = inspect.getsource(func)
+        source = function_source(func)
         io_indicators = [
             "open(",
             "requests.",
@@ -423,6 +884,10 @@ def create_local_executor(
     func: Optional[Callable] = None,
     args: tuple = (),
     kwargs: Optional[Dict[Any, Any]] = None,
+    reuse_pool: bool = False,
+    pool_options: Optional[Dict[str, Any]] = None,
+    task_timeout: Optional[float] = None,
+    task_retries: int = 0,
 ) -> LocalExecutor:
     """
     Create a LocalExecutor with appropriate settings.
@@ -433,6 +898,10 @@ def create_local_executor(
         func: Function to analyze for executor type selection
         args: Function arguments for analysis
         kwargs: Function keyword arguments for analysis
+        reuse_pool: Use the process-global worker pool
+        pool_options: Options for the shared worker pool
+        task_timeout: Per-task deadline enforced by a supervisor
+        task_retries: Retries for tasks that time out or crash their worker
 
     Returns:
         Configured LocalExecutor
@@ -446,4 +915,124 @@ def create_local_executor(
     elif use_threads is None:
         use_threads = False  # Default to processes
 
-    return LocalExecutor(max_workers=max_workers, use_threads=use_threads)
+    return LocalExecutor(
+        max_workers=max_workers,
+        use_threads=use_threads,
+        reuse_pool=reuse_pool,
+        pool_options=pool_options,
+        task_timeout=task_timeout,
+        task_retries=task_retries,
+    )
+
+
+def calibrated_imap(
+    func: Callable,
+    items: Sequence[Any],
+    loop_var: Optional[str] = None,
+    func_args: tuple = (),
+    func_kwargs: Optional[Dict[Any, Any]] = None,
+    max_workers: Optional[int] = None,
+    reuse_pool: bool = False,
+    pool_options: Optional[Dict[str, Any]] = None,
+    ordered: bool = True,
+    max_in_flight: Optional[int] = None,
+) -> Iterator[Any]:
+    """
+    Map ``func`` over ``items`` using a measured execution strategy.
+
+    The first items run inline to calibrate the function (see
+    :mod:`clustrix.calibration`); their results are reused. The cost model
+    then picks serial execution, threads or processes and a chunk size for the
+    remaining items. Calibration is cached per code object, so repeated calls
+    skip straight to the decision. Use
+    :func:`clustrix.calibration.explain_execution_plan` to see why a mode was
+    chosen.
+
+    Args:
+        func: Function applied to each item
+        items: Items to process (must support ``len`` and indexing)
+        loop_var: Keyword argument receiving each item. If None, the item is
+                  passed positionally after ``func_args``.
+        func_args: Additional positional arguments for each call
+        func_kwargs: Additional keyword arguments for each call
+        max_workers: Workers available (defaults to the CPU count)
+        reuse_pool: Run on the process-global worker pool
+        pool_options: Options for the shared worker pool
+        ordered: Yield results in input order or as chunks complete
+        max_in_flight: Maximum outstanding chunks
+
+    Yields:
+        Results of ``func`` for each item
+    """
+    func_kwargs = func_kwargs or {}
+    max_workers = max_workers or os.cpu_count() or 4
+    # Calibration measures pickling, so it must pickle what workers receive
+    func = _by_reference(func)
+    runner = _LoopChunkRunner(func, loop_var, func_args, func_kwargs)
+
+    plan, done = get_execution_plan(
+        func,
+        items,
+        lambda item: runner([item])[0][0],
+        max_workers,
+        func_args=func_args,
+        func_kwargs=func_kwargs,
+        warm_process_pool=reuse_pool and has_warm_worker_pool(False, max_workers),
+    )
+    logger.debug(f"Calibrated execution of {func.__name__}: {plan.reason}")
+
+    # Calibration evaluates a prefix of the items
+    for index in range(len(done)):
+        yield done[index]
+    remaining = items[len(done) :]
+
+    if plan.mode == "serial" or not remaining:
+        for item in remaining:
+            yield runner([item])[0][0]
+        return
+
+    executor = LocalExecutor(
+        max_workers=plan.workers,
+        use_threads=plan.use_threads,
+        reuse_pool=reuse_pool,
+        pool_options=pool_options,
+    )
+    with executor:
+        yield from executor.imap(
+            func,
+            remaining,
+            loop_var=loop_var,
+            func_args=func_args,
+            func_kwargs=func_kwargs,
+            chunk_size=plan.chunk_size,
+            max_in_flight=max_in_flight,
+            ordered=ordered,
+        )
+
+
+def execute_calibrated(
+    func: Callable, items: Iterable[Any], loop_var: Optional[str] = None, **options
+) -> List[Any]:
+    """
+    Apply ``func`` to every item, choosing serial, threads or processes by
+    measurement rather than source inspection.
+
+    Args:
+        func: Function applied to each item
+        items: Items to process
+        loop_var: Keyword argument receiving each item (positional if None)
+        **options: Passed to :func:`calibrated_imap`
+
+    Returns:
+        Results in input order
+
+    Example:
+        >>> results = execute_calibrated(simulate, range(10_000))
+        >>> from clustrix.calibration import explain_execution_plan
+        >>> explain_execution_plan(simulate).mode
+        'processes'
+    """
+    if not isinstance(items, Sequence):
+        items = list(items)
+    options.pop("ordered", None)
+    return list(calibrated_imap(func, items, loop_var=loop_var, **options))
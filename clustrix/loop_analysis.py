@@ -2,9 +2,12 @@
 
 import ast
 import inspect
+import operator
 from typing import Any, Dict, List, Optional, Callable, Set
 import logging
 
+from .analysis_cache import function_tree
+
 logger = logging.getLogger(__name__)
 
 
@@ -234,8 +237,54 @@ class LoopInfo:
         }
 
 
+_UNKNOWN = object()
+
+
+def _as_int(value: Any) -> Optional[int]:
+    """Return ``value`` as an int if it is integral (including NumPy ints)."""
+    try:
+        return operator.index(value)
+    except TypeError:
+        return None
+
+
+def bind_arguments(
+    func: Callable, args: tuple = (), kwargs: Optional[Dict[Any, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Map ``func``'s parameter names to the values of a call.
+
+    Args:
+        func: Function being called
+        args: Positional arguments of the call
+        kwargs: Keyword arguments of the call
+
+    Returns:
+        Parameter values, including defaults, or an empty dict if the
+        arguments do not fit the signature
+    """
+    try:
+        bound = inspect.signature(func).bind_partial(*args, **(kwargs or {}))
+        bound.apply_defaults()
+        return dict(bound.arguments)
+    except (TypeError, ValueError):
+        return {}
+
+
 class SafeRangeEvaluator(ast.NodeVisitor):
-    """Safely evaluate range expressions without using eval()."""
+    """Safely evaluate range expressions without using eval().
+
+    Bounds may refer to the call's arguments through ``local_vars``, e.g.
+    ``range(len(x))``, ``range(1, x.shape[0] - 1)`` or ``range(n // 2)``.
+    Only integer arithmetic, a few side-effect free builtins and data
+    attributes/items of argument values are evaluated; anything else makes
+    the bound unknown.
+    """
+
+    # Builtins allowed in bounds; each only reads its arguments
+    SAFE_FUNCTIONS = {"len": len, "min": min, "max": max, "abs": abs, "int": int}
+    # Attributes that are computed rather than stored, e.g. on NumPy arrays
+    SAFE_ATTRIBUTES = {"shape", "size", "ndim"}
 
     def __init__(self, local_vars: Optional[Dict[str, Any]] = None):
         self.local_vars = local_vars or {}
@@ -278,20 +327,104 @@ class SafeRangeEvaluator(ast.NodeVisitor):
 
     def _evaluate_node(self, node) -> Optional[int]:
         """Safely evaluate an AST node to get integer value."""
+        if isinstance(node, ast.BinOp):
+            return self._evaluate_binop(node)
+        value = self._resolve(node)
+        if value is _UNKNOWN:
+            return None
+        return _as_int(value)
+
+    def _resolve(self, node) -> Any:
+        """Value of an expression over arguments, or _UNKNOWN."""
         if isinstance(node, ast.Constant):
-            return node.value if isinstance(node.value, int) else None
+            return node.value
         elif isinstance(node, ast.Num):  # Python < 3.8
-            return node.n if isinstance(node.n, int) else None
+            return node.n
         elif isinstance(node, ast.Name):
-            return (
-                self.local_vars.get(node.id)
-                if isinstance(self.local_vars.get(node.id), int)
-                else None
+            return self.local_vars.get(node.id, _UNKNOWN)
+        elif isinstance(node, (ast.BinOp, ast.UnaryOp)):
+            value = (
+                self._evaluate_binop(node)
+                if isinstance(node, ast.BinOp)
+                else self._evaluate_unaryop(node)
             )
-        elif isinstance(node, ast.BinOp):
-            return self._evaluate_binop(node)
-        else:
+            return _UNKNOWN if value is None else value
+        elif isinstance(node, ast.Attribute):
+            return self._resolve_attribute(node)
+        elif isinstance(node, ast.Subscript):
+            return self._resolve_subscript(node)
+        elif isinstance(node, ast.Call):
+            return self._resolve_call(node)
+        return _UNKNOWN
+
+    def _resolve_attribute(self, node) -> Any:
+        obj = self._resolve(node.value)
+        if obj is _UNKNOWN:
+            return _UNKNOWN
+        if node.attr in self.SAFE_ATTRIBUTES:
+            try:
+                return getattr(obj, node.attr)
+            except Exception:
+                return _UNKNOWN
+        # Plain instance data only; properties could run arbitrary code
+        return getattr(obj, "__dict__", {}).get(node.attr, _UNKNOWN)
+
+    def _resolve_subscript(self, node) -> Any:
+        obj = self._resolve(node.value)
+        index = node.slice
+        if isinstance(index, getattr(ast, "Index", ())):  # Python < 3.9
+            index = index.value
+        key = self._resolve(index)
+        if obj is _UNKNOWN or key is _UNKNOWN:
+            return _UNKNOWN
+        if not isinstance(obj, (tuple, list, dict)):
+            return _UNKNOWN
+        try:
+            return obj[key]
+        except (LookupError, TypeError):
+            return _UNKNOWN
+
+    def _resolve_call(self, node) -> Any:
+        if not (
+            isinstance(node.func, ast.Name)
+            and node.func.id in self.SAFE_FUNCTIONS
+            and node.func.id not in self.local_vars
+            and not node.keywords
+        ):
+            return _UNKNOWN
+        args = [self._resolve(arg) for arg in node.args]
+        if any(arg is _UNKNOWN for arg in args):
+            return _UNKNOWN
+        try:
+            return self.SAFE_FUNCTIONS[node.func.id](*args)
+        except Exception:
+            return _UNKNOWN
+
+    def resolve_iterable(self, node) -> Optional[Any]:
+        """
+        Resolve a loop iterable to a sized, sliceable sequence.
+
+        Returns:
+            The list, tuple, range, string or array the loop iterates over,
+            or None if it is unknown or not a sequence
+        """
+        value = self._resolve(node)
+        if isinstance(value, (list, tuple, range, str)):
+            return value
+        if type(value).__name__ == "ndarray" and getattr(value, "ndim", 0) >= 1:
+            return value
+        return None
+
+    def _evaluate_unaryop(self, node) -> Optional[int]:
+        """Evaluate unary plus and minus."""
+        operand = self._evaluate_node(node.operand)
+        if operand is None:
             return None
+        if isinstance(node.op, ast.USub):
+            return -operand
+        if isinstance(node.op, ast.UAdd):
+            return operand
+        return None
 
     def _evaluate_binop(self, node) -> Optional[int]:
         """Evaluate binary operations."""
@@ -310,6 +443,8 @@ class SafeRangeEvaluator(ast.NodeVisitor):
                 return left * right
             elif isinstance(node.op, ast.FloorDiv):
                 return left // right if right != 0 else None
+            elif isinstance(node.op, ast.Mod):
+                return left % right if right != 0 else None
             else:
                 return None
         except Exception:
@@ -590,20 +725,13 @@ def detect_loops_in_function(
         kwargs = {}
 
     try:
-        source = inspect.getsource(func)
-        tree = ast.parse(source)
+        tree = function_tree(func)
 
         # Build local variables context
         local_vars: Dict[str, Any] = {}
 
         # Add function arguments to context
-        try:
-            sig = inspect.signature(func)
-            bound_args = sig.bind_partial(*args, **kwargs)
-            bound_args.apply_defaults()
-            local_vars.update(bound_args.arguments)
-        except Exception:
-            pass
+        local_vars.update(bind_arguments(func, args, kwargs))
 
         detector = LoopDetector(local_vars)
 
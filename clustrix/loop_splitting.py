@@ -0,0 +1,993 @@
+"""Split a function's main loop into independently executable chunks.
+
+Chunking a loop is only useful if each chunk actually runs its own part of
+the iteration space. This module compiles a *chunk variant* of a function:
+a copy in which the main ``for`` loop iterates only the values (or
+positional slice) passed in the ``_parallel_<var>`` / ``_chunk_range_<var>``
+keyword arguments, while the code before and after the loop runs unchanged.
+
+A loop is split only when the rewrite cannot change the result:
+
+- it is the last statement before ``return <accumulator>``
+- the accumulator is assigned just before the loop and the loop only
+  updates it in one of these ways, each chunk reducing its own share:
+
+  ====================  ======================================  ===========
+  kind                  updates                                 starts as
+  ====================  ======================================  ===========
+  ``concat``            ``acc.append(x)``, ``.extend``, ``+=``  ``[]``
+  ``merge``             ``acc[k] = v``, ``acc.update(d)``       ``{}``
+  ``sum``               ``acc += x``, ``acc -= x``,             ``0``,
+                        ``acc[i] += x``                         ``np.zeros``
+  ``product``           ``acc *= x``                            ``1``,
+                                                                ``np.ones``
+  ``min`` / ``max``     ``acc = min(acc, x)``,                  anything
+                        ``np.maximum(acc, x)``
+  ====================  ======================================  ===========
+
+- iterations do not communicate: every other name the loop body writes is
+  assigned before it is read, and nothing outside the iteration is mutated
+- the body has no ``break``, ``return``, ``yield``, ``global`` or
+  ``nonlocal``
+
+Chunk results are combined in chunk order; reductions are combined pairwise
+as a balanced tree (:func:`tree_reduce`), which can also run as a small job
+on the cluster so only the reduced value is downloaded.
+
+Calls inside the loop are assumed not to mutate shared state. Static
+analyses and compiled variants are cached per code object.
+"""
+
+import ast
+import builtins
+import copy
+import importlib
+import inspect
+import itertools
+import logging
+import types
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .analysis_cache import cached_analysis, function_tree, get_analysis_cache
+from .loop_analysis import (
+    LoopDetector,
+    SafeRangeEvaluator,
+    _ast_to_string,
+    bind_arguments,
+)
+from .result_combiners import combine_by_type, merge_dicts
+
+logger = logging.getLogger(__name__)
+
+CONCAT = "concat"
+MERGE = "merge"
+SUM = "sum"
+PRODUCT = "product"
+MIN = "min"
+MAX = "max"
+
+# Initial accumulator values each kind needs (None: any value)
+_KIND_INITIALS: Dict[str, Optional[Set[str]]] = {
+    CONCAT: {"list"},
+    MERGE: {"dict"},
+    SUM: {"zero"},
+    PRODUCT: {"one"},
+    MIN: None,
+    MAX: None,
+}
+
+# Kind of ``acc <op>= x`` / ``acc = acc <op> x`` for each initial value
+_OPERATOR_KINDS = {
+    (ast.Add, "list"): CONCAT,
+    (ast.Add, "zero"): SUM,
+    (ast.Sub, "zero"): SUM,
+    (ast.Mult, "one"): PRODUCT,
+}
+
+# ``acc = min(acc, x)`` style updates, including NumPy's element-wise forms
+_REDUCTION_CALLS = {
+    "min": MIN,
+    "max": MAX,
+    "minimum": MIN,
+    "maximum": MAX,
+    "fmin": MIN,
+    "fmax": MAX,
+}
+
+_CHUNK_ITER = "__clustrix_chunk_iter__"
+_FACTORY = "__clustrix_chunk_factory__"
+_CHUNK_INDEX = "_chunk_index"
+_SHARD_OFFSET = "_shard_offset"
+
+# How a shardable argument is read (see LoopSplit.shards)
+SHARD_ITER = "iter"  # The loop iterates it: ``for row in data``
+SHARD_ITEM = "item"  # Indexed by the loop variable: ``x[i]``
+SHARD_ILOC = "iloc"  # Indexed positionally: ``df.iloc[i]``
+
+# Method names that mutate lists, dicts and sets in place
+_MUTATING_METHODS = {
+    "append",
+    "extend",
+    "insert",
+    "pop",
+    "remove",
+    "clear",
+    "update",
+    "add",
+    "discard",
+    "setdefault",
+    "popitem",
+    "sort",
+    "reverse",
+}
+
+_SLICEABLE = (list, tuple, range, str, bytes)
+
+
+@dataclass
+class LoopSplit:
+    """A loop whose iterations can run in separate chunks."""
+
+    variable: str
+    iterable: str
+    accumulator: str
+    combine: str
+    loop_index: int  # Position of the loop in the function body
+    lineno: int
+    # ``(parameter, access)`` pairs: arguments each chunk only needs its
+    # slice of, and how the function reads them (SHARD_ITER/ITEM/ILOC)
+    shards: Tuple[Tuple[str, str], ...] = ()
+
+    @property
+    def is_reduction(self) -> bool:
+        """Whether chunks return small partial values rather than lists."""
+        return self.combine != CONCAT
+
+    @property
+    def chunk_kwargs(self) -> List[str]:
+        """Keyword arguments accepted by the chunk variant."""
+        return [
+            f"_parallel_{self.variable}",
+            f"_chunk_range_{self.variable}",
+            _CHUNK_INDEX,
+            _SHARD_OFFSET,
+        ]
+
+
+@dataclass
+class LoopSplitPlan:
+    """A splittable loop together with its resolved iteration space."""
+
+    split: LoopSplit
+    iterations: range
+    chunk_function: "ChunkFunction"
+    positional: bool = False  # Chunks are positions in the iterable, not values
+
+    def loop_info(self) -> Dict[str, Any]:
+        """Loop description in the format the work chunkers accept."""
+        return {
+            "variable": self.split.variable,
+            "range": self.iterations,
+            "positional": self.positional,
+        }
+
+    def combine(self, results: List[Any]) -> Any:
+        """Combine chunk results, given in chunk order."""
+        return combine_chunk_results(self.split, results)
+
+
+class _SplitRejected(Exception):
+    """Raised internally when a loop cannot be split safely."""
+
+
+def _function_def(func: Callable) -> ast.FunctionDef:
+    """
+    Return ``func``'s parsed definition from the analysis cache.
+
+    The node is shared, and its line numbers count from the definition.
+    """
+    for node in function_tree(func).body:
+        if isinstance(node, ast.FunctionDef) and node.name == func.__name__:
+            return node
+    raise _SplitRejected("definition is not a plain function")
+
+
+def _root_name(node: ast.AST) -> Optional[str]:
+    """Name at the base of an attribute/subscript chain, e.g. ``a`` in ``a.b[0]``."""
+    while isinstance(node, (ast.Attribute, ast.Subscript, ast.Starred)):
+        node = node.value
+    return node.id if isinstance(node, ast.Name) else None
+
+
+def _stored_names(nodes: List[ast.stmt]) -> Set[str]:
+    """Names bound by ``nodes``, excluding nested scopes."""
+    names: Set[str] = set()
+    stack: List[ast.AST] = list(nodes)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            names.add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+            continue
+        elif isinstance(
+            node,
+            (ast.Lambda, ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp),
+        ):
+            continue
+        stack.extend(ast.iter_child_nodes(node))
+    return names
+
+
+class _IterationChecker(ast.NodeVisitor):
+    """
+    Check that loop iterations only communicate through the accumulator.
+
+    Statements are visited in execution order while tracking which names
+    are definitely assigned in the current iteration. Reading a name the
+    body writes before the iteration has assigned it means a value flows
+    from one iteration to the next.
+    """
+
+    def __init__(
+        self,
+        variable: str,
+        accumulator: str,
+        initial: str,
+        written: Set[str],
+        line_offset: int = 0,
+    ):
+        self.line_offset = line_offset
+        self.accumulator = accumulator
+        self.initial = initial
+        self.written = written
+        self.assigned: Set[str] = {variable}
+        self.loop_depth = 0
+        self.kinds: Set[str] = set()
+
+    def reject(self, node: ast.AST, reason: str) -> None:
+        lineno = getattr(node, "lineno", None)
+        where = "?" if lineno is None else lineno + self.line_offset
+        raise _SplitRejected(f"line {where}: {reason}")
+
+    def check(self, body: List[ast.stmt]) -> None:
+        for stmt in body:
+            self.visit(stmt)
+
+    def _is_accumulator(self, node: ast.AST) -> bool:
+        return isinstance(node, ast.Name) and node.id == self.accumulator
+
+    def _update(self, node: ast.AST, kind: Optional[str]) -> None:
+        """Record an accumulator update of the given kind."""
+        if kind is None:
+            self.reject(node, f"unsupported update of '{self.accumulator}'")
+        initials = _KIND_INITIALS[kind]
+        if initials is not None and self.initial not in initials:
+            self.reject(
+                node, f"{kind} into '{self.accumulator}' does not start from identity"
+            )
+        self.kinds.add(kind)
+        if len(self.kinds) > 1:
+            self.reject(node, f"'{self.accumulator}' is updated in different ways")
+
+    def _store(self, target: ast.AST) -> None:
+        if isinstance(target, ast.Name):
+            self.assigned.add(target.id)
+        elif isinstance(target, (ast.Tuple, ast.List)):
+            for element in target.elts:
+                self._store(element)
+        elif isinstance(target, ast.Starred):
+            self._store(target.value)
+        elif isinstance(target, ast.Subscript) and self._is_accumulator(target.value):
+            self._update(target, MERGE)
+            self.visit(target.slice)
+        elif isinstance(target, (ast.Attribute, ast.Subscript)):
+            root = _root_name(target)
+            if root not in self.assigned:
+                self.reject(target, f"mutates '{root}', which outlives the iteration")
+            self.generic_visit(target)
+
+    def visit_Name(self, node: ast.Name) -> None:
+        if not isinstance(node.ctx, ast.Load):
+            return
+        if node.id == self.accumulator:
+            self.reject(node, f"reads the accumulator '{node.id}'")
+        if node.id in self.written and node.id not in self.assigned:
+            self.reject(node, f"'{node.id}' carries a value between iterations")
+
+    def visit_Assign(self, node: ast.Assign) -> None:
+        if len(node.targets) == 1 and self._is_accumulator(node.targets[0]):
+            self._visit_accumulator_assign(node)
+            return
+        self.visit(node.value)
+        for target in node.targets:
+            self._store(target)
+
+    def _visit_accumulator_assign(self, node: ast.Assign) -> None:
+        """``acc = acc + x``, ``acc = x * acc`` or ``acc = max(acc, x)``."""
+        value = node.value
+        if isinstance(value, ast.BinOp):
+            kind = _OPERATOR_KINDS.get((type(value.op), self.initial))
+            if self._is_accumulator(value.left):
+                self._update(node, kind)
+                self.visit(value.right)
+                return
+            # Only addition and multiplication of numbers commute
+            if self._is_accumulator(value.right) and kind in (SUM, PRODUCT):
+                if not isinstance(value.op, ast.Sub):
+                    self._update(node, kind)
+                    self.visit(value.left)
+                    return
+        elif isinstance(value, ast.Call) and len(value.args) == 2:
+            callee = value.func
+            name = callee.attr if isinstance(callee, ast.Attribute) else None
+            if isinstance(callee, ast.Name) and callee.id in ("min", "max"):
+                name = callee.id
+            elif name in ("min", "max"):
+                name = None  # obj.min(acc, x) is not the builtin
+            others = [arg for arg in value.args if not self._is_accumulator(arg)]
+            if name in _REDUCTION_CALLS and len(others) == 1 and not value.keywords:
+                self._update(node, _REDUCTION_CALLS[name])
+                self.visit(callee)
+                self.visit(others[0])
+                return
+        self.reject(node, f"unsupported update of '{self.accumulator}'")
+
+    def visit_AnnAssign(self, node: ast.AnnAssign) -> None:
+        if node.value is not None:
+            self.visit(node.value)
+            self._store(node.target)
+
+    def visit_NamedExpr(self, node: ast.NamedExpr) -> None:
+        self.visit(node.value)
+        self._store(node.target)
+
+    def visit_AugAssign(self, node: ast.AugAssign) -> None:
+        self.visit(node.value)
+        target = node.target
+        if self._is_accumulator(target):
+            self._update(node, _OPERATOR_KINDS.get((type(node.op), self.initial)))
+            return
+        if isinstance(target, ast.Subscript) and self._is_accumulator(target.value):
+            # Element-wise update of an array accumulator
+            kind = _OPERATOR_KINDS.get((type(node.op), self.initial))
+            self._update(node, kind if kind in (SUM, PRODUCT) else None)
+            self.visit(target.slice)
+            return
+        if isinstance(target, ast.Name):
+            if target.id not in self.assigned:
+                self.reject(node, f"'{target.id}' accumulates across iterations")
+            return
+        self._store(target)
+
+    def visit_Delete(self, node: ast.Delete) -> None:
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                if target.id not in self.assigned:
+                    self.reject(node, f"deletes '{target.id}'")
+                self.assigned.discard(target.id)
+            else:
+                self._store(target)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        func = node.func
+        if isinstance(func, ast.Attribute):
+            root = _root_name(func.value)
+            if self._is_accumulator(func.value):
+                methods = {"append": CONCAT, "extend": CONCAT, "update": MERGE}
+                self._update(node, methods.get(func.attr))
+                for arg in node.args:
+                    self.visit(arg)
+                for keyword in node.keywords:
+                    self.visit(keyword.value)
+                return
+            if func.attr in _MUTATING_METHODS and root not in self.assigned:
+                self.reject(node, f"'{root}.{func.attr}()' mutates shared state")
+        self.generic_visit(node)
+
+    def visit_If(self, node: ast.If) -> None:
+        self.visit(node.test)
+        before = set(self.assigned)
+        self.check(node.body)
+        after_body, self.assigned = self.assigned, before
+        self.check(node.orelse)
+        # Only names assigned on both branches are definitely assigned
+        self.assigned &= after_body
+
+    def _visit_loop(self, node: ast.AST, header: List[ast.AST]) -> None:
+        for part in header:
+            self.visit(part)
+        before = set(self.assigned)
+        if isinstance(node, (ast.For, ast.AsyncFor)):
+            self._store(node.target)
+        self.loop_depth += 1
+        self.check(node.body)
+        self.loop_depth -= 1
+        # The body may not run at all
+        self.assigned = before
+        self.check(node.orelse)
+
+    def visit_For(self, node: ast.For) -> None:
+        self._visit_loop(node, [node.iter])
+
+    def visit_While(self, node: ast.While) -> None:
+        self._visit_loop(node, [node.test])
+
+    def visit_Try(self, node: ast.Try) -> None:
+        before = set(self.assigned)
+        self.check(node.body)
+        self.check(node.orelse)
+        for handler in node.handlers:
+            self.assigned = set(before)
+            if handler.name:
+                self.assigned.add(handler.name)
+            self.check(handler.body)
+        self.assigned = before
+        self.check(node.finalbody)
+
+    def visit_Break(self, node: ast.Break) -> None:
+        if self.loop_depth == 0:
+            self.reject(node, "break ends the loop early")
+
+    def visit_Return(self, node: ast.Return) -> None:
+        self.reject(node, "return inside the loop")
+
+    def visit_Yield(self, node: ast.Yield) -> None:
+        self.reject(node, "yield inside the loop")
+
+    visit_YieldFrom = visit_Yield
+    visit_Await = visit_Yield
+
+    def visit_Global(self, node: ast.Global) -> None:
+        self.reject(node, "global/nonlocal declaration")
+
+    visit_Nonlocal = visit_Global
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        for default in node.args.defaults + node.args.kw_defaults:
+            if default is not None:
+                self.visit(default)
+        self.assigned.add(node.name)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self.assigned.add(node.name)
+
+
+def _initial_value(node: ast.AST) -> str:
+    """Classify an accumulator's initial value as an identity element."""
+    if isinstance(node, ast.List) and not node.elts:
+        return "list"
+    if isinstance(node, ast.Dict) and not node.keys:
+        return "dict"
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        if node.value == 0:
+            return "zero"
+        if node.value == 1:
+            return "one"
+    if isinstance(node, ast.Call):
+        func = node.func
+        name = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", "")
+        if isinstance(func, ast.Name) and not node.args and not node.keywords:
+            return {"list": "list", "dict": "dict"}.get(name, "other")
+        if isinstance(func, ast.Attribute):
+            return {
+                "zeros": "zero",
+                "zeros_like": "zero",
+                "ones": "one",
+                "ones_like": "one",
+            }.get(name, "other")
+    return "other"
+
+
+def _analyze(func: Callable) -> LoopSplit:
+    """Find the splittable loop of ``func`` or raise _SplitRejected."""
+    if not inspect.isfunction(func):
+        raise _SplitRejected("not a Python function")
+    if inspect.isgeneratorfunction(func) or inspect.iscoroutinefunction(func):
+        raise _SplitRejected("generator or coroutine")
+    if "__class__" in func.__code__.co_freevars:
+        raise _SplitRejected("uses zero-argument super()")
+
+    node = _function_def(func)
+    line_offset = func.__code__.co_firstlineno - 1
+    body = node.body
+    if len(body) < 2:
+        raise _SplitRejected("no loop followed by a return")
+    loop, epilogue = body[-2], body[-1]
+    if not (
+        isinstance(loop, ast.For)
+        and isinstance(epilogue, ast.Return)
+        and isinstance(epilogue.value, ast.Name)
+    ):
+        raise _SplitRejected("function does not end with a for loop and 'return name'")
+    if not isinstance(loop.target, ast.Name):
+        raise _SplitRejected("loop target is not a single name")
+    if loop.orelse:
+        raise _SplitRejected("loop has an else clause")
+
+    variable = loop.target.id
+    accumulator = epilogue.value.id
+    arguments = node.args
+    parameters = {
+        arg.arg for arg in arguments.posonlyargs + arguments.args + arguments.kwonlyargs
+    }
+    if accumulator in parameters:
+        raise _SplitRejected(f"accumulator '{accumulator}' is a parameter")
+    if parameters & set(LoopSplit(variable, "", "", "", 0, 0).chunk_kwargs):
+        raise _SplitRejected("function already takes chunk keyword arguments")
+
+    # The accumulator's last use before the loop must be a plain assignment:
+    # every chunk starts from that value, so sums, concatenations and merges
+    # additionally need it to be the identity (0, [], {}, ...)
+    prologue = body[:-2]
+    initial = None
+    for stmt in prologue:
+        mentions = any(
+            isinstance(n, ast.Name) and n.id == accumulator for n in ast.walk(stmt)
+        )
+        if not mentions:
+            continue
+        initial = None
+        if (
+            isinstance(stmt, ast.Assign)
+            and len(stmt.targets) == 1
+            and isinstance(stmt.targets[0], ast.Name)
+        ):
+            initial = _initial_value(stmt.value)
+    if initial is None:
+        raise _SplitRejected(
+            f"accumulator '{accumulator}' is not assigned before the loop"
+        )
+
+    # Chunks are planned from the arguments, so the loop must see them as
+    # they were passed
+    iter_names = {n.id for n in ast.walk(loop.iter) if isinstance(n, ast.Name)}
+    changed = iter_names & _stored_names(prologue)
+    for stmt in prologue:
+        for call in ast.walk(stmt):
+            if (
+                isinstance(call, ast.Call)
+                and isinstance(call.func, ast.Attribute)
+                and call.func.attr in _MUTATING_METHODS
+                and _root_name(call.func.value) in iter_names
+            ):
+                changed.add(_root_name(call.func.value))
+    if changed:
+        raise _SplitRejected(f"{sorted(changed)} change before the loop")
+
+    for inner in ast.walk(node):
+        if isinstance(inner, (ast.Global, ast.Nonlocal)):
+            raise _SplitRejected("global/nonlocal declaration")
+
+    checker = _IterationChecker(
+        variable, accumulator, initial, _stored_names(loop.body), line_offset
+    )
+    checker.check(loop.body)
+    if not checker.kinds:
+        raise _SplitRejected(f"the loop does not update '{accumulator}'")
+    return LoopSplit(
+        variable=variable,
+        iterable=(
+            ast.unparse(loop.iter)
+            if hasattr(ast, "unparse")
+            else _ast_to_string(loop.iter)
+        ),
+        accumulator=accumulator,
+        combine=checker.kinds.pop(),
+        loop_index=len(body) - 2,
+        lineno=loop.lineno + line_offset,
+        shards=_shardable_parameters(node, loop, parameters),
+    )
+
+
+def _indexed_by(subscript: ast.Subscript) -> Optional[str]:
+    """Name of a plain-name index, e.g. ``i`` in ``x[i]``."""
+    index = subscript.slice
+    if isinstance(index, getattr(ast, "Index", ())):  # Python 3.8
+        index = index.value  # type: ignore[attr-defined]
+    return index.id if isinstance(index, ast.Name) else None
+
+
+def _shardable_parameters(
+    node: ast.FunctionDef, loop: ast.For, parameters: Set[str]
+) -> Tuple[Tuple[str, str], ...]:
+    """
+    Parameters a chunk only needs its own slice of.
+
+    A parameter qualifies if the function reads it nowhere but in the loop:
+    either as the iterable itself, or in the loop header (``len(x)``) and
+    as ``x[i]`` / ``x.iloc[i]`` in the body, ``i`` being the loop variable.
+    """
+    variable = loop.target.id  # type: ignore[attr-defined]
+    indexed_ok = variable not in _stored_names(loop.body)
+    shards = []
+    for name in sorted(parameters):
+        uses = [n for n in ast.walk(node) if isinstance(n, ast.Name) and n.id == name]
+        if not uses:
+            continue
+        if isinstance(loop.iter, ast.Name) and loop.iter.id == name:
+            if len(uses) == 1:
+                shards.append((name, SHARD_ITER))
+            continue
+        if not indexed_ok:
+            continue
+        allowed = {id(n) for n in ast.walk(loop.iter) if isinstance(n, ast.Name)}
+        accesses = set()
+        for stmt in loop.body:
+            for sub in ast.walk(stmt):
+                if not (
+                    isinstance(sub, ast.Subscript)
+                    and isinstance(sub.ctx, ast.Load)
+                    and _indexed_by(sub) == variable
+                ):
+                    continue
+                value = sub.value
+                if isinstance(value, ast.Name) and value.id == name:
+                    allowed.add(id(value))
+                    accesses.add(SHARD_ITEM)
+                elif (
+                    isinstance(value, ast.Attribute)
+                    and value.attr == "iloc"
+                    and isinstance(value.value, ast.Name)
+                    and value.value.id == name
+                ):
+                    allowed.add(id(value.value))
+                    accesses.add(SHARD_ILOC)
+        if len(accesses) == 1 and all(id(n) in allowed for n in uses):
+            shards.append((name, accesses.pop()))
+    return tuple(shards)
+
+
+class _ShardIndexer(ast.NodeTransformer):
+    """Rewrite ``x[i]`` to ``x[i - _shard_offset]`` for sharded ``x``."""
+
+    def __init__(self, variable: str, names: Set[str]):
+        self.variable = variable
+        self.names = names
+
+    def visit_Subscript(self, node: ast.Subscript) -> ast.AST:
+        self.generic_visit(node)
+        if _indexed_by(node) != self.variable:
+            return node
+        root = node.value
+        if isinstance(root, ast.Attribute) and root.attr == "iloc":
+            root = root.value
+        if not (isinstance(root, ast.Name) and root.id in self.names):
+            return node
+        offset = ast.BinOp(
+            left=ast.Name(id=self.variable, ctx=ast.Load()),
+            op=ast.Sub(),
+            right=ast.Name(id=_SHARD_OFFSET, ctx=ast.Load()),
+        )
+        if isinstance(node.slice, getattr(ast, "Index", ())):  # Python 3.8
+            node.slice = ast.Index(value=offset)  # type: ignore[call-arg]
+        else:
+            node.slice = offset
+        return node
+
+
+def analyze_loop_split(func: Callable) -> Optional[LoopSplit]:
+    """
+    Return the loop of ``func`` that can be split into chunks, if any.
+
+    The result is cached per code object.
+    """
+    if getattr(func, "__code__", None) is None:
+        return None
+    return cached_analysis(func, "loop_split", lambda: _find_split(func))
+
+
+def _find_split(func: Callable) -> Optional[LoopSplit]:
+    try:
+        split: Optional[LoopSplit] = _analyze(func)
+        logger.debug(
+            f"🔀 {func.__qualname__}: loop over '{split.iterable}' can be split"
+        )
+    except _SplitRejected as e:
+        logger.debug(f"{func.__qualname__}: loop not split ({e})")
+        split = None
+    except (OSError, TypeError, SyntaxError) as e:
+        logger.debug(f"{func.__qualname__}: source unavailable ({e})")
+        split = None
+    return split
+
+
+def _chunk_iter(iterable: Any, *specs: Any) -> Any:
+    """Iterate the chunk's share of ``iterable``.
+
+    A spec is either the chunk's loop values or a positional ``slice``; with
+    no spec the whole iterable is used.
+    """
+    for spec in specs:
+        if spec is None:
+            continue
+        if isinstance(spec, slice):
+            if isinstance(iterable, _SLICEABLE) or type(iterable).__name__ == "ndarray":
+                return iterable[spec]
+            return itertools.islice(iterable, spec.start, spec.stop, spec.step)
+        return spec
+    return iterable
+
+
+def _compile_factory(func: Callable, split: LoopSplit) -> Callable:
+    """Compile a factory that builds the chunk variant of ``func``."""
+    node = copy.deepcopy(_function_def(func))
+    ast.increment_lineno(node, func.__code__.co_firstlineno - 1)
+    node.decorator_list = []
+    node.returns = None
+    arguments = node.args
+    for arg in arguments.posonlyargs + arguments.args + arguments.kwonlyargs:
+        arg.annotation = None
+    for arg in (arguments.vararg, arguments.kwarg):
+        if arg is not None:
+            arg.annotation = None
+    # Defaults are restored from the original function object
+    arguments.defaults = []
+    for name in split.chunk_kwargs:
+        arguments.kwonlyargs.append(ast.arg(arg=name))
+    arguments.kw_defaults = [None] * len(arguments.kwonlyargs)
+
+    loop = node.body[split.loop_index]
+    indexed = {name for name, access in split.shards if access != SHARD_ITER}
+    if indexed:
+        indexer = _ShardIndexer(split.variable, indexed)
+        loop.body = [indexer.visit(stmt) for stmt in loop.body]
+    loop.iter = ast.Call(
+        func=ast.Name(id=_CHUNK_ITER, ctx=ast.Load()),
+        args=[loop.iter]
+        + [ast.Name(id=name, ctx=ast.Load()) for name in split.chunk_kwargs[:2]],
+        keywords=[],
+    )
+
+    factory_args = [_CHUNK_ITER] + list(func.__code__.co_freevars)
+    factory = ast.FunctionDef(
+        name=_FACTORY,
+        args=ast.arguments(
+            posonlyargs=[],
+            args=[ast.arg(arg=name) for name in factory_args],
+            kwonlyargs=[],
+            kw_defaults=[],
+            defaults=[],
+        ),
+        body=[node, ast.Return(value=ast.Name(id=node.name, ctx=ast.Load()))],
+        decorator_list=[],
+    )
+    for added in (factory, factory.body[1]):
+        ast.copy_location(added, node)
+    module = ast.fix_missing_locations(ast.Module(body=[factory], type_ignores=[]))
+    code = compile(module, func.__code__.co_filename, "exec")
+    namespace: Dict[str, Any] = {}
+    exec(code, func.__globals__, namespace)
+    return namespace[_FACTORY]
+
+
+def get_chunk_variant(func: Callable) -> Callable:
+    """
+    Return the chunk variant of ``func``.
+
+    The variant takes the same arguments plus the keyword arguments listed
+    in :attr:`LoopSplit.chunk_kwargs`, and its loop runs only the values in
+    ``_parallel_<var>`` or ``_chunk_range_<var>`` (a list, range or
+    positional ``slice``). Indexed shards (:attr:`LoopSplit.shards`) are
+    read at ``i - _shard_offset``, for chunks passed only a slice of them.
+    Called without them it behaves like ``func``.
+
+    Raises:
+        ValueError: If ``func`` has no splittable loop
+    """
+    split = analyze_loop_split(func)
+    if split is None:
+        raise ValueError(f"{func.__qualname__} has no loop that can be split")
+    factory = cached_analysis(
+        func, "chunk_factory", lambda: _compile_factory(func, split)
+    )
+
+    cells = [cell.cell_contents for cell in func.__closure__ or ()]
+    variant = factory(_chunk_iter, *cells)
+    variant.__defaults__ = func.__defaults__
+    variant.__kwdefaults__ = dict(func.__kwdefaults__ or {})
+    variant.__kwdefaults__.update({name: None for name in split.chunk_kwargs})
+    variant.__kwdefaults__[_SHARD_OFFSET] = 0
+    variant.__module__ = func.__module__
+    variant.__qualname__ = f"{func.__qualname__}.<chunk>"
+    variant.__doc__ = func.__doc__
+    return variant
+
+
+def _load_wrapped_chunk_function(module: str, qualname: str) -> "ChunkFunction":
+    target: Any = importlib.import_module(module)
+    for part in qualname.split("."):
+        target = getattr(target, part)
+    return ChunkFunction(target.__wrapped__)
+
+
+class ChunkFunction:
+    """
+    Picklable callable that runs the chunk variant of a function.
+
+    Only the original function is pickled; worker processes compile the
+    variant themselves. Functions decorated with :func:`clustrix.cluster`
+    are pickled through the decorated module attribute.
+    """
+
+    def __init__(self, func: Callable):
+        self.func = func
+        self.__wrapped__ = func
+        self._variant: Optional[Callable] = None
+
+    def __call__(self, *args, **kwargs):
+        if self._variant is None:
+            self._variant = get_chunk_variant(self.func)
+        return self._variant(*args, **kwargs)
+
+    @property
+    def __code__(self) -> types.CodeType:
+        # Calibrations are cached per code object, so measure the variant
+        if self._variant is None:
+            self._variant = get_chunk_variant(self.func)
+        return self._variant.__code__
+
+    def __repr__(self) -> str:
+        return f"ChunkFunction({self.func.__qualname__})"
+
+    def __reduce__(self):
+        func = self.func
+        module, qualname = func.__module__, func.__qualname__
+        try:
+            target: Any = importlib.import_module(module)
+            for part in qualname.split("."):
+                target = getattr(target, part)
+        except (ImportError, AttributeError):
+            target = None
+        if target is not func and getattr(target, "__wrapped__", None) is func:
+            return _load_wrapped_chunk_function, (module, qualname)
+        return ChunkFunction, (func,)
+
+
+def plan_loop_split(
+    func: Callable, args: tuple = (), kwargs: Optional[Dict[str, Any]] = None
+) -> Optional[LoopSplitPlan]:
+    """
+    Plan chunked execution of ``func(*args, **kwargs)``.
+
+    The iteration space is evaluated against the call's arguments: ``range``
+    bounds such as ``len(x)``, ``x.shape[0]`` or ``n // 2``, or a sequence
+    argument iterated directly (split by position). Unknown bounds disable
+    splitting rather than being guessed.
+
+    Returns:
+        A LoopSplitPlan, or None when the function has no splittable loop or
+        its iteration space cannot be determined from the arguments
+    """
+    split = analyze_loop_split(func)
+    if split is None:
+        return None
+    try:
+        loop = _function_def(func).body[split.loop_index]
+    except (OSError, TypeError, SyntaxError, _SplitRejected):
+        return None
+    local_vars = bind_arguments(func, args, kwargs)
+    loop_info = LoopDetector(local_vars)._analyze_for_loop(loop)
+    if loop_info is not None and loop_info.range_info:
+        range_info = loop_info.range_info
+        if range_info["step"] == 0:
+            return None
+        iterations = range(range_info["start"], range_info["stop"], range_info["step"])
+        positional = False
+    else:
+        sequence = SafeRangeEvaluator(local_vars).resolve_iterable(loop.iter)
+        if sequence is None:
+            logger.debug(
+                f"{func.__qualname__}: iteration space of '{split.iterable}' unknown"
+            )
+            return None
+        iterations, positional = range(len(sequence)), True
+    return LoopSplitPlan(
+        split=split,
+        iterations=iterations,
+        chunk_function=ChunkFunction(func),
+        positional=positional,
+    )
+
+
+def tree_reduce(partials: List[Any], kind: str, from_files: bool = False) -> Any:
+    """
+    Combine chunk partials pairwise, in chunk order, as a balanced tree.
+
+    Pairwise combination keeps merges order-preserving (later chunks win)
+    and limits floating-point error growth in sums to ``O(log n)``.
+
+    The function is self-contained so it can be shipped by value and run as
+    a cluster job next to the partial results (see :func:`remote_tree_reduce`).
+
+    Args:
+        partials: Chunk results, or paths of pickled results
+        kind: Combine kind (``"concat"``, ``"merge"``, ``"sum"``, ...)
+        from_files: Load each partial from the pickle file it names
+
+    Returns:
+        The combined value
+    """
+    import operator
+    import pickle
+
+    def elementwise(name, builtin):
+        def combine(a, b):
+            if type(a).__name__ == "ndarray" or type(b).__name__ == "ndarray":
+                import numpy
+
+                return getattr(numpy, name)(a, b)
+            return builtin(a, b)
+
+        return combine
+
+    combiners = {
+        "concat": operator.add,
+        "merge": lambda a, b: {**a, **b},
+        "sum": operator.add,
+        "product": operator.mul,
+        "min": elementwise("minimum", min),
+        "max": elementwise("maximum", max),
+    }
+    if kind not in combiners:
+        raise ValueError(f"Unknown combine kind: {kind}")
+    if not partials:
+        raise ValueError("Nothing to reduce")
+    if from_files:
+        loaded = []
+        for path in partials:
+            with open(path, "rb") as f:
+                loaded.append(pickle.load(f))
+        partials = loaded
+
+    combine = combiners[kind]
+    level = list(partials)
+    while len(level) > 1:
+        paired = [combine(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+    return level[0]
+
+
+def remote_tree_reduce() -> Callable:
+    """
+    A copy of :func:`tree_reduce` that serializes by value.
+
+    Cluster jobs cannot assume clustrix is importable remotely, so the copy
+    lives in ``__main__`` with only builtins as globals.
+    """
+    reducer = types.FunctionType(
+        tree_reduce.__code__,
+        {"__builtins__": builtins, "__name__": "__main__"},
+        "tree_reduce",
+        tree_reduce.__defaults__,
+    )
+    reducer.__module__ = "__main__"
+    return reducer
+
+
+def combine_chunk_results(split: LoopSplit, results: List[Any]) -> Any:
+    """Combine the accumulators returned by each chunk, in chunk order."""
+    if split.combine in (CONCAT, MERGE):
+        # Each chunk built its share of one container; registered types
+        # (arrays, frames, tables) are joined along the loop axis
+        combined, value = combine_by_type(results)
+        if combined:
+            return value
+    if split.combine == CONCAT:
+        return list(itertools.chain.from_iterable(results))
+    if split.combine == MERGE:
+        # One pass; pairwise merging would copy the growing dict log(n) times
+        return merge_dicts(results)
+    return tree_reduce(results, split.combine)
+
+
+def clear_loop_split_cache() -> None:
+    """Forget cached loop analyses and compiled variants."""
+    cache = get_analysis_cache()
+    cache.discard("loop_split")
+    cache.discard("chunk_factory")
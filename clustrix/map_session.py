@@ -0,0 +1,252 @@
+"""Durable, resumable sessions for parallel ``@cluster`` runs.
+
+Without a session, one failed chunk of a parallel run (or a crashed client)
+loses every completed chunk's result, and the whole sweep is resubmitted.
+With ``checkpoint_parallel`` enabled (``configure(checkpoint_parallel=True)``
+or ``@cluster(checkpoint=True)``), each run keeps a session under
+``<local_cache_dir>/map_sessions/<session id>``:
+
+- ``manifest.jsonl``: an append-only journal of each chunk's job ID, status
+  and the handle needed to reattach to its job
+- ``results/<index>.pkl``: each chunk's result, written as soon as it is
+  collected
+
+The session ID is derived from the function, the call's arguments, the
+cluster environment and the chunk layout, so calling the function again
+with the same inputs finds the session: completed chunks are loaded from
+disk, jobs that are still queued or running are reattached, and only
+failed or missing chunks are resubmitted. The session is removed once the
+run completes.
+"""
+
+import json
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from .result_cache import environment_fingerprint, result_cache_key
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.jsonl"
+
+PENDING = "pending"
+SUBMITTED = "submitted"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class ChunkFailuresError(RuntimeError):
+    """Some chunks of a checkpointed parallel run failed."""
+
+    def __init__(self, session_id: str, failures: Dict[int, str]):
+        self.session_id = session_id
+        self.failures = failures
+        indices = ", ".join(str(i) for i in sorted(failures)[:10])
+        more = "..." if len(failures) > 10 else ""
+        super().__init__(
+            f"{len(failures)} chunk(s) failed ({indices}{more}). Completed chunks "
+            f"are saved in map session {session_id}; call the function again with "
+            f"the same arguments to resubmit only the failed chunks."
+        )
+
+
+@dataclass
+class ChunkState:
+    """Latest journal entry of one chunk."""
+
+    index: int
+    status: str = PENDING
+    job_id: Optional[str] = None
+    handle: Optional[Dict[str, Any]] = None  # From ClusterExecutor.job_handle
+    error: Optional[str] = None
+    attempts: int = 0
+    updated_at: float = field(default_factory=time.time)
+
+
+def map_sessions_dir(config) -> str:
+    return os.path.join(os.path.expanduser(config.local_cache_dir), "map_sessions")
+
+
+class MapSession:
+    """
+    Manifest and result store of one parallel run.
+
+    Example:
+        >>> session = MapSession("/tmp/sessions/abc", n_chunks=500)
+        >>> session.submitted(3, "12345", handle)
+        >>> session.completed(3, result)
+        >>> session.load_result(3)
+    """
+
+    def __init__(self, path: str, n_chunks: int):
+        self.path = path
+        self.session_id = os.path.basename(path)
+        self.n_chunks = n_chunks
+        self.chunks: Dict[int, ChunkState] = {i: ChunkState(i) for i in range(n_chunks)}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(path, "results"), exist_ok=True)
+        self._replay()
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.path, MANIFEST_FILE)
+
+    def result_path(self, index: int) -> str:
+        return os.path.join(self.path, "results", f"{index}.pkl")
+
+    def _replay(self) -> None:
+        try:
+            with open(self.manifest_path) as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+        for line in lines:
+            try:
+                state = ChunkState(**json.loads(line))
+            except (ValueError, TypeError):
+                continue  # Torn final line after a crash
+            if 0 <= state.index < self.n_chunks:
+                self.chunks[state.index] = state
+        # A completed chunk whose result file is gone must be recomputed
+        for state in self.chunks.values():
+            if state.status == COMPLETED and not os.path.exists(
+                self.result_path(state.index)
+            ):
+                state.status = PENDING
+
+    def _append(self, state: ChunkState) -> None:
+        state.updated_at = time.time()
+        line = json.dumps(asdict(state), default=str) + "\n"
+        with self._lock:
+            self.chunks[state.index] = state
+            with open(self.manifest_path, "a") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    @property
+    def resumed(self) -> bool:
+        return any(state.status != PENDING for state in self.chunks.values())
+
+    def indices(self, status: str) -> List[int]:
+        return [i for i, state in sorted(self.chunks.items()) if state.status == status]
+
+    def submitted(
+        self, index: int, job_id: str, handle: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Record that chunk ``index`` was submitted as ``job_id``."""
+        previous = self.chunks[index]
+        self._append(
+            ChunkState(
+                index,
+                SUBMITTED,
+                job_id=job_id,
+                handle=handle,
+                attempts=previous.attempts + 1,
+            )
+        )
+
+    def completed(self, index: int, result: Any) -> None:
+        """Store chunk ``index``'s result, then mark it completed."""
+        path = self.result_path(index)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        previous = self.chunks[index]
+        self._append(
+            ChunkState(
+                index, COMPLETED, job_id=previous.job_id, attempts=previous.attempts
+            )
+        )
+
+    def failed(self, index: int, error: BaseException) -> None:
+        previous = self.chunks[index]
+        self._append(
+            ChunkState(
+                index,
+                FAILED,
+                job_id=previous.job_id,
+                error=f"{type(error).__name__}: {error}",
+                attempts=previous.attempts,
+            )
+        )
+
+    def load_result(self, index: int) -> Any:
+        with open(self.result_path(index), "rb") as f:
+            return pickle.load(f)
+
+    def discard(self) -> None:
+        """Delete the session's manifest and stored results."""
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def open_map_session(
+    config,
+    func: Callable,
+    args: tuple,
+    kwargs: dict,
+    job_config: Dict[str, Any],
+    n_chunks: int,
+    layout: Any = None,
+) -> Optional[MapSession]:
+    """
+    Open the session of a parallel run, resuming it if it exists.
+
+    Args:
+        config: Cluster configuration
+        func: The (undecorated) function being run
+        args: Positional arguments of the call
+        kwargs: Keyword arguments of the call
+        job_config: Resources requested for each chunk
+        n_chunks: Number of chunks the run is split into
+        layout: Anything else that determines the chunks' contents
+
+    Returns:
+        The session, or None if the call's arguments cannot be hashed
+    """
+    key = result_cache_key(
+        func,
+        args,
+        kwargs,
+        (
+            environment_fingerprint(config, "remote", job_config),
+            sorted((k, repr(v)) for k, v in job_config.items()),
+            n_chunks,
+            layout,
+        ),
+    )
+    if key is None:
+        return None
+    session = MapSession(os.path.join(map_sessions_dir(config), key.name), n_chunks)
+    if session.resumed:
+        logger.info(
+            f"🔁 Resuming map session {session.session_id}: "
+            f"{len(session.indices(COMPLETED))}/{n_chunks} chunks completed, "
+            f"{len(session.indices(SUBMITTED))} submitted, "
+            f"{len(session.indices(FAILED))} failed"
+        )
+    return session
+
+
+def clear_map_sessions(config) -> int:
+    """Delete all saved map sessions; returns how many were removed."""
+    root = map_sessions_dir(config)
+    if not os.path.isdir(root):
+        return 0
+    names = os.listdir(root)
+    for name in names:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    return len(names)
@@ -0,0 +1,220 @@
+"""In-memory cache of remote filesystem metadata.
+
+Data-discovery code tends to probe the same paths over and over
+(``cluster_exists``, ``cluster_isfile``, ``cluster_stat``), and every probe
+of a remote filesystem is a network round trip. :class:`MetadataCache`
+remembers stat results, directory listings and negative lookups for
+``ttl`` seconds, evicting least recently used entries beyond
+``max_entries``.
+
+A cached directory listing also answers stat-style lookups of the entries
+in it, including negative ones: once ``data/`` has been listed, probing
+thousands of ``data/part-*.csv`` paths costs no further requests.
+Symbolic links are the exception, as listings describe the link rather
+than its target.
+
+Writes made through clustrix invalidate the affected entries explicitly
+(see :func:`clustrix.filesystem.invalidate_metadata`); changes made by
+other processes become visible once entries expire.
+"""
+
+import posixpath
+import stat
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+DEFAULT_TTL = 30.0
+DEFAULT_MAX_ENTRIES = 100_000
+
+_ATTRIBUTES = "attributes"
+_LISTING = "listing"
+
+
+@dataclass
+class MetadataCacheStats:
+    """Counters of a metadata cache."""
+
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+    evictions: int = 0
+    entries: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class MetadataCache:
+    """
+    TTL and LRU bounded cache of path attributes and directory listings.
+
+    Attributes are SFTP-style objects with ``st_mode``; None records that a
+    path does not exist. Listings map entry names to their attributes.
+
+    Args:
+        ttl: Seconds an entry is trusted
+        max_entries: Evict least recently used entries beyond this many,
+            counting each name in a cached listing as an entry
+        clock: Monotonic time source (for tests)
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        # (kind, path) -> (expires at, value, size)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any, int]]" = (
+            OrderedDict()
+        )
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = MetadataCacheStats()
+
+    @staticmethod
+    def _normalize(path: str) -> str:
+        return posixpath.normpath(path)
+
+    def _lookup(self, kind: str, path: str) -> Tuple[bool, Any]:
+        """Fresh entry for ``(kind, path)``; call with the lock held."""
+        key = (kind, path)
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] <= self._clock():
+            self._remove(key)
+            return False, None
+        self._entries.move_to_end(key)
+        return True, entry[1]
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        _, _, size = self._entries.pop(key)
+        self._size -= size
+
+    def _store(self, kind: str, path: str, value: Any, size: int = 1) -> None:
+        key = (kind, path)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (self._clock() + self.ttl, value, size)
+            self._size += size
+            while self._size > self.max_entries and len(self._entries) > 1:
+                self._remove(next(iter(self._entries)))
+                self._stats.evictions += 1
+
+    def _count(self, hit: bool) -> None:
+        if hit:
+            self._stats.hits += 1
+        else:
+            self._stats.misses += 1
+
+    def get_attributes(self, path: str) -> Tuple[bool, Any]:
+        """
+        Look up the attributes of ``path``.
+
+        Returns:
+            ``(True, attributes)``, ``(True, None)`` if the path is known
+            not to exist, or ``(False, None)`` on a miss
+        """
+        path = self._normalize(path)
+        with self._lock:
+            hit, attrs = self._lookup(_ATTRIBUTES, path)
+            if not hit:
+                parent, name = posixpath.split(path)
+                listed, listing = self._lookup(_LISTING, parent)
+                if listed and listing is not None:
+                    attrs = listing.get(name)
+                    # A listing describes links, not what they point to
+                    hit = attrs is None or not stat.S_ISLNK(attrs.st_mode or 0)
+            self._count(hit)
+            return hit, attrs if hit else None
+
+    def put_attributes(self, path: str, attrs: Any) -> None:
+        """Remember the attributes of ``path`` (None if it does not exist)."""
+        self._store(_ATTRIBUTES, self._normalize(path), attrs)
+
+    def get_listing(self, path: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Look up the listing of directory ``path``.
+
+        Returns:
+            ``(True, {name: attributes})``, ``(True, None)`` if the path is
+            known not to be a listable directory, or ``(False, None)``
+        """
+        with self._lock:
+            hit, listing = self._lookup(_LISTING, self._normalize(path))
+            self._count(hit)
+            return hit, listing
+
+    def put_listing(self, path: str, listing: Optional[Dict[str, Any]]) -> None:
+        """Remember the entries of directory ``path`` (None if unlistable)."""
+        size = 1 + (len(listing) if listing else 0)
+        self._store(_LISTING, self._normalize(path), listing, size)
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """
+        Forget what is known about ``path``, or everything.
+
+        Drops ``path`` itself, everything below it, and its ancestors,
+        whose listings (or existence, for directories a write created)
+        may have changed.
+        """
+        with self._lock:
+            if path is None:
+                self._stats.invalidations += len(self._entries)
+                self._entries.clear()
+                self._size = 0
+                return
+            path = self._normalize(path)
+            prefix = path.rstrip("/") + "/"
+            ancestors = set()
+            parent = posixpath.dirname(path)
+            while parent not in ancestors:
+                ancestors.add(parent)
+                parent = posixpath.dirname(parent)
+            stale = [
+                key
+                for key in self._entries
+                if key[1] == path or key[1].startswith(prefix) or key[1] in ancestors
+            ]
+            for key in stale:
+                self._remove(key)
+            self._stats.invalidations += len(stale)
+
+    def stats(self) -> MetadataCacheStats:
+        with self._lock:
+            return MetadataCacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                invalidations=self._stats.invalidations,
+                evictions=self._stats.evictions,
+                entries=len(self._entries),
+            )
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = MetadataCacheStats()
+
+
+def metadata_cache_enabled(config) -> bool:
+    return getattr(config, "filesystem_cache", False) is True
+
+
+def create_metadata_cache(config) -> MetadataCache:
+    """A MetadataCache sized by ``config``."""
+    ttl = getattr(config, "filesystem_cache_ttl", DEFAULT_TTL)
+    if not isinstance(ttl, (int, float)) or isinstance(ttl, bool) or ttl < 0:
+        ttl = DEFAULT_TTL
+    max_entries = getattr(config, "filesystem_cache_max_entries", DEFAULT_MAX_ENTRIES)
+    if not isinstance(max_entries, int) or isinstance(max_entries, bool):
+        max_entries = DEFAULT_MAX_ENTRIES
+    return MetadataCache(ttl=ttl, max_entries=max(1, max_entries))
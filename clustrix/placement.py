@@ -0,0 +1,630 @@
+"""Cost-model placement of ``@cluster`` calls on this machine or the cluster.
+
+By default (``placement="cluster"``) calls run on the cluster whenever one
+is configured. Submitting a job is only worth it when the work outweighs
+the cost of getting it onto a node, though, so with ``placement="auto"``
+the placement engine estimates for each call:
+
+- local runtime: recorded runs of the function, or its calibration
+  measurements (see :mod:`clustrix.calibration`), scaled by the iteration
+  count of its loop for this call
+- transfer time: the size of the arguments that would be uploaded
+- queue wait: live ``squeue``/``sprio`` data on SLURM (cached for
+  ``placement_queue_ttl`` seconds), or a per-scheduler default
+- remote speedup: ``placement_remote_speedup`` per core, times the number
+  of jobs a loop can be split into
+
+and picks the cheapest of ``local_serial``, ``local_parallel``,
+``remote_single`` and ``remote_array``. Calls estimated to take longer than
+``placement_max_local_seconds`` locally always go to the cluster, as do
+calls that request GPUs, a cloud provider, or more cores or memory than
+this machine has. While nothing is known about a function's runtime, calls
+with fewer loop iterations than ``local_parallel_threshold`` run locally
+and everything else goes to the cluster. Remote runs are recorded too, and
+refine the estimated compute time of later jobs; they are never taken as
+local runtimes, since cluster nodes differ from this machine.
+
+Set ``placement`` in the config or on the decorator to ``"auto"`` to use
+the model, or to one of the four modes to force it. The latest decision
+and its reasoning are available from :func:`explain_placement`.
+
+Example:
+    >>> decision = decide_placement(func, args, kwargs, config)
+    >>> print(decision.reason)
+    estimated local_serial 0.012s, remote_single 47.1s (runtime from history; ...)
+"""
+
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .calibration import get_cached_calibration
+from .cloud_placement import _parse_memory_gb
+from .result_cache import function_id
+
+logger = logging.getLogger(__name__)
+
+LOCAL_SERIAL = "local_serial"
+LOCAL_PARALLEL = "local_parallel"
+REMOTE_SINGLE = "remote_single"
+REMOTE_ARRAY = "remote_array"
+PLACEMENT_MODES = (LOCAL_SERIAL, LOCAL_PARALLEL, REMOTE_SINGLE, REMOTE_ARRAY)
+CLUSTER = "cluster"  # Remote whenever a cluster is configured (the default)
+AUTO = "auto"  # Choose from the cost model
+
+# Cost model constants (seconds unless noted). Rough figures; the queue wait
+# dominates on batch schedulers and is probed live where possible.
+REMOTE_SETUP_SECONDS = 5.0  # Connect, upload, activate the environment
+REMOTE_COMBINE_SECONDS = 2.0  # Collecting and combining array results
+LOCAL_PARALLEL_STARTUP = 0.05  # Worker pool startup and chunk dispatch
+TRANSFER_BYTES_PER_SECOND = 20e6
+SECONDS_PER_JOB_AHEAD = 2.0  # Queue wait added by each higher-priority job
+DEFAULT_QUEUE_WAIT = {"slurm": 30.0, "pbs": 30.0, "sge": 30.0, "ssh": 0.0}
+CLOUD_QUEUE_WAIT = 60.0  # Kubernetes and cloud providers: scheduling/startup
+MIN_REMOTE_OBSERVATION = 1.0  # Faster round trips cannot include a submission
+HISTORY_ALPHA = 0.5  # Weight of the newest run in the runtime averages
+HISTORY_SAVE_INTERVAL = 5.0
+HISTORY_FILE = "placement_history.json"
+MAX_SIZED_ITEMS = 1000  # Container items measured before extrapolating
+
+
+@dataclass
+class PlacementEstimate:
+    """Inputs and per-mode estimates behind a placement decision."""
+
+    iterations: Optional[int] = None
+    local_seconds: Optional[float] = None  # Serial runtime on this machine
+    local_source: Optional[str] = None  # history or calibration
+    payload_bytes: int = 0
+    transfer_seconds: float = 0.0
+    queue_wait_seconds: float = 0.0
+    queue_source: str = "default"  # squeue, cache or default
+    remote_overhead_seconds: float = 0.0  # Queue wait, setup, transfer, polling
+    remote_speedup: float = 1.0
+    seconds: Dict[str, float] = field(default_factory=dict)  # Per mode
+
+
+@dataclass
+class PlacementDecision:
+    """Where a call runs and why."""
+
+    mode: str
+    reason: str
+    estimate: PlacementEstimate = field(default_factory=PlacementEstimate)
+    overridden: bool = False
+    decided_at: float = field(default_factory=time.time)
+
+    @property
+    def is_remote(self) -> bool:
+        return self.mode in (REMOTE_SINGLE, REMOTE_ARRAY)
+
+    @property
+    def execution_mode(self) -> str:
+        """``'remote'`` or ``'local'``."""
+        return "remote" if self.is_remote else "local"
+
+    @property
+    def parallel(self) -> bool:
+        return self.mode in (LOCAL_PARALLEL, REMOTE_ARRAY)
+
+
+@dataclass
+class RuntimeRecord:
+    """Averaged runtimes of one function."""
+
+    local_seconds: Optional[float] = None  # Per iteration if per_iteration
+    per_iteration: bool = False
+    local_runs: int = 0
+    remote_compute_seconds: Optional[float] = None  # Per call, scaled to speedup 1
+    remote_runs: int = 0
+
+    def local_estimate(self, iterations: Optional[int]) -> Optional[float]:
+        if self.local_seconds is None:
+            return None
+        if self.per_iteration:
+            if iterations is None:
+                return None
+            return self.local_seconds * iterations
+        return self.local_seconds
+
+
+def _average(old: Optional[float], new: float) -> float:
+    return new if old is None else HISTORY_ALPHA * new + (1 - HISTORY_ALPHA) * old
+
+
+class PlacementHistory:
+    """
+    Recorded runtimes per function, saved under ``local_cache_dir``.
+
+    Local runs record their wall time, per iteration when the call's loop
+    size is known. Remote runs record the wall time left after subtracting
+    the modelled queue wait and overheads, as an upper bound on compute.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._records: Dict[str, RuntimeRecord] = {}
+        self._lock = threading.Lock()
+        self._loaded = path is None
+        self._dirty = False
+        self._saved_at = 0.0
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            self._records.update(
+                {key: RuntimeRecord(**value) for key, value in data.items()}
+            )
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable placement history {self.path}: {e}")
+
+    def get(self, func: Callable) -> Optional[RuntimeRecord]:
+        with self._lock:
+            self._load()
+            return self._records.get(function_id(func))
+
+    def _update(self, func: Callable, update: Callable[[RuntimeRecord], None]) -> None:
+        with self._lock:
+            self._load()
+            record = self._records.setdefault(function_id(func), RuntimeRecord())
+            update(record)
+            self._dirty = True
+            due = time.time() - self._saved_at >= HISTORY_SAVE_INTERVAL
+        if due:
+            self.save()
+
+    def record_local(
+        self, func: Callable, seconds: float, iterations: Optional[int] = None
+    ) -> None:
+        """Record a serial local run of ``func``."""
+
+        def update(record: RuntimeRecord) -> None:
+            per_iteration = bool(iterations)
+            value = seconds / iterations if per_iteration else seconds
+            if per_iteration != record.per_iteration:
+                record.local_seconds = None
+                record.per_iteration = per_iteration
+            record.local_seconds = _average(record.local_seconds, value)
+            record.local_runs += 1
+
+        self._update(func, update)
+
+    def record_remote(
+        self, func: Callable, seconds: float, decision: PlacementDecision
+    ) -> None:
+        """Record a single remote job of ``func`` that took ``seconds``."""
+        if seconds < MIN_REMOTE_OBSERVATION:
+            return
+        estimate = decision.estimate
+        compute = (
+            max(0.0, seconds - estimate.remote_overhead_seconds)
+            * estimate.remote_speedup
+        )
+
+        def update(record: RuntimeRecord) -> None:
+            record.remote_compute_seconds = _average(
+                record.remote_compute_seconds, compute
+            )
+            record.remote_runs += 1
+
+        self._update(func, update)
+
+    def save(self) -> None:
+        """Write the history to disk if it changed."""
+        with self._lock:
+            if self.path is None or not self._dirty:
+                return
+            data = {key: vars(record) for key, record in self._records.items()}
+            self._dirty = False
+            self._saved_at = time.time()
+        try:
+            directory = os.path.dirname(self.path)
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.debug(f"Could not save placement history: {e}")
+
+    def clear(self, func: Optional[Callable] = None) -> None:
+        with self._lock:
+            self._load()
+            if func is None:
+                self._records.clear()
+            else:
+                self._records.pop(function_id(func), None)
+            self._dirty = True
+        self.save()
+
+
+_histories: Dict[str, PlacementHistory] = {}
+_histories_lock = threading.Lock()
+_queue_waits: Dict[Any, Any] = {}  # (host, partition) -> (probed at, seconds)
+_queue_lock = threading.Lock()
+_last_decisions: Dict[str, PlacementDecision] = {}
+
+
+@atexit.register
+def _save_histories() -> None:
+    with _histories_lock:
+        histories = list(_histories.values())
+    for history in histories:
+        history.save()
+
+
+def get_placement_history(config) -> PlacementHistory:
+    """Return the runtime history kept under ``config.local_cache_dir``."""
+    path = os.path.join(os.path.expanduser(config.local_cache_dir), HISTORY_FILE)
+    with _histories_lock:
+        history = _histories.get(path)
+        if history is None:
+            history = _histories[path] = PlacementHistory(path)
+        return history
+
+
+def call_iterations(func: Callable, args: tuple, kwargs: dict) -> Optional[int]:
+    """Iteration count of the loop a call would be split on, if known."""
+    from .loop_splitting import plan_loop_split
+    from .utils import detect_loops
+
+    try:
+        split_plan = plan_loop_split(func, args, kwargs)
+        if split_plan is not None:
+            return len(split_plan.iterations)
+        loop_info = detect_loops(func, args, kwargs)
+        if loop_info and "range" in loop_info:
+            return len(loop_info["range"])
+    except Exception:
+        pass
+    return None
+
+
+def payload_bytes(obj: Any, _depth: int = 0) -> int:
+    """Approximate serialized size of ``obj`` without pickling it."""
+    nbytes = getattr(obj, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    if isinstance(obj, (bytes, bytearray, memoryview, str)):
+        return len(obj)
+    if isinstance(obj, dict):
+        obj = list(obj.keys()) + list(obj.values())
+    if isinstance(obj, (list, tuple, set, frozenset)) and _depth < 4:
+        items = list(obj)[:MAX_SIZED_ITEMS] if len(obj) > MAX_SIZED_ITEMS else obj
+        measured = sum(payload_bytes(item, _depth + 1) for item in items)
+        return measured * len(obj) // max(1, len(items)) + 64
+    return 64
+
+
+def _run(executor, command: str) -> str:
+    stdout, _ = executor.connection_manager.execute_remote_command(command)
+    return stdout
+
+
+def probe_queue_wait(executor, config, partition: Optional[str]) -> Optional[float]:
+    """
+    Estimate the queue wait of a new SLURM job from ``squeue`` and ``sprio``.
+
+    Jobs ahead are the pending jobs whose priority is at least the median
+    priority of the user's own pending jobs (all pending jobs if the user
+    has none). Returns None when the scheduler cannot be queried.
+    """
+    try:
+        executor.connect()
+        part = f" -p {partition}" if partition else ""
+        pending = [
+            float(line)
+            for line in _run(executor, f"squeue -h -t PENDING{part} -o %Q").split()
+            if line.strip()
+        ]
+        user = config.username or "$USER"
+        own = sorted(
+            float(line)
+            for line in _run(executor, f"sprio -h -u {user} -o %Y").split()
+            if line.strip()
+        )
+    except Exception as e:
+        logger.debug(f"Queue probe failed: {e}")
+        return None
+
+    if own:
+        median = own[len(own) // 2]
+        ahead = sum(1 for priority in pending if priority >= median)
+    else:
+        ahead = len(pending)
+    return DEFAULT_QUEUE_WAIT["slurm"] + ahead * SECONDS_PER_JOB_AHEAD
+
+
+def estimate_queue_wait(
+    config,
+    job_config: Dict[str, Any],
+    connect: Optional[Callable[[], Any]] = None,
+) -> Tuple[float, str]:
+    """
+    Estimate how long a new job waits in the queue.
+
+    Args:
+        config: Cluster configuration
+        job_config: Resources requested for the job
+        connect: Returns a ClusterExecutor; without it the queue is not
+            probed, though an earlier probe is still used
+
+    Returns:
+        The wait in seconds and its source: squeue, cache or default
+    """
+    cluster_type = config.cluster_type
+    if job_config.get("provider") or cluster_type not in DEFAULT_QUEUE_WAIT:
+        return CLOUD_QUEUE_WAIT, "default"
+    if cluster_type != "slurm" or not getattr(config, "placement_queue_probe", True):
+        return DEFAULT_QUEUE_WAIT[cluster_type], "default"
+
+    partition = job_config.get("partition") or config.default_partition
+    key = (config.cluster_host, partition)
+    ttl = getattr(config, "placement_queue_ttl", 60.0)
+    with _queue_lock:
+        cached = _queue_waits.get(key)
+    if cached is not None and time.time() - cached[0] < ttl:
+        return cached[1], "cache"
+    if connect is not None:
+        wait = probe_queue_wait(connect(), config, partition)
+        if wait is not None:
+            with _queue_lock:
+                _queue_waits[key] = (time.time(), wait)
+            return wait, "squeue"
+    return DEFAULT_QUEUE_WAIT["slurm"], "default"
+
+
+def _local_runtime(
+    func: Callable, iterations: Optional[int], record: Optional[RuntimeRecord]
+) -> Tuple[Optional[float], Optional[str]]:
+    if record is not None:
+        seconds = record.local_estimate(iterations)
+        if seconds is not None:
+            return seconds, "history"
+    calibration = get_cached_calibration(func)
+    if calibration is not None:
+        return calibration.per_item_seconds, "calibration"
+    return None, None
+
+
+def _client_memory_gb() -> Optional[float]:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1024**3
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def remote_requirement(job_config: Dict[str, Any]) -> Optional[str]:
+    """
+    Why the resources a call requests rule out running it here, if they do.
+
+    Returns:
+        A description of the request (e.g. ``"2 GPUs"``), or None
+    """
+    provider = job_config.get("provider")
+    if provider:
+        return f"{provider} instances"
+    gpus = job_config.get("gpus")
+    if gpus:
+        return f"{gpus} GPUs"
+    cores = job_config.get("cores")
+    available = os.cpu_count() or 1
+    if isinstance(cores, int) and cores > available:
+        return f"{cores} cores ({available} here)"
+    memory = _parse_memory_gb(job_config.get("memory"))
+    total = _client_memory_gb()
+    if memory is not None and total is not None and memory > total:
+        return f"{memory:.3g}GB of memory ({total:.3g}GB here)"
+    return None
+
+
+def decide_placement(
+    func: Callable,
+    args: tuple,
+    kwargs: dict,
+    config,
+    job_config: Optional[Dict[str, Any]] = None,
+    allow_parallel: bool = True,
+    placement: Optional[str] = None,
+    connect: Optional[Callable[[], Any]] = None,
+) -> PlacementDecision:
+    """
+    Decide where a call of ``func`` runs.
+
+    Args:
+        func: Function being called
+        args: Positional arguments of the call
+        kwargs: Keyword arguments of the call
+        config: Cluster configuration
+        job_config: Resources requested for the call
+        allow_parallel: Whether the parallel modes may be chosen
+        placement: ``"cluster"`` (remote whenever a cluster is configured),
+            ``"auto"`` (the cost model) or one of :data:`PLACEMENT_MODES`
+            (default: ``config.placement``)
+        connect: Returns a ClusterExecutor, for probing the queue
+
+    Returns:
+        The decision, also available afterwards from :func:`explain_placement`
+
+    Raises:
+        ValueError: If ``placement`` is not a known mode
+    """
+    job_config = job_config or {}
+    placement = placement or getattr(config, "placement", CLUSTER)
+    if placement not in (CLUSTER, AUTO) + PLACEMENT_MODES:
+        raise ValueError(
+            f"Unknown placement {placement!r}; expected 'cluster', 'auto' or "
+            f"one of {', '.join(PLACEMENT_MODES)}"
+        )
+    local_mode = LOCAL_PARALLEL if allow_parallel else LOCAL_SERIAL
+    remote_mode = REMOTE_ARRAY if allow_parallel else REMOTE_SINGLE
+
+    auto_k8s = config.cluster_type == "kubernetes" and getattr(
+        config, "auto_provision_k8s", False
+    )
+    requirement = remote_requirement(job_config) if placement == AUTO else None
+    if not (config.cluster_host or auto_k8s) and placement not in (
+        LOCAL_SERIAL,
+        LOCAL_PARALLEL,
+    ):
+        decision = PlacementDecision(local_mode, "no cluster configured")
+    elif placement in PLACEMENT_MODES:
+        decision = PlacementDecision(placement, "placement override", overridden=True)
+    elif auto_k8s:
+        decision = PlacementDecision(remote_mode, "auto-provisioned Kubernetes cluster")
+    elif requirement is not None:
+        decision = PlacementDecision(remote_mode, f"call requests {requirement}")
+    elif getattr(config, "prefer_local_parallel", False):
+        decision = PlacementDecision(local_mode, "prefer_local_parallel is set")
+    elif placement == CLUSTER:
+        decision = PlacementDecision(remote_mode, "cluster configured")
+    else:
+        decision = _estimate_and_choose(
+            func, args, kwargs, config, job_config, allow_parallel, connect
+        )
+
+    _last_decisions[function_id(func)] = decision
+    return decision
+
+
+def _estimate_and_choose(
+    func: Callable,
+    args: tuple,
+    kwargs: dict,
+    config,
+    job_config: Dict[str, Any],
+    allow_parallel: bool,
+    connect: Optional[Callable[[], Any]],
+) -> PlacementDecision:
+    record = get_placement_history(config).get(func)
+    iterations = call_iterations(func, args, kwargs)
+    local_seconds, local_source = _local_runtime(func, iterations, record)
+    parallel = allow_parallel and (iterations or 0) > 1
+
+    estimate = PlacementEstimate(
+        iterations=iterations,
+        local_seconds=local_seconds,
+        local_source=local_source,
+        payload_bytes=payload_bytes((args, kwargs)),
+        remote_speedup=max(1e-3, getattr(config, "placement_remote_speedup", 1.0)),
+    )
+    estimate.transfer_seconds = estimate.payload_bytes / TRANSFER_BYTES_PER_SECOND
+    fixed = (
+        REMOTE_SETUP_SECONDS
+        + estimate.transfer_seconds
+        + config.job_poll_interval / 2  # Completion is noticed on the next poll
+    )
+
+    def remote_overhead(probe: bool) -> None:
+        wait, source = estimate_queue_wait(
+            config, job_config, connect if probe else None
+        )
+        estimate.queue_wait_seconds, estimate.queue_source = wait, source
+        estimate.remote_overhead_seconds = wait + fixed
+
+    if local_seconds is None:
+        remote_overhead(probe=False)
+        threshold = config.local_parallel_threshold
+        if iterations is not None and iterations < threshold:
+            return PlacementDecision(
+                mode=LOCAL_PARALLEL if allow_parallel else LOCAL_SERIAL,
+                reason=(
+                    f"{iterations} iterations is below local_parallel_threshold "
+                    f"({threshold}) and the runtime is not yet known"
+                ),
+                estimate=estimate,
+            )
+        return PlacementDecision(
+            mode=REMOTE_ARRAY if allow_parallel else REMOTE_SINGLE,
+            reason="runtime not yet known; running on the cluster",
+            estimate=estimate,
+        )
+
+    seconds = estimate.seconds
+    seconds[LOCAL_SERIAL] = local_seconds
+    if parallel:
+        workers = min(iterations, os.cpu_count() or 1)
+        if workers > 1:
+            seconds[LOCAL_PARALLEL] = LOCAL_PARALLEL_STARTUP + local_seconds / workers
+
+    # Long work stays on the cluster for its resources and time limits
+    max_local = getattr(config, "placement_max_local_seconds", 60.0)
+    local_candidates = [m for m in seconds if seconds[m] <= max_local]
+
+    # Only probe the queue if local execution could lose to the cluster
+    remote_overhead(
+        probe=bool(local_candidates)
+        and min(seconds[m] for m in local_candidates) > fixed
+    )
+    if record is not None and record.remote_compute_seconds is not None:
+        base_seconds = record.remote_compute_seconds
+    else:
+        base_seconds = local_seconds
+    remote_compute = base_seconds / estimate.remote_speedup
+    seconds[REMOTE_SINGLE] = estimate.remote_overhead_seconds + remote_compute
+    if parallel:
+        jobs = min(iterations, config.max_parallel_jobs)
+        seconds[REMOTE_ARRAY] = (
+            estimate.remote_overhead_seconds
+            + REMOTE_COMBINE_SECONDS
+            + remote_compute / jobs
+        )
+
+    candidates = local_candidates + [
+        m for m in (REMOTE_SINGLE, REMOTE_ARRAY) if m in seconds
+    ]
+    mode = min(candidates, key=lambda m: seconds[m])
+    details = ", ".join(f"{m} {s:.3g}s" for m, s in sorted(seconds.items()))
+    notes = [f"runtime from {local_source}"]
+    if iterations is not None:
+        notes.append(f"{iterations} iterations")
+    notes.append(f"queue {estimate.queue_wait_seconds:.3g}s ({estimate.queue_source})")
+    if not local_candidates:
+        notes.append(f"over {max_local:.3g}s locally")
+    if estimate.payload_bytes >= 1024**2:
+        notes.append(f"{estimate.payload_bytes / 1024**2:.3g}MiB to upload")
+    return PlacementDecision(
+        mode=mode,
+        reason=f"estimated {details} ({'; '.join(notes)})",
+        estimate=estimate,
+    )
+
+
+def explain_placement(func: Callable) -> Optional[PlacementDecision]:
+    """Return the most recent placement decision for ``func``."""
+    return _last_decisions.get(function_id(func))
+
+
+def clear_placement_state(func: Optional[Callable] = None, config=None) -> None:
+    """
+    Forget recorded runtimes and decisions, and cached queue probes.
+
+    Args:
+        func: Only forget this function (queue probes are kept)
+        config: Configuration whose history to clear (default: all loaded)
+    """
+    if config is not None:
+        histories: List[PlacementHistory] = [get_placement_history(config)]
+    else:
+        with _histories_lock:
+            histories = list(_histories.values())
+    for history in histories:
+        history.clear(func)
+    if func is None:
+        _last_decisions.clear()
+        with _queue_lock:
+            _queue_waits.clear()
+    else:
+        _last_decisions.pop(function_id(func), None)
@@ -0,0 +1,414 @@
+"""Persistent indexes of the local project and the installed environment.
+
+Dependency resolution needs to know which functions each project module
+defines, what it imports, and which installed distributions provide which
+top-level modules. Computing this means parsing every ``.py`` file under the
+project root and listing every site-packages directory, which on a large
+repository takes seconds and used to happen on every analysis.
+
+:class:`ProjectIndex` keeps a per-module table (functions, imports) on disk,
+keyed by path, modification time and size. A refresh only re-parses files
+whose key changed, in a process pool when there are many of them, so after
+the first run an unchanged tree costs one directory walk.
+:class:`EnvironmentIndex` caches installed distributions and the
+module→distribution mapping, rebuilt when a ``sys.path`` directory changes.
+
+Index files live under ``<local_cache_dir>/index``; a missing, stale or
+unreadable file is simply rebuilt.
+"""
+
+import ast
+import hashlib
+import logging
+import os
+import pickle
+import site
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+# Directories never indexed (besides hidden ones)
+SKIP_DIRS = frozenset(
+    {"__pycache__", "build", "dist", "egg-info", ".git", ".venv", "venv"}
+)
+
+# Fewer changed files than this are parsed in-process
+PARALLEL_PARSE_MIN_FILES = 32
+
+
+@dataclass
+class IndexedFunction:
+    """A function definition found in a project module."""
+
+    name: str
+    lineno: int
+    is_nested: bool
+    source_code: str
+
+
+@dataclass
+class IndexedModule:
+    """Function table and imports of one project module."""
+
+    rel_path: str
+    mtime_ns: int
+    size: int
+    functions: List[IndexedFunction] = field(default_factory=list)
+    imports: Dict[str, str] = field(default_factory=dict)
+    from_imports: Dict[str, str] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+@dataclass
+class IndexUpdate:
+    """What a :meth:`ProjectIndex.refresh` had to do."""
+
+    parsed: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    parallel: bool = False
+    seconds: float = 0.0
+
+
+@dataclass
+class EnvironmentIndex:
+    """Installed packages of the running interpreter."""
+
+    fingerprint: Tuple[Tuple[str, int], ...]
+    site_names: Set[str] = field(default_factory=set)
+    distributions: Dict[str, str] = field(default_factory=dict)
+    module_distributions: Dict[str, List[str]] = field(default_factory=dict)
+
+
+def default_index_dir() -> str:
+    """Directory holding index files, under the configured local cache."""
+    from .config import get_config
+
+    return os.path.join(os.path.expanduser(get_config().local_cache_dir), "index")
+
+
+def _index_file(cache_dir: str, kind: str, key: str) -> str:
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{kind}-{digest}.pickle")
+
+
+def _read_index(path: str) -> Optional[dict]:
+    try:
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.debug(f"Ignoring unreadable index {path}: {e}")
+        return None
+    if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+        return None
+    return data
+
+
+def _write_index(path: str, data: dict) -> None:
+    """Write atomically, so concurrent readers never see a partial file."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(
+                    dict(data, version=INDEX_VERSION),
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        logger.debug(f"Could not save index {path}: {e}")
+
+
+def _unparse(node: ast.AST) -> str:
+    return ast.unparse(node) if hasattr(ast, "unparse") else ""
+
+
+def index_module(path: str, rel_path: str, mtime_ns: int, size: int) -> IndexedModule:
+    """Parse one file into its function table and imports."""
+    module = IndexedModule(rel_path=rel_path, mtime_ns=mtime_ns, size=size)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+    except (SyntaxError, UnicodeDecodeError, ValueError, OSError) as e:
+        module.error = str(e)
+        return module
+
+    nested: Set[int] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef):
+            for inner in ast.walk(node):
+                if inner is not node and isinstance(inner, ast.FunctionDef):
+                    nested.add(id(inner))
+            module.functions.append(
+                IndexedFunction(
+                    name=node.name,
+                    lineno=node.lineno,
+                    is_nested=id(node) in nested,
+                    source_code=_unparse(node),
+                )
+            )
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                module.imports[alias.asname or alias.name] = alias.name
+        elif isinstance(node, ast.ImportFrom):
+            prefix = node.module or ""
+            for alias in node.names:
+                full_name = f"{prefix}.{alias.name}" if prefix else alias.name
+                module.from_imports[alias.asname or alias.name] = full_name
+    return module
+
+
+def _index_module_job(job: Tuple[str, str, int, int]) -> IndexedModule:
+    return index_module(*job)
+
+
+def _scan_python_files(
+    root_dir: str, skip_dirs: Iterable[str] = SKIP_DIRS
+) -> Dict[str, Tuple[str, int, int]]:
+    """Map each ``.py`` file under ``root_dir`` to (path, mtime_ns, size)."""
+    skip = set(skip_dirs)
+    found = {}
+    for root, dirs, files in os.walk(root_dir):
+        dirs[:] = [d for d in dirs if not d.startswith(".") and d not in skip]
+        for name in files:
+            if name.endswith(".py") and not name.startswith("."):
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                rel_path = os.path.relpath(path, root_dir)
+                found[rel_path] = (path, st.st_mtime_ns, st.st_size)
+    return found
+
+
+class ProjectIndex:
+    """
+    On-disk index of the Python modules under a project root.
+
+    Example:
+        >>> index = ProjectIndex("/path/to/repo")
+        >>> update = index.refresh()  # parses only files changed since last run
+        >>> index.modules["pkg/util.py"].functions[0].name
+        'helper'
+    """
+
+    def __init__(
+        self,
+        root_dir: str,
+        cache_dir: Optional[str] = None,
+        max_workers: Optional[int] = None,
+    ):
+        """
+        Initialize index.
+
+        Args:
+            root_dir: Project root to index
+            cache_dir: Directory for index files (default: under
+                ``local_cache_dir``)
+            max_workers: Processes used to parse many changed files
+                (default: CPU count)
+        """
+        self.root_dir = os.path.abspath(root_dir)
+        self.cache_dir = cache_dir or default_index_dir()
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.index_path = _index_file(self.cache_dir, "project", self.root_dir)
+        self.modules: Dict[str, IndexedModule] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _parse(self, jobs: List[Tuple[str, str, int, int]]) -> Tuple[list, bool]:
+        """Parse changed files, in a process pool when there are many."""
+        workers = min(self.max_workers, len(jobs))
+        if workers > 1 and len(jobs) >= PARALLEL_PARSE_MIN_FILES:
+            from .worker_pool import create_process_pool
+
+            try:
+                with create_process_pool(workers) as pool:
+                    chunksize = max(1, len(jobs) // (workers * 4))
+                    return (
+                        list(pool.map(_index_module_job, jobs, chunksize=chunksize)),
+                        True,
+                    )
+            except Exception as e:
+                logger.warning(f"Parallel indexing failed, parsing serially: {e}")
+        return [_index_module_job(job) for job in jobs], False
+
+    def refresh(self) -> IndexUpdate:
+        """Bring the index up to date with the files on disk."""
+        with self._lock:
+            start = time.perf_counter()
+            if not self._loaded:
+                data = _read_index(self.index_path)
+                if data is not None and data.get("root_dir") == self.root_dir:
+                    self.modules = data["modules"]
+                self._loaded = True
+
+            files = _scan_python_files(self.root_dir)
+            update = IndexUpdate()
+            jobs = []
+            for rel_path, (path, mtime_ns, size) in files.items():
+                known = self.modules.get(rel_path)
+                if known and (known.mtime_ns, known.size) == (mtime_ns, size):
+                    update.unchanged += 1
+                else:
+                    jobs.append((path, rel_path, mtime_ns, size))
+            removed = set(self.modules) - set(files)
+            for rel_path in removed:
+                del self.modules[rel_path]
+            update.removed = len(removed)
+
+            if jobs:
+                parsed, update.parallel = self._parse(jobs)
+                for module in parsed:
+                    if module.error:
+                        logger.warning(
+                            f"Could not parse {module.rel_path}: {module.error}"
+                        )
+                    self.modules[module.rel_path] = module
+                update.parsed = len(parsed)
+
+            if jobs or removed:
+                _write_index(
+                    self.index_path,
+                    {"root_dir": self.root_dir, "modules": self.modules},
+                )
+            update.seconds = time.perf_counter() - start
+            logger.debug(
+                f"🗂️ Indexed {self.root_dir}: {update.parsed} parsed, "
+                f"{update.removed} removed, {update.unchanged} unchanged "
+                f"in {update.seconds:.3f}s"
+            )
+            return update
+
+
+_project_indexes: Dict[Tuple[str, str], ProjectIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_project_index(root_dir: str, cache_dir: Optional[str] = None) -> ProjectIndex:
+    """Return the up-to-date index of ``root_dir``, shared within the process."""
+    cache_dir = cache_dir or default_index_dir()
+    key = (os.path.abspath(root_dir), cache_dir)
+    with _indexes_lock:
+        index = _project_indexes.get(key)
+        if index is None:
+            index = _project_indexes[key] = ProjectIndex(root_dir, cache_dir)
+    index.refresh()
+    return index
+
+
+def _environment_fingerprint() -> Tuple[Tuple[str, int], ...]:
+    """Directories packages are installed into, with their mtimes."""
+    dirs = set(site_package_dirs())
+    dirs.update(p for p in sys.path if p and os.path.isdir(p))
+    fingerprint = []
+    for path in sorted(dirs):
+        try:
+            fingerprint.append((path, os.stat(path).st_mtime_ns))
+        except OSError:
+            continue
+    return tuple(fingerprint)
+
+
+def site_package_dirs() -> List[str]:
+    try:
+        return [d for d in site.getsitepackages() if os.path.isdir(d)]
+    except AttributeError:
+        # Old virtualenvs ship a site module without getsitepackages
+        return []
+
+
+def _build_environment(fingerprint: Tuple[Tuple[str, int], ...]) -> EnvironmentIndex:
+    env = EnvironmentIndex(fingerprint=fingerprint)
+    for site_dir in site_package_dirs():
+        try:
+            items = os.listdir(site_dir)
+        except OSError:
+            continue
+        for item in items:
+            if os.path.isdir(os.path.join(site_dir, item)) and not item.startswith("."):
+                # Remove version info (e.g., 'numpy-1.21.0.dist-info' -> 'numpy')
+                env.site_names.add(item.split("-")[0].replace("_", "").lower())
+
+    try:
+        from importlib import metadata
+    except ImportError:
+        return env
+    for dist in metadata.distributions():
+        name = dist.metadata["Name"]
+        if not name or name in env.distributions:
+            continue
+        env.distributions[name] = dist.version
+        top_level = (dist.read_text("top_level.txt") or "").split()
+        if not top_level:
+            top_level = sorted(
+                {
+                    file.parts[0].split(".")[0]
+                    for file in dist.files or ()
+                    if file.parts
+                    and file.parts[0] != ".."
+                    and not file.parts[0].endswith((".dist-info", ".egg-info"))
+                    and (len(file.parts) > 1 or file.suffix == ".py")
+                }
+            )
+        for module in top_level:
+            env.module_distributions.setdefault(module, []).append(name)
+    return env
+
+
+_environment: Optional[EnvironmentIndex] = None
+_environment_lock = threading.Lock()
+
+
+def get_environment_index(cache_dir: Optional[str] = None) -> EnvironmentIndex:
+    """
+    Return the index of installed packages.
+
+    It is rebuilt only when a directory on ``sys.path`` (or a site-packages
+    directory) has changed since it was built, in this process or any
+    earlier one.
+    """
+    global _environment
+    fingerprint = _environment_fingerprint()
+    with _environment_lock:
+        if _environment is not None and _environment.fingerprint == fingerprint:
+            return _environment
+        path = _index_file(
+            cache_dir or default_index_dir(), "environment", sys.executable
+        )
+        data = _read_index(path)
+        if data is not None and data["environment"].fingerprint == fingerprint:
+            _environment = data["environment"]
+            return _environment
+        start = time.perf_counter()
+        _environment = _build_environment(fingerprint)
+        logger.debug(
+            f"🗂️ Indexed {len(_environment.distributions)} installed distributions "
+            f"in {time.perf_counter() - start:.3f}s"
+        )
+        _write_index(path, {"environment": _environment})
+        return _environment
+
+
+def clear_index_memory() -> None:
+    """Drop in-process copies, so the next lookup reads the on-disk indexes."""
+    global _environment
+    with _indexes_lock:
+        _project_indexes.clear()
+    with _environment_lock:
+        _environment = None
@@ -0,0 +1,183 @@
+"""Lazy handles to results that stay on the cluster.
+
+A ``@cluster`` call normally downloads its job's ``result.pkl`` before
+returning, even when the next call only sends the value straight back as
+an argument. With ``lazy=True`` (or ``config.lazy_results``) a call
+returns a :class:`RemoteResult` as soon as its job is submitted; the value
+is downloaded only when :meth:`RemoteResult.result` is called.
+
+Passing a RemoteResult to another ``@cluster`` call passes it by
+reference. It pickles as ``pickle.load(open("../job_<...>/result.pkl",
+"rb"))``, so the downstream job reads the upstream result from the shared
+filesystem with its usual ``pickle.loads(data['args'])``, and the job is
+held by the scheduler until its inputs exist (``afterok`` dependencies on
+SLURM and PBS, ``-hold_jid`` on SGE). A SLURM job whose upstream job
+failed is cancelled rather than left pending. SGE's ``-hold_jid`` releases
+a job even when its upstream job failed, so the job checks that the
+upstream results exist and fails with a clear error if not. A pipeline of
+lazy calls therefore moves its intermediates across the network zero
+times::
+
+    features = extract(raw_path)          # RemoteResult, returns at once
+    model = fit(features)                 # queued after extract
+    score = evaluate(model).result()      # only the final value is fetched
+
+Intermediate results stay in their job directories until
+:meth:`RemoteResult.discard` is called.
+"""
+
+import logging
+import pickle
+import posixpath
+from typing import Any, Dict, List, Optional, Tuple
+
+from .blob_store import _BlobFile, blob_store_available
+
+logger = logging.getLogger(__name__)
+
+_SEARCHED_CONTAINERS = (list, tuple, dict)
+
+
+class RemoteResult:
+    """
+    Result of a submitted job, left on the cluster until it is asked for.
+
+    Args:
+        executor: ClusterExecutor that submitted the job
+        job_id: Scheduler job ID
+        remote_path: Path of the job's ``result.pkl`` on the cluster
+    """
+
+    def __init__(self, executor, job_id: str, remote_path: str):
+        self.executor = executor
+        self.job_id = job_id
+        self.remote_path = remote_path
+        self._value: Any = None
+        self._fetched = False
+
+    @property
+    def job_relative_path(self) -> str:
+        """Path of the result as seen from another job's directory."""
+        job_dir = posixpath.dirname(self.remote_path)
+        return f"../{posixpath.basename(job_dir)}/result.pkl"
+
+    def status(self) -> str:
+        """Status of the job, as from ``ClusterExecutor.get_job_status``."""
+        if self._fetched:
+            return "completed"
+        return self.executor.get_job_status(self.job_id)
+
+    def done(self) -> bool:
+        """Whether the job has finished, successfully or not."""
+        return self.status() in ("completed", "failed")
+
+    def wait(self) -> str:
+        """
+        Wait for the job to finish, without downloading its result.
+
+        Returns:
+            Remote path of the result
+
+        Raises:
+            The job's exception if it failed
+        """
+        if not self._fetched:
+            self.executor.wait_for_remote_result(self.job_id)
+        return self.remote_path
+
+    def result(self) -> Any:
+        """Wait for the job and download its result (once)."""
+        if not self._fetched:
+            self.wait()
+            found, value = self.executor.fetch_cached_result(self.remote_path)
+            if not found:
+                raise FileNotFoundError(
+                    f"Result of job {self.job_id} is no longer at {self.remote_path}"
+                )
+            self._value = value
+            self._fetched = True
+        return self._value
+
+    get = result
+
+    def discard(self) -> None:
+        """Remove the job's directory from the cluster (with ``cleanup_on_success``)."""
+        self.executor.discard_remote_result(self.job_id)
+
+    def __reduce__(self):
+        # Jobs unpickling their arguments read the result in place, with
+        # nothing but the standard library
+        return pickle.load, (_BlobFile(self.job_relative_path),)
+
+    def __repr__(self) -> str:
+        state = "fetched" if self._fetched else "on cluster"
+        return f"RemoteResult(job {self.job_id}, {state})"
+
+
+def remote_results_in(args: tuple, kwargs: dict) -> List[RemoteResult]:
+    """RemoteResults among the arguments and the lists, tuples and dicts they hold."""
+    found: Dict[int, RemoteResult] = {}
+    values = list(args) + list(kwargs.values())
+    for value in values:
+        if isinstance(value, dict):
+            items = list(value.values())
+        elif isinstance(value, _SEARCHED_CONTAINERS):
+            items = list(value)
+        else:
+            items = [value]
+        for item in items:
+            if isinstance(item, RemoteResult):
+                found[id(item)] = item
+    return list(found.values())
+
+
+def _resolved(value: Any) -> Any:
+    if isinstance(value, RemoteResult):
+        return value.result()
+    if isinstance(value, dict) and any(
+        isinstance(v, RemoteResult) for v in value.values()
+    ):
+        return {k: _resolved(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)) and any(
+        isinstance(v, RemoteResult) for v in value
+    ):
+        return type(value)(_resolved(v) for v in value)
+    return value
+
+
+def resolve_remote_results(args: tuple, kwargs: dict) -> Tuple[tuple, dict]:
+    """Replace RemoteResults in the arguments by their downloaded values."""
+    return (
+        tuple(_resolved(arg) for arg in args),
+        {name: _resolved(value) for name, value in kwargs.items()},
+    )
+
+
+def can_chain(refs: List[RemoteResult], config, job_config: Dict[str, Any]) -> bool:
+    """Whether a job of ``config`` can read ``refs`` on the cluster filesystem."""
+    if not refs or not blob_store_available(config, job_config):
+        return False
+    work_dir = config.remote_work_dir.rstrip("/") + "/"
+    return all(ref.remote_path.startswith(work_dir) for ref in refs)
+
+
+def chain_dependencies(refs: List[RemoteResult], config) -> Optional[List[str]]:
+    """
+    Job IDs a job reading ``refs`` must wait for.
+
+    Finished upstream jobs need no dependency. Direct SSH execution has no
+    scheduler to hold a job, so upstream jobs are waited for here instead.
+
+    Raises:
+        The exception of an upstream job that failed
+    """
+    pending = []
+    for ref in refs:
+        status = ref.status()
+        if status == "completed":
+            continue
+        if status == "failed" or config.cluster_type == "ssh":
+            ref.wait()
+            continue
+        pending.append(ref.job_id)
+    return pending or None
@@ -0,0 +1,416 @@
+"""Content-addressed memoization of ``@cluster`` results.
+
+Re-running a notebook cell with the same inputs should not resubmit the same
+work. With ``result_cache`` enabled (``configure(result_cache=True)`` or
+``@cluster(cache_results=True)``), each call is keyed by:
+
+- the function: its source (or bytecode), defaults and closure values
+- the arguments: hashed structurally, with NumPy arrays hashed straight from
+  their buffers rather than pickled
+- the environment that computes the result: the local interpreter and its
+  installed packages, or the cluster, environment and packages a job runs in
+
+Results are kept in two tiers. The local tier is a directory of pickles
+under ``<local_cache_dir>/results``, evicted least-recently-used once it
+exceeds ``result_cache_max_bytes``; a hit returns without contacting the
+cluster at all. The remote tier lives in ``<remote_work_dir>/result_cache``
+on SSH-based clusters, so a result computed by one client is found by any
+other client with the same key; single jobs copy their result there on the
+cluster, without a round trip.
+
+Keys cover the function's own code but not globals or helpers it calls;
+after changing those, drop the entries with :func:`invalidate_results` or
+the decorated function's ``invalidate_cache()``.
+"""
+
+import hashlib
+import logging
+import marshal
+import os
+import pickle
+import sys
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .analysis_cache import cached_analysis, function_source
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Cluster types whose jobs write results to a filesystem reachable over SSH
+REMOTE_TIER_CLUSTER_TYPES = ("slurm", "pbs", "sge", "ssh")
+
+
+class UnhashableArgumentError(TypeError):
+    """An argument can be neither hashed structurally nor pickled."""
+
+
+@dataclass(frozen=True)
+class CacheKey:
+    """Identity of one call of one version of a function."""
+
+    function_id: str  # Same for every version of the function
+    function_hash: str
+    call_hash: str  # Arguments and environment
+
+    @property
+    def name(self) -> str:
+        return f"{self.function_id}-{self.function_hash}-{self.call_hash}"
+
+    @property
+    def filename(self) -> str:
+        return f"{self.name}.pkl"
+
+
+@dataclass
+class ResultCacheStats:
+    """Counters of a local result cache."""
+
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+
+def _hasher():
+    return hashlib.blake2b(digest_size=16)
+
+
+def _update(h, obj: Any) -> None:
+    """Feed ``obj`` into ``h`` so equal values produce equal digests."""
+    if obj is None or isinstance(obj, (bool, int, float, complex)):
+        h.update(f"{type(obj).__name__}:{obj!r};".encode())
+    elif isinstance(obj, str):
+        data = obj.encode("utf-8", "surrogatepass")
+        h.update(b"str:%d:" % len(data))
+        h.update(data)
+    elif isinstance(obj, (bytes, bytearray)):
+        h.update(b"bytes:%d:" % len(obj))
+        h.update(obj)
+    elif NUMPY_AVAILABLE and isinstance(obj, np.ndarray) and not obj.dtype.hasobject:
+        h.update(f"ndarray:{obj.dtype.str}:{obj.shape};".encode())
+        # Hash the buffer directly; copies only non-contiguous views
+        h.update(np.ascontiguousarray(obj).view(np.uint8).ravel())
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"{type(obj).__name__}:{len(obj)}[".encode())
+        for item in obj:
+            _update(h, item)
+        h.update(b"]")
+    elif isinstance(obj, (dict, set, frozenset)):
+        # Order-independent: equal mappings and sets hash equally
+        items = obj.items() if isinstance(obj, dict) else ((item,) for item in obj)
+        digests = []
+        for item in items:
+            item_hash = _hasher()
+            for part in item:
+                _update(item_hash, part)
+            digests.append(item_hash.digest())
+        h.update(f"{type(obj).__name__}:{len(digests)}{{".encode())
+        for digest in sorted(digests):
+            h.update(digest)
+        h.update(b"}")
+    else:
+        try:
+            data = pickle.dumps(obj, protocol=4)
+        except Exception as e:
+            raise UnhashableArgumentError(
+                f"Cannot hash {type(obj).__name__} argument: {e}"
+            ) from e
+        h.update(f"pickle:{type(obj).__module__}.{type(obj).__qualname__}:".encode())
+        h.update(data)
+
+
+def hash_value(obj: Any) -> str:
+    """
+    Content hash of ``obj``.
+
+    Raises:
+        UnhashableArgumentError: If part of ``obj`` cannot be pickled
+    """
+    h = _hasher()
+    _update(h, obj)
+    return h.hexdigest()
+
+
+def _code_identity(func: Callable) -> bytes:
+    """Source of ``func``, or its bytecode when the source is unavailable."""
+    try:
+        return function_source(func).encode("utf-8")
+    except (OSError, TypeError):
+        return marshal.dumps(func.__code__)
+
+
+def function_id(func: Callable) -> str:
+    """Short hash of ``func``'s name, shared by all versions of its code."""
+    func = getattr(func, "__wrapped__", func)
+    return hash_value(f"{func.__module__}.{func.__qualname__}")[:12]
+
+
+def function_hash(func: Callable) -> str:
+    """
+    Hash of what ``func`` computes: its code, defaults and closure values.
+
+    Raises:
+        UnhashableArgumentError: If a default or closure value cannot be hashed
+    """
+    code_hash = cached_analysis(
+        func, "code_hash", lambda: hashlib.sha256(_code_identity(func)).hexdigest()
+    )
+    cells = [
+        cell.cell_contents if _cell_has_value(cell) else None
+        for cell in getattr(func, "__closure__", None) or ()
+    ]
+    return hash_value(
+        (
+            code_hash,
+            getattr(func, "__defaults__", None),
+            getattr(func, "__kwdefaults__", None),
+            cells,
+        )
+    )
+
+
+def _cell_has_value(cell) -> bool:
+    try:
+        cell.cell_contents
+        return True
+    except ValueError:
+        return False
+
+
+def environment_fingerprint(config, execution_mode: str, job_config: Dict) -> Any:
+    """What, besides the call itself, determines the result."""
+    if execution_mode == "local":
+        from .project_index import get_environment_index
+
+        try:
+            packages = sorted(get_environment_index().distributions.items())
+        except Exception:
+            packages = []
+        return ("local", sys.version_info[:3], packages)
+    return (
+        "remote",
+        config.cluster_type,
+        config.cluster_host,
+        job_config.get("provider"),
+        job_config.get("environment"),
+        config.python_executable,
+        config.cluster_packages,
+    )
+
+
+def result_cache_key(
+    func: Callable, args: tuple, kwargs: dict, environment: Any
+) -> Optional[CacheKey]:
+    """Key for ``func(*args, **kwargs)``, or None if the call can't be hashed."""
+    try:
+        return CacheKey(
+            function_id=function_id(func),
+            function_hash=function_hash(func),
+            call_hash=hash_value((args, kwargs, environment)),
+        )
+    except UnhashableArgumentError as e:
+        logger.debug(f"Not caching {func.__qualname__}: {e}")
+        return None
+
+
+class ResultCache:
+    """
+    Local disk tier: one pickle per key, evicted least-recently-used.
+
+    Example:
+        >>> cache = ResultCache("~/.clustrix/cache/results", max_bytes=2**30)
+        >>> hit, value = cache.get(key)
+        >>> cache.put(key, 42)
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: Optional[int] = None,
+        max_entries: Optional[int] = None,
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            cache_dir: Directory holding cached results
+            max_bytes: Evict least recently used entries beyond this total size
+            max_entries: Evict least recently used entries beyond this count
+        """
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.stats = ResultCacheStats()
+        self._lock = threading.Lock()
+
+    def _path(self, key: CacheKey) -> str:
+        return os.path.join(self.cache_dir, key.filename)
+
+    def get(self, key: CacheKey) -> Tuple[bool, Any]:
+        """Return ``(True, value)`` on a hit, ``(False, None)`` otherwise."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            self.stats.misses += 1
+            return False, None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cached result {path}: {e}")
+            self._remove(path)
+            self.stats.misses += 1
+            return False, None
+        try:
+            # Recency for LRU eviction
+            os.utime(path)
+        except OSError:
+            pass
+        self.stats.hits += 1
+        return True, value
+
+    def put(self, key: CacheKey, value: Any) -> bool:
+        """Store ``value``; returns False if it cannot be pickled."""
+        try:
+            data = pickle.dumps(value, protocol=4)
+        except Exception as e:
+            logger.debug(f"Not caching unpicklable result: {e}")
+            return False
+        return self.put_bytes(key, data)
+
+    def put_bytes(self, key: CacheKey, data: bytes) -> bool:
+        """Store an already pickled value."""
+        if self.max_bytes is not None and len(data) > self.max_bytes:
+            return False
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning(f"Could not cache result: {e}")
+            return False
+        self.stats.stores += 1
+        self._evict()
+        return True
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """(mtime, size, path) of every entry."""
+        entries = []
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return entries
+        for name in names:
+            if not name.endswith(".pkl"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _evict(self) -> None:
+        if self.max_bytes is None and self.max_entries is None:
+            return
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            while entries and (
+                (self.max_bytes is not None and total > self.max_bytes)
+                or (self.max_entries is not None and len(entries) > self.max_entries)
+            ):
+                _, size, path = entries.pop(0)
+                self._remove(path)
+                total -= size
+                self.stats.evictions += 1
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def invalidate(self, func: Optional[Callable] = None) -> int:
+        """Remove the entries of ``func`` (all versions), or all entries."""
+        prefix = f"{function_id(func)}-" if func is not None else ""
+        removed = 0
+        for _, _, path in self._entries():
+            if os.path.basename(path).startswith(prefix):
+                self._remove(path)
+                removed += 1
+        return removed
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+
+_caches: Dict[Tuple[str, Optional[int]], ResultCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_result_cache(config) -> ResultCache:
+    """Return the local result cache configured by ``config``."""
+    cache_dir = os.path.join(os.path.expanduser(config.local_cache_dir), "results")
+    key = (cache_dir, config.result_cache_max_bytes)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = ResultCache(
+                cache_dir, max_bytes=config.result_cache_max_bytes
+            )
+        return cache
+
+
+def remote_tier_available(config, job_config: Dict) -> bool:
+    return (
+        config.result_cache_remote
+        and config.cluster_type in REMOTE_TIER_CLUSTER_TYPES
+        and not job_config.get("provider")
+    )
+
+
+def remote_cache_dir(config) -> str:
+    return f"{config.remote_work_dir}/result_cache"
+
+
+def remote_cache_path(config, key: CacheKey) -> str:
+    return f"{remote_cache_dir(config)}/{key.filename}"
+
+
+def invalidate_results(
+    func: Optional[Callable] = None, config=None, executor=None
+) -> int:
+    """
+    Drop cached results of ``func`` (or of every function).
+
+    Args:
+        func: Function (decorated or not) whose results to drop; None for all
+        config: Configuration locating the caches (default: current config)
+        executor: Connected ClusterExecutor, to also clear the remote tier
+
+    Returns:
+        Number of local entries removed
+    """
+    if config is None:
+        from .config import get_config
+
+        config = get_config()
+    removed = get_result_cache(config).invalidate(func)
+    if executor is not None:
+        prefix = f"{function_id(func)}-" if func is not None else ""
+        executor.remove_remote_files(f"{remote_cache_dir(config)}/{prefix}*.pkl")
+    logger.info(f"🧹 Dropped {removed} cached result(s)")
+    return removed
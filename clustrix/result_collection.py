@@ -0,0 +1,202 @@
+"""As-completed collection of parallel chunk results.
+
+Waiting for chunk jobs in submission order lets one slow chunk hold back
+every result behind it: chunks 1..N sit finished on the cluster while chunk
+0 is still running, and nothing can be used until the last one lands.
+:func:`collect_as_completed` instead polls all outstanding jobs with one
+batched status query per ``job_poll_interval`` (a single ``squeue`` on
+SLURM, see :meth:`ClusterExecutor.get_job_statuses`) and hands each finished
+job to a bounded pool of ``result_download_workers`` threads, yielding
+results in the order their downloads complete. Callers that need input order
+sort by chunk index at the end.
+"""
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Statuses of jobs that are known to be unfinished; anything else is handed
+# to ``wait_for_result``, which resolves failures and unknown states itself
+WAITING_STATUSES = ("queued", "pending", "running")
+
+DEFAULT_DOWNLOAD_WORKERS = 4
+
+# Polls in a row a job's status may be undeterminable before the job is
+# handed to ``wait_for_result`` to resolve or raise
+MAX_UNKNOWN_POLLS = 10
+
+
+@dataclass
+class _Copy:
+    job_id: str
+    submitted_at: float
+    duplicate: bool = False
+    unknown_polls: int = 0
+
+
+@dataclass
+class _Chunk:
+    chunk: Dict[str, Any]
+    copies: List[_Copy] = field(default_factory=list)
+
+
+def download_workers(config) -> int:
+    """Size of the result download pool, from ``result_download_workers``."""
+    workers = getattr(config, "result_download_workers", DEFAULT_DOWNLOAD_WORKERS)
+    if not isinstance(workers, int) or isinstance(workers, bool) or workers < 1:
+        return DEFAULT_DOWNLOAD_WORKERS
+    return workers
+
+
+def poll_interval(config) -> float:
+    interval = getattr(config, "job_poll_interval", 30)
+    if not isinstance(interval, (int, float)) or interval < 0:
+        return 30.0
+    return float(interval)
+
+
+def poll_job_statuses(executor, job_ids: Sequence[str]) -> List[Any]:
+    """
+    Status of each job, in one batched query where the executor supports it.
+
+    Returns:
+        Statuses in the order of ``job_ids``; None where the status could
+        not be determined
+    """
+    try:
+        statuses = executor.get_job_statuses(list(job_ids))
+        return [statuses.get(job_id) for job_id in job_ids]
+    except Exception as e:
+        logger.debug(f"Batched status check failed, checking jobs one by one: {e}")
+    results = []
+    for job_id in job_ids:
+        try:
+            results.append(executor.get_job_status(job_id))
+        except Exception as e:
+            logger.debug(f"Status check of {job_id} failed: {e}")
+            results.append(None)
+    return results
+
+
+def collect_as_completed(
+    executor,
+    jobs: Sequence[Tuple[str, Dict[str, Any]]],
+    max_downloads: int = DEFAULT_DOWNLOAD_WORKERS,
+    interval: float = 30.0,
+    speculator=None,
+    clock=time.monotonic,
+    sleep=time.sleep,
+) -> Iterator[Tuple[Dict[str, Any], Any, Optional[BaseException]]]:
+    """
+    Collect chunk jobs as they finish, downloading results concurrently.
+
+    Args:
+        executor: ClusterExecutor the jobs were submitted to
+        jobs: ``(job_id, chunk)`` pairs
+        max_downloads: Results downloaded at once
+        interval: Seconds between status polls
+        speculator: Optional :class:`~clustrix.speculation.Speculator` that
+            duplicates straggling chunks
+        clock: Time source (seconds)
+        sleep: Called between polls while no download is in flight
+
+    Yields:
+        ``(chunk, result, None)`` per chunk in completion order, or
+        ``(chunk, None, error)`` when every copy of the chunk failed
+    """
+    start = clock()
+    polling = [_Chunk(chunk, [_Copy(job_id, start)]) for job_id, chunk in jobs]
+    n_chunks = len(polling)
+    downloading: Dict[Future, Tuple[_Chunk, _Copy]] = {}
+    pool = ThreadPoolExecutor(max_workers=max(1, max_downloads))
+    last_poll: Optional[float] = None
+
+    try:
+        while polling or downloading:
+            progressed = False
+
+            if polling and (last_poll is None or clock() - last_poll >= interval):
+                last_poll = clock()
+                copies = [copy for entry in polling for copy in entry.copies]
+                statuses = poll_job_statuses(executor, [c.job_id for c in copies])
+                status_of = {id(c): status for c, status in zip(copies, statuses)}
+                for entry in list(polling):
+                    copy = _finished_copy(entry, status_of)
+                    if copy is None:
+                        continue
+                    polling.remove(entry)
+                    future = pool.submit(executor.wait_for_result, copy.job_id)
+                    downloading[future] = (entry, copy)
+                    progressed = True
+
+            for future in [f for f in downloading if f.done()]:
+                entry, copy = downloading.pop(future)
+                progressed = True
+                error = future.exception()
+                if error is not None and not isinstance(error, Exception):
+                    raise error  # KeyboardInterrupt and the like
+                if error is not None and len(entry.copies) > 1:
+                    # Another copy of the chunk may still succeed
+                    entry.copies.remove(copy)
+                    polling.append(entry)
+                    logger.info(
+                        f"Copy {copy.job_id} of chunk {entry.chunk.get('index')} failed"
+                    )
+                    continue
+                if speculator is not None:
+                    speculator.finished(entry, copy, error, clock())
+                yield entry.chunk, (None if error else future.result()), error
+
+            if speculator is not None and polling:
+                progressed = (
+                    speculator.speculate(polling, n_chunks, clock) or progressed
+                )
+
+            if (polling or downloading) and not progressed:
+                remaining = interval
+                if last_poll is not None:
+                    remaining = max(0.0, interval - (clock() - last_poll))
+                if downloading:
+                    wait(
+                        list(downloading),
+                        timeout=remaining,
+                        return_when=FIRST_COMPLETED,
+                    )
+                elif remaining > 0:
+                    sleep(remaining)
+    finally:
+        # Abandoned early (an error, or the caller stopped iterating)
+        for future in downloading:
+            future.cancel()
+        pool.shutdown(wait=False)
+
+
+def _finished_copy(entry: _Chunk, status_of: Dict[int, Any]) -> Optional[_Copy]:
+    """The copy of a chunk whose result should be fetched now, if any."""
+    for copy in list(entry.copies):
+        status = status_of.get(id(copy))
+        if status is None:
+            copy.unknown_polls += 1
+            if copy.unknown_polls < MAX_UNKNOWN_POLLS:
+                continue
+            logger.warning(
+                f"Status of {copy.job_id} unknown after {copy.unknown_polls} "
+                "polls; waiting for its result"
+            )
+            return copy
+        copy.unknown_polls = 0
+        if status in WAITING_STATUSES:
+            continue
+        if status == "failed" and len(entry.copies) > 1:
+            # The other copy may still succeed
+            entry.copies.remove(copy)
+            logger.info(
+                f"Copy {copy.job_id} of chunk {entry.chunk.get('index')} failed"
+            )
+            continue
+        return copy
+    return None
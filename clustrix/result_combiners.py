@@ -0,0 +1,157 @@
+"""Type-aware combination of per-chunk results.
+
+When a split loop builds a container (a ``concat`` or ``merge``
+accumulator, see :mod:`clustrix.loop_splitting`), each chunk returns its
+share of it. If every chunk returns the same kind of container, the shares
+are combined into one value of that kind along the loop axis:
+
+=================================  ===========================================
+chunk result                       combined with
+=================================  ===========================================
+``numpy.ndarray``                  one preallocated output array, filled by
+                                   ``np.concatenate(..., out=...)`` on axis 0
+``pandas.DataFrame`` / ``Series``  a single ``pd.concat``; default
+                                   ``RangeIndex`` indexes are renumbered
+``pyarrow.Table``                  ``pa.concat_tables`` (no data is copied)
+``dict``                           merged, if no two chunks share a key
+=================================  ===========================================
+
+Other parallel runs, whose chunk results need not belong together, are
+never combined this way and still return a list.
+
+Optional libraries are never imported just to look a type up: their
+combiners are registered under the qualified type name and matched
+against each result's MRO. Other types can be added with
+:func:`register_combiner`.
+"""
+
+import logging
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+Combiner = Callable[[Sequence[Any]], Any]
+
+# Keyed by type, or by "module.QualName" for types of optional libraries
+_COMBINERS: Dict[Union[type, str], Combiner] = {}
+
+
+def register_combiner(result_type: Union[type, str], combiner: Combiner) -> None:
+    """
+    Combine chunk results of ``result_type`` with ``combiner``.
+
+    Args:
+        result_type: A type, or its qualified name (e.g.
+            ``"numpy.ndarray"``) to avoid importing its library
+        combiner: Called with the chunk results, in chunk order; raises
+            TypeError or ValueError if they cannot be combined
+    """
+    _COMBINERS[result_type] = combiner
+
+
+def _type_name(cls: type) -> str:
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def find_combiner(parts: Sequence[Any]) -> Optional[Combiner]:
+    """The combiner registered for the common type of ``parts``, if any."""
+    if not parts:
+        return None
+    for cls in type(parts[0]).__mro__:
+        combiner = _COMBINERS.get(cls) or _COMBINERS.get(_type_name(cls))
+        if combiner is not None:
+            if all(isinstance(part, cls) for part in parts):
+                return combiner
+            return None
+    return None
+
+
+def combine_by_type(parts: Sequence[Any]) -> Tuple[bool, Any]:
+    """
+    Combine chunk results with the combiner registered for their type.
+
+    Returns:
+        ``(True, combined)``, or ``(False, None)`` if the results have no
+        common registered type or their combiner rejected them
+    """
+    combiner = find_combiner(parts)
+    if combiner is None:
+        return False, None
+    try:
+        return True, combiner(parts)
+    except (TypeError, ValueError) as e:
+        logger.debug(f"Could not combine {type(parts[0]).__name__} results: {e}")
+        return False, None
+
+
+def concat_arrays(parts: Sequence[Any]) -> Any:
+    """Concatenate NumPy arrays along axis 0 into one preallocated array."""
+    import numpy as np
+
+    if any(type(part) is not np.ndarray for part in parts):
+        raise TypeError("ndarray subclasses keep their own concatenation")
+    if any(part.ndim == 0 for part in parts):
+        raise ValueError("zero-dimensional arrays have no loop axis")
+    trailing = parts[0].shape[1:]
+    if any(part.shape[1:] != trailing for part in parts):
+        raise ValueError("chunk arrays differ in shape beyond axis 0")
+    dtype = np.result_type(*{part.dtype for part in parts})
+    out = np.empty((sum(part.shape[0] for part in parts),) + trailing, dtype=dtype)
+    np.concatenate(parts, axis=0, out=out)
+    return out
+
+
+def concat_frames(parts: Sequence[Any]) -> Any:
+    """Concatenate pandas DataFrames or Series with a single ``pd.concat``."""
+    import pandas as pd
+
+    default_index = all(
+        isinstance(part.index, pd.RangeIndex)
+        and part.index.start == 0
+        and part.index.step == 1
+        for part in parts
+    )
+    return pd.concat(parts, ignore_index=default_index)
+
+
+def concat_tables(parts: Sequence[Any]) -> Any:
+    """Concatenate Arrow tables without copying their buffers."""
+    import pyarrow as pa
+
+    return pa.concat_tables(parts)
+
+
+def merge_dicts(parts: Sequence[Any]) -> Any:
+    """Merge dicts in order, later ones winning, without changing the inputs."""
+    if not parts:
+        return {}
+    merged = parts[0].copy()
+    for part in parts[1:]:
+        merged.update(part)
+    return merged
+
+
+def merge_disjoint_dicts(parts: Sequence[Any]) -> Any:
+    """
+    Merge dicts that each hold their own share of the keys.
+
+    Chunks whose dicts share keys returned something else (per-chunk
+    summaries, say), and merging would silently drop all but the last.
+    """
+    merged = merge_dicts(parts)
+    if len(merged) != sum(len(part) for part in parts):
+        raise ValueError("chunk dicts share keys")
+    return merged
+
+
+register_combiner("numpy.ndarray", concat_arrays)
+# pandas 3 reports its public classes as defined in the top-level package
+for _name in (
+    "pandas.DataFrame",
+    "pandas.Series",
+    "pandas.core.frame.DataFrame",
+    "pandas.core.series.Series",
+):
+    register_combiner(_name, concat_frames)
+register_combiner("pyarrow.lib.Table", concat_tables)
+register_combiner(dict, merge_disjoint_dicts)
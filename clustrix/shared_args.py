@@ -0,0 +1,311 @@
+"""Shared-memory transport for large arguments to local worker processes.
+
+Submitting ``func, *args, **kwargs`` to a process pool pickles every argument
+for every chunk, so a large array passed to 64 chunks is copied 64 times.
+:class:`SharedArgumentStore` instead copies each large NumPy array (or the
+numeric columns of a pandas object) into a ``multiprocessing.shared_memory``
+segment once and sends workers a small handle. Workers rebuild zero-copy
+views over a private, copy-on-write mapping of the segment, so a task may
+modify its arguments as it could a pickled copy without affecting other
+tasks or the caller. Where segments cannot be mapped privately (Windows),
+workers copy them instead.
+
+The parent owns every segment and unlinks them when the store is closed,
+including when execution fails.
+"""
+
+import logging
+import mmap
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+
+    SHARED_MEMORY_AVAILABLE = True
+except ImportError:  # pragma: no cover - Python < 3.8
+    SHARED_MEMORY_AVAILABLE = False
+
+try:
+    # The shm_open used by multiprocessing.shared_memory on POSIX systems
+    import _posixshmem
+
+    PRIVATE_MAPPINGS_AVAILABLE = True
+except ImportError:
+    PRIVATE_MAPPINGS_AVAILABLE = False
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import pandas as pd
+
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
+
+# Arguments smaller than this are cheaper to pickle than to share
+DEFAULT_SHARED_MEMORY_THRESHOLD = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class SharedArrayHandle:
+    """Picklable reference to a NumPy array stored in shared memory."""
+
+    shm_name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+@dataclass(frozen=True)
+class SharedFrameHandle:
+    """Picklable reference to a pandas DataFrame or Series.
+
+    Numeric columns live in shared memory; other columns are pickled inline.
+    """
+
+    kind: str  # "frame" or "series"
+    columns: Dict[Any, Any]  # column -> SharedArrayHandle or pickled values
+    index: Any
+    column_order: List[Any] = field(default_factory=list)
+    name: Any = None
+
+
+def ensure_resource_tracker() -> None:
+    """
+    Start the shared-memory resource tracker before worker processes exist.
+
+    Workers inherit the parent's tracker; a worker started without one would
+    launch its own and report the parent's segments as leaked at exit.
+    """
+    if SHARED_MEMORY_AVAILABLE:
+        try:
+            resource_tracker.ensure_running()
+        except Exception as e:
+            logger.debug(f"Could not start resource tracker: {e}")
+
+
+def _is_shareable_array(obj: Any) -> bool:
+    return (
+        NUMPY_AVAILABLE
+        and isinstance(obj, np.ndarray)
+        and not obj.dtype.hasobject
+        and obj.nbytes > 0
+    )
+
+
+def _nbytes(obj: Any) -> int:
+    """Size of the buffer-backed data in ``obj`` (0 if not shareable)."""
+    if _is_shareable_array(obj):
+        return obj.nbytes
+    if PANDAS_AVAILABLE and isinstance(obj, (pd.DataFrame, pd.Series)):
+        try:
+            return int(obj.memory_usage(index=False, deep=False).sum())
+        except Exception:
+            return 0
+    return 0
+
+
+class SharedArgumentStore:
+    """
+    Place large arguments in shared memory for the lifetime of a parallel call.
+
+    The same object passed to many chunks is shared once (objects are keyed by
+    identity). Use as a context manager so segments are always released:
+
+    Example:
+        >>> with SharedArgumentStore() as store:
+        ...     args, kwargs = store.share_arguments(args, kwargs)
+        ...     future = pool.submit(call_with_shared_arguments, func, args, kwargs)
+    """
+
+    def __init__(self, threshold: int = DEFAULT_SHARED_MEMORY_THRESHOLD):
+        self.threshold = threshold
+        self._segments: List[Any] = []
+        self._handles: Dict[int, Tuple[Any, Any]] = {}
+        self.bytes_shared = 0
+
+    def __enter__(self) -> "SharedArgumentStore":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def _share_array(self, array: Any) -> SharedArrayHandle:
+        array = np.ascontiguousarray(array)
+        segment = shared_memory.SharedMemory(create=True, size=array.nbytes)
+        self._segments.append(segment)
+        view: Any = np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)
+        view[...] = array
+        del view
+        self.bytes_shared += array.nbytes
+        return SharedArrayHandle(segment.name, array.shape, array.dtype.str)
+
+    def _share_pandas(self, obj: Any) -> SharedFrameHandle:
+        if isinstance(obj, pd.Series):
+            values = obj.to_numpy()
+            column = (
+                self._share_array(values) if _is_shareable_array(values) else values
+            )
+            return SharedFrameHandle("series", {None: column}, obj.index, name=obj.name)
+
+        columns = {}
+        for position, name in enumerate(obj.columns):
+            values = obj.iloc[:, position].to_numpy()
+            columns[position] = (
+                self._share_array(values) if _is_shareable_array(values) else values
+            )
+        return SharedFrameHandle(
+            "frame", columns, obj.index, column_order=list(obj.columns)
+        )
+
+    def share(self, obj: Any) -> Any:
+        """Return a handle for ``obj`` if it is large enough, else ``obj``."""
+        if not SHARED_MEMORY_AVAILABLE or _nbytes(obj) < self.threshold:
+            return obj
+
+        cached = self._handles.get(id(obj))
+        if cached is not None and cached[0] is obj:
+            return cached[1]
+
+        try:
+            if _is_shareable_array(obj):
+                handle: Any = self._share_array(obj)
+            else:
+                handle = self._share_pandas(obj)
+        except Exception as e:
+            logger.debug(f"Falling back to pickling argument: {e}")
+            return obj
+
+        # Keep a reference to obj so its id cannot be reused while cached
+        self._handles[id(obj)] = (obj, handle)
+        return handle
+
+    def share_arguments(
+        self, args: tuple, kwargs: Dict[str, Any]
+    ) -> Tuple[tuple, Dict[str, Any]]:
+        """Replace large top-level arguments with shared-memory handles."""
+        return (
+            tuple(self.share(arg) for arg in args),
+            {key: self.share(value) for key, value in kwargs.items()},
+        )
+
+    def close(self) -> None:
+        """Release and unlink every segment created by this store."""
+        segments, self._segments = self._segments, []
+        self._handles.clear()
+        for segment in segments:
+            try:
+                segment.close()
+            except Exception as e:
+                logger.debug(f"Error closing shared memory {segment.name}: {e}")
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Failed to unlink shared memory {segment.name}: {e}")
+
+
+# Mappings handed to earlier tasks in this (worker) process
+_mappings: List[Any] = []
+
+
+def _release_mappings() -> None:
+    """Unmap segments of earlier tasks whose views are gone."""
+    in_use = []
+    for mapping in _mappings:
+        try:
+            mapping.close()
+        except BufferError:
+            # A view from an earlier task is still alive; try again later
+            in_use.append(mapping)
+    _mappings[:] = in_use
+
+
+def _attach_array(handle: SharedArrayHandle) -> Any:
+    dtype = np.dtype(handle.dtype)
+    if not PRIVATE_MAPPINGS_AVAILABLE:
+        segment = shared_memory.SharedMemory(name=handle.shm_name)
+        try:
+            view = np.ndarray(handle.shape, dtype=dtype, buffer=segment.buf)
+            array = view.copy()
+            del view
+        finally:
+            segment.close()
+        return array
+
+    nbytes = int(np.prod(handle.shape, dtype=np.int64)) * dtype.itemsize
+    fd = _posixshmem.shm_open("/" + handle.shm_name, os.O_RDONLY, mode=0o600)
+    try:
+        # Written pages are copied for this task alone
+        mapping = mmap.mmap(
+            fd,
+            nbytes,
+            flags=mmap.MAP_PRIVATE,
+            prot=mmap.PROT_READ | mmap.PROT_WRITE,
+        )
+    finally:
+        os.close(fd)
+    _mappings.append(mapping)
+    return np.ndarray(handle.shape, dtype=dtype, buffer=mapping)
+
+
+def _restore(obj: Any) -> Any:
+    if isinstance(obj, SharedArrayHandle):
+        return _attach_array(obj)
+    if isinstance(obj, SharedFrameHandle):
+        columns = {
+            key: _attach_array(value) if isinstance(value, SharedArrayHandle) else value
+            for key, value in obj.columns.items()
+        }
+        if obj.kind == "series":
+            return pd.Series(columns[None], index=obj.index, name=obj.name, copy=False)
+        frame = pd.DataFrame(
+            {position: columns[position] for position in range(len(columns))},
+            index=obj.index,
+            copy=False,
+        )
+        frame.columns = obj.column_order
+        return frame
+    return obj
+
+
+def restore_shared_arguments(
+    args: tuple, kwargs: Dict[str, Any]
+) -> Tuple[tuple, Dict[str, Any]]:
+    """Rebuild shared arguments of a new task (in the worker) as views."""
+    _release_mappings()
+    return (
+        tuple(_restore(arg) for arg in args),
+        {key: _restore(value) for key, value in kwargs.items()},
+    )
+
+
+def call_with_shared_arguments(
+    func: Callable, args: tuple, kwargs: Dict[str, Any]
+) -> Any:
+    """Worker entry point: rebuild shared arguments as views and call func."""
+    restored_args, restored_kwargs = restore_shared_arguments(args, kwargs)
+    return func(*restored_args, **restored_kwargs)
+
+
+def has_shareable_arguments(
+    work_chunks: List[Dict[str, Any]], threshold: Optional[int]
+) -> bool:
+    """Whether any chunk carries an argument worth placing in shared memory."""
+    if not SHARED_MEMORY_AVAILABLE or threshold is None:
+        return False
+    for chunk in work_chunks:
+        values = list(chunk.get("args", ())) + list(chunk.get("kwargs", {}).values())
+        if any(_nbytes(value) >= threshold for value in values):
+            return True
+    return False
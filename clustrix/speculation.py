@@ -0,0 +1,164 @@
+"""Speculative re-execution of straggling parallel chunks.
+
+A parallel run is as slow as its slowest chunk, and the slowest chunk is
+often slow for reasons unrelated to its work: a bad node, or a place deep
+in the queue. With ``speculative_execution`` enabled, the as-completed
+collector (:mod:`clustrix.result_collection`) also watches for stragglers.
+Once ``speculative_min_done`` of the chunks have finished, any chunk that
+has been running for longer than ``speculative_slack`` times the
+``speculative_percentile`` of the finished chunks' runtimes gets a
+duplicate job, placed off the straggler's node with ``--exclude`` on SLURM.
+Whichever copy finishes first is used and the other is cancelled. At most
+``speculative_max_duplicates`` (a fraction of the chunk count, at least
+one) duplicates are submitted per run.
+
+Runtimes are measured from submission, so a chunk stuck in the queue counts
+as a straggler too.
+"""
+
+import logging
+import math
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .result_collection import _Chunk, _Copy
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StragglerPolicy:
+    """When to duplicate a slow chunk, and how many duplicates to allow."""
+
+    min_done: float = 0.75  # Fraction of chunks finished before speculating
+    percentile: float = 90.0  # Of finished chunks' runtimes...
+    slack: float = 1.5  # ...times this is the straggler threshold
+    max_duplicates: float = 0.1  # Fraction of chunks; at least one
+    exclude_node: bool = True  # Keep duplicates off the straggler's node
+    poll_interval: float = 30.0
+
+    @classmethod
+    def from_config(cls, config) -> "StragglerPolicy":
+        return cls(
+            min_done=config.speculative_min_done,
+            percentile=config.speculative_percentile,
+            slack=config.speculative_slack,
+            max_duplicates=config.speculative_max_duplicates,
+            exclude_node=config.speculative_exclude_node,
+            poll_interval=config.job_poll_interval,
+        )
+
+    def duplicate_budget(self, n_chunks: int) -> int:
+        return max(1, int(self.max_duplicates * n_chunks))
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """The ``q``-th percentile of ``values``, by linear interpolation."""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100.0
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+@dataclass
+class SpeculationStats:
+    """What speculation did during a run."""
+
+    duplicates: int = 0
+    duplicate_wins: int = 0
+    cancelled: int = 0
+
+
+class Speculator:
+    """
+    Duplicates straggling chunks while :func:`collect_as_completed` runs.
+
+    Args:
+        executor: ClusterExecutor the jobs were submitted to
+        resubmit: Submits a duplicate of a chunk, optionally excluding a
+            node; returns the new job ID
+        policy: When to speculate
+        stats: Filled in with what speculation did
+    """
+
+    def __init__(
+        self,
+        executor,
+        resubmit: Callable[[Dict[str, Any], Optional[str]], str],
+        policy: StragglerPolicy,
+        stats: Optional[SpeculationStats] = None,
+    ):
+        self.executor = executor
+        self.resubmit = resubmit
+        self.policy = policy
+        self.stats = stats if stats is not None else SpeculationStats()
+        self.runtimes: List[float] = []
+
+    def finished(
+        self, entry: _Chunk, copy: _Copy, error: Optional[BaseException], now: float
+    ) -> None:
+        """Record a finished chunk and cancel its other copies."""
+        if error is None:
+            self.runtimes.append(now - copy.submitted_at)
+            if copy.duplicate:
+                self.stats.duplicate_wins += 1
+        for other in entry.copies:
+            if other is not copy and _cancel(self.executor, other.job_id):
+                self.stats.cancelled += 1
+
+    def speculate(
+        self, outstanding: List[_Chunk], n_chunks: int, clock: Callable[[], float]
+    ) -> bool:
+        """Duplicate outstanding chunks that run too long; True if any were."""
+        policy = self.policy
+        budget = policy.duplicate_budget(n_chunks)
+        if self.stats.duplicates >= budget:
+            return False
+        if len(self.runtimes) < policy.min_done * n_chunks:
+            return False
+        threshold = policy.slack * percentile(self.runtimes, policy.percentile)
+        now = clock()
+        submitted = False
+        for entry in outstanding:
+            if self.stats.duplicates >= budget:
+                break
+            if len(entry.copies) > 1:
+                continue
+            elapsed = now - entry.copies[0].submitted_at
+            if elapsed <= threshold:
+                continue
+            node = None
+            if policy.exclude_node:
+                node = _job_node(self.executor, entry.copies[0].job_id)
+            try:
+                job_id = self.resubmit(entry.chunk, node)
+            except Exception as e:
+                logger.warning(f"Could not submit a duplicate chunk: {e}")
+                continue
+            entry.copies.append(_Copy(job_id, clock(), duplicate=True))
+            self.stats.duplicates += 1
+            submitted = True
+            logger.info(
+                f"🐢 Chunk {entry.chunk.get('index')} has run {elapsed:.0f}s "
+                f"(threshold {threshold:.0f}s); submitted duplicate {job_id}"
+                + (f" excluding {node}" if node else "")
+            )
+        return submitted
+
+
+def _job_node(executor, job_id: str) -> Optional[str]:
+    try:
+        return executor.job_node(job_id)
+    except Exception as e:
+        logger.debug(f"Could not find the node of job {job_id}: {e}")
+        return None
+
+
+def _cancel(executor, job_id: str) -> bool:
+    try:
+        executor.cancel_job(job_id)
+        return True
+    except Exception as e:
+        logger.warning(f"Could not cancel job {job_id}: {e}")
+        return False
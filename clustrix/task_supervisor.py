@@ -0,0 +1,445 @@
+"""Supervised local execution with per-task deadlines.
+
+``concurrent.futures`` cannot stop a task once it is running: ``cancel()``
+only affects queued work, and ``shutdown(wait=True)`` blocks on whatever is
+still running. :class:`TaskSupervisor` instead gives each worker its own
+channel, so it always knows which task each worker is running and since
+when. When a task overruns its deadline, the worker process is killed and
+replaced, and the task is retried or recorded as timed out. The other tasks
+are unaffected.
+
+Threads cannot be killed, so in thread mode an overrunning worker is
+abandoned instead: it is replaced, and whatever it eventually returns is
+discarded. Its daemon thread does not block interpreter exit.
+
+Results come back as a :class:`SupervisedResults` with a status for every
+chunk, so completed work survives a single hung or crashed task.
+"""
+
+import logging
+import multiprocessing
+import pickle
+import queue
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from multiprocessing.connection import wait as wait_connections
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from .cpu_placement import WorkerPlacement, initialize_worker
+
+logger = logging.getLogger(__name__)
+
+COMPLETED = "completed"
+FAILED = "failed"
+TIMEOUT = "timeout"
+CANCELLED = "cancelled"
+
+
+class TaskTimeoutError(TimeoutError):
+    """A supervised task exceeded its deadline."""
+
+
+class WorkerDiedError(RuntimeError):
+    """A worker process exited while running a task."""
+
+
+@dataclass
+class ChunkOutcome:
+    """Final state of one work chunk."""
+
+    index: int
+    status: str = CANCELLED
+    result: Any = None
+    error: Optional[BaseException] = None
+    attempts: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == COMPLETED
+
+
+@dataclass
+class SupervisedResults:
+    """Per-chunk outcomes of a supervised run, in chunk order."""
+
+    outcomes: List[ChunkOutcome] = field(default_factory=list)
+
+    @property
+    def results(self) -> List[Any]:
+        """Chunk results, with None for chunks that did not complete."""
+        return [outcome.result for outcome in self.outcomes]
+
+    @property
+    def all_ok(self) -> bool:
+        return all(outcome.ok for outcome in self.outcomes)
+
+    def by_status(self, status: str) -> List[ChunkOutcome]:
+        return [outcome for outcome in self.outcomes if outcome.status == status]
+
+    def raise_for_status(self) -> None:
+        """Raise the error of the first chunk that did not complete."""
+        for outcome in self.outcomes:
+            if outcome.ok:
+                continue
+            if outcome.error is not None:
+                raise outcome.error
+            raise TaskTimeoutError(f"Chunk {outcome.index} was {outcome.status}")
+
+
+def _worker_error(error: BaseException) -> BaseException:
+    """Return ``error`` if it survives pickling, else a RuntimeError copy."""
+    try:
+        pickle.loads(pickle.dumps(error))
+        return error
+    except Exception:
+        return RuntimeError(
+            "".join(traceback.format_exception_only(type(error), error)).strip()
+        )
+
+
+def _process_worker_main(conn, placement: Optional[WorkerPlacement] = None) -> None:
+    """Worker process loop: run tasks from ``conn`` until told to stop."""
+    initialize_worker(placement)
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            return
+        if task is None:
+            return
+        task_id, func, args, kwargs = task
+        try:
+            message: Tuple[Any, ...] = (task_id, COMPLETED, func(*args, **kwargs))
+        except BaseException as e:
+            message = (task_id, FAILED, _worker_error(e))
+        try:
+            conn.send(message)
+        except Exception as e:
+            conn.send((task_id, FAILED, RuntimeError(f"Unpicklable result: {e}")))
+
+
+class _ProcessWorker:
+    """A single worker process with a private pipe."""
+
+    def __init__(self, context, placement: Optional[WorkerPlacement] = None):
+        self.placement = placement
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_process_worker_main, args=(child_conn, placement), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def send(self, task_id: int, func: Callable, args: tuple, kwargs: dict) -> None:
+        self.conn.send((task_id, func, args, kwargs))
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+        if self.placement is not None and self.placement.cpu_sets:
+            # A killed worker cannot release its cores itself
+            self.placement.release_slot(self.process.pid)
+
+    def close(self) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+
+class _ThreadWorker:
+    """A single daemon thread; it can be abandoned but not killed."""
+
+    def __init__(self, outbox: "queue.Queue"):
+        self.inbox: "queue.Queue" = queue.Queue()
+        self.outbox = outbox
+        self.thread = threading.Thread(
+            target=self._run, name="clustrix-supervised", daemon=True
+        )
+        self.thread.start()
+
+    def _run(self) -> None:
+        while True:
+            task = self.inbox.get()
+            if task is None:
+                return
+            task_id, func, args, kwargs = task
+            try:
+                message: Tuple[Any, ...] = (task_id, COMPLETED, func(*args, **kwargs))
+            except BaseException as e:
+                message = (task_id, FAILED, e)
+            self.outbox.put((self, message))
+
+    def send(self, task_id: int, func: Callable, args: tuple, kwargs: dict) -> None:
+        self.inbox.put((task_id, func, args, kwargs))
+
+    def kill(self) -> None:
+        # Let the thread exit after its current task; its result is ignored
+        self.inbox.put(None)
+
+    close = kill
+
+
+class TaskSupervisor:
+    """
+    Run work chunks on supervised workers with per-task deadlines.
+
+    Workers are started on demand and kept between :meth:`run` calls until
+    :meth:`shutdown`.
+
+    Example:
+        >>> with TaskSupervisor(max_workers=4) as supervisor:
+        ...     outcome = supervisor.run(simulate, chunks, task_timeout=30, retries=1)
+        >>> [o.index for o in outcome.by_status("timeout")]
+        [7]
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        use_threads: bool = False,
+        placement: Optional[WorkerPlacement] = None,
+    ):
+        """
+        Initialize supervisor.
+
+        Args:
+            max_workers: Maximum concurrent tasks
+            use_threads: Supervise threads (abandoned on timeout) rather than
+                processes (killed and replaced on timeout)
+            placement: Thread limits and core pinning for worker processes
+        """
+        self.max_workers = max(1, max_workers)
+        self.use_threads = use_threads
+        self.workers_replaced = 0
+        self._idle: List[Any] = []
+        self._outbox: "queue.Queue" = queue.Queue()
+        self._context = multiprocessing.get_context()
+        self.placement = placement
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    def _spawn(self):
+        if self.use_threads:
+            return _ThreadWorker(self._outbox)
+        return _ProcessWorker(self._context, self.placement)
+
+    def _poll(
+        self, running: Dict[Any, Tuple[int, float]], timeout: Optional[float]
+    ) -> List[Tuple[Any, Optional[Tuple[Any, ...]]]]:
+        """Wait for messages from running workers; None marks a dead worker."""
+        messages: List[Tuple[Any, Optional[Tuple[Any, ...]]]] = []
+        if self.use_threads:
+            try:
+                item = self._outbox.get(timeout=timeout)
+                while True:
+                    # Drop late results from abandoned threads
+                    if item[0] in running:
+                        messages.append(item)
+                    item = self._outbox.get_nowait()
+            except queue.Empty:
+                return messages
+
+        by_conn = {worker.conn: worker for worker in running}
+        for conn in wait_connections(list(by_conn), timeout=timeout):
+            worker = by_conn[conn]
+            try:
+                messages.append((worker, conn.recv()))
+            except (EOFError, OSError):
+                messages.append((worker, None))
+        return messages
+
+    def run(
+        self,
+        func: Callable,
+        work_chunks: Iterable[Dict[str, Any]],
+        task_timeout: Optional[float] = None,
+        retries: int = 0,
+        timeout: Optional[float] = None,
+        on_complete: Optional[Callable[[ChunkOutcome], None]] = None,
+    ) -> SupervisedResults:
+        """
+        Execute every chunk, enforcing deadlines.
+
+        Args:
+            func: Function to execute
+            work_chunks: Chunks with ``args`` and ``kwargs``. Lists are
+                scheduled up front; other iterables are drawn from only when
+                a worker is free, so they can depend on earlier outcomes
+            task_timeout: Seconds each attempt may run before its worker is
+                killed (or abandoned, for threads)
+            retries: Extra attempts, each on a fresh worker, for chunks that
+                time out or whose worker dies. Exceptions raised by ``func``
+                are not retried.
+            timeout: Overall deadline for the run; chunks still running are
+                recorded as timed out and unstarted ones as cancelled
+            on_complete: Called with each chunk's outcome as it completes
+
+        Returns:
+            SupervisedResults with one outcome per chunk
+        """
+        chunks: List[Dict[str, Any]] = []
+        source: Optional[Iterator[Dict[str, Any]]] = None
+        if isinstance(work_chunks, list):
+            chunks = work_chunks
+        else:
+            source = iter(work_chunks)
+        outcomes = [ChunkOutcome(index=i) for i in range(len(chunks))]
+        pending: Deque[int] = deque(range(len(chunks)))
+        running: Dict[Any, Tuple[int, float]] = {}
+        deadline = time.monotonic() + timeout if timeout else None
+
+        def next_index() -> Optional[int]:
+            nonlocal source
+            if pending:
+                return pending.popleft()
+            if source is not None:
+                chunk = next(source, None)
+                if chunk is not None:
+                    chunks.append(chunk)
+                    outcomes.append(ChunkOutcome(index=len(chunks) - 1))
+                    return len(chunks) - 1
+                source = None
+            return None
+
+        def retire(worker: Any, index: int, status: str, error: BaseException) -> None:
+            worker.kill()
+            self.workers_replaced += 1
+            outcome = outcomes[index]
+            if outcome.attempts <= retries:
+                logger.warning(
+                    f"⏱️ Chunk {index} {status} on attempt {outcome.attempts}; "
+                    f"retrying on a fresh worker"
+                )
+                pending.appendleft(index)
+            else:
+                outcome.status, outcome.error = status, error
+
+        try:
+            while pending or running or source is not None:
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    for worker, (index, started) in list(running.items()):
+                        worker.kill()
+                        outcomes[index].status = TIMEOUT
+                        outcomes[index].elapsed = now - started
+                        outcomes[index].error = TaskTimeoutError(
+                            f"Chunk {index} still running after {timeout}s overall timeout"
+                        )
+                    running.clear()
+                    break
+
+                # Hand pending chunks to idle (or new) workers
+                while len(running) < self.max_workers:
+                    index = next_index()
+                    if index is None:
+                        break
+                    worker = self._idle.pop() if self._idle else self._spawn()
+                    chunk = chunks[index]
+                    outcomes[index].attempts += 1
+                    try:
+                        worker.send(
+                            index, func, chunk.get("args", ()), chunk.get("kwargs", {})
+                        )
+                    except Exception as e:
+                        # Unpicklable task: the worker is still usable
+                        self._idle.append(worker)
+                        outcomes[index].status, outcomes[index].error = FAILED, e
+                        continue
+                    running[worker] = (index, time.monotonic())
+
+                if not running:
+                    continue
+
+                wake_times = []
+                if task_timeout:
+                    wake_times = [
+                        started + task_timeout for _, started in running.values()
+                    ]
+                if deadline is not None:
+                    wake_times.append(deadline)
+                wait_for = (
+                    max(0.0, min(wake_times) - time.monotonic()) if wake_times else None
+                )
+
+                for worker, message in self._poll(running, wait_for):
+                    index, started = running.pop(worker)
+                    outcomes[index].elapsed = time.monotonic() - started
+                    if message is None:
+                        exitcode = getattr(
+                            getattr(worker, "process", None), "exitcode", None
+                        )
+                        retire(
+                            worker,
+                            index,
+                            FAILED,
+                            WorkerDiedError(
+                                f"Worker died running chunk {index} (exit code {exitcode})"
+                            ),
+                        )
+                        continue
+                    _, status, payload = message
+                    outcomes[index].status = status
+                    self._idle.append(worker)
+                    if status == COMPLETED:
+                        outcomes[index].result = payload
+                        if on_complete is not None:
+                            on_complete(outcomes[index])
+                    else:
+                        outcomes[index].error = payload
+
+                if task_timeout:
+                    now = time.monotonic()
+                    for worker, (index, started) in list(running.items()):
+                        if now - started >= task_timeout:
+                            del running[worker]
+                            outcomes[index].elapsed = now - started
+                            retire(
+                                worker,
+                                index,
+                                TIMEOUT,
+                                TaskTimeoutError(
+                                    f"Chunk {index} exceeded task timeout of {task_timeout}s"
+                                ),
+                            )
+        except BaseException:
+            # Leave no worker running a task we no longer track
+            for worker in running:
+                worker.kill()
+            raise
+
+        summary = {status: 0 for status in (COMPLETED, FAILED, TIMEOUT, CANCELLED)}
+        for outcome in outcomes:
+            summary[outcome.status] += 1
+        logger.debug(f"Supervised run finished: {summary}")
+        return SupervisedResults(outcomes)
+
+    def shutdown(self) -> None:
+        """Stop all idle workers."""
+        workers, self._idle = self._idle, []
+        for worker in workers:
+            worker.close()
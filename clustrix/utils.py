@@ -5,11 +5,14 @@ import pickle
 import inspect
 import importlib
 import subprocess
-from typing import Any, Dict, Optional, Callable
+from typing import Any, Dict, List, Optional, Callable
 import dill  # type: ignore
 import cloudpickle  # type: ignore
 
+from .analysis_cache import function_source, function_tree
 from .config import ClusterConfig
+from .cpu_placement import THREAD_ENV_VARS
+from .loop_analysis import SafeRangeEvaluator, bind_arguments
 
 
 def detect_loops(func: Callable, args: tuple, kwargs: dict) -> Optional[Dict[str, Any]]:
@@ -26,12 +29,12 @@ def detect_loops(func: Callable, args: tuple, kwargs: dict) -> Optional[Dict[str
     """
 
     try:
-        source = inspect.getsource(func)
-        tree = ast.parse(source)
+        tree = function_tree(func)
 
         class LoopVisitor(ast.NodeVisitor):
             def __init__(self):
                 self.loops = []
+                self.nodes = []
 
             def visit_For(self, node):
                 # Analyze for loops
@@ -46,6 +49,7 @@ def detect_loops(func: Callable, args: tuple, kwargs: dict) -> Optional[Dict[str
                         ),
                     }
                     self.loops.append(loop_info)
+                    self.nodes.append(node)
                 self.generic_visit(node)
 
             def visit_While(self, node):
@@ -57,6 +61,7 @@ def detect_loops(func: Callable, args: tuple, kwargs: dict) -> Optional[Dict[str
                     ),
                 }
                 self.loops.append(loop_info)
+                self.nodes.append(node)
                 self.generic_visit(node)
 
         visitor = LoopVisitor()
@@ -67,24 +72,14 @@ def detect_loops(func: Callable, args: tuple, kwargs: dict) -> Optional[Dict[str
             # In practice, you'd want more sophisticated analysis
             loop = visitor.loops[0]
             if loop["type"] == "for" and "range(" in loop["iterable"]:
-                # Try to extract range information
-                try:
-                    # This is a simplified extraction
-                    range_str = loop["iterable"]
-                    if "range(" in range_str:
-                        range_part = range_str[
-                            range_str.find("range(") : range_str.find(
-                                ")", range_str.find("range(")
-                            )
-                            + 1
-                        ]
-                        range_obj = eval(
-                            range_part
-                        )  # Dangerous in practice, needs safer evaluation
-                        loop["range"] = range_obj
-                except Exception:
-                    loop["range"] = range(10)  # Default fallback
-
+                # Evaluate the bounds against this call's arguments; an
+                # unknown bound disables parallelization rather than guessing
+                evaluator = SafeRangeEvaluator(bind_arguments(func, args, kwargs))
+                evaluator.visit(visitor.nodes[0].iter)
+                bounds = evaluator.result
+                if not (evaluator.safe and bounds) or bounds["step"] == 0:
+                    return None
+                loop["range"] = range(bounds["start"], bounds["stop"], bounds["step"])
                 return loop
 
         return None
@@ -115,7 +110,7 @@ def serialize_function(func: Callable, args: tuple, kwargs: dict) -> Dict[str, A
     # Try to get function source code for better cross-Python compatibility
     func_source = None
     try:
-        func_source = inspect.getsource(func)
+        func_source = function_source(func)
     except Exception:
         # Cannot get source code - this is common for dynamically defined functions
         pass
@@ -144,7 +139,7 @@ def serialize_function(func: Callable, args: tuple, kwargs: dict) -> Dict[str, A
     }
 
     try:
-        func_info["source"] = inspect.getsource(func)
+        func_info["source"] = function_source(func)
     except Exception:
         pass
 
@@ -1095,6 +1090,28 @@ def create_job_script(
         raise ValueError(f"Unsupported cluster type: {cluster_type}")
 
 
+def _thread_limit_exports(
+    job_config: Dict[str, Any], config: ClusterConfig, cores_var: Optional[str]
+) -> List[str]:
+    """
+    Export OpenMP/BLAS thread counts matching the job's core allocation.
+
+    Args:
+        job_config: Job configuration with the requested ``cores``
+        config: Cluster configuration
+        cores_var: Scheduler variable holding the allocated cores, if any
+
+    Returns:
+        Script lines (empty when disabled)
+    """
+    if not getattr(config, "limit_worker_threads", True):
+        return []
+    cores = job_config.get("cores") or 1
+    value = f"${{{cores_var}:-{cores}}}" if cores_var else str(cores)
+    user_vars = config.environment_variables or {}
+    return [f"export {var}={value}" for var in THREAD_ENV_VARS if var not in user_vars]
+
+
 def _create_slurm_script(
     job_config: Dict[str, Any], remote_job_dir: str, config: ClusterConfig
 ) -> str:
@@ -1113,6 +1130,15 @@ def _create_slurm_script(
     if job_config.get("partition"):
         script_lines.append(f"#SBATCH --partition={job_config['partition']}")
 
+    if job_config.get("exclude"):
+        script_lines.append(f"#SBATCH --exclude={job_config['exclude']}")
+
+    if job_config.get("dependency"):
+        # Held until the jobs whose results it reads succeed
+        after = ":".join(job_config["dependency"])
+        script_lines.append(f"#SBATCH --dependency=afterok:{after}")
+        script_lines.append("#SBATCH --kill-on-invalid-dep=yes")
+
     # Add environment setup
     if config.module_loads:
         for module in config.module_loads:
@@ -1122,6 +1148,10 @@ def _create_slurm_script(
         for var, value in config.environment_variables.items():
             script_lines.append(f"export {var}={value}")
 
+    script_lines.extend(
+        _thread_limit_exports(job_config, config, "SLURM_CPUS_PER_TASK")
+    )
+
     if config.pre_execution_commands:
         for cmd in config.pre_execution_commands:
             script_lines.append(cmd)
@@ -1207,6 +1237,11 @@ def _create_pbs_script(
     if job_config.get("queue"):
         script_lines.append(f"#PBS -q {job_config['queue']}")
 
+    if job_config.get("dependency"):
+        script_lines.append(
+            f"#PBS -W depend=afterok:{':'.join(job_config['dependency'])}"
+        )
+
     # Add environment setup
     if config.module_loads:
         for module in config.module_loads:
@@ -1214,6 +1249,7 @@ def _create_pbs_script(
     if config.environment_variables:
         for var, value in config.environment_variables.items():
             script_lines.append(f"export {var}={value}")
+    script_lines.extend(_thread_limit_exports(job_config, config, "NCPUS"))
     if config.pre_execution_commands:
         for cmd in config.pre_execution_commands:
             script_lines.append(cmd)
@@ -1244,8 +1280,22 @@ def _create_sge_script(
         f"#$ -l h_vmem={job_config['memory']}",
         f"#$ -l h_rt={job_config['time']}",
         "#$ -cwd",
-        "",
     ]
+    upstream_check = []
+    if job_config.get("dependency"):
+        script_lines.append(f"#$ -hold_jid {','.join(job_config['dependency'])}")
+        # -hold_jid releases the job when its upstream jobs end, whether or
+        # not they succeeded, so it checks for their results itself
+        if job_config.get("dependency_results"):
+            upstream_check = [
+                f"    for path in {list(job_config['dependency_results'])!r}:",
+                "        if not os.path.exists(path):",
+                "            raise RuntimeError(",
+                "                f'Upstream result {path} is missing; the job that '",
+                "                'should have written it failed'",
+                "            )",
+            ]
+    script_lines.append("")
 
     # Add environment setup
     if config.module_loads:
@@ -1254,6 +1304,7 @@ def _create_sge_script(
     if config.environment_variables:
         for var, value in config.environment_variables.items():
             script_lines.append(f"export {var}={value}")
+    script_lines.extend(_thread_limit_exports(job_config, config, "NSLOTS"))
     if config.pre_execution_commands:
         for cmd in config.pre_execution_commands:
             script_lines.append(cmd)
@@ -1263,6 +1314,7 @@ def _create_sge_script(
             f"cd {remote_job_dir}",
             "source venv/bin/activate",
             f'{config.python_executable if config.python_executable else "python"} -c "',
+            "import os",
             "import pickle",
             "import sys",
             "import traceback",
@@ -1277,6 +1329,7 @@ def _create_sge_script(
             "    cloudpickle = None",
             "",
             "try:",
+            *upstream_check,
             "    with open('function_data.pkl', 'rb') as f:",
             "        data = pickle.load(f)",
             "    ",
@@ -1354,6 +1407,12 @@ def _create_ssh_script(
             script_lines.append(f"export {var}={value}")
         script_lines.append("")
 
+    thread_exports = _thread_limit_exports(job_config, config, None)
+    if thread_exports:
+        script_lines.append("# Match native thread pools to the requested cores")
+        script_lines.extend(thread_exports)
+        script_lines.append("")
+
     if config.pre_execution_commands:
         script_lines.append("# Execute pre-execution commands")
         for cmd in config.pre_execution_commands:
@@ -0,0 +1,339 @@
+"""Process-global worker pools that stay warm across local parallel calls.
+
+Creating a ``ProcessPoolExecutor`` per call means every decorated call pays
+for process start-up and for re-importing modules in every worker. Pools
+obtained from :func:`get_worker_pool` are created lazily, shared between
+calls with the same executor kind and worker count, recycled after a number
+of tasks or when workers grow too large, and shut down at interpreter exit.
+
+The task limit applies to the pool as a whole: with uneven work one worker
+may run most of the tasks before the pool is recycled. Per-process limits
+(``ProcessPoolExecutor(max_tasks_per_child=...)``) are not used, as
+replacing workers mid-run deadlocks the executor on current CPython
+releases.
+"""
+
+import atexit
+import importlib
+import logging
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from .cpu_placement import initialize_worker, plan_worker_placement
+from .shared_args import ensure_resource_tracker
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+def _preload_modules(modules: Tuple[str, ...]) -> None:
+    """Worker initializer importing modules ahead of the first task."""
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            logger.warning(f"Could not preload module {module} in worker: {e}")
+
+
+def _get_rss_mb(pid: int) -> Optional[float]:
+    """Resident set size of a process in MB, or None if unavailable."""
+    if PSUTIL_AVAILABLE:
+        try:
+            return psutil.Process(pid).memory_info().rss / (1024 * 1024)
+        except Exception:
+            return None
+
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+@dataclass
+class WorkerPoolStats:
+    """Usage counters for a persistent worker pool."""
+
+    kind: str
+    max_workers: int
+    tasks_submitted: int = 0
+    tasks_since_recycle: int = 0
+    pools_created: int = 0
+    recycles: int = 0
+
+
+def create_process_pool(
+    max_workers: int,
+    preload_modules: Iterable[str] = (),
+    limit_worker_threads: bool = True,
+    cpu_affinity: bool = False,
+) -> ProcessPoolExecutor:
+    """
+    Create a process pool whose workers respect a per-worker core budget.
+
+    Args:
+        max_workers: Number of worker processes
+        preload_modules: Modules each worker imports before its first task
+        limit_worker_threads: Cap OpenMP/BLAS threads at cores / workers
+        cpu_affinity: Pin each worker to its own NUMA-local cores
+
+    Returns:
+        The ProcessPoolExecutor
+    """
+    placement = plan_worker_placement(
+        max_workers, limit_threads=limit_worker_threads, cpu_affinity=cpu_affinity
+    )
+    preload_modules = tuple(preload_modules)
+    if placement is None and not preload_modules:
+        return ProcessPoolExecutor(max_workers=max_workers)
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=initialize_worker,
+        initargs=(placement, preload_modules),
+    )
+
+
+def terminate_executor(
+    executor: Union[ThreadPoolExecutor, ProcessPoolExecutor],
+) -> None:
+    """
+    Shut down ``executor`` without waiting on tasks that are still running.
+
+    Queued tasks are cancelled. Worker processes are killed; threads cannot
+    be stopped and are left to finish in the background.
+    """
+    processes = list((getattr(executor, "_processes", None) or {}).values())
+    try:
+        executor.shutdown(wait=False, cancel_futures=True)
+    except TypeError:  # Python < 3.9
+        executor.shutdown(wait=False)
+    for process in processes:
+        if process.is_alive():
+            process.kill()
+
+
+class PersistentWorkerPool:
+    """
+    A lazily created executor that is reused across calls.
+
+    The underlying executor is replaced ("recycled") when it breaks, when the
+    process forks, after ``max_pool_tasks`` tasks in total, or when any worker
+    process exceeds ``max_worker_memory_mb``. Recycling happens between
+    calls (see :meth:`acquire`) so work already submitted is never dropped.
+    """
+
+    def __init__(
+        self,
+        use_threads: bool,
+        max_workers: int,
+        preload_modules: Optional[Iterable[str]] = None,
+        max_pool_tasks: Optional[int] = None,
+        max_worker_memory_mb: Optional[float] = None,
+        limit_worker_threads: bool = True,
+        cpu_affinity: bool = False,
+    ):
+        self.use_threads = use_threads
+        self.max_workers = max_workers
+        self.preload_modules: Tuple[str, ...] = tuple(preload_modules or ())
+        self.max_pool_tasks = max_pool_tasks
+        self.max_worker_memory_mb = max_worker_memory_mb
+        self.limit_worker_threads = limit_worker_threads
+        self.cpu_affinity = cpu_affinity
+        self.stats = WorkerPoolStats(
+            kind="thread" if use_threads else "process", max_workers=max_workers
+        )
+        self._executor: Optional[Union[ThreadPoolExecutor, ProcessPoolExecutor]] = None
+        self._owner_pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def _create_executor(self) -> Union[ThreadPoolExecutor, ProcessPoolExecutor]:
+        if self.use_threads:
+            # Threads share the interpreter, so preloading happens here
+            _preload_modules(self.preload_modules)
+            executor: Union[ThreadPoolExecutor, ProcessPoolExecutor] = (
+                ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="clustrix-local",
+                )
+            )
+        else:
+            ensure_resource_tracker()
+            executor = create_process_pool(
+                self.max_workers,
+                preload_modules=self.preload_modules,
+                limit_worker_threads=self.limit_worker_threads,
+                cpu_affinity=self.cpu_affinity,
+            )
+        self.stats.pools_created += 1
+        self.stats.tasks_since_recycle = 0
+        self._owner_pid = os.getpid()
+        logger.debug(
+            f"Started {self.stats.kind} worker pool with {self.max_workers} workers"
+        )
+        return executor
+
+    def _worker_memory_mb(self) -> List[float]:
+        """RSS of each live worker process (empty for thread pools)."""
+        if self.use_threads or self._executor is None:
+            return []
+        processes = getattr(self._executor, "_processes", None) or {}
+        sizes = [_get_rss_mb(pid) for pid in list(processes)]
+        return [size for size in sizes if size is not None]
+
+    def _recycle_reason(self) -> Optional[str]:
+        if self._executor is None:
+            return None
+        if os.getpid() != self._owner_pid:
+            return "process forked"
+        if getattr(self._executor, "_broken", False):
+            return "pool broken"
+        if (
+            self.max_pool_tasks
+            and self.stats.tasks_since_recycle >= self.max_pool_tasks
+        ):
+            return f"{self.stats.tasks_since_recycle} tasks completed"
+        if self.max_worker_memory_mb:
+            largest = max(self._worker_memory_mb(), default=0.0)
+            if largest > self.max_worker_memory_mb:
+                return f"worker memory {largest:.0f}MB"
+        return None
+
+    def acquire(self) -> "PersistentWorkerPool":
+        """Ensure a healthy executor exists and return the pool for submission."""
+        with self._lock:
+            reason = self._recycle_reason()
+            if reason is not None:
+                logger.info(f"♻️ Recycling {self.stats.kind} worker pool: {reason}")
+                old = self._executor
+                self._executor = None
+                self.stats.recycles += 1
+                if old is not None and os.getpid() == self._owner_pid:
+                    # Let any straggling tasks finish in the background
+                    old.shutdown(wait=False)
+            if self._executor is None:
+                self._executor = self._create_executor()
+        return self
+
+    def submit(self, fn: Callable, *args: Any, **kwargs: Any) -> Future:
+        """Submit a task to the current executor."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._create_executor()
+            self.stats.tasks_submitted += 1
+            self.stats.tasks_since_recycle += 1
+            return self._executor.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the underlying executor; it is recreated on next use."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None and os.getpid() == self._owner_pid:
+            executor.shutdown(wait=wait)
+
+    def terminate(self) -> None:
+        """Discard the executor without waiting for running tasks."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None and os.getpid() == self._owner_pid:
+            self.stats.recycles += 1
+            terminate_executor(executor)
+
+    @property
+    def is_running(self) -> bool:
+        return self._executor is not None
+
+
+_POOLS: Dict[Tuple[str, int], PersistentWorkerPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_worker_pool(
+    use_threads: bool = False,
+    max_workers: Optional[int] = None,
+    preload_modules: Optional[Iterable[str]] = None,
+    max_pool_tasks: Optional[int] = None,
+    max_worker_memory_mb: Optional[float] = None,
+    limit_worker_threads: Optional[bool] = None,
+    cpu_affinity: Optional[bool] = None,
+) -> PersistentWorkerPool:
+    """
+    Get the shared worker pool for an executor kind and worker count.
+
+    Options passed here update the pool's settings; changes to preloaded
+    modules take effect the next time the pool is (re)created.
+
+    Args:
+        use_threads: Thread pool if True, process pool otherwise
+        max_workers: Number of workers (defaults to the CPU count)
+        preload_modules: Modules each worker imports before its first task
+        max_pool_tasks: Recycle the pool after it has run this many tasks
+            in total (across all of its workers)
+        max_worker_memory_mb: Recycle workers once one exceeds this RSS
+        limit_worker_threads: Cap OpenMP/BLAS threads in each worker process
+            at its share of the cores
+        cpu_affinity: Pin worker processes to NUMA-local cores
+
+    Returns:
+        The shared PersistentWorkerPool
+    """
+    max_workers = max_workers or os.cpu_count() or 4
+    key = ("thread" if use_threads else "process", max_workers)
+
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = PersistentWorkerPool(use_threads, max_workers)
+            _POOLS[key] = pool
+
+    if preload_modules is not None:
+        pool.preload_modules = tuple(preload_modules)
+    if max_pool_tasks is not None:
+        pool.max_pool_tasks = max_pool_tasks
+    if max_worker_memory_mb is not None:
+        pool.max_worker_memory_mb = max_worker_memory_mb
+    if limit_worker_threads is not None:
+        pool.limit_worker_threads = limit_worker_threads
+    if cpu_affinity is not None:
+        pool.cpu_affinity = cpu_affinity
+
+    return pool
+
+
+def has_warm_worker_pool(use_threads: bool, max_workers: Optional[int] = None) -> bool:
+    """Whether a shared pool of this kind and size is already running."""
+    max_workers = max_workers or os.cpu_count() or 4
+    key = ("thread" if use_threads else "process", max_workers)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+    return pool is not None and pool.is_running
+
+
+def get_worker_pool_stats() -> List[WorkerPoolStats]:
+    """Return usage counters for every shared worker pool."""
+    with _POOLS_LOCK:
+        return [pool.stats for pool in _POOLS.values()]
+
+
+def shutdown_worker_pools(wait: bool = True) -> None:
+    """Shut down all shared worker pools (registered to run at exit)."""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        try:
+            pool.shutdown(wait=wait)
+        except Exception as e:
+            logger.debug(f"Error shutting down worker pool: {e}")
+
+
+atexit.register(shutdown_worker_pools)
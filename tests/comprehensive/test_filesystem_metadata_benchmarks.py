@@ -0,0 +1,154 @@
+"""
+Benchmarks comparing shell-command and SFTP metadata lookups.
+
+The "cluster" is the local filesystem behind a simulated network: each
+SSH message exchange costs one round trip (``RTT``). Running a command
+opens a channel, requests the exec and waits for output and exit status
+(three round trips) while the remote shell starts (``SPAWN``); an SFTP
+request on the open session is one round trip. Commands really run and
+SFTP requests really stat, so both paths return real results.
+"""
+
+import os
+import statistics
+import subprocess
+import time
+from unittest.mock import patch
+
+import paramiko
+import pytest
+
+from clustrix.config import ClusterConfig
+from clustrix.filesystem import ClusterFilesystem
+
+RTT = 0.002  # seconds
+SPAWN = 0.002  # seconds
+PATHS = 40
+
+
+class _Output:
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def read(self):
+        return self.data
+
+
+class SimulatedSFTP:
+    def _attributes(self, path, name=""):
+        return paramiko.SFTPAttributes.from_stat(os.stat(path), name)
+
+    def stat(self, path):
+        time.sleep(RTT)
+        return self._attributes(path)
+
+    def listdir_attr(self, path):
+        time.sleep(RTT)
+        return [
+            self._attributes(os.path.join(path, name), name)
+            for name in os.listdir(path)
+        ]
+
+    def close(self):
+        pass
+
+
+class SimulatedSSH:
+    def set_missing_host_key_policy(self, policy):
+        pass
+
+    def connect(self, **kwargs):
+        pass
+
+    def open_sftp(self):
+        time.sleep(RTT)
+        return SimulatedSFTP()
+
+    def exec_command(self, command):
+        time.sleep(3 * RTT + SPAWN)
+        done = subprocess.run(command, shell=True, capture_output=True)
+        return None, _Output(done.stdout), _Output(done.stderr)
+
+    def close(self):
+        pass
+
+
+def shell_stat(ssh, path):
+    """The former ``stat -c`` implementation of a remote stat."""
+    _, stdout, _ = ssh.exec_command(f"stat -c '%s %Y %f' {path} 2>/dev/null")
+    output = stdout.read().decode().strip()
+    if not output:
+        raise FileNotFoundError(path)
+    return int(output.split()[0])
+
+
+def shell_exists(ssh, path):
+    """The former ``test -e`` implementation of a remote exists check."""
+    _, stdout, _ = ssh.exec_command(f"test -e {path} && echo 'EXISTS' || echo 'NO'")
+    return stdout.read().decode().strip() == "EXISTS"
+
+
+def _per_call(calls, repeats=3):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for call in calls:
+            call()
+        timings.append((time.perf_counter() - start) / len(calls))
+    return statistics.median(timings)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for i in range(PATHS):
+        (tmp_path / f"part-{i:03d}.csv").write_text("x" * i)
+    return tmp_path
+
+
+class TestFilesystemMetadataBenchmarks:
+    """SFTP requests should beat a remote shell per metadata lookup."""
+
+    @pytest.mark.parametrize("operation", ["stat", "exists"])
+    def test_sftp_beats_shell(self, data_dir, operation):
+        config = ClusterConfig(
+            cluster_type="slurm",
+            cluster_host="cluster.invalid",
+            remote_work_dir=str(data_dir),
+        )
+        with patch("clustrix.filesystem.paramiko.SSHClient", SimulatedSSH):
+            fs = ClusterFilesystem(config)
+            fs.exists(".")  # Open the SFTP session
+            ssh = fs._get_ssh_client()
+            paths = [str(data_dir / f"part-{i:03d}.csv") for i in range(PATHS)]
+
+            if operation == "stat":
+                assert [fs.stat(p).size for p in paths] == list(range(PATHS))
+                assert [shell_stat(ssh, p) for p in paths] == list(range(PATHS))
+                sftp = _per_call([lambda p=p: fs.stat(p) for p in paths])
+                shell = _per_call([lambda p=p: shell_stat(ssh, p) for p in paths])
+            else:
+                assert all(fs.exists(p) for p in paths)
+                sftp = _per_call([lambda p=p: fs.exists(p) for p in paths])
+                shell = _per_call([lambda p=p: shell_exists(ssh, p) for p in paths])
+
+        print(
+            f"\n{operation}: shell={shell * 1000:.2f}ms/call "
+            f"sftp={sftp * 1000:.2f}ms/call ({shell / sftp:.1f}x)"
+        )
+        assert sftp < shell / 2
+
+    def test_listing_returns_attributes(self, data_dir):
+        config = ClusterConfig(
+            cluster_type="slurm",
+            cluster_host="cluster.invalid",
+            remote_work_dir=str(data_dir),
+        )
+        with patch("clustrix.filesystem.paramiko.SSHClient", SimulatedSSH):
+            fs = ClusterFilesystem(config)
+            start = time.perf_counter()
+            entries = fs._remote_ls_info(".")
+            elapsed = time.perf_counter() - start
+
+        assert sorted(e.size for e in entries) == list(range(PATHS))
+        # One request for the session and one for the whole listing
+        assert elapsed < 10 * RTT
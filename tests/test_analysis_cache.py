@@ -0,0 +1,153 @@
+"""Tests for the per-code-object analysis cache."""
+
+import importlib.util
+import inspect
+import os
+from unittest.mock import patch
+
+import pytest
+
+from clustrix.analysis_cache import (
+    AnalysisCache,
+    analysis_cache_stats,
+    cached_analysis,
+    clear_analysis_cache,
+    function_tree,
+    get_analysis_cache,
+)
+from clustrix.config import configure
+from clustrix.decorator import cluster
+from clustrix.function_flattening import (
+    analyze_function_complexity,
+    auto_flatten_if_needed,
+)
+from clustrix.gpu_utils import detect_gpu_parallelizable_operations
+from clustrix.loop_splitting import plan_loop_split
+from clustrix.utils import detect_loops
+
+
+def scaled(data, factor):
+    results = []
+    for x in data:
+        results.append(x * factor)
+    return results
+
+
+MODULE_SOURCE = """
+def compute(n):
+    total = 0
+    for i in range(n):
+        total += {step}
+    return total
+"""
+
+
+def load_module(path, step):
+    path.write_text(MODULE_SOURCE.format(step=step))
+    spec = importlib.util.spec_from_file_location(path.stem, str(path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    clear_analysis_cache()
+    get_analysis_cache().reset_stats()
+    yield
+    clear_analysis_cache()
+
+
+@pytest.fixture
+def count_getsource():
+    with patch("inspect.getsource", wraps=inspect.getsource) as getsource:
+        yield getsource
+
+
+class TestAnalysisCache:
+    """Test caching and invalidation."""
+
+    def test_analyses_computed_once(self):
+        calls = []
+        for _ in range(3):
+            value = cached_analysis(scaled, "probe", lambda: calls.append(1) or 42)
+        assert value == 42
+        assert len(calls) == 1
+        stats = analysis_cache_stats()
+        assert (stats.hits, stats.misses) == (2, 1)
+        assert stats.hit_rate == pytest.approx(2 / 3)
+
+    def test_failures_not_cached(self):
+        def failing():
+            raise SyntaxError("bad")
+
+        with pytest.raises(SyntaxError):
+            cached_analysis(scaled, "probe", failing)
+        assert cached_analysis(scaled, "probe", lambda: 1) == 1
+
+    def test_shared_tree(self, count_getsource):
+        assert function_tree(scaled) is function_tree(scaled)
+        assert count_getsource.call_count == 1
+
+    def test_callables_without_code_are_not_cached(self):
+        cache = AnalysisCache()
+        assert cache.get(len, "probe", lambda: 1) == 1
+        assert cache.stats().entries == 0
+
+    def test_changed_source_invalidates(self, tmp_path):
+        module = load_module(tmp_path / "edited_module.py", step="i")
+        assert cached_analysis(module.compute, "probe", lambda: "old") == "old"
+
+        # Same length, so the old code object maps onto the edited lines
+        (tmp_path / "edited_module.py").write_text(MODULE_SOURCE.format(step="2"))
+        stat = os.stat(tmp_path / "edited_module.py")
+        os.utime(
+            tmp_path / "edited_module.py",
+            ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9),
+        )
+
+        assert cached_analysis(module.compute, "probe", lambda: "new") == "new"
+        assert analysis_cache_stats().invalidations == 1
+
+    def test_touched_file_keeps_analyses(self, tmp_path):
+        module = load_module(tmp_path / "touched_module.py", step="i")
+        function_tree(module.compute)
+        assert cached_analysis(module.compute, "probe", lambda: "old") == "old"
+
+        stat = os.stat(tmp_path / "touched_module.py")
+        os.utime(
+            tmp_path / "touched_module.py",
+            ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9),
+        )
+
+        assert cached_analysis(module.compute, "probe", lambda: "new") == "old"
+        assert analysis_cache_stats().invalidations == 0
+
+
+class TestHotPath:
+    """Test that repeated calls analyse the source once."""
+
+    def test_static_analyses_share_one_parse(self, count_getsource):
+        for _ in range(100):
+            analyze_function_complexity(scaled)
+            auto_flatten_if_needed(scaled)
+            detect_gpu_parallelizable_operations(scaled, ([1, 2], 3), {})
+            detect_loops(scaled, ([1, 2], 3), {})
+            plan_loop_split(scaled, ([1, 2], 3), {})
+        assert count_getsource.call_count == 1
+        assert analysis_cache_stats().hit_rate > 0.9
+
+    def test_cached_results_are_copies(self):
+        analyze_function_complexity(scaled)["complexity_score"] = -1
+        assert analyze_function_complexity(scaled)["complexity_score"] != -1
+
+    def test_decorated_function_analysed_once(self, count_getsource):
+        configure(cluster_host=None)
+
+        @cluster(parallel=True)
+        def add(x, y):
+            return x + y
+
+        for i in range(10000):
+            assert add(i, 1) == i + 1
+        assert count_getsource.call_count == 1
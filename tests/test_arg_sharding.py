@@ -0,0 +1,210 @@
+"""Tests for argument sharding and the shared-argument blob store."""
+
+import os
+import pickle
+import shutil
+import subprocess
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from clustrix.arg_sharding import shard_chunk_arguments
+from clustrix.blob_store import BlobRef, BlobStore
+from clustrix.config import ClusterConfig, get_config
+from clustrix.decorator import _create_work_chunks, _execute_parallel
+from clustrix.loop_splitting import analyze_loop_split, plan_loop_split
+
+
+def total_of(data):
+    total = 0
+    for row in data:
+        total += row
+    return total
+
+
+def scaled(x, scale):
+    out = []
+    for i in range(len(x)):
+        out.append(x[i] * scale)
+    return out
+
+
+def from_first(x):
+    first = x[0]
+    out = []
+    for i in range(len(x)):
+        out.append(x[i] - first)
+    return out
+
+
+def differences(x):
+    out = []
+    for i in range(len(x) - 1):
+        out.append(x[i + 1] - x[i])
+    return out
+
+
+def doubled_column(df):
+    out = []
+    for i in range(len(df)):
+        out.append(df.iloc[i]["a"] * 2)
+    return out
+
+
+def run_chunks(func, args, kwargs=None, n_jobs=4):
+    """Shard ``func``'s arguments and run its chunks locally."""
+    kwargs = kwargs or {}
+    plan = plan_loop_split(func, args, kwargs)
+    chunks = _create_work_chunks(func, args, kwargs, plan.loop_info(), n_jobs)
+    sharded = shard_chunk_arguments(func, args, kwargs, plan, chunks)
+    results = [plan.chunk_function(*c["args"], **c["kwargs"]) for c in chunks]
+    return sharded, chunks, plan.combine(results)
+
+
+class TestAnalysis:
+    """Test which arguments a chunk only needs a slice of."""
+
+    def test_iterated_argument(self):
+        assert analyze_loop_split(total_of).shards == (("data", "iter"),)
+
+    def test_indexed_argument(self):
+        assert analyze_loop_split(scaled).shards == (("x", "item"),)
+
+    def test_iloc_argument(self):
+        assert analyze_loop_split(doubled_column).shards == (("df", "iloc"),)
+
+    @pytest.mark.parametrize("func", [from_first, differences])
+    def test_other_reads_prevent_sharding(self, func):
+        assert analyze_loop_split(func).shards == ()
+
+
+class TestSharding:
+    """Test chunk payloads and results."""
+
+    def test_iterated_array(self):
+        data = np.arange(100.0)
+        sharded, chunks, result = run_chunks(total_of, (data,))
+        assert sharded == ["data"]
+        assert result == data.sum()
+        assert sum(len(c["args"][0]) for c in chunks) == len(data)
+        assert all(np.shares_memory(c["args"][0], data) for c in chunks)
+
+    def test_indexed_list_keeps_other_arguments(self):
+        x = list(range(10))
+        sharded, chunks, result = run_chunks(scaled, (x,), {"scale": 3})
+        assert sharded == ["x"]
+        assert result == scaled(x, 3)
+        assert all(c["kwargs"]["scale"] == 3 for c in chunks)
+        assert [c["kwargs"]["_shard_offset"] for c in chunks] == [0, 2, 4, 6, 8]
+
+    def test_dataframe_rows(self):
+        pd = pytest.importorskip("pandas")
+        df = pd.DataFrame({"a": range(12)})
+        sharded, chunks, result = run_chunks(doubled_column, (df,))
+        assert sharded == ["df"]
+        assert result == doubled_column(df)
+        assert sum(len(c["args"][0]) for c in chunks) == len(df)
+
+    def test_series_items_are_not_sharded(self):
+        pd = pytest.importorskip("pandas")
+        series = pd.Series(range(8), index=list("abcdefgh"))
+        plan = plan_loop_split(scaled, (series, 2), {})
+        chunks = _create_work_chunks(scaled, (series, 2), {}, plan.loop_info(), 4)
+        assert shard_chunk_arguments(scaled, (series, 2), {}, plan, chunks) == []
+
+    def test_payload_scales_with_data(self, monkeypatch):
+        config = get_config()
+        monkeypatch.setattr(config, "max_parallel_jobs", 8)
+        monkeypatch.setattr(config, "job_poll_interval", 0)
+        data = np.arange(80_000.0)
+        payloads = []
+        jobs = {}
+        executor = MagicMock()
+
+        def serialize(func, args, kwargs):
+            payloads.append(len(pickle.dumps((args, kwargs))))
+            return (func, args, kwargs)
+
+        def wait(job):
+            func, args, kwargs = jobs[job]
+            return func(*args, **kwargs)
+
+        def submit(func_data, job_config):
+            job_id = f"job{len(jobs)}"
+            jobs[job_id] = func_data
+            return job_id
+
+        executor.submit_job.side_effect = submit
+        executor.wait_for_result.side_effect = wait
+        executor.wait_for_remote_result.return_value = None
+        with patch("clustrix.decorator.serialize_function", side_effect=serialize):
+            result = _execute_parallel(executor, total_of, (data,), {}, {}, {})
+
+        assert result == data.sum()
+        assert len(payloads) == 8
+        assert sum(payloads) < 1.1 * data.nbytes
+
+
+class LocalShell:
+    """A 'cluster' whose remote filesystem is the local one."""
+
+    def __init__(self):
+        self.uploads = []
+        self.connection_manager = MagicMock()
+        self.connection_manager.execute_remote_command.side_effect = self.run
+        self.connection_manager.upload_file.side_effect = self.upload
+
+    def run(self, command):
+        done = subprocess.run(command, shell=True, capture_output=True, text=True)
+        return done.stdout, done.stderr
+
+    def upload(self, local_path, remote_path):
+        self.uploads.append(remote_path)
+        shutil.copy(local_path, remote_path)
+
+
+class TestBlobStore:
+    """Test sharing large arguments between jobs."""
+
+    @pytest.fixture
+    def config(self, tmp_path):
+        return ClusterConfig(cluster_type="slurm", remote_work_dir=str(tmp_path))
+
+    def test_shared_once_and_loaded_by_jobs(self, config, tmp_path, monkeypatch):
+        cluster = LocalShell()
+        table = np.arange(1000.0)
+        store = BlobStore(cluster, config, min_bytes=1000)
+
+        first = store.share_arguments((table, 1), {"lookup": table})
+        second = store.share_arguments((table, 2), {})
+        assert isinstance(first[0][0], BlobRef) and first[0][1] == 1
+        assert first[1]["lookup"] is first[0][0] is second[0][0]
+        assert len(cluster.uploads) == 1
+        assert store.uploaded_bytes > table.nbytes
+
+        # A job unpickles its arguments with plain pickle, in its directory
+        job_dir = tmp_path / "job_1"
+        job_dir.mkdir()
+        payload = pickle.dumps(first[0], protocol=4)
+        monkeypatch.chdir(job_dir)
+        args = pickle.loads(payload)
+        np.testing.assert_array_equal(args[0], table)
+
+        # Other clients find the blob by content
+        again = BlobStore(cluster, config, min_bytes=1000)
+        again.share(table.copy())
+        assert len(cluster.uploads) == 1 and again.reused == 1
+        assert not [p for p in os.listdir(tmp_path / "blobs") if p.endswith(".tmp")]
+
+    def test_small_values_stay_inline(self, config):
+        cluster = LocalShell()
+        store = BlobStore(cluster, config, min_bytes=1000)
+        assert store.share([1, 2, 3]) == [1, 2, 3]
+        cluster.connection_manager.execute_remote_command.assert_not_called()
+
+    def test_upload_failure_sends_inline(self, config):
+        cluster = LocalShell()
+        cluster.connection_manager.upload_file.side_effect = OSError("disk full")
+        table = np.zeros(1000)
+        assert BlobStore(cluster, config, min_bytes=1000).share(table) is table
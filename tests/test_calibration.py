@@ -0,0 +1,295 @@
+"""Tests for calibration-based local executor selection."""
+
+import time
+
+import pytest
+
+import clustrix.calibration as calibration_module
+from clustrix.calibration import (
+    CalibrationResult,
+    clear_calibration_cache,
+    explain_execution_plan,
+    get_cached_calibration,
+    get_execution_plan,
+    plan_execution,
+)
+import clustrix.local_executor as local_executor_module
+from clustrix.decorator import _execute_local_parallel, cluster
+from clustrix.local_executor import (
+    _safe_pickle_test,
+    choose_executor_type,
+    execute_calibrated,
+)
+from clustrix.loop_splitting import plan_loop_split
+
+
+def add_one(x):
+    return x + 1
+
+
+def sleepy(x):
+    time.sleep(0.005)
+    return x
+
+
+def spin(x):
+    total = 0
+    for i in range(40_000):
+        total += i % 7
+    return x + total
+
+
+@cluster(cores=2)
+def decorated_spin(x):
+    return spin(x)
+
+
+def spin_all(values):
+    results = []
+    for x in values:
+        results.append(spin(x))
+    return results
+
+
+def add_one_all(values):
+    results = []
+    for x in values:
+        results.append(add_one(x))
+    return results
+
+
+def cpu_mentions_sleep(x):
+    if x < 0:
+        time.sleep(1)
+    return sum(i * i for i in range(200_000))
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    clear_calibration_cache()
+    yield
+    clear_calibration_cache()
+
+
+def fix_timing(monkeypatch, thread_speedup):
+    """Calibrate for real, but report 10ms items whatever the host."""
+    calibrate = calibration_module.calibrate
+
+    def fixed_timing(*args, **kwargs):
+        calibration, results = calibrate(*args, **kwargs)
+        calibration.per_item_seconds = 0.01
+        calibration.thread_speedup = thread_speedup
+        return calibration, results
+
+    monkeypatch.setattr(calibration_module, "calibrate", fixed_timing)
+
+
+@pytest.fixture
+def gil_bound_timing(monkeypatch):
+    fix_timing(monkeypatch, thread_speedup=1.0)
+
+
+@pytest.fixture
+def gil_releasing_timing(monkeypatch):
+    fix_timing(monkeypatch, thread_speedup=2.0)
+
+
+class TestPlanExecution:
+    """Test the cost model on synthetic measurements."""
+
+    def test_tiny_items_run_serially(self):
+        calibration = CalibrationResult(per_item_seconds=1e-7, samples=3)
+        plan = plan_execution(calibration, n_items=1000, max_workers=8)
+        assert plan.mode == "serial"
+        assert plan.workers == 1
+
+    def test_gil_bound_heavy_work_uses_processes(self):
+        calibration = CalibrationResult(
+            per_item_seconds=0.01,
+            samples=3,
+            thread_speedup=1.0,
+            item_pickle_seconds=1e-6,
+        )
+        plan = plan_execution(calibration, n_items=1000, max_workers=8)
+        assert plan.mode == "processes"
+        assert "processes" in plan.reason
+
+    def test_gil_releasing_work_uses_threads(self):
+        calibration = CalibrationResult(
+            per_item_seconds=0.01, samples=3, thread_speedup=2.0
+        )
+        plan = plan_execution(calibration, n_items=1000, max_workers=8)
+        assert plan.mode == "threads"
+
+    def test_unpicklable_never_uses_processes(self):
+        calibration = CalibrationResult(
+            per_item_seconds=0.01, samples=3, thread_speedup=1.0, picklable=False
+        )
+        plan = plan_execution(calibration, n_items=1000, max_workers=8)
+        assert "processes" not in plan.estimated_seconds
+        assert plan.mode in ("serial", "threads")
+
+    def test_chunk_size_amortises_overhead(self):
+        calibration = CalibrationResult(
+            per_item_seconds=1e-4, samples=3, thread_speedup=1.0
+        )
+        plan = plan_execution(
+            calibration, n_items=1_000_000, max_workers=4, warm_process_pool=True
+        )
+        assert plan.mode == "processes"
+        # 300us overhead / (5% of 100us) -> 60 items per chunk
+        assert plan.chunk_size == 60
+
+    def test_chunk_size_leaves_work_for_every_worker(self):
+        calibration = CalibrationResult(
+            per_item_seconds=1e-5, samples=3, thread_speedup=1.0
+        )
+        plan = plan_execution(
+            calibration, n_items=4000, max_workers=4, warm_process_pool=True
+        )
+        assert plan.mode == "processes"
+        # 600 items would amortise overhead, but four chunks per worker wins
+        assert plan.chunk_size == 250
+
+
+class TestGetExecutionPlan:
+    """Test inline calibration and caching."""
+
+    def test_calibration_results_are_reused(self):
+        calls = []
+
+        def call(item):
+            calls.append(item)
+            return item * 2
+
+        plan, done = get_execution_plan(add_one, list(range(10)), call, 4)
+        assert done == {i: i * 2 for i in range(len(done))}
+        assert calls == list(range(len(done)))
+        assert plan.n_items == 10 - len(done)
+        assert not plan.from_cache
+
+    def test_cached_per_code_object(self):
+        get_execution_plan(add_one, [1, 2, 3], add_one, 4)
+        plan, done = get_execution_plan(add_one, [1] * 50, add_one, 4)
+        assert plan.from_cache
+        assert done == {}
+        assert plan.n_items == 50
+        assert explain_execution_plan(add_one) is plan
+
+    def test_gil_probe_detects_sleeping_function(self):
+        plan, done = get_execution_plan(sleepy, list(range(20)), sleepy, 4)
+        assert len(done) == 5  # Three inline samples plus the 2-thread probe
+        assert plan.calibration.thread_speedup > 1.5
+        assert plan.mode == "threads"
+
+    def test_clear_single_function(self):
+        get_execution_plan(add_one, [1, 2], add_one, 2)
+        get_execution_plan(sleepy, [1, 2], sleepy, 2)
+        clear_calibration_cache(add_one)
+        assert get_cached_calibration(add_one) is None
+        assert get_cached_calibration(sleepy) is not None
+
+
+class TestExecuteCalibrated:
+    """Test end-to-end calibrated execution."""
+
+    def test_cheap_function_runs_serially(self):
+        assert execute_calibrated(add_one, range(200)) == list(range(1, 201))
+        assert explain_execution_plan(add_one).mode == "serial"
+
+    def test_loop_var_and_generator_input(self):
+        def scaled(x, factor):
+            return x * factor
+
+        results = execute_calibrated(
+            scaled,
+            (i for i in range(30)),
+            loop_var="x",
+            func_kwargs={"factor": 3},
+            max_workers=2,
+        )
+        assert results == [i * 3 for i in range(30)]
+
+    def test_cpu_bound_function_uses_processes(self, gil_bound_timing):
+        results = execute_calibrated(spin, range(64), max_workers=2)
+        assert results == [spin(i) for i in range(64)]
+        assert explain_execution_plan(spin).mode == "processes"
+
+    def test_decorated_map_uses_processes(self, gil_bound_timing):
+        results = list(decorated_spin.map(range(40)))
+        assert results == [spin(i) for i in range(40)]
+        plan = explain_execution_plan(decorated_spin.__wrapped__)
+        assert plan.calibration.picklable
+        assert plan.mode == "processes"
+
+    def test_sleepy_function_uses_threads(self):
+        results = execute_calibrated(sleepy, range(40), max_workers=4)
+        assert results == list(range(40))
+        assert explain_execution_plan(sleepy).mode == "threads"
+
+
+class TestCalibratedLoopSplit:
+    """Test that split loops run with a calibrated plan."""
+
+    @pytest.fixture
+    def no_pickle_probe(self, monkeypatch):
+        def fail(*args, **kwargs):
+            raise AssertionError("arguments were probed by pickling")
+
+        monkeypatch.setattr(local_executor_module, "_safe_pickle_test", fail)
+
+    def test_local_loop_is_calibrated(self, gil_releasing_timing, no_pickle_probe):
+        values = list(range(30))
+        result = _execute_local_parallel(spin_all, (values,), {}, {"cores": 2})
+        assert result == [spin(x) for x in values]
+
+        plan = explain_execution_plan(
+            plan_loop_split(spin_all, (values,)).chunk_function
+        )
+        assert plan.mode == "threads"
+        assert plan.calibration.picklable
+
+    def test_serial_plan_runs_inline(self, monkeypatch, no_pickle_probe):
+        def fail(*args, **kwargs):
+            raise AssertionError("a serial plan started an executor")
+
+        monkeypatch.setattr("clustrix.decorator.create_local_executor", fail)
+        values = list(range(200))
+        result = _execute_local_parallel(add_one_all, (values,), {}, {"cores": 2})
+        assert result == [x + 1 for x in values]
+
+        split_plan = plan_loop_split(add_one_all, (values,))
+        assert explain_execution_plan(split_plan.chunk_function).mode == "serial"
+
+
+class TestChooseExecutorTypeUsesCalibration:
+    """Test that cached measurements override source heuristics."""
+
+    def test_measured_cpu_bound_uses_processes(self, gil_bound_timing):
+        # "time.sleep" in the source alone would pick threads
+        assert choose_executor_type(cpu_mentions_sleep, (), {}) is True
+        get_execution_plan(cpu_mentions_sleep, list(range(10)), cpu_mentions_sleep, 4)
+        assert choose_executor_type(cpu_mentions_sleep, (), {}) is False
+
+    def test_measured_module_function(self, gil_releasing_timing):
+        assert choose_executor_type(spin, (), {}) is False
+        get_execution_plan(sleepy, list(range(10)), sleepy, 4)
+        assert choose_executor_type(sleepy, (), {}) is True
+
+
+class TestSafePickleFastPath:
+    """Test that known-safe types skip serialisation."""
+
+    def test_scalars(self):
+        for value in (None, 1, 2.5, "s", b"b", True, range(3)):
+            assert _safe_pickle_test(value)
+
+    def test_numpy_array_not_serialised(self, monkeypatch):
+        np = pytest.importorskip("numpy")
+        import clustrix.local_executor as local_executor
+
+        def fail(*args, **kwargs):
+            raise AssertionError("array should not be pickled")
+
+        monkeypatch.setattr(local_executor.pickle, "dumps", fail)
+        assert _safe_pickle_test(np.zeros(10))
@@ -0,0 +1,163 @@
+"""Tests for dynamic chunk scheduling of local loops."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from clustrix.chunk_scheduler import (
+    ChunkScheduler,
+    guided_chunk_sizes,
+    run_scheduled_chunks,
+)
+from clustrix.local_executor import LocalExecutor
+
+
+def square(x):
+    return x * x
+
+
+def _drain(scheduler):
+    chunks = []
+    while True:
+        chunk = scheduler.next_chunk()
+        if chunk is None:
+            return chunks
+        chunks.append(chunk)
+
+
+class TestChunkScheduler:
+    """Test chunk sizing for each schedule."""
+
+    def test_static_chunks_are_equal(self):
+        chunks = _drain(ChunkScheduler(100, 4, schedule="static"))
+        assert chunks == [(0, 25), (25, 50), (50, 75), (75, 100)]
+
+    def test_guided_chunks_shrink_and_cover_range(self):
+        chunks = _drain(ChunkScheduler(100, 4, schedule="guided"))
+        sizes = [stop - start for start, stop in chunks]
+        assert sizes[0] == 13
+        assert sizes == sorted(sizes, reverse=True)
+        assert sizes[-1] == 1
+        assert chunks[0][0] == 0 and chunks[-1][1] == 100
+        assert all(a[1] == b[0] for a, b in zip(chunks, chunks[1:]))
+
+    def test_guided_chunk_sizes_match_scheduler(self):
+        sizes = guided_chunk_sizes(100, 4)
+        chunks = _drain(ChunkScheduler(100, 4, schedule="guided"))
+        assert sizes == [stop - start for start, stop in chunks]
+        assert sum(guided_chunk_sizes(7, 16)) == 7
+
+    def test_adaptive_sizes_from_measured_cost(self):
+        scheduler = ChunkScheduler(
+            10_000, 4, schedule="adaptive", target_chunk_seconds=0.01
+        )
+        start, stop = scheduler.next_chunk()
+        assert stop - start == 157  # Probe: total / (workers * 16)
+
+        # 1ms per item -> 10 items per 10ms chunk
+        scheduler.record(stop - start, (stop - start) * 0.001)
+        start, stop = scheduler.next_chunk()
+        assert stop - start == 10
+
+    def test_fixed_chunk_size(self):
+        chunks = _drain(ChunkScheduler(5, 4, schedule="guided", chunk_size=2))
+        assert chunks == [(0, 2), (2, 4), (4, 5)]
+
+    def test_unknown_schedule(self):
+        with pytest.raises(ValueError):
+            ChunkScheduler(10, 2, schedule="random")
+
+    def test_thread_safe(self):
+        scheduler = ChunkScheduler(10_000, 8, schedule="guided", min_chunk=3)
+        chunks = []
+        lock = threading.Lock()
+
+        def worker():
+            for chunk in iter(scheduler.next_chunk, None):
+                with lock:
+                    chunks.append(chunk)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        covered = sorted(i for start, stop in chunks for i in range(start, stop))
+        assert covered == list(range(10_000))
+
+
+class TestRunScheduledChunks:
+    """Test on-demand dispatch and ordering."""
+
+    def test_results_in_order_despite_completion_order(self):
+        scheduler = ChunkScheduler(20, 4, schedule="guided")
+
+        def run(start, stop):
+            # Later chunks finish first
+            time.sleep(0.002 * (20 - start))
+            return list(range(start, stop)), 0.0
+
+        with ThreadPoolExecutor(4) as pool:
+            values = run_scheduled_chunks(
+                lambda start, stop: pool.submit(run, start, stop), scheduler
+            )
+
+        assert [i for chunk in values for i in chunk] == list(range(20))
+
+    def test_in_flight_is_bounded(self):
+        scheduler = ChunkScheduler(50, 2, schedule="guided")
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def run(start, stop):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.001)
+            with lock:
+                active.pop()
+            return None, 0.0
+
+        with ThreadPoolExecutor(8) as pool:
+            run_scheduled_chunks(
+                lambda start, stop: pool.submit(run, start, stop),
+                scheduler,
+                max_in_flight=3,
+            )
+
+        assert max(peak) <= 3
+
+    def test_failure_propagates(self):
+        scheduler = ChunkScheduler(10, 2, schedule="guided")
+
+        def run(start, stop):
+            if start > 0:
+                raise RuntimeError("chunk failed")
+            return [], 0.0
+
+        with ThreadPoolExecutor(2) as pool:
+            with pytest.raises(RuntimeError, match="chunk failed"):
+                run_scheduled_chunks(
+                    lambda start, stop: pool.submit(run, start, stop), scheduler
+                )
+
+
+class TestExecuteLoopParallelSchedules:
+    """Test LocalExecutor.execute_loop_parallel with each schedule."""
+
+    @pytest.mark.parametrize("schedule", ["static", "guided", "adaptive"])
+    def test_schedules_preserve_order(self, schedule):
+        with LocalExecutor(max_workers=3, use_threads=True) as executor:
+            results = executor.execute_loop_parallel(
+                square, "x", range(97), schedule=schedule
+            )
+        assert results == [x * x for x in range(97)]
+
+    def test_process_pool_with_module_level_function(self):
+        with LocalExecutor(max_workers=2) as executor:
+            results = executor.execute_loop_parallel(square, "x", list(range(30)))
+        assert results == [x * x for x in range(30)]
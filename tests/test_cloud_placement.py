@@ -0,0 +1,241 @@
+"""Tests for slot-aware placement of cloud jobs."""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from clustrix.cloud_placement import (
+    InstanceCapacity,
+    SlotRequest,
+    SlotScheduler,
+    build_slot_request,
+    get_instance_capacity,
+    _parse_memory_gb,
+)
+from clustrix.config import ClusterConfig
+from clustrix.executor_cloud import CloudJobManager
+
+
+class TestInstanceCapacity:
+    """Test capacity lookup from provider catalogs."""
+
+    def test_lambda_multi_gpu_catalog(self):
+        capacity = get_instance_capacity("lambda", "gpu_8x_a100")
+        assert capacity.gpus == 8
+        assert capacity.cpus == 240
+        assert capacity.memory_gb == 1600
+
+    def test_lambda_single_gpu_catalog(self):
+        capacity = get_instance_capacity("lambda", "gpu_1x_a10")
+        assert capacity.gpus == 1
+        assert capacity.cpus == 12
+
+    def test_aws_catalog(self):
+        capacity = get_instance_capacity("aws", "p3.8xlarge")
+        assert capacity.gpus == 4
+        assert capacity.cpus == 32
+        assert capacity.memory_gb == 244
+
+    def test_lambda_names_map_to_catalog_skus(self):
+        assert get_instance_capacity("lambda", "gpu_1x_a100").cpus == 30
+        assert get_instance_capacity("lambda", "gpu_1x_h100_pcie").cpus == 26
+        assert get_instance_capacity("lambda", "a100_80gb").gpus == 1
+
+    @pytest.mark.parametrize(
+        "provider, instance_type",
+        [("lambda", "gpu_8x_a100_80gb_sxm4"), ("lambda", "gpu_4x_foo"), ("aws", "m99")],
+    )
+    def test_unknown_type_raises(self, provider, instance_type):
+        with pytest.raises(ValueError, match="instance_capacity"):
+            get_instance_capacity(provider, instance_type)
+
+    def test_override(self):
+        capacity = get_instance_capacity(
+            "aws", "custom", {"gpus": 2, "cpu_cores": 16, "ram": "64GB"}
+        )
+        assert (capacity.gpus, capacity.cpus, capacity.memory_gb) == (2, 16, 64)
+
+    def test_parse_memory(self):
+        assert _parse_memory_gb("8GB") == 8
+        assert _parse_memory_gb("512MB") == 0.5
+        assert _parse_memory_gb("1T") == 1024
+        assert _parse_memory_gb(None) is None
+        assert _parse_memory_gb("lots") is None
+
+
+class TestSlotScheduler:
+    """Test bin packing and occupancy tracking."""
+
+    def test_packs_jobs_onto_one_instance(self):
+        scheduler = SlotScheduler()
+        capacity = InstanceCapacity(gpus=8, cpus=32, memory_gb=256)
+        request = SlotRequest(gpus=1, cpus=4, memory_gb=8)
+
+        placements = [
+            scheduler.acquire("lambda", "gpu_8x_a100", "us-east-1", request, capacity)
+            for _ in range(8)
+        ]
+
+        assert [is_new for _, _, is_new in placements] == [True] + [False] * 7
+        assert len({inst.instance_key for inst, _, _ in placements}) == 1
+
+        gpu_ids = [gpu for _, alloc, _ in placements for gpu in alloc.gpu_ids]
+        assert sorted(gpu_ids) == list(range(8))
+        cpu_ids = [cpu for _, alloc, _ in placements for cpu in alloc.cpu_ids]
+        assert len(set(cpu_ids)) == 32
+
+        # Ninth job needs a new instance
+        _, _, is_new = scheduler.acquire(
+            "lambda", "gpu_8x_a100", "us-east-1", request, capacity
+        )
+        assert is_new
+
+    def test_release_returns_idle_instance(self):
+        scheduler = SlotScheduler()
+        capacity = InstanceCapacity(gpus=2, cpus=8)
+        request = SlotRequest(gpus=1, cpus=2)
+
+        _, first, _ = scheduler.acquire("lambda", "t", "r", request, capacity)
+        _, second, _ = scheduler.acquire("lambda", "t", "r", request, capacity)
+
+        assert scheduler.release(first) is None
+        idle = scheduler.release(second)
+        assert idle is not None
+        assert scheduler.get_occupancy() == []
+
+    def test_freed_slots_are_reused(self):
+        scheduler = SlotScheduler()
+        capacity = InstanceCapacity(gpus=1, cpus=4)
+        request = SlotRequest(gpus=1, cpus=1)
+
+        inst, first, _ = scheduler.acquire("lambda", "t", "r", request, capacity)
+        scheduler.acquire("lambda", "t", "r", SlotRequest(gpus=0, cpus=1), capacity)
+        scheduler.release(first)
+        reused, _, is_new = scheduler.acquire("lambda", "t", "r", request, capacity)
+        assert not is_new
+        assert reused is inst
+
+    def test_different_instance_types_not_mixed(self):
+        scheduler = SlotScheduler()
+        capacity = InstanceCapacity(gpus=8, cpus=32)
+        request = SlotRequest(gpus=1, cpus=1)
+        scheduler.acquire("lambda", "a", "r", request, capacity)
+        _, _, is_new = scheduler.acquire("lambda", "b", "r", request, capacity)
+        assert is_new
+
+    def test_oversized_request_raises(self):
+        scheduler = SlotScheduler()
+        with pytest.raises(ValueError):
+            scheduler.acquire(
+                "lambda",
+                "t",
+                "r",
+                SlotRequest(gpus=2, cpus=1),
+                InstanceCapacity(gpus=1, cpus=4),
+            )
+
+    def test_allocation_environment(self):
+        scheduler = SlotScheduler()
+        capacity = InstanceCapacity(gpus=4, cpus=8)
+        scheduler.acquire("lambda", "t", "r", SlotRequest(gpus=2, cpus=2), capacity)
+        _, alloc, _ = scheduler.acquire(
+            "lambda", "t", "r", SlotRequest(gpus=2, cpus=2), capacity
+        )
+        env = alloc.get_environment()
+        assert env["CUDA_VISIBLE_DEVICES"] == "2,3"
+        assert env["CLUSTRIX_CPU_AFFINITY"] == "2,3"
+        assert alloc.wrap_command("python x.py").endswith("python x.py")
+
+    def test_build_slot_request_defaults(self):
+        request = build_slot_request(
+            {"cores": 4, "memory": "8GB"}, InstanceCapacity(gpus=8, cpus=32)
+        )
+        assert (request.gpus, request.cpus, request.memory_gb) == (1, 4, 8)
+
+        cpu_only = build_slot_request({"cores": 2}, InstanceCapacity(cpus=16))
+        assert cpu_only.gpus == 0
+
+
+class TestPackedCloudJobs:
+    """Test CloudJobManager packing concurrent jobs onto one instance."""
+
+    def test_concurrent_jobs_share_instance(self):
+        config = ClusterConfig(cloud_job_packing=True)
+        manager = CloudJobManager(config)
+
+        provider = MagicMock()
+        provider.create_instance.return_value = {"instance_id": "i-123"}
+        provider.get_cluster_status.return_value = {"status": "active"}
+        provider.get_cluster_config.return_value = {"cluster_host": "1.2.3.4"}
+
+        seen_allocations = []
+        all_running = threading.Barrier(4, timeout=5)
+
+        def fake_execute(ssh_config, func_data, job_config, job_id, allocation=None):
+            seen_allocations.append(allocation)
+            all_running.wait()
+            return job_id
+
+        job_config = {"instance_type": "gpu_8x_a100", "cores": 4, "memory": "8GB"}
+
+        with patch.object(
+            manager, "_get_cloud_provider_instance", return_value=provider
+        ), patch.object(
+            manager, "_execute_job_on_cloud_instance", side_effect=fake_execute
+        ):
+            job_ids = [
+                manager.submit_cloud_job({}, dict(job_config), "lambda")
+                for _ in range(4)
+            ]
+            results = [manager.wait_for_cloud_result(job_id) for job_id in job_ids]
+
+        assert results == job_ids
+        provider.create_instance.assert_called_once()
+        gpu_ids = sorted(g for alloc in seen_allocations for g in alloc.gpu_ids)
+        assert gpu_ids == [0, 1, 2, 3]
+        # Last job out terminates the shared instance
+        provider.delete_cluster.assert_called_once_with("i-123")
+        assert manager.slot_scheduler.get_occupancy() == []
+
+    def test_provisioning_failure_fails_waiting_jobs(self):
+        config = ClusterConfig(cloud_job_packing=True)
+        manager = CloudJobManager(config)
+
+        provider = MagicMock()
+        gate = threading.Event()
+
+        def slow_fail(**kwargs):
+            gate.wait(1)
+            raise RuntimeError("no capacity")
+
+        provider.create_instance.side_effect = slow_fail
+        job_config = {"instance_type": "gpu_8x_a100", "cores": 1}
+
+        with patch.object(
+            manager, "_get_cloud_provider_instance", return_value=provider
+        ):
+            job_ids = [
+                manager.submit_cloud_job({}, dict(job_config), "lambda")
+                for _ in range(2)
+            ]
+            gate.set()
+            for job_id in job_ids:
+                with pytest.raises(RuntimeError):
+                    manager.wait_for_cloud_result(job_id)
+
+        # No instance was created, so there is nothing to terminate
+        provider.delete_cluster.assert_not_called()
+
+    def test_unknown_instance_type_fails_job(self):
+        manager = CloudJobManager(ClusterConfig(cloud_job_packing=True))
+        provider = MagicMock()
+        with patch.object(
+            manager, "_get_cloud_provider_instance", return_value=provider
+        ):
+            job_id = manager.submit_cloud_job(
+                {}, {"instance_type": "gpu_8x_a100_80gb_sxm4"}, "lambda"
+            )
+            with pytest.raises(RuntimeError, match="Unknown lambda instance type"):
+                manager.wait_for_cloud_result(job_id)
+        provider.create_instance.assert_not_called()
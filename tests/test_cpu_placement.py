@@ -0,0 +1,159 @@
+"""Tests for worker CPU placement and BLAS thread limits."""
+
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from clustrix.cpu_placement import (
+    THREAD_ENV_VARS,
+    available_cpus,
+    numa_nodes,
+    parse_cpulist,
+    plan_worker_cpus,
+    plan_worker_placement,
+    thread_env,
+)
+from clustrix.local_executor import LocalExecutor
+from clustrix.task_supervisor import TaskSupervisor
+from clustrix.worker_pool import create_process_pool
+
+
+def worker_threads_env():
+    return {var: os.environ.get(var) for var in THREAD_ENV_VARS}
+
+
+def worker_affinity():
+    return sorted(os.sched_getaffinity(0))
+
+
+def pinned_worker(seconds):
+    time.sleep(seconds)
+    return os.getpid(), tuple(sorted(os.sched_getaffinity(0)))
+
+
+def dead_pid():
+    process = multiprocessing.get_context().Process(target=os.getpid)
+    process.start()
+    process.join()
+    return process.pid
+
+
+needs_affinity = pytest.mark.skipif(
+    not hasattr(os, "sched_setaffinity"), reason="CPU affinity needs Linux"
+)
+needs_two_cpus = pytest.mark.skipif(
+    not hasattr(os, "sched_setaffinity") or len(available_cpus()) < 2,
+    reason="CPU affinity needs Linux and at least two CPUs",
+)
+
+
+@pytest.fixture
+def clean_thread_env(monkeypatch):
+    for var in THREAD_ENV_VARS:
+        monkeypatch.delenv(var, raising=False)
+
+
+class TestTopology:
+    """Test topology parsing and core assignment."""
+
+    def test_parse_cpulist(self):
+        assert parse_cpulist("0-3,8,10-11\n") == [0, 1, 2, 3, 8, 10, 11]
+        assert parse_cpulist("") == []
+
+    def test_numa_nodes_from_sysfs(self, tmp_path, monkeypatch):
+        for node, cpulist in [(0, "0-1"), (1, "2-3"), (10, "4")]:
+            (tmp_path / f"node{node}").mkdir()
+            (tmp_path / f"node{node}" / "cpulist").write_text(cpulist)
+        monkeypatch.setattr(
+            "clustrix.cpu_placement.available_cpus", lambda: [0, 1, 2, 3, 4]
+        )
+        assert numa_nodes(str(tmp_path)) == [[0, 1], [2, 3], [4]]
+
+    def test_numa_nodes_fallback(self, tmp_path):
+        assert numa_nodes(str(tmp_path)) == [available_cpus()]
+
+    def test_workers_spread_over_sockets(self):
+        nodes = [list(range(0, 8)), list(range(8, 16))]
+        slots = plan_worker_cpus(4, cpus=range(16), nodes=nodes)
+        assert slots == [[0, 1, 2, 3], [8, 9, 10, 11], [4, 5, 6, 7], [12, 13, 14, 15]]
+
+    def test_no_worker_straddles_nodes(self):
+        nodes = [list(range(0, 6)), list(range(6, 12))]
+        for workers in range(1, 13):
+            slots = plan_worker_cpus(workers, cpus=range(12), nodes=nodes)
+            assert len(slots) == workers
+            for cpus in slots:
+                assert set(cpus) <= set(nodes[0]) or set(cpus) <= set(nodes[1])
+
+    def test_more_workers_than_cpus(self):
+        slots = plan_worker_cpus(5, cpus=[0, 1], nodes=[[0, 1]])
+        assert slots == [[0], [1], [0], [1], [0]]
+
+    def test_thread_env(self):
+        assert thread_env(3)["OPENBLAS_NUM_THREADS"] == "3"
+        assert thread_env(0)["OMP_NUM_THREADS"] == "1"
+
+
+class TestWorkerPlacement:
+    """Test that worker processes pick up their budget."""
+
+    def test_disabled(self):
+        assert plan_worker_placement(4, limit_threads=False) is None
+
+    def test_thread_budget_split_across_workers(self):
+        placement = plan_worker_placement(2)
+        assert placement.threads_per_worker == max(1, len(available_cpus()) // 2)
+
+    def test_process_pool_workers_get_thread_limits(self, clean_thread_env):
+        placement = plan_worker_placement(2)
+        with create_process_pool(2) as pool:
+            env = pool.submit(worker_threads_env).result()
+        assert env == {
+            var: str(placement.threads_per_worker) for var in THREAD_ENV_VARS
+        }
+
+    def test_user_setting_respected(self, clean_thread_env, monkeypatch):
+        monkeypatch.setenv("OMP_NUM_THREADS", "7")
+        with LocalExecutor(max_workers=2) as executor:
+            envs = executor.execute_parallel(worker_threads_env, [{}, {}])
+        assert all(env["OMP_NUM_THREADS"] == "7" for env in envs)
+
+    def test_limits_can_be_disabled(self, clean_thread_env):
+        options = {"limit_worker_threads": False}
+        with LocalExecutor(max_workers=2, pool_options=options) as executor:
+            envs = executor.execute_parallel(worker_threads_env, [{}, {}])
+        assert all(env["OMP_NUM_THREADS"] is None for env in envs)
+
+    @needs_two_cpus
+    def test_supervised_workers_pinned(self):
+        placement = plan_worker_placement(2, cpu_affinity=True)
+        with TaskSupervisor(max_workers=2, placement=placement) as supervisor:
+            run = supervisor.run(worker_affinity, [{}, {}])
+        pinned = run.results
+        assert all(cpus in placement.cpu_sets for cpus in pinned)
+        assert len(pinned[0]) < len(available_cpus())
+
+    @needs_affinity
+    def test_slots_of_exited_workers_reused(self):
+        placement = plan_worker_placement(3, cpu_affinity=True)
+        live, dead = os.getpid(), dead_pid()
+        assert placement.claim_slot(live) == 0
+        assert placement.claim_slot(dead) == 1
+        # The dead worker's slot is reclaimed before the unused one
+        assert placement.claim_slot(os.getppid()) == 1
+        placement.release_slot(live)
+        assert list(placement.slot_owners) == [0, os.getppid(), 0]
+
+    @needs_two_cpus
+    def test_replacement_worker_takes_over_its_cores(self):
+        placement = plan_worker_placement(2, cpu_affinity=True)
+        chunks = [{"args": (seconds,)} for seconds in [60] + [0.2] * 8]
+        with TaskSupervisor(max_workers=2, placement=placement) as supervisor:
+            run = supervisor.run(pinned_worker, chunks, task_timeout=0.5)
+        assert supervisor.workers_replaced == 1
+        # The surviving worker and the replacement never share cores
+        cpus_by_pid = dict(result for result in run.results if result is not None)
+        assert len(cpus_by_pid) == 2
+        assert len(set(cpus_by_pid.values())) == 2
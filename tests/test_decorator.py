@@ -368,16 +368,18 @@ class TestExecutionModeSelection:
 class TestParallelExecution:
     """Test parallel execution functionality."""
 
-    @patch("clustrix.decorator.detect_loops")
+    @patch("clustrix.decorator.plan_loop_split")
     @patch("clustrix.decorator._execute_parallel")
     @patch("clustrix.decorator.ClusterExecutor")
     def test_remote_parallel_execution_with_loops(
-        self, mock_executor_class, mock_execute_parallel, mock_detect_loops
+        self, mock_executor_class, mock_execute_parallel, mock_plan_loop_split
     ):
-        """Test remote parallel execution when loops are detected."""
+        """Test remote parallel execution when a loop can be split."""
         # Setup mocks
-        mock_loop_info = {"variable": "i", "range": range(10)}
-        mock_detect_loops.return_value = mock_loop_info
+        mock_plan_loop_split.return_value.loop_info.return_value = {
+            "variable": "i",
+            "range": range(10),
+        }
         mock_execute_parallel.return_value = [1, 2, 3, 4, 5]
 
         mock_executor = Mock()
@@ -393,7 +395,7 @@ class TestParallelExecution:
         result = parallel_func([1, 2, 3, 4, 5])
 
         assert result == [1, 2, 3, 4, 5]
-        mock_detect_loops.assert_called_once()
+        mock_plan_loop_split.assert_called_once()
         mock_execute_parallel.assert_called_once()
 
     @patch("clustrix.decorator.find_parallelizable_loops")
@@ -467,9 +469,12 @@ class TestRemoteParallelExecution:
         mock_serialize.return_value = b"serialized_function"
 
         def test_func(data):
-            return [x * 2 for x in data]
+            results = []
+            for x in data:
+                results.append(x * 2)
+            return results
 
-        loop_info = {"variable": "i", "range": range(4)}
+        loop_info = {"variable": "x", "range": range(4)}
         job_config = {"cores": 2}
 
         result = _execute_parallel(
@@ -352,6 +352,18 @@ class TestClusterExecutor:
         assert "squeue" in call_args
         assert "12345" in call_args
 
+    def test_check_slurm_status_dependency_never_satisfied(self, executor):
+        """A job held on a failed upstream job has failed."""
+        executor.ssh_client = Mock()
+
+        mock_stdout = Mock()
+        mock_stdout.read.return_value = b"PENDING DependencyNeverSatisfied"
+        mock_stdout.channel.recv_exit_status.return_value = 0
+
+        executor.ssh_client.exec_command.return_value = (None, mock_stdout, Mock())
+
+        assert executor._check_slurm_status("12345") == "failed"
+
     def test_check_pbs_status(self, executor):
         """Test PBS job status checking."""
         executor.ssh_client = Mock()
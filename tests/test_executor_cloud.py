@@ -0,0 +1,130 @@
+"""Tests for the future-based cloud job workflow in CloudJobManager."""
+
+import threading
+import time
+from concurrent.futures import CancelledError
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from clustrix.config import ClusterConfig
+from clustrix.executor_cloud import CloudJobManager
+
+
+def _make_provider():
+    provider = MagicMock()
+    provider.create_instance.return_value = {"instance_id": "i-1"}
+    provider.get_cluster_status.return_value = {"status": "active"}
+    provider.get_cluster_config.return_value = {"cluster_host": "1.2.3.4"}
+    return provider
+
+
+class TestCloudJobFutures:
+    """Test event-driven completion and per-phase timings."""
+
+    def test_wait_returns_immediately_on_completion(self):
+        # A long poll interval must not delay the caller
+        manager = CloudJobManager(ClusterConfig(job_poll_interval=30))
+
+        def fake_execute(ssh_config, func_data, job_config, job_id, allocation=None):
+            job_info = manager.active_jobs[job_id]
+            manager._set_status(job_info, "uploading")
+            manager._set_status(job_info, "executing")
+            time.sleep(0.05)
+            manager._set_status(job_info, "downloading")
+            return 42
+
+        with patch.object(
+            manager, "_get_cloud_provider_instance", return_value=_make_provider()
+        ), patch.object(
+            manager, "_execute_job_on_cloud_instance", side_effect=fake_execute
+        ):
+            job_id = manager.submit_cloud_job({}, {}, "lambda")
+            start = time.monotonic()
+            assert manager.wait_for_cloud_result(job_id, timeout=5) == 42
+            assert time.monotonic() - start < 5
+
+        assert manager.get_cloud_job_status(job_id) == "completed"
+        timings = manager.get_cloud_job_timings(job_id)
+        assert set(timings) == {"provision", "boot", "upload", "run", "download"}
+        assert timings["run"] >= 0.04
+
+    def test_failed_job_raises(self):
+        manager = CloudJobManager(ClusterConfig())
+        provider = _make_provider()
+        provider.create_instance.side_effect = RuntimeError("quota exceeded")
+
+        with patch.object(
+            manager, "_get_cloud_provider_instance", return_value=provider
+        ):
+            job_id = manager.submit_cloud_job({}, {}, "lambda")
+            with pytest.raises(RuntimeError, match="quota exceeded"):
+                manager.wait_for_cloud_result(job_id, timeout=5)
+
+        assert manager.get_cloud_job_status(job_id) == "failed"
+
+    def test_worker_pool_is_bounded(self):
+        manager = CloudJobManager(ClusterConfig(cloud_max_concurrent_jobs=2))
+        release = threading.Event()
+        running = []
+
+        def fake_workflow(job_id):
+            running.append(job_id)
+            release.wait(5)
+            manager._set_status(manager.active_jobs[job_id], "completed")
+
+        with patch.object(
+            manager, "_get_cloud_provider_instance", return_value=_make_provider()
+        ), patch.object(
+            manager, "_execute_cloud_job_workflow", side_effect=fake_workflow
+        ):
+            job_ids = [manager.submit_cloud_job({}, {}, "lambda") for _ in range(4)]
+            time.sleep(0.1)
+            assert len(running) == 2
+            assert manager.get_cloud_job_status(job_ids[3]) == "pending"
+
+            # Jobs that never started are cancelled without touching the cloud
+            manager.cancel_cloud_job(job_ids[3])
+            assert manager.get_cloud_job_status(job_ids[3]) == "cancelled"
+            with pytest.raises(CancelledError):
+                manager.wait_for_cloud_result(job_ids[3])
+
+            release.set()
+            for job_id in job_ids[:3]:
+                manager.wait_for_cloud_result(job_id, timeout=5)
+
+        manager.shutdown()
+
+    def test_cancel_running_job_is_final(self):
+        manager = CloudJobManager(ClusterConfig())
+        started = threading.Event()
+        release = threading.Event()
+
+        def fake_workflow(job_id):
+            job_info = manager.active_jobs[job_id]
+            job_info["instance_id"] = "i-1"
+            started.set()
+            release.wait(5)
+            manager._set_status(job_info, "completed")
+
+        provider = _make_provider()
+        with patch.object(
+            manager, "_get_cloud_provider_instance", return_value=provider
+        ), patch.object(
+            manager, "_execute_cloud_job_workflow", side_effect=fake_workflow
+        ):
+            job_id = manager.submit_cloud_job({}, {}, "lambda")
+            assert started.wait(5)
+            manager.cancel_cloud_job(job_id)
+            release.set()
+
+            with pytest.raises(RuntimeError, match="cancelled"):
+                manager.wait_for_cloud_result(job_id, timeout=5)
+
+        provider.delete_cluster.assert_called_once_with("i-1")
+        assert manager.get_cloud_job_status(job_id) == "cancelled"
+
+    def test_unknown_job(self):
+        manager = CloudJobManager(ClusterConfig())
+        with pytest.raises(ValueError):
+            manager.wait_for_cloud_result("lambda_missing")
@@ -7,6 +7,8 @@ from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
 import stat
 
+import paramiko
+
 from clustrix.filesystem import (
     ClusterFilesystem,
     cluster_ls,
@@ -202,17 +204,29 @@ class TestClusterFilesystem:
             assert usage.file_count == 2
             assert usage.total_bytes >= 1100  # At least 1100 bytes
 
+    @staticmethod
+    def _attributes(name, mode, size=0, mtime=1640995200):
+        attrs = paramiko.SFTPAttributes()
+        attrs.filename = name
+        attrs.st_mode = mode
+        attrs.st_size = size
+        attrs.st_mtime = mtime
+        return attrs
+
     @patch("paramiko.SSHClient")
     def test_remote_ls(self, mock_ssh_class):
         """Test remote directory listing."""
         # Mock SSH client
         mock_ssh = MagicMock()
         mock_ssh_class.return_value = mock_ssh
+        mock_sftp = mock_ssh.open_sftp.return_value
 
-        # Mock command execution
-        mock_stdout = MagicMock()
-        mock_stdout.read.return_value = b"file1.txt\nfile2.py\nsubdir/\n"
-        mock_ssh.exec_command.return_value = (None, mock_stdout, None)
+        # One SFTP request returns every entry with its attributes
+        mock_sftp.listdir_attr.return_value = [
+            self._attributes("file2.py", stat.S_IFREG | 0o644),
+            self._attributes("subdir", stat.S_IFDIR | 0o755),
+            self._attributes("file1.txt", stat.S_IFREG | 0o644),
+        ]
 
         config = ClusterConfig(
             cluster_type="slurm",
@@ -224,21 +238,22 @@ class TestClusterFilesystem:
         fs = ClusterFilesystem(config)
 
         files = fs.ls(".")
-        expected = ["file1.txt", "file2.py", "subdir"]
-        # Remove trailing slashes for comparison
-        cleaned_files = [f.rstrip("/") for f in files]
-        assert set(cleaned_files) == set(expected)
+        assert files == ["file1.txt", "file2.py", "subdir"]
+        mock_sftp.listdir_attr.assert_called_once_with("/home/testuser/.")
+        mock_ssh.exec_command.assert_not_called()
+
+        mock_sftp.listdir_attr.side_effect = FileNotFoundError()
+        assert fs.ls("missing") == []
 
     @patch("paramiko.SSHClient")
     def test_remote_exists(self, mock_ssh_class):
         """Test remote file existence check."""
         mock_ssh = MagicMock()
         mock_ssh_class.return_value = mock_ssh
+        mock_sftp = mock_ssh.open_sftp.return_value
 
-        # Mock successful exists command (file exists)
-        mock_stdout = MagicMock()
-        mock_stdout.read.return_value = b"EXISTS"
-        mock_ssh.exec_command.return_value = (None, mock_stdout, None)
+        # File exists
+        mock_sftp.stat.return_value = self._attributes("", stat.S_IFREG | 0o644)
 
         config = ClusterConfig(
             cluster_type="slurm",
@@ -249,22 +264,24 @@ class TestClusterFilesystem:
         fs = ClusterFilesystem(config)
 
         assert fs.exists("test.txt") is True
+        assert fs.isfile("test.txt") is True
+        assert fs.isdir("test.txt") is False
 
-        # Mock failed exists command (file doesn't exist)
-        mock_stdout.read.return_value = b"NOT_EXISTS"
+        # File doesn't exist
+        mock_sftp.stat.side_effect = FileNotFoundError()
         assert fs.exists("nonexistent.txt") is False
+        assert fs.isfile("nonexistent.txt") is False
+        mock_ssh.exec_command.assert_not_called()
 
     @patch("paramiko.SSHClient")
     def test_remote_stat(self, mock_ssh_class):
         """Test remote file stat."""
         mock_ssh = MagicMock()
         mock_ssh_class.return_value = mock_ssh
-
-        # Mock stat output: size mtime mode
-        stat_output = "11 1640995200 81a4"  # 11 bytes, timestamp, regular file mode
-        mock_stdout = MagicMock()
-        mock_stdout.read.return_value = stat_output.encode()
-        mock_ssh.exec_command.return_value = (None, mock_stdout, None)
+        mock_sftp = mock_ssh.open_sftp.return_value
+        mock_sftp.stat.return_value = self._attributes(
+            "", stat.S_IFREG | 0o644, size=11
+        )
 
         config = ClusterConfig(
             cluster_type="slurm",
@@ -277,6 +294,12 @@ class TestClusterFilesystem:
         file_info = fs.stat("test.txt")
         assert file_info.size == 11
         assert file_info.modified == 1640995200.0
+        assert file_info.permissions == "644"
+        assert file_info.is_file and file_info.name == "test.txt"
+
+        mock_sftp.stat.side_effect = FileNotFoundError()
+        with pytest.raises(FileNotFoundError):
+            fs.stat("missing.txt")
 
 
 class TestConvenienceFunctions:
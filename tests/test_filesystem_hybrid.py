@@ -12,6 +12,8 @@ from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
 import stat
 
+import paramiko
+
 from clustrix.filesystem import (
     ClusterFilesystem,
     cluster_ls,
@@ -93,7 +95,13 @@ class TestFileSystemHybrid:
             mock_ssh.exec_command.return_value = (mock_stdin, mock_stdout, mock_stderr)
 
             # Mock SFTP operations
-            mock_sftp.listdir.return_value = ["file1.txt", "file2.py", "subdir"]
+            entries = []
+            for name in ["file1.txt", "file2.py", "subdir"]:
+                attrs = paramiko.SFTPAttributes()
+                attrs.filename = name
+                attrs.st_mode = stat.S_IFREG | 0o644
+                entries.append(attrs)
+            mock_sftp.listdir_attr.return_value = entries
             mock_sftp.stat.return_value = Mock(
                 st_size=1024, st_mtime=1640995200.0, st_mode=stat.S_IFREG | 0o644
             )
@@ -106,10 +114,10 @@ class TestFileSystemHybrid:
             assert "file2.py" in files
             assert "subdir" in files
 
-            # Verify SSH methods were called (ls uses exec_command, not SFTP)
-            mock_ssh.exec_command.assert_called()
-            # mock_ssh.open_sftp.assert_called()  # Not called for ls operation
-            # mock_sftp.listdir.assert_called_with("/remote/path")  # Not used for ls
+            # Verify ls is a single SFTP request, not a shell command
+            mock_ssh.open_sftp.assert_called()
+            mock_sftp.listdir_attr.assert_called_with("/remote/path")
+            mock_ssh.exec_command.assert_not_called()
 
     def test_error_handling_hybrid(self):
         """Test error handling with real and mocked errors."""
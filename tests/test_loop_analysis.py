@@ -504,6 +504,19 @@ class TestLoopInfoAdvanced:
         assert count == 100  # Default fallback
 
 
+class Grid:
+    """Array-like argument for bound evaluation tests."""
+
+    shape = (4, 5)
+
+    @property
+    def area(self):
+        raise AssertionError("properties must not be evaluated")
+
+    def rows(self):
+        return 4
+
+
 class TestSafeRangeEvaluator:
     """Test SafeRangeEvaluator class."""
 
@@ -623,6 +636,28 @@ class TestSafeRangeEvaluator:
         result = evaluator._evaluate_binop(node)
         assert result is None
 
+    def test_bounds_from_arguments(self):
+        """Test bounds computed from argument values."""
+        evaluator = SafeRangeEvaluator(
+            local_vars={"items": [1, 2, 3], "grid": Grid(), "params": {"n": 8}}
+        )
+        for expression, expected in [
+            ("len(items)", 3),
+            ("grid.shape[0] - 1", 3),
+            ("params['n'] // 2", 4),
+            ("max(len(items), 5) % 4", 1),
+            ("-len(items)", -3),
+        ]:
+            node = ast.parse(expression, mode="eval").body
+            assert evaluator._evaluate_node(node) == expected
+
+    def test_unknown_bounds(self):
+        """Test that calls and unknown names are not evaluated."""
+        evaluator = SafeRangeEvaluator(local_vars={"grid": Grid()})
+        for expression in ["len(other)", "grid.rows()", "grid.area", "sum([1, 2])"]:
+            node = ast.parse(expression, mode="eval").body
+            assert evaluator._evaluate_node(node) is None
+
     def test_evaluate_binop_unsupported_operation(self):
         """Test unsupported binary operations."""
         evaluator = SafeRangeEvaluator()
@@ -0,0 +1,414 @@
+"""Tests for compiling chunk variants of parallelizable loops."""
+
+import math
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from clustrix.config import get_config
+from clustrix.decorator import _execute_local_parallel, _execute_parallel, cluster
+from clustrix.loop_splitting import (
+    MAX,
+    MERGE,
+    MIN,
+    PRODUCT,
+    SUM,
+    ChunkFunction,
+    analyze_loop_split,
+    clear_loop_split_cache,
+    get_chunk_variant,
+    plan_loop_split,
+    remote_tree_reduce,
+    tree_reduce,
+)
+from clustrix.utils import detect_loops
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+def squares(n, offset=0):
+    """Squares of 0..n-1 plus an offset."""
+    scale = offset + 1
+    results = []
+    for i in range(n):
+        value = i * i
+        results.append(value * scale)
+    return results
+
+
+def doubled(data):
+    results = []
+    for x in data:
+        results.append(2 * x)
+    return results
+
+
+def pids(n):
+    seen = []
+    for i in range(n):
+        seen.append((i, os.getpid()))
+    return seen
+
+
+@cluster(cores=2, parallel=True)
+def decorated_squares(n):
+    results = []
+    for i in range(n):
+        results += [i * i]
+    return results
+
+
+def running_total(data):
+    totals = []
+    total = 0
+    for x in data:
+        total += x
+        totals.append(total)
+    return totals
+
+
+def dedupe(data):
+    seen = set()
+    results = []
+    for x in data:
+        seen.add(x)
+        results.append(x)
+    return results
+
+
+def first_negative(data):
+    results = []
+    for x in data:
+        if x < 0:
+            break
+        results.append(x)
+    return results
+
+
+def squares_below(n, limit):
+    results = []
+    for i in range(n):
+        if i * i >= limit:
+            break
+        results.append(i)
+    return results
+
+
+def with_header(n):
+    results = ["header"]
+    for i in range(n):
+        results.append(i)
+    return results
+
+
+def previous_value(n):
+    results = []
+    for i in range(n):
+        if i:
+            results.append(last)  # noqa: F821
+        last = i
+    return results
+
+
+def sum_of_squares(n):
+    total = 0
+    for i in range(n):
+        total += i * i
+    return total
+
+
+def factorial(n):
+    result = 1
+    for k in range(1, n + 1):
+        result = result * k
+    return result
+
+
+def largest_remainder(data, modulus):
+    best = -1
+    for x in data:
+        best = max(best, x % modulus)
+    return best
+
+
+def squares_by_key(keys):
+    table = {}
+    for key in keys:
+        table[key] = key * key
+    return table
+
+
+def offset_total(n):
+    total = 10
+    for i in range(n):
+        total += i
+    return total
+
+
+def mixed_updates(n):
+    total = 0
+    for i in range(n):
+        total += i
+        total = max(total, 5)
+    return total
+
+
+def histogram(values, bins):
+    counts = np.zeros(bins)
+    for v in values:
+        counts[v % bins] += 1
+    return counts
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    clear_loop_split_cache()
+    yield
+    clear_loop_split_cache()
+
+
+class TestAnalysis:
+    """Test which loops are split."""
+
+    def test_list_accumulator_split(self):
+        split = analyze_loop_split(squares)
+        assert split.variable == "i"
+        assert split.accumulator == "results"
+        assert split.iterable == "range(n)"
+
+    @pytest.mark.parametrize(
+        "func", [running_total, dedupe, first_negative, with_header, previous_value]
+    )
+    def test_unsafe_loops_rejected(self, func):
+        assert analyze_loop_split(func) is None
+
+    @pytest.mark.parametrize(
+        "func, kind",
+        [
+            (sum_of_squares, SUM),
+            (factorial, PRODUCT),
+            (largest_remainder, MAX),
+            (squares_by_key, MERGE),
+        ],
+    )
+    def test_reductions_detected(self, func, kind):
+        assert analyze_loop_split(func).combine == kind
+
+    def test_reduction_must_start_from_identity(self):
+        assert analyze_loop_split(offset_total) is None
+        assert analyze_loop_split(mixed_updates) is None
+
+    def test_cached_per_code_object(self):
+        assert analyze_loop_split(squares) is analyze_loop_split(squares)
+
+    def test_plan_resolves_range_from_arguments(self):
+        plan = plan_loop_split(squares, (12,), {})
+        assert plan.iterations == range(12)
+        assert plan.loop_info()["range"] == range(12)
+        assert plan.loop_info()["positional"] is False
+
+    def test_unknown_iteration_space(self):
+        assert plan_loop_split(squares, (), {}) is None
+
+    def test_bounds_from_argument_expressions(self):
+        def inner(grid, pad=1):
+            results = []
+            for r in range(pad, len(grid) - pad):
+                results.append(grid[r])
+            return results
+
+        assert plan_loop_split(inner, ([0] * 10,), {}).iterations == range(1, 9)
+
+    def test_sequence_argument_split_by_position(self):
+        plan = plan_loop_split(doubled, ("abcde",), {})
+        assert plan.positional
+        assert plan.iterations == range(5)
+
+    def test_iterable_rebound_before_loop(self):
+        def sorted_first(data):
+            data = sorted(data)
+            results = []
+            for x in data:
+                results.append(x)
+            return results
+
+        assert analyze_loop_split(sorted_first) is None
+
+
+class TestChunkVariant:
+    """Test that variants run only their share of the loop."""
+
+    def test_variant_runs_only_its_values(self):
+        variant = get_chunk_variant(squares)
+        assert variant(100, offset=1, _parallel_i=[3, 4]) == [18, 32]
+        assert variant(100, _chunk_range_i=range(98, 100)) == [9604, 9801]
+
+    def test_variant_without_chunk_is_original(self):
+        variant = get_chunk_variant(squares)
+        assert variant(5) == squares(5)
+        assert variant.__doc__ == squares.__doc__
+
+    def test_positional_slice(self):
+        variant = get_chunk_variant(doubled)
+        assert variant([1, 2, 3, 4], _chunk_range_x=slice(1, 3)) == [4, 6]
+        assert variant(iter([1, 2, 3, 4]), _chunk_range_x=slice(2, None)) == [6, 8]
+
+    def test_closure_values(self):
+        factor = 3
+
+        def scaled(n):
+            results = []
+            for i in range(n):
+                results.append(i * factor)
+            return results
+
+        assert get_chunk_variant(scaled)(10, _parallel_i=[2]) == [6]
+
+    def test_chunks_combine_to_sequential_result(self):
+        plan = plan_loop_split(squares, (10,), {"offset": 2})
+        values = list(plan.iterations)
+        results = [
+            plan.chunk_function(10, offset=2, _parallel_i=values[start : start + 3])
+            for start in range(0, 10, 3)
+        ]
+        assert plan.combine(results) == squares(10, offset=2)
+
+
+class TestReductions:
+    """Test tree combination of partial results."""
+
+    def test_tree_reduce(self):
+        assert tree_reduce([1, 2, 3, 4, 5], SUM) == 15
+        assert tree_reduce([3, 1, 2], MIN) == 1
+        assert tree_reduce([{"a": 1}, {"a": 2, "b": 1}, {"b": 3}], MERGE) == {
+            "a": 2,
+            "b": 3,
+        }
+
+    def test_remote_copy_is_self_contained(self, tmp_path):
+        paths = []
+        for i, partial in enumerate([2, 3, 7]):
+            path = tmp_path / f"result{i}.pkl"
+            path.write_bytes(pickle.dumps(partial))
+            paths.append(str(path))
+        reducer = remote_tree_reduce()
+        assert reducer.__module__ == "__main__"
+        assert reducer(paths, PRODUCT, from_files=True) == 42
+
+    @pytest.mark.parametrize(
+        "func, args",
+        [
+            (sum_of_squares, (200,)),
+            (factorial, (30,)),
+            (largest_remainder, (list(range(100)), 37)),
+            (squares_by_key, ([5, 3, 9, 1, 7, 3],)),
+        ],
+    )
+    def test_local_reduction_matches_sequential(self, func, args):
+        assert _execute_local_parallel(func, args, {}, {"cores": 2}) == func(*args)
+
+    @pytest.mark.skipif(not NUMPY_AVAILABLE, reason="NumPy not installed")
+    def test_array_accumulator(self):
+        assert analyze_loop_split(histogram).combine == SUM
+        values = list(range(50))
+        result = _execute_local_parallel(histogram, (values, 7), {}, {"cores": 2})
+        assert np.array_equal(result, histogram(values, 7))
+
+    @patch("clustrix.decorator.serialize_function", side_effect=lambda f, a, k: a)
+    def test_remote_reduction_downloads_only_the_result(self, mock_serialize):
+        executor = MagicMock()
+        executor.submit_job.side_effect = [f"job{i}" for i in range(100)]
+        executor.wait_for_remote_result.side_effect = lambda job: f"/jobs/{job}"
+        executor.wait_for_result.return_value = 123
+
+        result = _execute_parallel(executor, sum_of_squares, (20,), {}, {}, {})
+
+        assert result == 123
+        executor.wait_for_result.assert_called_once()
+        reduce_args = mock_serialize.call_args[0][1]
+        assert reduce_args[1] == SUM
+        assert len(reduce_args[0]) == executor.discard_remote_result.call_count
+
+    @patch("clustrix.decorator.serialize_function", side_effect=lambda f, a, k: k)
+    def test_remote_reduction_falls_back_to_download(self, mock_serialize):
+        executor = MagicMock()
+        executor.submit_job.side_effect = lambda data, config: data
+        executor.wait_for_remote_result.return_value = None
+        variant = get_chunk_variant(sum_of_squares)
+        executor.wait_for_result.side_effect = lambda kwargs: variant(20, **kwargs)
+
+        result = _execute_parallel(executor, sum_of_squares, (20,), {}, {}, {})
+
+        assert result == sum_of_squares(20)
+        assert executor.wait_for_result.call_count > 1
+
+
+@pytest.fixture
+def remote_config(monkeypatch):
+    config = get_config()
+    for name, value in {
+        "cluster_host": "cluster.example.com",
+        "cluster_type": "slurm",
+        "placement": "cluster",
+        "result_cache": False,
+        "auto_gpu_parallel": False,
+    }.items():
+        monkeypatch.setattr(config, name, value)
+    return config
+
+
+class TestExecution:
+    """Test chunk functions in worker processes and the decorator."""
+
+    @patch("clustrix.decorator.ClusterExecutor")
+    def test_unsplittable_loop_runs_as_one_job(
+        self, mock_executor_class, remote_config
+    ):
+        # The loop is detected, but chunks could not each run only their part
+        assert detect_loops(squares_below, (100, 50), {})
+        assert plan_loop_split(squares_below, (100, 50), {}) is None
+
+        executor = mock_executor_class.return_value
+        executor.config = remote_config
+        executor.submit_job.return_value = "job1"
+        executor.wait_for_result.return_value = squares_below(100, 50)
+        decorated = cluster(squares_below, parallel=True)
+
+        assert decorated(100, 50) == list(range(8))
+        executor.submit_job.assert_called_once()
+        func_data = executor.submit_job.call_args[0][0]
+        assert pickle.loads(func_data["kwargs"]) == {}
+        with pytest.raises(ValueError, match="no loop that can be split"):
+            next(decorated.as_completed(100, 50))
+
+    def test_decorated_function_pickles_by_reference(self):
+        chunk_func = plan_loop_split(decorated_squares.__wrapped__, (6,), {})
+        restored = pickle.loads(pickle.dumps(chunk_func.chunk_function))
+        assert isinstance(restored, ChunkFunction)
+        assert restored.func is decorated_squares.__wrapped__
+
+    def test_runs_in_worker_process(self):
+        chunk_func = ChunkFunction(decorated_squares.__wrapped__)
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            assert pool.submit(chunk_func, 10, _parallel_i=[7]).result() == [49]
+
+    def test_local_parallel_execution_splits_loop(self):
+        result = _execute_local_parallel(squares, (50,), {"offset": 1}, {"cores": 2})
+        assert result == squares(50, offset=1)
+
+    def test_local_parallel_execution_by_position(self):
+        data = list(range(37))
+        result = _execute_local_parallel(doubled, (data,), {}, {"cores": 2})
+        assert result == doubled(data)
+
+    def test_each_iteration_runs_once(self):
+        result = _execute_local_parallel(pids, (40,), {}, {"cores": 2})
+        assert [i for i, _ in result] == list(range(40))
@@ -0,0 +1,187 @@
+"""Tests for checkpointed, resumable parallel runs."""
+
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from clustrix.config import get_config
+from clustrix.decorator import _execute_parallel
+from clustrix.executor_core import ClusterExecutor
+from clustrix.loop_splitting import get_chunk_variant
+from clustrix.map_session import (
+    COMPLETED,
+    FAILED,
+    PENDING,
+    SUBMITTED,
+    ChunkFailuresError,
+    MapSession,
+    clear_map_sessions,
+    map_sessions_dir,
+)
+
+
+def sum_of_squares(n):
+    total = 0
+    for i in range(n):
+        total += i * i
+    return total
+
+
+@pytest.fixture
+def session_config(tmp_path, monkeypatch):
+    config = get_config()
+    monkeypatch.setattr(config, "local_cache_dir", str(tmp_path))
+    monkeypatch.setattr(config, "max_parallel_jobs", 4)
+    return config
+
+
+class FakeCluster:
+    """Runs chunk jobs on submission; chunks listed in ``failing`` fail."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.variant = get_chunk_variant(sum_of_squares)
+        self.jobs = {}
+        self.executor = MagicMock()
+        self.executor.submit_job.side_effect = self.submit
+        self.executor.wait_for_result.side_effect = self.wait
+        self.executor.job_handle.side_effect = lambda job_id: {
+            "manager": "scheduler",
+            "job_id": job_id,
+            "remote_dir": f"/jobs/{job_id}",
+        }
+        self.executor.reattach_job.side_effect = lambda handle: handle["job_id"]
+        self.executor.get_job_status.return_value = "running"
+
+    def submit(self, kwargs, job_config):
+        job_id = f"job{len(self.jobs)}"
+        self.jobs[job_id] = kwargs
+        return job_id
+
+    def wait(self, job_id):
+        kwargs = self.jobs[job_id]
+        if kwargs["_chunk_index"] in self.failing:
+            raise RuntimeError("node failure")
+        return self.variant(20, **kwargs)
+
+
+def run(cluster):
+    with patch("clustrix.decorator.serialize_function", side_effect=lambda f, a, k: k):
+        return _execute_parallel(
+            cluster.executor, sum_of_squares, (20,), {}, {}, {}, checkpoint=True
+        )
+
+
+def session_dirs(config):
+    root = map_sessions_dir(config)
+    return os.listdir(root) if os.path.isdir(root) else []
+
+
+class TestMapSession:
+    """Test the manifest journal and result store."""
+
+    def test_replay(self, tmp_path):
+        session = MapSession(str(tmp_path / "s"), n_chunks=3)
+        session.submitted(0, "j0", {"manager": "scheduler"})
+        session.completed(0, {"value": 1})
+        session.submitted(1, "j1")
+        session.failed(2, RuntimeError("boom"))
+        with open(session.manifest_path, "a") as f:
+            f.write('{"index": 1, "sta')  # Torn write from a crash
+
+        reopened = MapSession(str(tmp_path / "s"), n_chunks=3)
+        assert reopened.resumed
+        assert reopened.indices(COMPLETED) == [0]
+        assert reopened.chunks[1].status == SUBMITTED
+        assert reopened.chunks[1].job_id == "j1"
+        assert reopened.chunks[2].error == "RuntimeError: boom"
+        assert reopened.load_result(0) == {"value": 1}
+
+    def test_missing_result_file_is_recomputed(self, tmp_path):
+        session = MapSession(str(tmp_path / "s"), n_chunks=1)
+        session.completed(0, 1)
+        os.unlink(session.result_path(0))
+        assert MapSession(str(tmp_path / "s"), n_chunks=1).chunks[0].status == PENDING
+
+
+class TestResume:
+    """Test resuming parallel runs through _execute_parallel."""
+
+    def test_only_failed_chunks_resubmitted(self, session_config):
+        first = FakeCluster(failing={2})
+        with pytest.raises(ChunkFailuresError) as excinfo:
+            run(first)
+        assert list(excinfo.value.failures) == [2]
+        assert isinstance(excinfo.value.__cause__, RuntimeError)
+        n_chunks = first.executor.submit_job.call_count
+
+        (session_id,) = session_dirs(session_config)
+        assert excinfo.value.session_id == session_id
+        saved = MapSession(
+            os.path.join(map_sessions_dir(session_config), session_id), n_chunks
+        )
+        assert saved.indices(FAILED) == [2]
+        assert len(saved.indices(COMPLETED)) == n_chunks - 1
+
+        second = FakeCluster()
+        assert run(second) == sum_of_squares(20)
+        second.executor.submit_job.assert_called_once()
+        assert second.jobs["job0"]["_chunk_index"] == 2
+
+        # Finished sessions are removed
+        assert session_dirs(session_config) == []
+
+    def test_reattach_after_client_crash(self, session_config):
+        crashed = FakeCluster()
+        crashed.executor.wait_for_result.side_effect = KeyboardInterrupt
+        with pytest.raises(KeyboardInterrupt):
+            run(crashed)
+
+        resumed = FakeCluster()
+        resumed.jobs = crashed.jobs  # The jobs kept running on the cluster
+        assert run(resumed) == sum_of_squares(20)
+        resumed.executor.submit_job.assert_not_called()
+        assert resumed.executor.reattach_job.call_count == len(crashed.jobs)
+
+    def test_finished_jobs_of_lost_clients_resubmitted(self, session_config):
+        crashed = FakeCluster()
+        crashed.executor.wait_for_result.side_effect = KeyboardInterrupt
+        with pytest.raises(KeyboardInterrupt):
+            run(crashed)
+
+        resumed = FakeCluster()
+        resumed.executor.get_job_status.return_value = "failed"
+        assert run(resumed) == sum_of_squares(20)
+        assert resumed.executor.submit_job.call_count == len(crashed.jobs)
+
+    def test_clear_map_sessions(self, session_config):
+        with pytest.raises(ChunkFailuresError):
+            run(FakeCluster(failing={0}))
+        assert clear_map_sessions(session_config) == 1
+        assert session_dirs(session_config) == []
+
+
+class TestReattach:
+    """Test job handles on ClusterExecutor."""
+
+    def test_handle_round_trip(self, mock_config):
+        executor = ClusterExecutor(mock_config)
+        executor.connection_manager = MagicMock()
+        executor.scheduler_manager.active_jobs["42"] = {
+            "remote_dir": "/tmp/job42",
+            "submit_time": 1.0,
+        }
+        executor.active_jobs["42"] = {"manager": "scheduler", "job_id": "42"}
+        handle = executor.job_handle("42")
+
+        other = ClusterExecutor(mock_config)
+        other.connection_manager = MagicMock()
+        assert other.reattach_job(handle) == "42"
+        assert other.scheduler_manager.active_jobs["42"]["remote_dir"] == "/tmp/job42"
+        assert other.active_jobs["42"]["manager"] == "scheduler"
+
+    def test_cloud_jobs_have_no_handle(self, mock_config):
+        executor = ClusterExecutor(mock_config)
+        executor.active_jobs["aws_1"] = {"manager": "cloud", "job_id": "aws_1"}
+        assert executor.job_handle("aws_1") is None
@@ -0,0 +1,164 @@
+"""Tests for the filesystem metadata cache."""
+
+import stat
+from unittest.mock import MagicMock, patch
+
+import paramiko
+import pytest
+
+from clustrix.config import ClusterConfig
+from clustrix.executor_connections import ConnectionManager
+from clustrix.filesystem import ClusterFilesystem, cluster_exists, cluster_isfile
+from clustrix.metadata_cache import MetadataCache
+
+
+def attributes(name="", mode=stat.S_IFREG | 0o644, size=0):
+    attrs = paramiko.SFTPAttributes()
+    attrs.filename = name
+    attrs.st_mode = mode
+    attrs.st_size = size
+    attrs.st_mtime = 1640995200
+    return attrs
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMetadataCache:
+    """Test expiry, eviction and invalidation."""
+
+    def test_entries_expire(self):
+        clock = Clock()
+        cache = MetadataCache(ttl=10, clock=clock)
+        cache.put_attributes("/data/a", attributes())
+        cache.put_attributes("/data/missing", None)
+        assert cache.get_attributes("/data/a")[0]
+        assert cache.get_attributes("/data/./missing") == (True, None)
+
+        clock.now = 10
+        assert cache.get_attributes("/data/a") == (False, None)
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.entries) == (2, 1, 1)
+
+    def test_least_recently_used_listing_evicted(self):
+        cache = MetadataCache(max_entries=6)
+        cache.put_listing("/a", {"x": attributes(), "y": attributes()})
+        cache.put_attributes("/b", attributes())
+        cache.get_listing("/a")
+        cache.put_listing("/c", {"z": attributes()})
+        cache.put_attributes("/d", attributes())
+        assert cache.get_attributes("/b") == (False, None)
+        assert cache.get_listing("/a")[0]
+        assert cache.stats().evictions == 1
+
+    def test_listing_answers_lookups(self):
+        cache = MetadataCache()
+        link = attributes("link", stat.S_IFLNK | 0o777)
+        cache.put_listing("/data", {"a.csv": attributes("a.csv", size=3), "l": link})
+        assert cache.get_attributes("/data/a.csv")[1].st_size == 3
+        assert cache.get_attributes("/data/b.csv") == (True, None)
+        # A link's listing entry says nothing about its target
+        assert cache.get_attributes("/data/l") == (False, None)
+
+    def test_invalidate(self):
+        cache = MetadataCache()
+        cache.put_listing("/work", {"job_1": attributes(mode=stat.S_IFDIR)})
+        cache.put_attributes("/work/job_2", None)
+        cache.put_attributes("/work/job_2/result.pkl", None)
+        cache.put_attributes("/work/other", attributes())
+
+        cache.invalidate("/work/job_2/result.pkl")
+        assert cache.get_listing("/work") == (False, None)
+        assert cache.get_attributes("/work/job_2") == (False, None)
+        assert cache.get_attributes("/work/other")[0]
+
+        cache.invalidate("/work")
+        assert cache.get_attributes("/work/other") == (False, None)
+        cache.invalidate()
+        assert cache.stats().entries == 0
+
+
+@pytest.fixture
+def sftp():
+    with patch("clustrix.filesystem.paramiko.SSHClient") as ssh_class:
+        sftp = ssh_class.return_value.open_sftp.return_value
+        sftp.stat.return_value = attributes(size=7)
+        yield sftp
+
+
+@pytest.fixture
+def config():
+    return ClusterConfig(
+        cluster_type="slurm",
+        cluster_host="cluster.invalid",
+        remote_work_dir="/work",
+        filesystem_cache=True,
+    )
+
+
+class TestClusterFilesystem:
+    """Test cached remote lookups."""
+
+    def test_repeated_lookups_served_from_memory(self, sftp, config):
+        fs = ClusterFilesystem(config)
+        assert fs.exists("a.txt") and fs.isfile("a.txt")
+        assert fs.stat("a.txt").size == 7
+        sftp.stat.assert_called_once_with("/work/a.txt")
+
+        sftp.stat.return_value = attributes(size=9)
+        assert fs.stat("a.txt", use_cache=False).size == 9
+        assert fs.stat("a.txt").size == 9
+        assert sftp.stat.call_count == 2
+
+    def test_negative_lookups_cached(self, sftp, config):
+        sftp.stat.side_effect = FileNotFoundError()
+        fs = ClusterFilesystem(config)
+        assert not fs.exists("missing")
+        with pytest.raises(FileNotFoundError):
+            fs.stat("missing")
+        sftp.stat.assert_called_once()
+
+    def test_probing_a_listed_directory(self, sftp, config):
+        sftp.listdir_attr.return_value = [
+            attributes(f"part-{i}.csv") for i in range(0, 2000, 2)
+        ]
+        fs = ClusterFilesystem(config)
+        assert len(fs.ls("data")) == 1000
+        found = [fs.isfile(f"data/part-{i}.csv") for i in range(2000)]
+
+        assert found == [i % 2 == 0 for i in range(2000)]
+        sftp.stat.assert_not_called()
+        assert fs.cache_stats().hit_rate > 0.99
+
+    def test_disabled(self, sftp, config):
+        fs = ClusterFilesystem(config, cache_metadata=False)
+        fs.exists("a.txt")
+        fs.exists("a.txt")
+        assert sftp.stat.call_count == 2
+        assert fs.cache_stats() is None
+
+    def test_writes_through_clustrix_invalidate(self, sftp, config, tmp_path):
+        sftp.stat.side_effect = FileNotFoundError()
+        fs = ClusterFilesystem(config)
+        assert not fs.exists("job_1/result.pkl")
+
+        connection = ConnectionManager(config)
+        connection.ssh_client = MagicMock()
+        local = tmp_path / "result.pkl"
+        local.write_bytes(b"data")
+        connection.upload_file(str(local), "/work/job_1/result.pkl")
+
+        sftp.stat.side_effect = None
+        assert fs.exists("job_1/result.pkl")
+        assert sftp.stat.call_count == 2
+
+    def test_convenience_functions_share_a_filesystem(self, sftp, config):
+        assert cluster_exists("a.txt", config)
+        assert cluster_isfile("a.txt", config)
+        assert cluster_isfile("a.txt", config, use_cache=False)
+        assert sftp.stat.call_count == 2
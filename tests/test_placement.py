@@ -0,0 +1,231 @@
+"""Tests for cost-model placement of @cluster calls."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from clustrix import placement
+from clustrix.config import ClusterConfig, get_config
+from clustrix.decorator import cluster
+from clustrix.placement import (
+    LOCAL_PARALLEL,
+    LOCAL_SERIAL,
+    REMOTE_ARRAY,
+    REMOTE_SINGLE,
+    clear_placement_state,
+    decide_placement,
+    estimate_queue_wait,
+    explain_placement,
+    get_placement_history,
+    payload_bytes,
+)
+
+
+def tiny(x):
+    return x + 1
+
+
+def loop_sum(n):
+    total = 0
+    for i in range(n):
+        total += i
+    return total
+
+
+@pytest.fixture
+def config(tmp_path):
+    config = ClusterConfig(
+        cluster_type="slurm",
+        cluster_host="cluster.example.com",
+        username="testuser",
+        local_cache_dir=str(tmp_path),
+        job_poll_interval=10,
+        placement="auto",
+    )
+    clear_placement_state()
+    yield config
+    clear_placement_state()
+
+
+def squeue_executor(pending, own):
+    executor = MagicMock()
+    outputs = {"squeue": "\n".join(pending), "sprio": "\n".join(own)}
+    executor.connection_manager.execute_remote_command.side_effect = lambda cmd: (
+        outputs[cmd.split()[0]],
+        "",
+    )
+    return executor
+
+
+class TestDecisions:
+    """Test the choice of mode."""
+
+    def test_unknown_runtime_goes_remote(self, config):
+        decision = decide_placement(tiny, (1,), {}, config, allow_parallel=False)
+        assert decision.mode == REMOTE_SINGLE
+        assert "not yet known" in decision.reason
+
+    def test_small_loop_below_threshold_runs_locally(self, config):
+        decision = decide_placement(loop_sum, (10,), {}, config)
+        assert decision.mode == LOCAL_PARALLEL
+        assert decision.estimate.iterations == 10
+        large = decide_placement(loop_sum, (10**6,), {}, config)
+        assert large.mode == REMOTE_ARRAY
+
+    def test_fast_history_stays_local_without_probing(self, config):
+        get_placement_history(config).record_local(tiny, 0.001)
+        connect = MagicMock()
+        decision = decide_placement(tiny, (1,), {}, config, connect=connect)
+        assert decision.mode == LOCAL_SERIAL
+        assert decision.estimate.seconds[REMOTE_SINGLE] > 30
+        connect.assert_not_called()
+        assert explain_placement(tiny) is decision
+
+    def test_remote_speedup_and_local_limit(self, config):
+        config.placement_remote_speedup = 2.0
+        get_placement_history(config).record_local(tiny, 30.0)
+        decision = decide_placement(tiny, (1,), {}, config, allow_parallel=False)
+        assert decision.mode == LOCAL_SERIAL
+        assert decision.estimate.seconds[REMOTE_SINGLE] > 30
+
+        # Beyond placement_max_local_seconds even a slower cluster is used
+        config.placement_remote_speedup = 1.0
+        get_placement_history(config).record_local(tiny, 3600.0)
+        decision = decide_placement(tiny, (1,), {}, config, allow_parallel=False)
+        assert decision.mode == REMOTE_SINGLE
+        assert "locally" in decision.reason
+
+    def test_history_scales_with_iterations(self, config):
+        get_placement_history(config).record_local(loop_sum, 1.0, iterations=100)
+        assert decide_placement(loop_sum, (10,), {}, config).mode == LOCAL_SERIAL
+        decision = decide_placement(loop_sum, (10**5,), {}, config)
+        assert decision.estimate.local_seconds == pytest.approx(1000.0)
+        assert decision.mode == REMOTE_ARRAY
+
+    def test_remote_runs_refine_only_the_remote_estimate(self, config):
+        first = decide_placement(tiny, (1,), {}, config, allow_parallel=False)
+        overhead = first.estimate.remote_overhead_seconds
+        history = get_placement_history(config)
+        history.record_remote(tiny, overhead + 0.5, first)
+        decision = decide_placement(tiny, (1,), {}, config, allow_parallel=False)
+        assert decision.estimate.local_seconds is None
+        assert decision.mode == REMOTE_SINGLE
+
+        history.record_local(tiny, 20.0)
+        decision = decide_placement(tiny, (1,), {}, config, allow_parallel=False)
+        assert decision.estimate.seconds[REMOTE_SINGLE] == pytest.approx(overhead + 0.5)
+
+    def test_default_runs_on_the_cluster(self, config):
+        get_placement_history(config).record_local(tiny, 0.001)
+        config.placement = "cluster"
+        decision = decide_placement(tiny, (1,), {}, config, allow_parallel=False)
+        assert decision.mode == REMOTE_SINGLE
+        assert not decision.overridden
+        assert ClusterConfig().placement == "cluster"
+
+    @pytest.mark.parametrize(
+        "job_config",
+        [
+            {"gpus": 1},
+            {"provider": "lambda"},
+            {"cores": 10**6},
+            {"memory": "1000000TB"},
+        ],
+    )
+    def test_resource_requests_stay_remote(self, config, job_config):
+        get_placement_history(config).record_local(tiny, 0.001)
+        decision = decide_placement(tiny, (1,), {}, config, job_config=job_config)
+        assert decision.mode == REMOTE_ARRAY
+        assert "requests" in decision.reason
+        fits = {"cores": 1, "memory": "1MB"}
+        assert decide_placement(tiny, (1,), {}, config, fits).mode == LOCAL_SERIAL
+
+    def test_history_persisted(self, config):
+        history = get_placement_history(config)
+        history.record_local(tiny, 0.25)
+        history.save()
+        reloaded = placement.PlacementHistory(history.path)
+        assert reloaded.get(tiny).local_seconds == pytest.approx(0.25)
+
+    def test_override(self, config):
+        decision = decide_placement(tiny, (1,), {}, config, placement=REMOTE_SINGLE)
+        assert decision.mode == REMOTE_SINGLE and decision.overridden
+        config.placement = LOCAL_SERIAL
+        assert decide_placement(tiny, (1,), {}, config).mode == LOCAL_SERIAL
+        with pytest.raises(ValueError):
+            decide_placement(tiny, (1,), {}, config, placement="cloud")
+
+    def test_no_cluster_stays_local(self, config):
+        config.cluster_host = None
+        decision = decide_placement(tiny, (1,), {}, config, placement=REMOTE_ARRAY)
+        assert decision.mode == LOCAL_PARALLEL
+
+
+class TestEstimates:
+    """Test the inputs of the cost model."""
+
+    def test_queue_probe_counts_jobs_ahead(self, config):
+        executor = squeue_executor(["100", "500", "900", "50"], own=["400", "600"])
+        wait, source = estimate_queue_wait(config, {}, lambda: executor)
+        # Jobs at priority 900 and 600+ are ahead of the user's median (600)
+        assert source == "squeue"
+        assert wait == placement.DEFAULT_QUEUE_WAIT["slurm"] + 1 * 2.0
+
+        # Reused until the TTL expires
+        assert estimate_queue_wait(config, {}, None) == (wait, "cache")
+        assert executor.connect.call_count == 1
+
+    def test_failed_probe_uses_default(self, config):
+        executor = MagicMock()
+        executor.connection_manager.execute_remote_command.side_effect = OSError
+        assert estimate_queue_wait(config, {}, lambda: executor) == (30.0, "default")
+
+    def test_payload_bytes(self):
+        assert payload_bytes(b"x" * 1000) == 1000
+        large = payload_bytes(([b"x" * 10] * 5000,))
+        assert 50_000 <= large < 60_000
+
+
+class TestDecorator:
+    """Test placement through @cluster."""
+
+    @pytest.fixture
+    def cluster_config(self, tmp_path, monkeypatch):
+        config = get_config()
+        for name, value in {
+            "cluster_host": "cluster.example.com",
+            "cluster_type": "slurm",
+            "local_cache_dir": str(tmp_path),
+            "auto_gpu_parallel": False,
+            "placement": "auto",
+            "default_cores": 1,
+            "default_memory": "1GB",
+        }.items():
+            monkeypatch.setattr(config, name, value)
+        clear_placement_state()
+        yield config
+        clear_placement_state()
+
+    @patch("clustrix.decorator.ClusterExecutor")
+    def test_fast_function_skips_the_queue(self, mock_executor_class, cluster_config):
+        get_placement_history(cluster_config).record_local(tiny, 0.001)
+        assert cluster(tiny)(1) == 2
+        mock_executor_class.assert_not_called()
+        assert get_placement_history(cluster_config).get(tiny).local_runs == 2
+
+    @patch("clustrix.decorator.ClusterExecutor")
+    def test_probe_connection_reused(
+        self, mock_executor_class, cluster_config, monkeypatch
+    ):
+        monkeypatch.setattr(cluster_config, "placement_remote_speedup", 10.0)
+        monkeypatch.setattr(cluster_config, "job_poll_interval", 1)
+        get_placement_history(cluster_config).record_local(tiny, 50.0)
+        executor = mock_executor_class.return_value
+        executor.connection_manager.execute_remote_command.return_value = ("", "")
+        executor.submit_job.return_value = "job1"
+        executor.wait_for_result.return_value = 2
+
+        assert cluster(tiny, parallel=False)(1) == 2
+        assert explain_placement(tiny).estimate.queue_source == "squeue"
+        assert mock_executor_class.call_count == 1
+        executor.submit_job.assert_called_once()
@@ -0,0 +1,133 @@
+"""Tests for the persistent project and environment indexes."""
+
+import os
+
+import pytest
+
+from clustrix import project_index
+from clustrix.dependency_resolution import FunctionDependencyAnalyzer
+from clustrix.project_index import (
+    ProjectIndex,
+    clear_index_memory,
+    get_environment_index,
+    get_project_index,
+    index_module,
+)
+
+HELPERS = """
+import numpy as np
+from os.path import join as pjoin
+
+
+def helper(x):
+    def inner(y):
+        return y + 1
+
+    return inner(x)
+"""
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "project"
+    (root / "pkg").mkdir(parents=True)
+    (root / "pkg" / "helpers.py").write_text(HELPERS)
+    (root / "main.py").write_text("def main():\n    return helper(1)\n")
+    (root / "build").mkdir()
+    (root / "build" / "generated.py").write_text("def skipped():\n    pass\n")
+    return root
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(project_index, "default_index_dir", lambda: str(cache_dir))
+    clear_index_memory()
+    yield str(cache_dir)
+    clear_index_memory()
+
+
+def bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+class TestProjectIndex:
+    """Test incremental indexing of project modules."""
+
+    def test_function_table_and_imports(self, project):
+        path = str(project / "pkg" / "helpers.py")
+        module = index_module(path, "pkg/helpers.py", 0, 0)
+        assert [(f.name, f.is_nested) for f in module.functions] == [
+            ("helper", False),
+            ("inner", True),
+        ]
+        assert module.imports == {"np": "numpy"}
+        assert module.from_imports == {"pjoin": "os.path.join"}
+
+    def test_syntax_errors_recorded(self, tmp_path):
+        (tmp_path / "broken.py").write_text("def broken(:\n")
+        module = index_module(str(tmp_path / "broken.py"), "broken.py", 0, 0)
+        assert module.error and not module.functions
+
+    def test_only_changed_files_reparsed(self, project, cache_dir):
+        first = ProjectIndex(str(project), cache_dir).refresh()
+        assert first.parsed == 2
+        assert set(ProjectIndex(str(project), cache_dir).modules) == set()
+
+        # A fresh index loads the saved tables instead of parsing
+        index = ProjectIndex(str(project), cache_dir)
+        second = index.refresh()
+        assert (second.parsed, second.unchanged) == (0, 2)
+        assert index.modules[os.path.join("pkg", "helpers.py")].functions
+
+        (project / "main.py").write_text("def main():\n    return 2\n")
+        bump_mtime(project / "main.py")
+        (project / "pkg" / "helpers.py").unlink()
+        third = index.refresh()
+        assert (third.parsed, third.removed, third.unchanged) == (1, 1, 0)
+        assert set(index.modules) == {"main.py"}
+
+    def test_many_changed_files_parsed_in_pool(self, tmp_path, cache_dir):
+        for i in range(project_index.PARALLEL_PARSE_MIN_FILES):
+            (tmp_path / f"module_{i}.py").write_text(f"def function_{i}():\n    pass\n")
+        index = ProjectIndex(str(tmp_path), cache_dir, max_workers=2)
+        update = index.refresh()
+        assert update.parallel
+        assert index.modules["module_7.py"].functions[0].name == "function_7"
+
+
+class TestDependencyAnalyzer:
+    """Test that the analyzer is served from the index."""
+
+    def test_local_functions_from_index(self, project, cache_dir):
+        analyzer = FunctionDependencyAnalyzer(root_dir=str(project))
+        helper = analyzer._find_local_function("helper")
+        assert helper.module_path == os.path.join("pkg", "helpers.py")
+        assert helper.ast_node.name == "helper"
+        assert analyzer._find_local_function("inner").is_nested
+        assert analyzer._find_local_function("skipped") is None
+
+    def test_second_analyzer_parses_nothing(self, project, cache_dir, monkeypatch):
+        FunctionDependencyAnalyzer(root_dir=str(project))
+        clear_index_memory()
+        monkeypatch.setattr(project_index, "index_module", pytest.fail, raising=True)
+        analyzer = FunctionDependencyAnalyzer(root_dir=str(project))
+        assert analyzer._find_local_function("main") is not None
+        assert get_project_index(str(project)).modules
+
+
+class TestEnvironmentIndex:
+    """Test the cached view of installed packages."""
+
+    def test_distributions_and_modules(self, cache_dir):
+        env = get_environment_index()
+        assert "pytest" in env.distributions
+        assert "pytest" in env.module_distributions["_pytest"]
+        assert get_environment_index() is env
+
+    def test_loaded_from_disk(self, cache_dir, monkeypatch):
+        env = get_environment_index()
+        clear_index_memory()
+        monkeypatch.setattr(project_index, "_build_environment", pytest.fail)
+        assert get_environment_index().distributions == env.distributions
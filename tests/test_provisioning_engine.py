@@ -0,0 +1,183 @@
+"""Tests for the dependency-graph provisioning engine and backoff waiters."""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from clustrix.kubernetes.cluster_provisioner import ClusterSpec
+from clustrix.kubernetes.provisioning_engine import (
+    ProvisioningGraph,
+    WaiterFailure,
+    wait_with_backoff,
+)
+
+
+class TestWaitWithBackoff:
+    """Test capped exponential backoff polling."""
+
+    def test_delays_grow_and_cap(self):
+        delays = []
+        checks = iter([False] * 6 + [True])
+        wait_with_backoff(
+            lambda: next(checks),
+            "thing",
+            initial_delay=1,
+            max_delay=5,
+            sleep=delays.append,
+        )
+        assert delays == [1, 2, 4, 5, 5, 5]
+
+    def test_transient_errors_are_retried(self):
+        calls = []
+
+        def check():
+            calls.append(1)
+            if len(calls) < 3:
+                raise ConnectionError("flaky")
+            return True
+
+        wait_with_backoff(check, "thing", sleep=lambda s: None)
+        assert len(calls) == 3
+
+    def test_terminal_failure_is_not_retried(self):
+        calls = []
+
+        def check():
+            calls.append(1)
+            raise WaiterFailure("broken")
+
+        with pytest.raises(WaiterFailure):
+            wait_with_backoff(check, "thing", sleep=lambda s: None)
+        assert len(calls) == 1
+
+    def test_timeout(self):
+        with pytest.raises(RuntimeError, match="not ready"):
+            wait_with_backoff(lambda: False, "thing", timeout=0.05, initial_delay=0.01)
+
+
+class TestProvisioningGraph:
+    """Test dependency ordering, concurrency and failure handling."""
+
+    def test_independent_steps_run_concurrently(self):
+        both_running = threading.Barrier(2, timeout=5)
+
+        def step(value):
+            both_running.wait()
+            return value
+
+        graph = ProvisioningGraph()
+        graph.add_step("vpc", lambda r: step("vpc-1"))
+        graph.add_step("iam", lambda r: step("role-1"))
+        graph.add_step(
+            "cluster",
+            lambda r: (r["vpc"], r["iam"]),
+            depends_on=["vpc", "iam"],
+        )
+
+        results = graph.run()
+
+        assert results["cluster"] == ("vpc-1", "role-1")
+        assert set(graph.timings) == {"vpc", "iam", "cluster"}
+
+    def test_dependencies_respected(self):
+        order = []
+        graph = ProvisioningGraph()
+        graph.add_step("a", lambda r: order.append("a"))
+        graph.add_step("b", lambda r: order.append("b"), depends_on=["a"])
+        graph.add_step("c", lambda r: order.append("c"), depends_on=["b"])
+        graph.run()
+        assert order == ["a", "b", "c"]
+
+    def test_failure_skips_dependents(self):
+        graph = ProvisioningGraph()
+        graph.add_step("a", lambda r: 1 / 0)
+        graph.add_step("b", lambda r: "never", depends_on=["a"])
+
+        with pytest.raises(ZeroDivisionError):
+            graph.run()
+
+        assert graph.steps["a"].status == "failed"
+        assert graph.steps["b"].status == "skipped"
+
+    def test_unknown_dependency(self):
+        graph = ProvisioningGraph()
+        with pytest.raises(ValueError):
+            graph.add_step("b", lambda r: None, depends_on=["a"])
+
+
+class TestAWSProvisioningGraph:
+    """Test the AWS provisioner against mocked boto3 clients."""
+
+    @pytest.fixture
+    def provisioner(self):
+        from clustrix.kubernetes import aws_provisioner
+
+        with patch.object(aws_provisioner, "BOTO3_AVAILABLE", True), patch.object(
+            aws_provisioner, "boto3", create=True
+        ) as boto3:
+            session = boto3.Session.return_value
+            clients = {
+                name: MagicMock(name=name) for name in ["ec2", "eks", "iam", "sts"]
+            }
+            session.client.side_effect = lambda name, **kwargs: clients[name]
+            prov = aws_provisioner.AWSEKSFromScratchProvisioner(
+                {"aws_access_key_id": "x", "aws_secret_access_key": "y"},
+                "us-west-2",
+            )
+        return prov, clients
+
+    def test_iam_overlaps_networking(self, provisioner):
+        prov, clients = provisioner
+        ec2, eks, iam = clients["ec2"], clients["eks"], clients["iam"]
+
+        ec2.describe_availability_zones.return_value = {
+            "AvailabilityZones": [{"ZoneName": "a"}, {"ZoneName": "b"}]
+        }
+        ec2.describe_nat_gateways.return_value = {
+            "NatGateways": [{"State": "available"}]
+        }
+        iam.create_role.return_value = {"Role": {"Arn": "arn:role"}}
+        eks.describe_cluster.return_value = {
+            "cluster": {
+                "name": "test",
+                "status": "ACTIVE",
+                "endpoint": "https://k8s",
+                "arn": "arn:cluster",
+                "version": "1.28",
+                "certificateAuthority": {"data": "ca"},
+            }
+        }
+        eks.describe_nodegroup.return_value = {"nodegroup": {"status": "ACTIVE"}}
+
+        # IAM must be able to start before the VPC is finished
+        vpc_gate = threading.Event()
+        iam_started = threading.Event()
+
+        def create_vpc(**kwargs):
+            assert vpc_gate.wait(5)
+            return {"Vpc": {"VpcId": "vpc-1"}}
+
+        def create_role(**kwargs):
+            iam_started.set()
+            return {"Role": {"Arn": "arn:role"}}
+
+        ec2.create_vpc.side_effect = create_vpc
+        iam.create_role.side_effect = create_role
+        threading.Thread(
+            target=lambda: iam_started.wait(5) and vpc_gate.set(), daemon=True
+        ).start()
+
+        with patch.object(prov, "_setup_clustrix_environment"), patch.object(
+            prov, "_verify_cluster_operational"
+        ):
+            result = prov.provision_complete_infrastructure(
+                ClusterSpec(provider="aws", cluster_name="test", region="us-west-2")
+            )
+
+        assert result["cluster_name"] == "test"
+        assert result["vpc_id"] == "vpc-1"
+        assert "control_plane" in result["provisioning_timings"]
+        assert len(result["created_resources"]["nat_gateways"]) == 2
+        eks.create_cluster.assert_called_once()
+        eks.create_nodegroup.assert_called_once()
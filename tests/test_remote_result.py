@@ -0,0 +1,217 @@
+"""Tests for lazy remote results and job chaining."""
+
+import pickle
+import subprocess
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from clustrix.config import ClusterConfig, get_config
+from clustrix.decorator import cluster
+from clustrix.remote_result import (
+    RemoteResult,
+    can_chain,
+    chain_dependencies,
+    remote_results_in,
+    resolve_remote_results,
+)
+from clustrix.utils import create_job_script
+
+
+def make_ref(job_id="1", remote_dir="/work/job_1_ab", value=None, status="running"):
+    executor = MagicMock()
+    executor.get_job_status.return_value = status
+    executor.fetch_cached_result.return_value = (True, value)
+    return RemoteResult(executor, job_id, f"{remote_dir}/result.pkl")
+
+
+class TestRemoteResult:
+    """Test the handle itself."""
+
+    def test_jobs_read_the_result_in_place(self, tmp_path, monkeypatch):
+        upstream = tmp_path / "job_1_ab"
+        downstream = tmp_path / "job_2_cd"
+        upstream.mkdir()
+        downstream.mkdir()
+        value = list(range(1000))
+        (upstream / "result.pkl").write_bytes(pickle.dumps(value, protocol=4))
+
+        ref = make_ref(remote_dir=str(upstream))
+        payload = pickle.dumps(((ref,), {"scale": 2}), protocol=4)
+        assert len(payload) < 200
+
+        # Unpickled with plain pickle from the downstream job's directory
+        monkeypatch.chdir(downstream)
+        args, kwargs = pickle.loads(payload)
+        assert args == (value,) and kwargs == {"scale": 2}
+
+    def test_result_downloaded_once(self):
+        ref = make_ref(value=42)
+        assert ref.result() == 42
+        assert ref.get() == 42
+        ref.executor.wait_for_remote_result.assert_called_once_with("1")
+        ref.executor.fetch_cached_result.assert_called_once_with(
+            "/work/job_1_ab/result.pkl"
+        )
+        assert ref.status() == "completed"
+
+    def test_missing_result(self):
+        ref = make_ref()
+        ref.executor.fetch_cached_result.return_value = (False, None)
+        with pytest.raises(FileNotFoundError):
+            ref.result()
+
+    def test_references_found_and_resolved(self):
+        a, b = make_ref(value="a"), make_ref(value="b")
+        args, kwargs = (a, [1, b]), {"both": {"x": a}, "n": 3}
+        assert remote_results_in(args, kwargs) == [a, b]
+        assert resolve_remote_results(args, kwargs) == (
+            ("a", [1, "b"]),
+            {"both": {"x": "a"}, "n": 3},
+        )
+
+
+class TestChaining:
+    """Test dependencies between jobs."""
+
+    def test_only_unfinished_jobs_are_dependencies(self):
+        config = ClusterConfig(cluster_type="slurm")
+        refs = [
+            make_ref("1", status="completed"),
+            make_ref("2", status="running"),
+            make_ref("3", status="queued"),
+        ]
+        assert chain_dependencies(refs, config) == ["2", "3"]
+        assert chain_dependencies(refs[:1], config) is None
+
+    def test_failed_upstream_raises(self):
+        ref = make_ref(status="failed")
+        ref.executor.wait_for_remote_result.side_effect = ValueError("bad input")
+        with pytest.raises(ValueError, match="bad input"):
+            chain_dependencies([ref], ClusterConfig(cluster_type="slurm"))
+
+    def test_ssh_waits_for_upstream(self):
+        ref = make_ref()
+        assert chain_dependencies([ref], ClusterConfig(cluster_type="ssh")) is None
+        ref.executor.wait_for_remote_result.assert_called_once()
+
+    def test_only_on_the_same_filesystem(self):
+        ref = make_ref()
+        slurm = ClusterConfig(cluster_type="slurm", remote_work_dir="/work")
+        assert can_chain([ref], slurm, {})
+        assert not can_chain([ref], slurm, {"provider": "aws"})
+        assert not can_chain([ref], ClusterConfig(cluster_type="kubernetes"), {})
+        other = ClusterConfig(cluster_type="slurm", remote_work_dir="/scratch")
+        assert not can_chain([ref], other, {})
+
+    @pytest.mark.parametrize(
+        "cluster_type, line",
+        [
+            ("slurm", "#SBATCH --dependency=afterok:11:12"),
+            ("pbs", "#PBS -W depend=afterok:11:12"),
+            ("sge", "#$ -hold_jid 11,12"),
+        ],
+    )
+    def test_job_scripts(self, cluster_type, line):
+        config = ClusterConfig(cluster_type=cluster_type)
+        job_config = {"cores": 1, "memory": "1GB", "time": "00:10:00"}
+        script = create_job_script(
+            cluster_type, dict(job_config, dependency=["11", "12"]), "/w/j", config
+        )
+        assert line in script
+        plain = create_job_script(cluster_type, job_config, "/w/j", config)
+        assert "afterok" not in plain and "hold_jid" not in plain
+
+    def test_slurm_cancels_jobs_of_failed_upstream(self):
+        config = ClusterConfig(cluster_type="slurm")
+        job_config = {"cores": 1, "memory": "1GB", "time": "00:10:00"}
+        script = create_job_script(
+            "slurm", dict(job_config, dependency=["11"]), "/w/j", config
+        )
+        assert "#SBATCH --kill-on-invalid-dep=yes" in script
+
+    def test_sge_checks_upstream_results(self, tmp_path):
+        config = ClusterConfig(cluster_type="sge")
+        job_config = {
+            "cores": 1,
+            "memory": "1GB",
+            "time": "00:10:00",
+            "dependency": ["11"],
+            "dependency_results": ["../job_11/result.pkl"],
+        }
+        script = create_job_script("sge", job_config, "/w/j", config)
+        assert "'../job_11/result.pkl'" in script
+
+        # The upstream job ended without a result: the job writes an error
+        program = script.split('python -c "', 1)[1].rsplit('"', 1)[0]
+        job_dir = tmp_path / "job_12"
+        job_dir.mkdir()
+        subprocess.run([sys.executable, "-c", program], cwd=job_dir, check=False)
+        with open(job_dir / "error.pkl", "rb") as f:
+            error = pickle.load(f)
+        assert "Upstream result ../job_11/result.pkl is missing" in error["error"]
+
+
+def double(values):
+    return [2 * v for v in values]
+
+
+def total(values):
+    return sum(values)
+
+
+@pytest.fixture
+def chain_config(monkeypatch):
+    config = get_config()
+    for name, value in {
+        "cluster_host": "cluster.example.com",
+        "cluster_type": "slurm",
+        "remote_work_dir": "/work",
+        "placement": "remote_single",
+        "result_cache": False,
+        "auto_parallel": False,
+        "auto_gpu_parallel": False,
+    }.items():
+        monkeypatch.setattr(config, name, value)
+    return config
+
+
+class TestDecorator:
+    """Test lazy calls and pipelines through @cluster."""
+
+    @patch("clustrix.decorator.ClusterExecutor")
+    def test_pipeline_moves_no_intermediates(self, mock_executor_class, chain_config):
+        executor = mock_executor_class.return_value
+        executor.config = chain_config
+        submitted = []
+
+        def submit(func_data, job_config):
+            submitted.append((func_data, dict(job_config)))
+            return str(len(submitted))
+
+        executor.submit_job.side_effect = submit
+        executor.job_handle.side_effect = lambda job_id: {
+            "remote_dir": f"/work/job_{job_id}"
+        }
+        executor.get_job_status.return_value = "queued"
+        executor.wait_for_result.return_value = 6
+
+        ref = cluster(double, lazy=True)([1, 2, 3])
+        assert isinstance(ref, RemoteResult)
+        assert ref.remote_path == "/work/job_1/result.pkl"
+        assert cluster(total)(ref) == 6
+
+        executor.fetch_cached_result.assert_not_called()
+        executor.wait_for_result.assert_called_once_with("2")
+        assert mock_executor_class.call_count == 1
+        (_, first), (func_data, second) = submitted
+        assert not first.get("dependency")
+        assert second["dependency"] == ["1"]
+        assert b"../job_1/result.pkl" in func_data["args"]
+
+    @patch("clustrix.decorator.ClusterExecutor")
+    def test_local_calls_download(self, mock_executor_class, chain_config):
+        ref = make_ref(value=[1, 2])
+        assert cluster(total, placement="local_serial")(ref) == 3
+        mock_executor_class.return_value.submit_job.assert_not_called()
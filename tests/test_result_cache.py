@@ -0,0 +1,221 @@
+"""Tests for memoizing @cluster results."""
+
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from clustrix.config import get_config
+from clustrix.decorator import cluster
+from clustrix.executor_core import ClusterExecutor
+from clustrix.result_cache import (
+    ResultCache,
+    UnhashableArgumentError,
+    function_hash,
+    hash_value,
+    invalidate_results,
+    result_cache_key,
+)
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+calls = []
+
+
+def expensive(x, scale=2):
+    calls.append(x)
+    return x * scale
+
+
+@pytest.fixture
+def cache_config(tmp_path, monkeypatch):
+    config = get_config()
+    for name, value in {
+        "result_cache": True,
+        "local_cache_dir": str(tmp_path),
+        "cluster_host": None,
+        "cluster_type": "slurm",
+        "auto_parallel": False,
+        "auto_gpu_parallel": False,
+    }.items():
+        monkeypatch.setattr(config, name, value)
+    calls.clear()
+    return config
+
+
+class TestHashing:
+    """Test content hashing of functions and arguments."""
+
+    def test_containers(self):
+        assert hash_value({"a": 1, "b": [2, 3]}) == hash_value({"b": [2, 3], "a": 1})
+        assert hash_value((1, "2")) != hash_value((1, 2))
+        assert hash_value([1, 2]) != hash_value((1, 2))
+
+    @pytest.mark.skipif(not NUMPY_AVAILABLE, reason="NumPy not installed")
+    def test_arrays_hashed_by_content(self):
+        data = np.arange(12, dtype=np.float64).reshape(3, 4)
+        assert hash_value(data) == hash_value(data.copy())
+        assert hash_value(data[:, ::2]) == hash_value(data[:, ::2].copy())
+        assert hash_value(data) != hash_value(data.astype(np.float32))
+        assert hash_value(data) != hash_value(data.reshape(4, 3))
+
+    def test_unpicklable_argument(self):
+        with pytest.raises(UnhashableArgumentError):
+            hash_value(lambda: None)
+        assert result_cache_key(expensive, (lambda: None,), {}, None) is None
+
+    def test_closure_values_part_of_function_hash(self):
+        def make(factor):
+            def scaled(x):
+                return x * factor
+
+            return scaled
+
+        assert function_hash(make(2)) == function_hash(make(2))
+        assert function_hash(make(2)) != function_hash(make(3))
+
+
+class TestLocalTier:
+    """Test the on-disk LRU tier."""
+
+    def key(self, x):
+        return result_cache_key(expensive, (x,), {}, "env")
+
+    def test_round_trip(self, tmp_path):
+        cache = ResultCache(str(tmp_path))
+        assert cache.get(self.key(1)) == (False, None)
+        cache.put(self.key(1), {"value": 1})
+        assert cache.get(self.key(1)) == (True, {"value": 1})
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+    def test_least_recently_used_evicted(self, tmp_path):
+        cache = ResultCache(str(tmp_path), max_entries=2)
+        for x in (1, 2):
+            cache.put(self.key(x), x)
+        # Touching 1 makes 2 the least recently used
+        entries = sorted(cache._entries())
+        path_1 = str(tmp_path / self.key(1).filename)
+        os.utime(path_1, (entries[-1][0] + 10, entries[-1][0] + 10))
+        cache.put(self.key(3), 3)
+        assert cache.get(self.key(1))[0]
+        assert not cache.get(self.key(2))[0]
+        assert cache.stats.evictions == 1
+
+    def test_size_budget(self, tmp_path):
+        cache = ResultCache(str(tmp_path), max_bytes=4096)
+        for x in range(10):
+            cache.put(self.key(x), b"x" * 1000)
+        assert cache.size_bytes() <= 4096
+
+    def test_invalidate_function(self, tmp_path):
+        cache = ResultCache(str(tmp_path))
+        cache.put(self.key(1), 1)
+        cache.put(result_cache_key(hash_value, (1,), {}, "env"), 1)
+        assert cache.invalidate(expensive) == 1
+        assert cache.invalidate() == 1
+
+
+class TestDecorator:
+    """Test cache hits through @cluster."""
+
+    def test_local_calls_memoized(self, cache_config):
+        decorated = cluster(expensive)
+        assert decorated(3) == 6
+        assert decorated(3) == 6
+        assert decorated(3, scale=3) == 9
+        assert calls == [3, 3]
+
+        assert decorated.invalidate_cache() == 2
+        decorated(3)
+        assert calls == [3, 3, 3]
+
+    def test_opt_in(self, cache_config):
+        cache_config.result_cache = False
+        decorated = cluster(expensive)
+        decorated(1)
+        decorated(1)
+        assert calls == [1, 1]
+
+    @patch("clustrix.decorator.ClusterExecutor")
+    def test_local_hit_skips_cluster(self, mock_executor_class, cache_config):
+        cache_config.cluster_host = "cluster.example.com"
+        executor = mock_executor_class.return_value
+        executor.fetch_cached_result.return_value = (False, None)
+        executor.submit_job.return_value = "job1"
+        executor.wait_for_result.return_value = 10
+
+        decorated = cluster(expensive)
+        assert decorated(5) == 10
+        assert decorated(5) == 10
+
+        assert mock_executor_class.call_count == 1
+        executor.submit_job.assert_called_once()
+        path = executor.cache_result_on_cluster.call_args[0][1]
+        assert path.startswith(f"{cache_config.remote_work_dir}/result_cache/")
+
+    @patch("clustrix.decorator.ClusterExecutor")
+    def test_remote_hit_skips_recomputation(self, mock_executor_class, cache_config):
+        cache_config.cluster_host = "cluster.example.com"
+        executor = mock_executor_class.return_value
+        executor.fetch_cached_result.return_value = (True, 42)
+
+        assert cluster(expensive)(7) == 42
+        executor.submit_job.assert_not_called()
+
+        # Now cached locally as well
+        assert cluster(expensive)(7) == 42
+        assert mock_executor_class.call_count == 1
+
+    @patch("clustrix.decorator.ClusterExecutor")
+    def test_remote_lookup_failure_is_a_miss(self, mock_executor_class, cache_config):
+        cache_config.cluster_host = "cluster.example.com"
+        executor = mock_executor_class.return_value
+        executor.fetch_cached_result.side_effect = OSError("connection reset")
+        executor.wait_for_result.return_value = 4
+
+        assert cluster(expensive)(2) == 4
+        executor.submit_job.assert_called_once()
+
+    def test_invalidate_results_for_all_functions(self, cache_config):
+        decorated = cluster(expensive)
+        decorated(1)
+        decorated(2)
+        executor = MagicMock()
+        assert invalidate_results(executor=executor) == 2
+        executor.remove_remote_files.assert_called_once_with(
+            f"{cache_config.remote_work_dir}/result_cache/*.pkl"
+        )
+
+
+class TestClusterSideCopy:
+    """Test that single jobs copy their result into the remote cache."""
+
+    def test_result_copied_before_cleanup(self, mock_config):
+        executor = ClusterExecutor(mock_config)
+        executor.connection_manager = MagicMock()
+        executor.scheduler_manager = MagicMock()
+        executor.scheduler_manager.active_jobs = {"1": {"remote_dir": "/tmp/job1"}}
+        executor.scheduler_manager.check_job_status.return_value = "completed"
+        executor.active_jobs["1"] = {"manager": "scheduler", "job_id": "1"}
+
+        def download(remote, local):
+            with open(local, "wb") as f:
+                f.write(b"\x80\x04K\x05.")  # pickled 5
+
+        executor.connection_manager.download_file.side_effect = download
+        assert executor.cache_result_on_cluster("1", "/tmp/cache/key.pkl")
+        assert executor.wait_for_result("1") == 5
+
+        commands = [
+            c[0][0]
+            for c in executor.connection_manager.execute_remote_command.call_args_list
+        ]
+        assert commands[0] == (
+            "mkdir -p /tmp/cache && cp /tmp/job1/result.pkl /tmp/cache/key.pkl"
+        )
+        assert commands[1] == "rm -rf /tmp/job1"
@@ -0,0 +1,228 @@
+"""Tests for as-completed collection of parallel chunk results."""
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from clustrix.config import get_config
+from clustrix.decorator import cluster
+from clustrix.executor_core import ClusterExecutor
+from clustrix.loop_splitting import get_chunk_variant
+from clustrix.result_collection import MAX_UNKNOWN_POLLS, collect_as_completed
+
+
+class FakeJobs:
+    """Jobs that finish in the order given by ``finish_order``.
+
+    With ``gated``, each download blocks until the test calls :meth:`release`.
+    """
+
+    def __init__(self, finish_order, failing=(), gated=False):
+        self.finish_order = list(finish_order)
+        self.failing = set(failing)
+        self.polls = 0
+        self.gates = {job: threading.Event() for job in self.finish_order}
+        if not gated:
+            for gate in self.gates.values():
+                gate.set()
+        self.executor = MagicMock()
+        self.executor.get_job_statuses.side_effect = self.statuses
+        self.executor.wait_for_result.side_effect = self.result
+
+    def statuses(self, jobs):
+        # One more job finishes with every poll
+        self.polls += 1
+        done = set(self.finish_order[: self.polls])
+        return {job: "completed" if job in done else "running" for job in jobs}
+
+    def release(self, job):
+        self.gates[job].set()
+
+    def result(self, job):
+        assert self.gates[job].wait(timeout=10)
+        if job in self.failing:
+            raise RuntimeError(f"{job} failed")
+        return f"result of {job}"
+
+
+def collect(executor, n, **kwargs):
+    jobs = [(f"job{i}", {"index": i}) for i in range(n)]
+    return list(collect_as_completed(executor, jobs, interval=0, **kwargs))
+
+
+class TestCollectAsCompleted:
+    """Test polling and downloading chunk jobs."""
+
+    def test_yields_in_completion_order(self):
+        fake = FakeJobs(["job2", "job0", "job1"], gated=True)
+        jobs = [(f"job{i}", {"index": i}) for i in range(3)]
+        results = collect_as_completed(fake.executor, jobs, interval=0)
+        collected = []
+        # Downloads run concurrently; each finishes only once released
+        for job in ["job1", "job2", "job0"]:
+            fake.release(job)
+            collected.append(next(results))
+        assert next(results, None) is None
+        assert [chunk["index"] for chunk, _, _ in collected] == [1, 2, 0]
+        assert collected[0][1:] == ("result of job1", None)
+        # One batched status query per poll, never one per job
+        fake.executor.get_job_status.assert_not_called()
+        assert fake.executor.get_job_statuses.call_count == 3
+
+    def test_downloads_are_bounded(self):
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def download(job):
+            with lock:
+                active.append(job)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.remove(job)
+            return job
+
+        executor = MagicMock()
+        executor.get_job_statuses.side_effect = lambda jobs: dict.fromkeys(
+            jobs, "completed"
+        )
+        executor.wait_for_result.side_effect = download
+        collected = collect(executor, 8, max_downloads=3)
+        assert sorted(result for _, result, _ in collected) == sorted(
+            f"job{i}" for i in range(8)
+        )
+        assert 1 < max(peak) <= 3
+
+    def test_failures_are_yielded(self):
+        fake = FakeJobs(["job0", "job1"], failing={"job1"})
+        collected = {
+            chunk["index"]: error for chunk, _, error in collect(fake.executor, 2)
+        }
+        assert collected[0] is None
+        assert isinstance(collected[1], RuntimeError)
+
+    def test_keyboard_interrupt_propagates(self):
+        fake = FakeJobs(["job0"])
+        fake.executor.wait_for_result.side_effect = KeyboardInterrupt
+        with pytest.raises(KeyboardInterrupt):
+            collect(fake.executor, 1)
+
+    def test_undeterminable_status_is_resolved(self):
+        executor = MagicMock()
+        executor.get_job_statuses.side_effect = lambda jobs: {
+            job: "completed" for job in jobs if job != "job1"
+        }
+        executor.wait_for_result.side_effect = lambda job: job
+        collected = collect(executor, 2)
+        assert [result for _, result, _ in collected] == ["job0", "job1"]
+        # job1 is handed over only after MAX_UNKNOWN_POLLS polls
+        assert executor.get_job_statuses.call_count == MAX_UNKNOWN_POLLS
+
+    def test_falls_back_to_per_job_status(self):
+        executor = MagicMock()
+        executor.get_job_statuses.side_effect = RuntimeError("no batch support")
+        executor.get_job_status.return_value = "completed"
+        executor.wait_for_result.side_effect = lambda job: job
+        assert len(collect(executor, 3)) == 3
+        assert executor.get_job_status.call_count == 3
+
+
+class TestBatchedStatus:
+    """Test ClusterExecutor.get_job_statuses on SLURM."""
+
+    def test_one_squeue_call(self, mock_config):
+        executor = ClusterExecutor(mock_config)
+        executor.connection_manager = MagicMock()
+        for job_id in ["1", "2", "3", "4"]:
+            executor.scheduler_manager.active_jobs[job_id] = {
+                "remote_dir": f"/tmp/job{job_id}"
+            }
+            executor.active_jobs[job_id] = {"manager": "scheduler", "job_id": job_id}
+
+        def remote(command):
+            if command.startswith("squeue"):
+                return "1 RUNNING None\n2 PENDING Priority\n", ""
+            return "/tmp/job3\n", ""
+
+        executor.connection_manager.execute_remote_command.side_effect = remote
+        with patch.object(
+            executor.scheduler_manager, "check_job_status", return_value="failed"
+        ) as check:
+            statuses = executor.get_job_statuses(["1", "2", "3", "4"])
+
+        assert statuses == {
+            "1": "running",
+            "2": "queued",
+            "3": "completed",
+            "4": "failed",
+        }
+        commands = [
+            c.args[0]
+            for c in executor.connection_manager.execute_remote_command.call_args_list
+        ]
+        assert len(commands) == 2
+        assert "-j 1,2,3,4" in commands[0]
+        # Only the job that left the queue without a result is checked alone
+        check.assert_called_once_with("4")
+
+    def test_dependency_never_satisfied_fails(self, mock_config):
+        executor = ClusterExecutor(mock_config)
+        executor.connection_manager = MagicMock()
+        executor.scheduler_manager.active_jobs["1"] = {"remote_dir": "/tmp/job1"}
+        executor.active_jobs["1"] = {"manager": "scheduler", "job_id": "1"}
+        executor.connection_manager.execute_remote_command.return_value = (
+            "1 PENDING DependencyNeverSatisfied\n",
+            "",
+        )
+
+        assert executor.get_job_statuses(["1"]) == {"1": "failed"}
+
+
+class TestStreamingAPI:
+    """Test the decorated function's as_completed generator."""
+
+    def test_as_completed(self, monkeypatch):
+        config = get_config()
+        monkeypatch.setattr(config, "max_parallel_jobs", 4)
+        monkeypatch.setattr(config, "job_poll_interval", 0)
+
+        @cluster(cores=1, parallel=True)
+        def sum_of_squares(n):
+            total = 0
+            for i in range(n):
+                total += i * i
+            return total
+
+        variant = get_chunk_variant(sum_of_squares.__wrapped__)
+        jobs = {}
+        executor = MagicMock()
+
+        def submit(kwargs, job_config):
+            jobs[f"job{len(jobs)}"] = kwargs
+            return f"job{len(jobs) - 1}"
+
+        executor.submit_job.side_effect = submit
+        executor.get_job_statuses.side_effect = lambda ids: dict.fromkeys(
+            ids, "completed"
+        )
+        executor.wait_for_result.side_effect = lambda job: variant(20, **jobs[job])
+
+        with patch("clustrix.decorator.ClusterExecutor", return_value=executor), patch(
+            "clustrix.decorator.serialize_function", side_effect=lambda f, a, k: k
+        ):
+            partials = dict(sum_of_squares.as_completed(20))
+
+        assert sorted(partials) == list(range(len(jobs)))
+        assert sum(partials.values()) == sum(i * i for i in range(20))
+        executor.disconnect.assert_called_once()
+
+    def test_no_loop(self):
+        @cluster(cores=1)
+        def square(x):
+            return x * x
+
+        with pytest.raises(ValueError, match="no loop"):
+            list(square.as_completed(3))
@@ -0,0 +1,115 @@
+"""Tests for type-aware combination of chunk results."""
+
+import numpy as np
+import pytest
+
+from clustrix.decorator import _combine_local_results, _combine_results
+from clustrix.loop_splitting import plan_loop_split
+from clustrix.result_combiners import (
+    combine_by_type,
+    find_combiner,
+    register_combiner,
+)
+
+pd = pytest.importorskip("pandas")
+
+
+class TestArrays:
+    """Test NumPy array concatenation."""
+
+    def test_concat_along_loop_axis(self):
+        parts = [np.arange(6).reshape(3, 2), np.arange(4.0).reshape(2, 2)]
+        combined, value = combine_by_type(parts)
+        assert combined
+        assert value.shape == (5, 2)
+        assert value.dtype == np.float64
+        np.testing.assert_array_equal(value, np.concatenate(parts))
+
+    def test_incompatible_arrays_are_not_combined(self):
+        assert combine_by_type([np.zeros((2, 3)), np.zeros((2, 4))]) == (False, None)
+        assert combine_by_type([np.float64(1.0), np.float64(2.0)])[0] is False
+        assert combine_by_type([np.array(1), np.array(2)]) == (False, None)
+
+    def test_mixed_types_are_not_combined(self):
+        assert find_combiner([np.zeros(2), [0.0, 0.0]]) is None
+
+
+class TestFrames:
+    """Test pandas concatenation."""
+
+    def test_default_index_is_renumbered(self):
+        parts = [pd.DataFrame({"x": [1, 2]}), pd.DataFrame({"x": [3]})]
+        combined, value = combine_by_type(parts)
+        assert combined
+        assert list(value.index) == [0, 1, 2]
+        assert list(value["x"]) == [1, 2, 3]
+
+    def test_own_index_is_kept(self):
+        parts = [pd.Series([1.0], index=["a"]), pd.Series([2.0], index=["b"])]
+        _, value = combine_by_type(parts)
+        assert value.to_dict() == {"a": 1.0, "b": 2.0}
+
+    def test_arrow_tables(self):
+        pa = pytest.importorskip("pyarrow")
+        parts = [pa.table({"x": [1, 2]}), pa.table({"x": [3]})]
+        _, value = combine_by_type(parts)
+        assert value.column("x").to_pylist() == [1, 2, 3]
+
+
+class TestDicts:
+    """Test dict merging."""
+
+    def test_disjoint_dicts_are_merged(self):
+        parts = [{0: "a"}, {1: "b"}]
+        assert combine_by_type(parts) == (True, {0: "a", 1: "b"})
+        assert parts == [{0: "a"}, {1: "b"}]
+
+    def test_shared_keys_are_not_merged(self):
+        assert combine_by_type([{"total": 1}, {"total": 2}]) == (False, None)
+
+    def test_merge_accumulator_later_chunks_win(self):
+        def last_seen(items):
+            seen = {}
+            for i in items:
+                seen[i % 3] = i
+            return seen
+
+        plan = plan_loop_split(last_seen, (list(range(10)),), {})
+        assert plan.combine([{0: 0, 1: 1}, {1: 4, 2: 5}]) == {0: 0, 1: 4, 2: 5}
+
+
+def collect(items):
+    out = []
+    for i in items:
+        out.append(i)
+    return out
+
+
+class TestIntegration:
+    """Test where parallel execution uses the combiners."""
+
+    def test_concat_accumulator_chunks(self):
+        plan = plan_loop_split(collect, (list(range(4)),), {})
+        parts = [np.array([1, 2]), np.array([3, 4])]
+        np.testing.assert_array_equal(plan.combine(parts), np.array([1, 2, 3, 4]))
+        assert plan.combine([[1, 2], [3]]) == [1, 2, 3]
+
+    def test_registered_type(self):
+        class Intervals(list):
+            pass
+
+        register_combiner(Intervals, lambda parts: Intervals(sum(parts, [])))
+        plan = plan_loop_split(collect, (list(range(3)),), {})
+        combined = plan.combine([Intervals([1]), Intervals([2, 3])])
+        assert type(combined) is Intervals and combined == [1, 2, 3]
+
+    def test_generic_chunks_stay_a_list(self):
+        arrays = [np.array([1, 2]), np.array([3, 4])]
+        remote = _combine_results(list(enumerate(arrays)), {})
+        assert isinstance(remote, list) and len(remote) == 2
+        assert _combine_results([(1, {"b": 2}), (0, {"a": 1})], {}) == [
+            {"a": 1},
+            {"b": 2},
+        ]
+        frames = [pd.DataFrame({"x": [1]}), pd.DataFrame({"x": [2]})]
+        assert isinstance(_combine_local_results(frames, {}), list)
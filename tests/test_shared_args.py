@@ -0,0 +1,168 @@
+"""Tests for passing large arguments to local workers through shared memory."""
+
+import mmap
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from clustrix.local_executor import LocalExecutor
+from clustrix.shared_args import (
+    SharedArgumentStore,
+    SharedArrayHandle,
+    SharedFrameHandle,
+    call_with_shared_arguments,
+    has_shareable_arguments,
+)
+
+
+def chunk_sum(data, start, stop):
+    return float(data[start:stop].sum())
+
+
+def is_shared_view(data):
+    return isinstance(data.base, mmap.mmap) and data.flags.writeable
+
+
+def shared_item(data, index):
+    return is_shared_view(data), float(data[index])
+
+
+def write_and_read(data, index):
+    data[index] = 5
+    data[0] += 1
+    return float(data[index]), float(data[0])
+
+
+def frame_total(frame):
+    return float(frame["a"].sum() + frame["b"].sum()), list(frame["label"])
+
+
+def fail_on_chunk(data, index):
+    if index == 1:
+        raise ValueError("chunk failed")
+    return index
+
+
+def _segment_exists(name):
+    try:
+        segment = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return False
+    segment.close()
+    return True
+
+
+class TestSharedArgumentStore:
+    """Test handle creation and reconstruction."""
+
+    def test_same_array_shared_once(self):
+        data = np.arange(1000, dtype=np.float64)
+        with SharedArgumentStore(threshold=100) as store:
+            first, _ = store.share_arguments((data, 1), {})
+            second, _ = store.share_arguments((data, 2), {})
+            assert isinstance(first[0], SharedArrayHandle)
+            assert first[0] is second[0]
+            assert first[1] == 1
+            assert store.bytes_shared == data.nbytes
+
+    def test_small_arguments_not_shared(self):
+        with SharedArgumentStore(threshold=10**6) as store:
+            args, kwargs = store.share_arguments((np.zeros(10),), {"x": [1, 2]})
+            assert isinstance(args[0], np.ndarray)
+            assert kwargs == {"x": [1, 2]}
+
+    def test_roundtrip_in_process(self):
+        data = np.arange(100, dtype=np.int32).reshape(10, 10)
+        with SharedArgumentStore(threshold=1) as store:
+            args, _ = store.share_arguments((data,), {})
+            assert call_with_shared_arguments(np.sum, args, {}) == data.sum()
+
+    def test_dataframe_handle(self):
+        frame = pd.DataFrame(
+            {"a": np.arange(50.0), "b": np.arange(50), "label": ["x"] * 50}
+        )
+        with SharedArgumentStore(threshold=1) as store:
+            (handle,), _ = store.share_arguments((frame,), {})
+            assert isinstance(handle, SharedFrameHandle)
+            total, labels = call_with_shared_arguments(frame_total, (handle,), {})
+        assert total == frame["a"].sum() + frame["b"].sum()
+        assert labels == ["x"] * 50
+
+    def test_segments_unlinked_on_close(self):
+        with SharedArgumentStore(threshold=1) as store:
+            (handle,), _ = store.share_arguments((np.ones(10),), {})
+            assert _segment_exists(handle.shm_name)
+        assert not _segment_exists(handle.shm_name)
+
+    def test_has_shareable_arguments(self):
+        big = [{"args": (np.ones(1000),), "kwargs": {}}]
+        assert has_shareable_arguments(big, threshold=100)
+        assert not has_shareable_arguments(big, threshold=None)
+        assert not has_shareable_arguments([{"args": (1,)}], threshold=1)
+
+
+class TestLocalExecutorSharedMemory:
+    """Test shared-memory transport in LocalExecutor process pools."""
+
+    def test_chunks_receive_zero_copy_views(self):
+        data = np.random.rand(200_000)
+        chunks = [
+            {"args": (data, i * 50_000, (i + 1) * 50_000), "kwargs": {}}
+            for i in range(4)
+        ]
+        with LocalExecutor(max_workers=2, shared_memory_threshold=1024) as executor:
+            results = executor.execute_parallel(chunk_sum, chunks)
+            views = executor.execute_parallel(
+                is_shared_view, [{"args": (data,)}, {"kwargs": {"data": data}}]
+            )
+
+        assert sum(results) == pytest.approx(data.sum())
+        assert views == [True, True]
+
+    def test_loop_chunks_share_arguments(self):
+        data = np.random.rand(200_000)
+        with LocalExecutor(max_workers=2, shared_memory_threshold=1024) as executor:
+            views = executor.execute_loop_parallel(
+                shared_item, "index", range(40), func_args=(data,)
+            )
+        assert views == [(True, data[i]) for i in range(40)]
+
+    def test_writes_stay_private_to_each_task(self):
+        data = np.zeros(400_000)
+        chunks = [{"args": (data, i), "kwargs": {}} for i in range(1, 9)]
+        with LocalExecutor(max_workers=2, shared_memory_threshold=1024) as executor:
+            results = executor.execute_parallel(write_and_read, chunks)
+
+        # Every task sees a fresh copy, as it would a pickled argument
+        assert results == [(5.0, 1.0)] * 8
+        assert not data.any()
+
+    def test_segments_released_after_failure(self):
+        data = np.ones(10_000)
+        created = []
+        original = SharedArgumentStore._share_array
+
+        def tracking_share(self, array):
+            handle = original(self, array)
+            created.append(handle.shm_name)
+            return handle
+
+        chunks = [{"args": (data, i), "kwargs": {}} for i in range(3)]
+        SharedArgumentStore._share_array = tracking_share
+        try:
+            with LocalExecutor(max_workers=2, shared_memory_threshold=1) as executor:
+                with pytest.raises(ValueError):
+                    executor.execute_parallel(fail_on_chunk, chunks)
+        finally:
+            SharedArgumentStore._share_array = original
+
+        assert len(created) == 1
+        assert not _segment_exists(created[0])
+
+    def test_disabled_threshold_pickles_arguments(self):
+        data = np.arange(10_000.0)
+        chunks = [{"args": (data,), "kwargs": {}}, {"args": (data,), "kwargs": {}}]
+        with LocalExecutor(max_workers=2, shared_memory_threshold=None) as executor:
+            assert executor.execute_parallel(is_shared_view, chunks) == [False, False]
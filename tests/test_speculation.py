@@ -0,0 +1,244 @@
+"""Tests for speculative re-execution of straggling chunks."""
+
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from clustrix.config import ClusterConfig, get_config
+from clustrix.decorator import _execute_parallel
+from clustrix.loop_splitting import get_chunk_variant
+from clustrix.result_collection import collect_as_completed
+from clustrix.speculation import (
+    SpeculationStats,
+    Speculator,
+    StragglerPolicy,
+    percentile,
+)
+from clustrix.utils import _create_slurm_script
+
+
+class FakeScheduler:
+    """Jobs finish ``durations[job]`` seconds after submission, on a fake clock."""
+
+    def __init__(self, durations, failing=()):
+        self.now = 0.0
+        self.durations = dict(durations)
+        self.failing = set(failing)
+        self.submitted_at = {job: 0.0 for job in durations}
+        self.cancelled = []
+        self.executor = MagicMock()
+        self.executor.get_job_statuses.side_effect = lambda jobs: {
+            job: self.status(job) for job in jobs
+        }
+        self.executor.wait_for_result.side_effect = self.result
+        self.executor.job_node.side_effect = lambda job: f"node-{job}"
+        self.executor.cancel_job.side_effect = self.cancelled.append
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def status(self, job):
+        if self.now - self.submitted_at[job] < self.durations[job]:
+            return "running"
+        return "failed" if job in self.failing else "completed"
+
+    def result(self, job):
+        if job in self.failing:
+            raise RuntimeError(f"{job} failed")
+        return f"result of {job}"
+
+    def submit(self, duration):
+        def resubmit(chunk, node):
+            job = f"dup{chunk['index']}"
+            self.durations[job] = duration
+            self.submitted_at[job] = self.now
+            self.excluded = node
+            return job
+
+        return resubmit
+
+
+def collect(scheduler, jobs, resubmit, policy=None, stats=None):
+    # As _iter_parallel_results collects a speculative run, on a fake clock
+    policy = policy or StragglerPolicy(poll_interval=1.0)
+    speculator = Speculator(scheduler.executor, resubmit, policy, stats)
+    return {
+        chunk["index"]: (result, error)
+        for chunk, result, error in collect_as_completed(
+            scheduler.executor,
+            jobs,
+            interval=policy.poll_interval,
+            speculator=speculator,
+            clock=scheduler.clock,
+            sleep=scheduler.sleep,
+        )
+    }
+
+
+def chunks(n):
+    return [(f"job{i}", {"index": i}) for i in range(n)]
+
+
+def test_percentile():
+    assert percentile([1, 2, 3, 4, 5], 50) == 3
+    assert percentile([10, 20], 90) == pytest.approx(19)
+    assert percentile([7], 90) == 7
+
+
+class TestSpeculation:
+    """Test duplicating stragglers."""
+
+    def test_duplicate_of_straggler_wins(self):
+        durations = {f"job{i}": 10.0 for i in range(9)}
+        durations["job9"] = 1000.0
+        scheduler = FakeScheduler(durations)
+        stats = SpeculationStats()
+
+        results = collect(scheduler, chunks(10), scheduler.submit(10.0), stats=stats)
+
+        assert results[9] == ("result of dup9", None)
+        assert scheduler.excluded == "node-job9"
+        assert scheduler.cancelled == ["job9"]
+        assert (stats.duplicates, stats.duplicate_wins) == (1, 1)
+        # Threshold is 1.5 x the 90th percentile (10s), so the duplicate
+        # starts at 16s and finishes 10s later
+        assert scheduler.now < 30
+
+    def test_original_kept_if_it_finishes_first(self):
+        durations = {f"job{i}": 10.0 for i in range(4)}
+        durations["job3"] = 20.0
+        scheduler = FakeScheduler(durations)
+        results = collect(scheduler, chunks(4), scheduler.submit(100.0))
+        assert results[3] == ("result of job3", None)
+        assert scheduler.cancelled == ["dup3"]
+
+    def test_no_speculation_before_most_chunks_finish(self):
+        durations = {"job0": 10.0, "job1": 100.0, "job2": 100.0}
+        scheduler = FakeScheduler(durations)
+        resubmit = MagicMock()
+        collect(scheduler, chunks(3), resubmit)
+        resubmit.assert_not_called()
+
+    def test_duplicate_cap(self):
+        durations = {f"job{i}": 10.0 for i in range(8)}
+        durations.update({"job8": 500.0, "job9": 500.0})
+        scheduler = FakeScheduler(durations)
+        stats = SpeculationStats()
+        policy = StragglerPolicy(min_done=0.5, max_duplicates=0.1, poll_interval=1.0)
+        collect(scheduler, chunks(10), scheduler.submit(10.0), policy, stats)
+        assert stats.duplicates == 1
+
+    def test_failed_original_falls_back_to_duplicate(self):
+        durations = {f"job{i}": 10.0 for i in range(4)}
+        durations["job3"] = 40.0
+        scheduler = FakeScheduler(durations, failing={"job3"})
+        results = collect(scheduler, chunks(4), scheduler.submit(30.0))
+        assert results[3] == ("result of dup3", None)
+
+    def test_failure_without_duplicate_is_reported(self):
+        scheduler = FakeScheduler({"job0": 1.0}, failing={"job0"})
+        ((result, error),) = collect(scheduler, chunks(1), MagicMock()).values()
+        assert result is None and isinstance(error, RuntimeError)
+
+
+class TestIntegration:
+    """Test speculation in _execute_parallel and job scripts."""
+
+    def test_execute_parallel_speculates(self, monkeypatch):
+        config = get_config()
+        monkeypatch.setattr(config, "speculative_execution", True)
+        monkeypatch.setattr(config, "max_parallel_jobs", 4)
+        monkeypatch.setattr(config, "job_poll_interval", 0)
+
+        def sum_of_squares(n):
+            total = 0
+            for i in range(n):
+                total += i * i
+            return total
+
+        variant = get_chunk_variant(sum_of_squares)
+        jobs = {}
+        executor = MagicMock()
+
+        def submit(kwargs, job_config):
+            jobs[f"job{len(jobs)}"] = kwargs
+            return f"job{len(jobs) - 1}"
+
+        executor.submit_job.side_effect = submit
+        executor.get_job_statuses.side_effect = lambda jobs: dict.fromkeys(
+            jobs, "completed"
+        )
+        executor.wait_for_result.side_effect = lambda job: variant(20, **jobs[job])
+
+        with patch(
+            "clustrix.decorator.serialize_function", side_effect=lambda f, a, k: k
+        ):
+            result = _execute_parallel(executor, sum_of_squares, (20,), {}, {}, {})
+
+        assert result == sum_of_squares(20)
+        executor.get_job_statuses.assert_called_once()
+        executor.wait_for_remote_result.assert_not_called()
+
+    def test_execute_parallel_duplicates_straggler(self, monkeypatch):
+        config = get_config()
+        monkeypatch.setattr(config, "speculative_execution", True)
+        monkeypatch.setattr(config, "speculative_min_done", 0.5)
+        monkeypatch.setattr(config, "max_parallel_jobs", 4)
+        monkeypatch.setattr(config, "job_poll_interval", 0)
+
+        def sum_of_squares(n):
+            total = 0
+            for i in range(n):
+                total += i * i
+            return total
+
+        variant = get_chunk_variant(sum_of_squares)
+        jobs = {}
+        submitted_at = {}
+        job_configs = []
+        executor = MagicMock()
+
+        def submit(kwargs, job_config):
+            job = f"job{len(jobs)}"
+            jobs[job] = kwargs
+            submitted_at[job] = time.monotonic()
+            job_configs.append(job_config)
+            return job
+
+        def status(job):
+            # job0 never finishes; every other job takes 10ms
+            if job == "job0" or time.monotonic() - submitted_at[job] < 0.01:
+                return "running"
+            return "completed"
+
+        executor.submit_job.side_effect = submit
+        executor.get_job_statuses.side_effect = lambda ids: {
+            job: status(job) for job in ids
+        }
+        executor.wait_for_result.side_effect = lambda job: variant(20, **jobs[job])
+        executor.job_node.return_value = "node7"
+
+        with patch(
+            "clustrix.decorator.serialize_function", side_effect=lambda f, a, k: k
+        ):
+            result = _execute_parallel(executor, sum_of_squares, (20,), {}, {}, {})
+
+        assert result == sum_of_squares(20)
+        # The duplicate of job0 ran off its node and job0 was cancelled
+        duplicate = f"job{len(jobs) - 1}"
+        assert jobs[duplicate] == jobs["job0"]
+        assert job_configs[-1]["exclude"] == "node7"
+        executor.cancel_job.assert_called_once_with("job0")
+
+    def test_slurm_exclude(self):
+        config = ClusterConfig(cluster_type="slurm")
+        job_config = {"cores": 1, "memory": "1GB", "time": "00:10:00"}
+        script = _create_slurm_script(
+            dict(job_config, exclude="node7"), "/tmp/j", config
+        )
+        assert "#SBATCH --exclude=node7" in script
+        assert "--exclude" not in _create_slurm_script(job_config, "/tmp/j", config)
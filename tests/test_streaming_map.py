@@ -0,0 +1,130 @@
+"""Tests for streaming, bounded-memory parallel maps."""
+
+import itertools
+import threading
+import time
+
+import pytest
+
+from clustrix import cluster
+from clustrix.local_executor import LocalExecutor
+
+
+def double(x):
+    return 2 * x
+
+
+def scaled(x, factor=1):
+    return x * factor
+
+
+class TestLocalExecutorImap:
+    """Test LocalExecutor.imap."""
+
+    def test_ordered_results(self):
+        with LocalExecutor(max_workers=3, use_threads=True) as executor:
+            results = list(executor.imap(double, range(100)))
+        assert results == [2 * x for x in range(100)]
+
+    def test_unordered_results(self):
+        def slow_first(x):
+            if x == 0:
+                time.sleep(0.1)
+            return x
+
+        with LocalExecutor(max_workers=2, use_threads=True) as executor:
+            results = list(executor.imap(slow_first, range(10), ordered=False))
+
+        assert sorted(results) == list(range(10))
+        assert results[-1] == 0
+
+    def test_unbounded_iterable_is_consumed_lazily(self):
+        pulled = []
+
+        def source():
+            for i in itertools.count():
+                pulled.append(i)
+                yield i
+
+        with LocalExecutor(max_workers=2, use_threads=True) as executor:
+            stream = executor.imap(double, source(), chunk_size=5, max_in_flight=3)
+            first = list(itertools.islice(stream, 12))
+            stream.close()
+
+        assert first == [2 * x for x in range(12)]
+        # At most the in-flight window beyond what was consumed
+        assert len(pulled) <= 12 + 3 * 5 + 1
+
+    def test_in_flight_cap_holds_with_slow_head(self):
+        started = []
+        release = threading.Event()
+
+        def blocked_head(x):
+            started.append(x)
+            if x == 0:
+                release.wait(5)
+            return x
+
+        with LocalExecutor(max_workers=4, use_threads=True) as executor:
+            stream = executor.imap(
+                blocked_head, range(1000), chunk_size=1, max_in_flight=4
+            )
+            consumer = threading.Thread(target=lambda: list(stream))
+            consumer.start()
+            time.sleep(0.2)
+            # Completed chunks wait for the head, so nothing new is submitted
+            assert len(started) == 4
+            release.set()
+            consumer.join(5)
+
+        assert len(started) == 1000
+
+    def test_positional_args_and_kwargs(self):
+        with LocalExecutor(max_workers=2, use_threads=True) as executor:
+            results = list(executor.imap(scaled, [1, 2, 3], func_kwargs={"factor": 10}))
+        assert results == [10, 20, 30]
+
+    def test_loop_var(self):
+        with LocalExecutor(max_workers=2, use_threads=True) as executor:
+            results = list(
+                executor.imap(scaled, [1, 2], loop_var="x", func_kwargs={"factor": 3})
+            )
+        assert results == [3, 6]
+
+    def test_error_propagates(self):
+        def fail_on_five(x):
+            if x == 5:
+                raise ValueError("bad item")
+            return x
+
+        with LocalExecutor(max_workers=2, use_threads=True) as executor:
+            with pytest.raises(ValueError, match="bad item"):
+                list(executor.imap(fail_on_five, range(20), chunk_size=2))
+
+    def test_process_pool(self):
+        with LocalExecutor(max_workers=2) as executor:
+            assert list(executor.imap(double, range(50))) == [2 * x for x in range(50)]
+
+    def test_without_context_manager(self):
+        executor = LocalExecutor(max_workers=2, use_threads=True)
+        assert list(executor.imap(double, iter([1, 2, 3]))) == [2, 4, 6]
+        assert executor._executor is None
+
+
+class TestDecoratorMap:
+    """Test the streaming map exposed on decorated functions."""
+
+    def test_map_streams_locally(self):
+        @cluster(cores=2)
+        def triple(x, offset=0):
+            return 3 * x + offset
+
+        results = list(triple.map((i for i in range(20)), offset=1))
+        assert results == [3 * i + 1 for i in range(20)]
+
+    def test_map_unordered(self):
+        @cluster(cores=2)
+        def identity(x):
+            return x
+
+        assert sorted(identity.map(range(30), ordered=False)) == list(range(30))
@@ -0,0 +1,175 @@
+"""Tests for supervised local execution with per-task deadlines."""
+
+import os
+import time
+
+import pytest
+
+from clustrix.local_executor import LocalExecutor
+from clustrix.task_supervisor import (
+    CANCELLED,
+    COMPLETED,
+    FAILED,
+    TIMEOUT,
+    TaskSupervisor,
+    TaskTimeoutError,
+    WorkerDiedError,
+)
+
+
+def sleep_for(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def hang_on(x, bad):
+    if x == bad:
+        time.sleep(60)
+    return x * 2
+
+
+def fail_on_two(x):
+    if x == 2:
+        raise ValueError("bad chunk")
+    return x
+
+
+def crash(x):
+    if x == 1:
+        os._exit(3)
+    return x
+
+
+def hang_once(x, marker):
+    # Hangs on the first attempt only: the marker file records the attempt
+    if x == 1 and not os.path.exists(marker):
+        open(marker, "w").close()
+        time.sleep(60)
+    return x
+
+
+def _chunks(*values, **kwargs):
+    return [{"args": (value,), "kwargs": dict(kwargs)} for value in values]
+
+
+class TestTaskSupervisor:
+    """Test deadlines, worker replacement and partial results."""
+
+    def test_hung_task_killed_others_complete(self):
+        start = time.monotonic()
+        with TaskSupervisor(max_workers=2) as supervisor:
+            run = supervisor.run(hang_on, _chunks(0, 1, 2, 3, bad=1), task_timeout=0.5)
+        assert time.monotonic() - start < 10
+        assert [o.status for o in run.outcomes] == [
+            COMPLETED,
+            TIMEOUT,
+            COMPLETED,
+            COMPLETED,
+        ]
+        assert run.results == [0, None, 4, 6]
+        assert isinstance(run.outcomes[1].error, TaskTimeoutError)
+        assert supervisor.workers_replaced == 1
+
+    def test_failures_reported_per_chunk(self):
+        with TaskSupervisor(max_workers=2) as supervisor:
+            run = supervisor.run(fail_on_two, _chunks(1, 2, 3))
+        assert [o.status for o in run.outcomes] == [COMPLETED, FAILED, COMPLETED]
+        assert isinstance(run.outcomes[1].error, ValueError)
+        with pytest.raises(ValueError, match="bad chunk"):
+            run.raise_for_status()
+
+    def test_worker_crash_replaced(self):
+        with TaskSupervisor(max_workers=2) as supervisor:
+            run = supervisor.run(crash, _chunks(0, 1, 2, 3))
+        assert run.outcomes[1].status == FAILED
+        assert isinstance(run.outcomes[1].error, WorkerDiedError)
+        assert run.results[2:] == [2, 3]
+
+    def test_retry_on_fresh_worker(self, tmp_path):
+        marker = str(tmp_path / "attempted")
+        with TaskSupervisor(max_workers=2) as supervisor:
+            run = supervisor.run(
+                hang_once,
+                _chunks(0, 1, 2, marker=marker),
+                task_timeout=0.5,
+                retries=1,
+            )
+        assert run.all_ok
+        assert run.results == [0, 1, 2]
+        assert run.outcomes[1].attempts == 2
+
+    def test_overall_timeout_cancels_unstarted(self):
+        with TaskSupervisor(max_workers=1) as supervisor:
+            run = supervisor.run(sleep_for, _chunks(5, 5, 5), timeout=0.3)
+        assert [o.status for o in run.outcomes] == [TIMEOUT, CANCELLED, CANCELLED]
+
+    def test_thread_mode_abandons_hung_task(self):
+        start = time.monotonic()
+        with TaskSupervisor(max_workers=2, use_threads=True) as supervisor:
+            run = supervisor.run(
+                lambda x: hang_on(x, bad=0), _chunks(0, 1, 2), task_timeout=0.3
+            )
+        assert time.monotonic() - start < 5
+        assert run.results == [None, 2, 4]
+        assert run.outcomes[0].status == TIMEOUT
+
+    def test_chunks_drawn_lazily(self):
+        drawn = []
+
+        def chunks():
+            for value in range(4):
+                drawn.append(value)
+                yield {"args": (value,)}
+
+        drawn_at_completion = []
+        with TaskSupervisor(max_workers=1) as supervisor:
+            run = supervisor.run(
+                abs,
+                chunks(),
+                on_complete=lambda o: drawn_at_completion.append(len(drawn)),
+            )
+        assert run.results == [0, 1, 2, 3]
+        # One worker: each chunk is drawn only after the previous completed
+        assert drawn_at_completion == [1, 2, 3, 4]
+
+    def test_workers_reused_between_runs(self):
+        with TaskSupervisor(max_workers=1) as supervisor:
+            first = supervisor.run(os.getpid, [{}])
+            second = supervisor.run(os.getpid, [{}])
+        assert first.results == second.results
+
+
+class TestLocalExecutorTimeouts:
+    """Test LocalExecutor integration."""
+
+    def test_execute_supervised_returns_partial_results(self):
+        with LocalExecutor(max_workers=2) as executor:
+            run = executor.execute_supervised(
+                hang_on, _chunks(0, 1, 2, bad=2), task_timeout=0.5
+            )
+        assert run.results == [0, 2, None]
+        assert [o.index for o in run.by_status(TIMEOUT)] == [2]
+
+    def test_task_timeout_raises_from_execute_parallel(self):
+        with LocalExecutor(max_workers=2, task_timeout=0.5) as executor:
+            with pytest.raises(TaskTimeoutError):
+                executor.execute_parallel(hang_on, _chunks(0, 1, bad=1))
+
+    def test_task_timeout_applies_to_loop_chunks(self):
+        start = time.monotonic()
+        with LocalExecutor(max_workers=2, task_timeout=0.5) as executor:
+            assert executor.execute_loop_parallel(
+                hang_on, "x", range(20), func_kwargs={"bad": -1}, schedule="adaptive"
+            ) == [2 * x for x in range(20)]
+            with pytest.raises(TaskTimeoutError):
+                executor.execute_loop_parallel(
+                    hang_on, "x", range(20), func_kwargs={"bad": 7}
+                )
+        assert time.monotonic() - start < 10
+
+    def test_global_timeout_does_not_block_shutdown(self):
+        start = time.monotonic()
+        with pytest.raises(TimeoutError):
+            with LocalExecutor(max_workers=1) as executor:
+                executor.execute_parallel(sleep_for, _chunks(30, 30), timeout=0.5)
+        assert time.monotonic() - start < 10
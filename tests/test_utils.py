@@ -328,6 +328,37 @@ class TestScriptGeneration:
         assert "result.pkl" in script
         assert "error.pkl" in script
 
+    @pytest.mark.parametrize(
+        "cluster_type,expected",
+        [
+            ("slurm", "${SLURM_CPUS_PER_TASK:-6}"),
+            ("pbs", "${NCPUS:-6}"),
+            ("sge", "${NSLOTS:-6}"),
+            ("ssh", "6"),
+        ],
+    )
+    def test_job_scripts_limit_blas_threads(self, cluster_type, expected):
+        """Test that thread pools are sized to the allocated cores."""
+        config = ClusterConfig(environment_variables={"MKL_NUM_THREADS": "2"})
+        job_config = {"cores": 6, "memory": "8GB", "time": "01:00:00"}
+
+        script = create_job_script(cluster_type, job_config, "/tmp/job", config)
+
+        assert f"export OMP_NUM_THREADS={expected}" in script
+        assert f"export OPENBLAS_NUM_THREADS={expected}" in script
+        # User-provided values take precedence
+        assert "export MKL_NUM_THREADS=2" in script
+        assert f"export MKL_NUM_THREADS={expected}" not in script
+
+    def test_job_scripts_thread_limits_disabled(self):
+        """Test that thread limits can be turned off."""
+        config = ClusterConfig(limit_worker_threads=False)
+        job_config = {"cores": 6, "memory": "8GB", "time": "01:00:00"}
+
+        script = create_job_script("slurm", job_config, "/tmp/job", config)
+
+        assert "OMP_NUM_THREADS" not in script
+
     def test_create_job_script_invalid_type(self):
         """Test error handling for invalid cluster type."""
         config = ClusterConfig()
@@ -620,6 +651,25 @@ class TestLoopDetectionEdgeCases:
             result = detect_loops(test_func, (), {})
             assert result is None
 
+    def test_detect_loops_bounds_from_arguments(self):
+        """Test that range bounds are evaluated against the call's arguments."""
+
+        def test_func(data, step=2):
+            for i in range(1, len(data), step):
+                print(data[i])
+
+        result = detect_loops(test_func, ([0] * 9,), {})
+        assert result["range"] == range(1, 9, 2)
+
+    def test_detect_loops_unknown_bound(self):
+        """Test that an unknown bound disables parallelization."""
+
+        def test_func(n):
+            for i in range(n):
+                print(i)
+
+        assert detect_loops(test_func, (), {}) is None
+
     def test_detect_loops_for_loop_no_range(self):
         """Test detection of for loops without range."""
 
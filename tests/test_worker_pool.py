@@ -0,0 +1,103 @@
+"""Tests for persistent worker pools shared across local parallel calls."""
+
+import os
+import sys
+
+import pytest
+
+from clustrix.local_executor import LocalExecutor
+from clustrix.worker_pool import (
+    get_worker_pool,
+    get_worker_pool_stats,
+    shutdown_worker_pools,
+)
+
+
+def worker_pid(_=None):
+    return os.getpid()
+
+
+def module_loaded(name):
+    return name in sys.modules
+
+
+def crash_worker():
+    os._exit(1)
+
+
+@pytest.fixture(autouse=True)
+def clean_pools():
+    shutdown_worker_pools()
+    yield
+    shutdown_worker_pools()
+
+
+def _pids(executor, n=8):
+    chunks = [{"args": (i,), "kwargs": {}} for i in range(n)]
+    return set(executor.execute_parallel(worker_pid, chunks))
+
+
+class TestPersistentWorkerPool:
+    """Test reuse, recycling and shutdown of shared pools."""
+
+    def test_workers_reused_across_calls(self):
+        with LocalExecutor(max_workers=2, reuse_pool=True) as executor:
+            first = _pids(executor)
+        with LocalExecutor(max_workers=2, reuse_pool=True) as executor:
+            second = _pids(executor)
+
+        assert first & second
+        pool = get_worker_pool(max_workers=2)
+        assert pool.stats.pools_created == 1
+        assert pool.is_running
+
+    def test_pools_keyed_by_kind_and_size(self):
+        assert get_worker_pool(max_workers=2) is get_worker_pool(max_workers=2)
+        assert get_worker_pool(max_workers=2) is not get_worker_pool(max_workers=3)
+        assert get_worker_pool(max_workers=2) is not get_worker_pool(
+            use_threads=True, max_workers=2
+        )
+
+    def test_recycle_after_max_pool_tasks(self):
+        options = {"max_pool_tasks": 4}
+        with LocalExecutor(
+            max_workers=2, reuse_pool=True, pool_options=options
+        ) as executor:
+            first = _pids(executor, n=4)
+        with LocalExecutor(
+            max_workers=2, reuse_pool=True, pool_options=options
+        ) as executor:
+            second = _pids(executor, n=4)
+
+        assert not first & second
+        assert get_worker_pool(max_workers=2).stats.recycles == 1
+
+    def test_preload_modules(self):
+        pool = get_worker_pool(max_workers=1, preload_modules=["json.tool"])
+        assert pool.acquire().submit(module_loaded, "json.tool").result()
+
+    def test_broken_pool_is_replaced(self):
+        pool = get_worker_pool(max_workers=1).acquire()
+        with pytest.raises(Exception):
+            pool.submit(crash_worker).result()
+
+        assert pool.acquire().submit(worker_pid).result() != os.getpid()
+        assert pool.stats.recycles == 1
+
+    def test_thread_pool_reuse(self):
+        with LocalExecutor(max_workers=2, use_threads=True, reuse_pool=True) as ex:
+            assert _pids(ex) == {os.getpid()}
+        with LocalExecutor(max_workers=2, use_threads=True, reuse_pool=True) as ex:
+            assert _pids(ex) == {os.getpid()}
+
+        stats = get_worker_pool_stats()
+        assert [(s.kind, s.pools_created, s.tasks_submitted) for s in stats] == [
+            ("thread", 1, 16)
+        ]
+
+    def test_shutdown(self):
+        pool = get_worker_pool(max_workers=1).acquire()
+        pool.submit(worker_pid).result()
+        shutdown_worker_pools()
+        assert not pool.is_running
+        assert get_worker_pool_stats() == []